@@ -0,0 +1,63 @@
+"""
+Precomputed JSON responses for static content.
+
+Each :class:`PrecomputedResponses` builds its models once, serializes them
+to bytes and hashes the bytes into a strong ETag. Requests are then served
+straight from memory: a matching ``If-None-Match`` gets ``304 Not
+Modified``, anything else gets the stored body.
+
+Call :func:`reload_static_responses` after the underlying data changes
+(e.g. once categories come from the database); each cache swaps in its new
+entries atomically.
+"""
+
+import hashlib
+from typing import Callable, Mapping, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.api.etag import etag_matches
+
+CACHE_CONTROL = "public, max-age=300"
+
+_registry: list["PrecomputedResponses"] = []
+
+
+class Precomputed:
+    """One serialized JSON body and its ETag."""
+
+    __slots__ = ("body", "etag", "headers")
+
+    def __init__(self, model: BaseModel):
+        self.body = model.model_dump_json().encode("utf-8")
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self.headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+
+    def respond(self, request: Request) -> Response:
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=self.headers)
+        return Response(self.body, media_type="application/json", headers=self.headers)
+
+
+class PrecomputedResponses:
+    """Named responses produced by ``build`` and rebuilt together on reload."""
+
+    def __init__(self, build: Callable[[], Mapping[str, BaseModel]]):
+        self._build = build
+        self._entries: Optional[dict[str, Precomputed]] = None
+        _registry.append(self)
+
+    def reload(self) -> None:
+        self._entries = {key: Precomputed(model) for key, model in self._build().items()}
+
+    def get(self, key: str) -> Optional[Precomputed]:
+        if self._entries is None:
+            self.reload()
+        return self._entries.get(key)
+
+
+def reload_static_responses() -> None:
+    """Rebuild every precomputed response from its source."""
+    for responses in _registry:
+        responses.reload()
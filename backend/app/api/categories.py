@@ -1,21 +1,36 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from app.api.cache import PrecomputedResponses
 from app.api.schemas import CategoriesResponse, Category
-from app.services.categories import get_all_categories, get_category_by_id
+from app.services.categories import get_all_categories, get_category_by_id, reload_categories
 
 router = APIRouter(tags=["categories"])
 
+# Key "" is the full list; every category is also stored under its id.
+_LIST = ""
 
-@router.get("/categories", response_model=CategoriesResponse)
-async def list_categories():
-    """Return all award categories with subcategories."""
+
+def _build() -> dict:
+    reload_categories()
     categories = get_all_categories()
-    return CategoriesResponse(categories=categories)
+    responses = {_LIST: CategoriesResponse(categories=categories)}
+    for category in categories:
+        responses[category.id] = get_category_by_id(category.id)
+    return responses
+
+
+cached_categories = PrecomputedResponses(_build)
+
+
+@router.get("/categories", response_model=CategoriesResponse, responses={304: {"description": "Not Modified"}})
+async def list_categories(request: Request):
+    """Return all award categories with subcategories."""
+    return cached_categories.get(_LIST).respond(request)
 
 
-@router.get("/categories/{category_id}", response_model=Category)
-async def get_category(category_id: str):
+@router.get("/categories/{category_id}", response_model=Category, responses={304: {"description": "Not Modified"}})
+async def get_category(category_id: str, request: Request):
     """Return a single category by ID with full metadata."""
-    category = get_category_by_id(category_id)
+    category = cached_categories.get(category_id) if category_id != _LIST else None
     if category is None:
         raise HTTPException(status_code=404, detail="Category not found")
-    return category
+    return category.respond(request)
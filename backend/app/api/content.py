@@ -1,4 +1,5 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from app.api.cache import PrecomputedResponses
 from app.api.schemas import (
     AboutResponse,
     AboutCard,
@@ -10,9 +11,7 @@ from app.api.schemas import (
 router = APIRouter(tags=["content"])
 
 
-@router.get("/content/about", response_model=AboutResponse)
-async def get_about():
-    """Return 'About the Award' section content."""
+def _about() -> AboutResponse:
     return AboutResponse(
         section_title=BilingualText(ar="عن الجائزة", en="About the Award"),
         cards=[
@@ -44,9 +43,7 @@ async def get_about():
     )
 
 
-@router.get("/content/steps", response_model=StepsResponse)
-async def get_steps():
-    """Return the 6 application steps."""
+def _steps() -> StepsResponse:
     return StepsResponse(
         section_title=BilingualText(ar="خطوات التقديم", en="How to Apply"),
         steps=[
@@ -100,3 +97,18 @@ async def get_steps():
             ),
         ],
     )
+
+
+cached_content = PrecomputedResponses(lambda: {"about": _about(), "steps": _steps()})
+
+
+@router.get("/content/about", response_model=AboutResponse, responses={304: {"description": "Not Modified"}})
+async def get_about(request: Request):
+    """Return 'About the Award' section content."""
+    return cached_content.get("about").respond(request)
+
+
+@router.get("/content/steps", response_model=StepsResponse, responses={304: {"description": "Not Modified"}})
+async def get_steps(request: Request):
+    """Return the 6 application steps."""
+    return cached_content.get("steps").respond(request)
@@ -3,7 +3,196 @@ Shared FastAPI dependencies (DB sessions, current-user, etc.).
 Import these in endpoint files via `Depends(...)`.
 """
 
-# Example:
-# from app.db.session import get_db
-# def get_db_session():
-#     ...
+from functools import lru_cache
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.rate_limit import LoginLimiter, TokenBuckets
+from app.core.security import PasswordHasher
+from app.db.session import get_db, get_engine
+from app.rag.embeddings import Embedder, HashingEmbedder, RemoteEmbedder
+from app.rag.extraction import DEFAULT_CACHE_DIR, ExtractionService
+from app.rag.llm_review import DEFAULT_CACHE_DIR as REVIEW_CACHE_DIR, ReviewService
+from app.rag.near_duplicates import DuplicateIndex
+from app.rag.retrieval import DEFAULT_INDEX_DIR, EvidenceIndex
+from app.services.change_feed import ChangeFeed
+from app.services.events import EventBroker
+from app.services.jobs import DEFAULT_JOBS_PATH, JobQueue, WorkerPool
+from app.services.scoring import DEFAULT_SCORES_PATH, Scoreboard
+from app.services.search_index import SearchIndex
+from app.services.sql_user_store import SqlUserStore
+from app.services.tasks import PROCESS_HANDLERS, thread_handlers
+from app.services.uploads import DEFAULT_UPLOADS_DIR, UploadService
+from app.services.validation import RecentResults
+from app.services.user_store import DEFAULT_DB_PATH, UserRepository, UserStore
+
+__all__ = [
+    "get_db",
+    "get_duplicate_index",
+    "get_event_broker",
+    "get_evidence_index",
+    "get_extraction_service",
+    "get_job_queue",
+    "get_login_limiter",
+    "get_password_hasher",
+    "get_review_service",
+    "get_scoreboard",
+    "get_search_index",
+    "get_upload_service",
+    "get_user_store",
+    "get_validation_results",
+    "get_worker_pools",
+]
+
+
+@lru_cache
+def get_user_store() -> UserRepository:
+    """Process-wide user store: SQL when `DATABASE_URL` is set, else the JSON file.
+
+    With `USERS_CHANGE_FEED_PATH`, the JSON store follows the other workers'
+    writes and re-indexes the users they change for admin search.
+    """
+    if settings.DATABASE_URL:
+        return SqlUserStore(get_engine())
+    path = Path(settings.USERS_DB_PATH) if settings.USERS_DB_PATH else DEFAULT_DB_PATH
+    if not settings.USERS_CHANGE_FEED_PATH:
+        return UserStore(path)
+    store = UserStore(path, feed=ChangeFeed(Path(settings.USERS_CHANGE_FEED_PATH)))
+    store.subscribe(lambda user: get_search_index().put_user(user))
+    store.watch(settings.USERS_CHANGE_POLL_INTERVAL)
+    return store
+
+
+@lru_cache
+def get_password_hasher() -> PasswordHasher:
+    """Process-wide password hasher; its worker pool starts on first use."""
+    return PasswordHasher(
+        n=settings.PASSWORD_SCRYPT_N,
+        r=settings.PASSWORD_SCRYPT_R,
+        p=settings.PASSWORD_SCRYPT_P,
+        workers=settings.PASSWORD_HASH_WORKERS,
+        max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    )
+
+
+@lru_cache
+def get_login_limiter() -> LoginLimiter:
+    """Per-worker login rate limits (`LOGIN_IP_*`, `LOGIN_EMAIL_*`)."""
+    return LoginLimiter(
+        ip=TokenBuckets(settings.LOGIN_IP_PER_MINUTE, settings.LOGIN_IP_BURST),
+        email=TokenBuckets(settings.LOGIN_EMAIL_PER_MINUTE, settings.LOGIN_EMAIL_BURST),
+    )
+
+
+@lru_cache
+def get_upload_service() -> UploadService:
+    """Process-wide upload service; open sessions are reloaded from disk."""
+    return UploadService(
+        Path(settings.UPLOADS_DIR) if settings.UPLOADS_DIR else DEFAULT_UPLOADS_DIR,
+        max_file_bytes=settings.UPLOAD_MAX_FILE_BYTES,
+        max_submission_bytes=settings.UPLOAD_MAX_SUBMISSION_BYTES,
+        session_ttl=settings.UPLOAD_SESSION_TTL_SECONDS,
+    )
+
+
+@lru_cache
+def get_extraction_service() -> ExtractionService:
+    """Process-wide text extraction; its worker pool starts on first use."""
+    return ExtractionService(
+        Path(settings.EXTRACTION_CACHE_DIR) if settings.EXTRACTION_CACHE_DIR else DEFAULT_CACHE_DIR,
+        workers=settings.EXTRACTION_WORKERS,
+    )
+
+
+@lru_cache
+def get_validation_results() -> RecentResults:
+    """Per-worker memo of the last validation of each autosaved submission form."""
+    return RecentResults()
+
+
+@lru_cache
+def get_scoreboard() -> Scoreboard:
+    """Process-wide judges' scores; loaded from the snapshot and journal on first use."""
+    return Scoreboard(Path(settings.SCORES_PATH) if settings.SCORES_PATH else DEFAULT_SCORES_PATH)
+
+
+@lru_cache
+def get_search_index() -> SearchIndex:
+    """Per-worker admin search index; filled from the user store at startup."""
+    return SearchIndex()
+
+
+@lru_cache
+def get_event_broker() -> EventBroker:
+    """Per-worker pub/sub behind the live admin streams."""
+    return EventBroker()
+
+
+@lru_cache
+def get_duplicate_index() -> DuplicateIndex:
+    """Per-worker near-duplicate index; filled from the user store at startup."""
+    return DuplicateIndex(
+        threshold=settings.DUPLICATE_THRESHOLD,
+        num_perm=settings.DUPLICATE_NUM_PERM,
+        workers=settings.DUPLICATE_SCAN_WORKERS,
+    )
+
+
+@lru_cache
+def get_evidence_index() -> EvidenceIndex:
+    """Process-wide evidence index, embedded per `EMBEDDING_PROVIDER`."""
+    embedder: Embedder
+    if settings.EMBEDDING_PROVIDER == "openai":
+        embedder = RemoteEmbedder(
+            settings.OPENAI_API_KEY,
+            model=settings.EMBEDDING_MODEL,
+            dim=settings.EMBEDDING_DIM,
+            base_url=settings.OPENAI_BASE_URL,
+        )
+    else:
+        embedder = HashingEmbedder(settings.EMBEDDING_DIM)
+    return EvidenceIndex(
+        Path(settings.VECTOR_INDEX_DIR) if settings.VECTOR_INDEX_DIR else DEFAULT_INDEX_DIR,
+        embedder,
+    )
+
+
+@lru_cache
+def get_review_service() -> ReviewService:
+    """Process-wide LLM review queue; its worker thread starts on first use."""
+    return ReviewService(
+        settings.OPENAI_API_KEY,
+        model=settings.LLM_REVIEW_MODEL,
+        base_url=settings.OPENAI_BASE_URL,
+        cache_dir=Path(settings.LLM_REVIEW_CACHE_DIR) if settings.LLM_REVIEW_CACHE_DIR else REVIEW_CACHE_DIR,
+        batch_size=settings.LLM_REVIEW_BATCH_SIZE,
+        max_concurrency=settings.LLM_REVIEW_MAX_CONCURRENCY,
+        tokens_per_minute=settings.LLM_REVIEW_TOKENS_PER_MINUTE,
+        max_retries=settings.LLM_REVIEW_MAX_RETRIES,
+    )
+
+
+@lru_cache
+def get_job_queue() -> JobQueue:
+    """Process-wide handle on the background job database."""
+    return JobQueue(
+        Path(settings.JOBS_DB_PATH) if settings.JOBS_DB_PATH else DEFAULT_JOBS_PATH,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+@lru_cache
+def get_worker_pools() -> tuple[WorkerPool, ...]:
+    """Job workers per `JOB_WORKERS` / `JOB_PROCESS_WORKERS`; the app lifespan starts and stops them."""
+    handlers = thread_handlers(
+        get_evidence_index(), get_upload_service(), get_extraction_service(), get_review_service()
+    )
+    options = {"visibility": settings.JOB_VISIBILITY_TIMEOUT}
+    if not settings.JOB_PROCESS_WORKERS:
+        return (WorkerPool(get_job_queue(), handlers, settings.JOB_WORKERS, **options),)
+    in_threads = {kind: h for kind, h in handlers.items() if kind not in PROCESS_HANDLERS}
+    return (
+        WorkerPool(get_job_queue(), in_threads, settings.JOB_WORKERS, name="jobs", **options),
+        WorkerPool(get_job_queue(), PROCESS_HANDLERS, settings.JOB_PROCESS_WORKERS, processes=True,
+                   name="job-processes", **options),
+    )
@@ -0,0 +1,22 @@
+"""
+Entity-tag helpers for conditional requests (If-Match / If-None-Match).
+"""
+
+from typing import Optional
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """True if an If-Match / If-None-Match header value matches `etag`.
+
+    Handles `*`, comma-separated lists and weak (`W/`) validators.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in header.split(","))
+    return _strip_weak(etag) in {_strip_weak(tag) for tag in candidates}
+
+
+def _strip_weak(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
@@ -0,0 +1,75 @@
+"""
+JSON responses encoded once, without FastAPI's second pass.
+
+A handler that returns a dict or a model gets it validated against its
+``response_model`` (for a user, a copy of every draft) or walked by
+``jsonable_encoder``, and only then encoded. A handler that returns a
+:class:`~starlette.responses.Response` is sent as is, so the handlers in
+:mod:`app.api` build theirs here:
+
+- :func:`json_response` for payloads built from stored data. The stores
+  only hold what was parsed from JSON, so it is trusted and encoded
+  directly, without being validated again.
+- :class:`Encoder` for models: a ``TypeAdapter`` compiled once at import
+  that validates what it is given and dumps straight to bytes.
+
+:func:`dump_json` uses orjson when it is installed and the standard
+library otherwise; both produce the same compact UTF-8. Routes keep their
+``response_model`` for the OpenAPI schema.
+"""
+
+import json
+from typing import Any, Generic, Mapping, Optional, TypeVar
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # optional; see requirements.txt
+    orjson = None
+
+T = TypeVar("T")
+
+MEDIA_TYPE = "application/json"
+
+
+def dump_json(content: Any) -> bytes:
+    """``content`` as compact UTF-8 JSON."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(content)
+        except TypeError:  # e.g. non-string keys; the stdlib is more lenient
+            pass
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class JSONBytesResponse(Response):
+    media_type = MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def json_response(content: Any, status_code: int = 200, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """A response for trusted, JSON-native ``content`` (no validation)."""
+    return JSONBytesResponse(content, status_code, headers)
+
+
+class Encoder(Generic[T]):
+    """The ``TypeAdapter`` of one response type, built once.
+
+    ``options`` are passed to ``dump_json`` (e.g. ``exclude_none=True``).
+    """
+
+    def __init__(self, type_: type[T], **options: Any):
+        self.adapter = TypeAdapter(type_)
+        self.options = options
+
+    def dump(self, value: T) -> bytes:
+        return self.adapter.dump_json(value, **self.options)
+
+    def response(self, data: Any, status_code: int = 200, headers: Optional[Mapping[str, str]] = None) -> Response:
+        """``data`` validated as the type and encoded, in one pass each."""
+        body = self.dump(self.adapter.validate_python(data))
+        return Response(body, status_code, headers, media_type=MEDIA_TYPE)
@@ -2,19 +2,56 @@
 Authentication endpoints for user login, signup, and draft management.
 """
 
-import json
-import os
-from typing import Optional, Any
-from pathlib import Path
-
-from fastapi import APIRouter, HTTPException, Depends, status
-from pydantic import BaseModel, EmailStr
+import asyncio
+import hashlib
+import math
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from fastapi import APIRouter, BackgroundTasks, Body, Header, HTTPException, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, EmailStr, Field
+
+from app.api.deps import (
+    get_duplicate_index,
+    get_event_broker,
+    get_job_queue,
+    get_login_limiter,
+    get_password_hasher,
+    get_search_index,
+    get_user_store,
+    get_validation_results,
+)
+from app.api.etag import etag_matches
+from app.api.responses import Encoder, dump_json, json_response
+from app.core.rate_limit import LoginLimiter
+from app.core.security import PasswordHasher
+from app.rag.near_duplicates import DuplicateIndex, log_pairs
+from app.services.events import Event, EventBroker
+from app.services.export import FORMATS, export_applications
+from app.services.jobs import JobQueue
+from app.services.json_patch import (
+    JSON_PATCH_MEDIA_TYPE,
+    JsonPatchError,
+    JsonPatchTestFailed,
+    apply_json_patch,
+    merge_patch,
+)
+from app.services.search_index import SearchIndex
+from app.services.status_index import decode_cursor, encode_cursor
+from app.services.tasks import EVIDENCE_INDEX
+from app.services.user_store import DuplicateEmailError, UserRepository
+from app.services.validation import (
+    RecentResults,
+    delta_from_json_patch,
+    delta_from_merge_patch,
+    get_validator,
+    parse_submission_draft_key,
+    submission_draft_key,
+)
 
 router = APIRouter()
 
-# Path to the JSON database file
-DB_PATH = Path(__file__).parent.parent.parent.parent.parent / "data" / "users.json"
-
 
 class LoginRequest(BaseModel):
     email: EmailStr
@@ -30,12 +67,28 @@ class SubmitApplicationRequest(BaseModel):
     categorySlug: str
     referenceNumber: str
     submittedAt: str
+    data: Optional[dict] = None  # the submission form; see app.services.validation
+
+
+class ValidateSubmissionRequest(BaseModel):
+    categorySlug: str
+    data: dict
 
 
 class DraftData(BaseModel):
     data: dict
 
 
+class DraftPatchResponse(BaseModel):
+    key: str
+    version: int
+    changed: bool
+    validation: Optional[dict] = None  # submission drafts only
+
+
+DRAFT_PATCH = Encoder(DraftPatchResponse, exclude_none=True)
+
+
 class UserResponse(BaseModel):
     id: int
     email: str
@@ -50,38 +103,75 @@ class UserResponse(BaseModel):
     isDirector: bool = False
 
 
-def load_users() -> dict:
-    """Load users from JSON file."""
-    if not DB_PATH.exists():
-        return {"users": []}
-    with open(DB_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+async def get_user_or_404(store: UserRepository, user_id: int) -> dict:
+    """Look up a user by id or raise 404."""
+    user = await store.get(user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
 
 
-def save_users(data: dict) -> None:
-    """Save users to JSON file."""
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(DB_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+def utc_timestamp() -> str:
+    """Current time in the ISO 8601 form the frontend sends, e.g. 2026-02-16T13:06:57.763Z."""
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
 
 
-@router.post("/login", response_model=UserResponse)
-async def login(req: LoginRequest):
-    """
-    Login endpoint - validates email and password.
-    Returns user data if credentials are correct.
-    """
-    db = load_users()
-    users = db.get("users", [])
+# Sub-documents that can grow to kilobytes; also served as sub-resources.
+HEAVY_USER_FIELDS = ("registrationData", "submissions", "draft")
 
-    user = next((u for u in users if u["email"] == req.email), None)
 
-    if not user or user["password"] != req.password:
+def parse_user_fields(value: Optional[str], param: str) -> Optional[set[str]]:
+    """Parse a comma-separated list of `UserResponse` field names (400 if unknown)."""
+    if value is None:
+        return None
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = names - UserResponse.model_fields.keys()
+    if unknown:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid email or password"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown {param}: {', '.join(sorted(unknown))}"
         )
+    return names
+
+
+def user_projection(fields: Optional[str], include: Optional[str]) -> Optional[set[str]]:
+    """Fields selected by `fields=` / `include=`, or None for the full response.
 
+    `fields=registered,isAdmin` returns just those (plus `id`);
+    `include=draft` returns every light field plus the listed heavy ones.
+    """
+    selected = parse_user_fields(fields, "fields")
+    included = parse_user_fields(include, "include")
+    if selected is None and included is None:
+        return None
+    if selected is None:
+        selected = set(UserResponse.model_fields) - set(HEAVY_USER_FIELDS)
+    return {"id"} | selected | (included or set())
+
+
+def projected_user_response(user: dict, projection: Optional[set[str]]) -> Response:
+    """`user_response`, trimmed to `projection` when one was requested."""
+    payload = user_response(user)
+    if projection is not None:
+        payload = {k: v for k, v in payload.items() if k in projection}
+    return json_response(payload)
+
+
+def cacheable_json(request: Request, payload: Any) -> Response:
+    """JSON response with a content-hash ETag; 304 when If-None-Match matches."""
+    body = dump_json(payload)
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def user_response(user: dict) -> dict:
+    """Shape a stored user as a `UserResponse` payload."""
     return {
         "id": user["id"],
         "email": user["email"],
@@ -97,99 +187,132 @@ async def login(req: LoginRequest):
     }
 
 
+FIELDS_QUERY = Query(None, description="Comma-separated fields to return, e.g. `registered,isAdmin`")
+INCLUDE_QUERY = Query(None, description="Heavy fields to add to the light ones, e.g. `draft`")
+
+
+@router.post("/login", response_model=UserResponse)
+async def login(
+    req: LoginRequest,
+    request: Request,
+    fields: Optional[str] = FIELDS_QUERY,
+    include: Optional[str] = INCLUDE_QUERY,
+    store: UserRepository = Depends(get_user_store),
+    hasher: PasswordHasher = Depends(get_password_hasher),
+    limiter: LoginLimiter = Depends(get_login_limiter),
+):
+    """
+    Login endpoint - validates email and password.
+    Returns user data if credentials are correct.
+    Plaintext or outdated password hashes are upgraded on success.
+    Attempts are rate limited per client IP and per email (429).
+    """
+    wait = limiter.check(request.client.host if request.client else None, req.email)
+    if wait:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, please try again later",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+    projection = user_projection(fields, include)
+    user = await store.get_by_email(req.email)
+
+    ok, upgraded = await hasher.verify(user["password"] if user else None, req.password)
+    if not ok:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password"
+        )
+
+    if upgraded:
+        stored = user["password"]
+
+        def apply(current: dict) -> None:
+            # Skip if the password changed while we were hashing.
+            if current["password"] == stored:
+                current["password"] = upgraded
+
+        user = await store.update(user["id"], apply, paths=[("password",)])
+
+    return projected_user_response(user, projection)
+
+
 @router.post("/signup", response_model=UserResponse)
-async def signup(req: SignupRequest):
+async def signup(
+    req: SignupRequest,
+    store: UserRepository = Depends(get_user_store),
+    hasher: PasswordHasher = Depends(get_password_hasher),
+    search: SearchIndex = Depends(get_search_index),
+):
     """
     Signup endpoint - creates a new user account.
     """
-    db = load_users()
-    users = db.get("users", [])
-
-    # Check if email already exists
-    if any(u["email"] == req.email for u in users):
+    password_hash = await hasher.hash(req.password)
+
+    # Create new user; the store rejects an email that is already taken
+    try:
+        new_user = await store.create({
+            "email": req.email,
+            "password": password_hash,
+            "registered": False,
+            "applied": False,
+            "appliedCategories": [],
+            "draft": None,
+            "submissions": {}
+        })
+    except DuplicateEmailError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
+    search.put_user(new_user)
 
-    # Create new user
-    new_id = max([u["id"] for u in users], default=0) + 1
-    new_user = {
-        "id": new_id,
-        "email": req.email,
-        "password": req.password,
-        "registered": False,
-        "applied": False,
-        "appliedCategories": [],
-        "draft": None,
-        "submissions": {}
-    }
-
-    users.append(new_user)
-    db["users"] = users
-    save_users(db)
-
-    return {
-        "id": new_user["id"],
-        "email": new_user["email"],
-        "registered": new_user["registered"],
-        "applied": new_user["applied"],
-        "appliedCategories": [],
-        "categoryStatuses": {},
-        "registrationData": None,
-        "submissions": {},
-        "draft": None,
-        "isAdmin": False,
-        "isDirector": False
-    }
+    return json_response(user_response(new_user))
 
 
 @router.get("/me/{user_id}", response_model=UserResponse)
-async def get_current_user(user_id: int):
+async def get_current_user(
+    user_id: int,
+    fields: Optional[str] = FIELDS_QUERY,
+    include: Optional[str] = INCLUDE_QUERY,
+    store: UserRepository = Depends(get_user_store),
+):
     """
     Get current user data by ID.
+    Use `fields=` / `include=` to skip the heavy sub-documents.
     """
-    db = load_users()
-    users = db.get("users", [])
+    projection = user_projection(fields, include)
+    user = await get_user_or_404(store, user_id)
 
-    user = next((u for u in users if u["id"] == user_id), None)
+    return projected_user_response(user, projection)
 
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
 
-    return {
-        "id": user["id"],
-        "email": user["email"],
-        "registered": user["registered"],
-        "applied": user["applied"],
-        "appliedCategories": user.get("appliedCategories", []),
-        "categoryStatuses": user.get("categoryStatuses", {}),
-        "registrationData": user.get("registrationData"),
-        "submissions": user.get("submissions", {}),
-        "draft": user.get("draft"),
-        "isAdmin": user.get("isAdmin", False),
-        "isDirector": user.get("isDirector", False)
-    }
+@router.get("/me/{user_id}/submissions")
+async def get_user_submissions(user_id: int, request: Request, store: UserRepository = Depends(get_user_store)):
+    """
+    Get the user's submissions, revalidated with ETag / If-None-Match.
+    """
+    user = await get_user_or_404(store, user_id)
 
+    return cacheable_json(request, {"submissions": user.get("submissions", {})})
 
-@router.get("/check-category/{user_id}/{category_slug}")
-async def check_category_applied(user_id: int, category_slug: str):
+
+@router.get("/me/{user_id}/registration-data")
+async def get_user_registration_data(user_id: int, request: Request, store: UserRepository = Depends(get_user_store)):
     """
-    Check if user has already applied to a specific category.
+    Get the user's registration data, revalidated with ETag / If-None-Match.
     """
-    db = load_users()
-    users = db.get("users", [])
+    user = await get_user_or_404(store, user_id)
 
-    user = next((u for u in users if u["id"] == user_id), None)
+    return cacheable_json(request, {"registrationData": user.get("registrationData")})
 
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+
+@router.get("/check-category/{user_id}/{category_slug}")
+async def check_category_applied(user_id: int, category_slug: str, store: UserRepository = Depends(get_user_store)):
+    """
+    Check if user has already applied to a specific category.
+    """
+    user = await get_user_or_404(store, user_id)
 
     applied_categories = user.get("appliedCategories", [])
     has_applied = category_slug in applied_categories
@@ -201,45 +324,168 @@ async def check_category_applied(user_id: int, category_slug: str):
 
 
 @router.post("/draft/{user_id}")
-async def save_draft(user_id: int, draft: DraftData):
+async def save_draft(
+    user_id: int,
+    draft: DraftData,
+    store: UserRepository = Depends(get_user_store),
+    search: SearchIndex = Depends(get_search_index),
+):
     """
     Save draft data for a user.
     """
-    db = load_users()
-    users = db.get("users", [])
+    await get_user_or_404(store, user_id)
 
-    user = next((u for u in users if u["id"] == user_id), None)
+    def apply(user: dict) -> None:
+        # Bump the version of every category whose draft actually changed
+        # so PATCH clients holding an older ETag get a 409.
+        previous = user.get("draft") or {}
+        versions = user.get("draftVersions", {})
+        for key in previous.keys() | draft.data.keys():
+            if previous.get(key) != draft.data.get(key):
+                versions[key] = versions.get(key, 0) + 1
+        user["draftVersions"] = versions
+        user["draft"] = draft.data
 
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-
-    user["draft"] = draft.data
-    db["users"] = users
-    save_users(db)
+    search.put_user(await store.update(user_id, apply))
 
     return {"message": "Draft saved successfully"}
 
 
 @router.get("/draft/{user_id}")
-async def get_draft(user_id: int):
+async def get_draft(user_id: int, request: Request, store: UserRepository = Depends(get_user_store)):
     """
-    Get draft data for a user.
+    Get draft data for a user, revalidated with ETag / If-None-Match.
     """
-    db = load_users()
-    users = db.get("users", [])
+    user = await get_user_or_404(store, user_id)
 
-    user = next((u for u in users if u["id"] == user_id), None)
+    return cacheable_json(request, {"draft": user.get("draft")})
 
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
+
+def draft_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+@router.get("/draft/{user_id}/{draft_key}")
+async def get_draft_section(
+    user_id: int,
+    draft_key: str,
+    request: Request,
+    store: UserRepository = Depends(get_user_store),
+):
+    """
+    Get one category's draft with its version.
+    Answers 304 when If-None-Match carries the current ETag.
+    """
+    user = await get_user_or_404(store, user_id)
+
+    version = user.get("draftVersions", {}).get(draft_key, 0)
+    etag = draft_etag(version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    return json_response(
+        {"key": draft_key, "version": version, "draft": (user.get("draft") or {}).get(draft_key)},
+        headers={"ETag": etag},
+    )
+
+
+@router.patch("/draft/{user_id}/{draft_key}", response_model=DraftPatchResponse, response_model_exclude_none=True)
+async def patch_draft_section(
+    user_id: int,
+    draft_key: str,
+    request: Request,
+    patch: Any = Body(...),
+    store: UserRepository = Depends(get_user_store),
+    recent: RecentResults = Depends(get_validation_results),
+    search: SearchIndex = Depends(get_search_index),
+):
+    """
+    Partially update one category's draft (autosave).
+
+    The body is a JSON Merge Patch (`application/merge-patch+json`, the
+    default) or a JSON Patch (`application/json-patch+json`) applied to
+    `draft[draft_key]`. Send the last seen ETag in If-Match to get a 409
+    instead of overwriting a newer version. A patch that changes nothing
+    is answered without writing anything.
+
+    Submission forms (`submission:<categorySlug>` keys) are validated on
+    every save; only the criteria the patch touched are rechecked.
+    """
+    await get_user_or_404(store, user_id)
+    if_match = request.headers.get("if-match")
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    def plan(user: dict) -> tuple[int, Any, bool]:
+        version = user.get("draftVersions", {}).get(draft_key, 0)
+        if if_match and not etag_matches(if_match, draft_etag(version)):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Draft was modified by another request"
+            )
+        current = (user.get("draft") or {}).get(draft_key)
+        try:
+            if media_type == JSON_PATCH_MEDIA_TYPE:
+                patched = apply_json_patch(current, patch)
+            else:
+                patched = merge_patch(current, patch)
+        except JsonPatchTestFailed as exc:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+        except JsonPatchError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+        return version, patched, patched != current
+
+    # Cheap path: most autosaves change nothing; check against the current
+    # read-only snapshot before copying or writing anything.
+    version, patched, changed = plan(await store.get(user_id))
+    previous_version = version
+    if changed:
+        def apply(user: dict) -> None:
+            nonlocal version, patched, previous_version
+            previous_version, patched, _ = plan(user)
+            version = previous_version + 1
+            user["draft"][draft_key] = patched
+            user["draftVersions"][draft_key] = version
+
+        user = await store.update(
+            user_id, apply, paths=[("draft", draft_key), ("draftVersions", draft_key)]
         )
+        search.put_user(user)
 
-    return {"draft": user.get("draft")}
+    result = {"key": draft_key, "version": version, "changed": changed}
+    category_slug = parse_submission_draft_key(draft_key)
+    if category_slug is not None:
+        result["validation"] = validate_submission_draft(
+            recent, user_id, draft_key, category_slug, patched, previous_version, version, media_type, patch
+        )
+    return DRAFT_PATCH.response(result, headers={"ETag": draft_etag(version)})
+
+
+def validate_submission_draft(
+    recent: RecentResults,
+    user_id: int,
+    draft_key: str,
+    category_slug: str,
+    form: Any,
+    previous_version: int,
+    version: int,
+    media_type: str,
+    patch: Any,
+) -> Optional[dict]:
+    """Validate an autosaved submission form against the previous save's result."""
+    form = form if isinstance(form, dict) else {}
+    validator = get_validator(category_slug, form.get("employeeSubcategory") or None)
+    if validator is None:
+        return None
+    result = recent.get(user_id, draft_key, version)
+    if result is None:
+        previous = recent.get(user_id, draft_key, previous_version)
+        if media_type == JSON_PATCH_MEDIA_TYPE:
+            delta = delta_from_json_patch(patch)
+        else:
+            delta = delta_from_merge_patch(patch)
+        result = validator.revalidate(form, previous, delta)
+        recent.put(user_id, draft_key, version, result)
+    return result.to_dict()
 
 
 class RegistrationData(BaseModel):
@@ -249,107 +495,276 @@ class RegistrationData(BaseModel):
 
 
 @router.post("/complete-registration/{user_id}")
-async def complete_registration(user_id: int, registration: RegistrationData):
+async def complete_registration(
+    user_id: int,
+    registration: RegistrationData,
+    store: UserRepository = Depends(get_user_store),
+    search: SearchIndex = Depends(get_search_index),
+    events: EventBroker = Depends(get_event_broker),
+):
     """
     Mark user as registered and save registration data.
     Also tracks which category the user has applied to and its status.
     """
-    db = load_users()
-    users = db.get("users", [])
-
-    user = next((u for u in users if u["id"] == user_id), None)
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-
-    # Check if user has already applied to this category
-    applied_categories = user.get("appliedCategories", [])
-    if registration.categorySlug in applied_categories:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You have already submitted an application for this category"
-        )
-
-    # Add category to applied list
-    applied_categories.append(registration.categorySlug)
-    user["appliedCategories"] = applied_categories
-
-    # Track category status
-    category_statuses = user.get("categoryStatuses", {})
-    category_statuses[registration.categorySlug] = registration.status
-    user["categoryStatuses"] = category_statuses
+    await get_user_or_404(store, user_id)
+    now = utc_timestamp()
+    previous: list[Optional[str]] = []
+
+    def apply(user: dict) -> None:
+        # Check if user has already applied to this category
+        applied_categories = user.get("appliedCategories", [])
+        if registration.categorySlug in applied_categories:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="You have already submitted an application for this category"
+            )
+
+        # Add category to applied list
+        applied_categories.append(registration.categorySlug)
+        user["appliedCategories"] = applied_categories
+
+        # Track category status
+        category_statuses = user.get("categoryStatuses", {})
+        previous[:] = [category_statuses.get(registration.categorySlug)]
+        category_statuses[registration.categorySlug] = registration.status
+        user["categoryStatuses"] = category_statuses
+        registered_at = user.get("categoryRegisteredAt", {})
+        registered_at[registration.categorySlug] = now
+        user["categoryRegisteredAt"] = registered_at
 
-    user["registered"] = True
-    user["registrationData"] = registration.data
+        user["registered"] = True
+        user["registrationData"] = registration.data
 
-    db["users"] = users
-    save_users(db)
+    search.put_user(await store.update(user_id, apply))
+    publish_registration(events, user_id, registration.categorySlug, registration.status, previous[0])
 
     return {"message": "Registration completed successfully"}
 
 
 @router.post("/submit-application/{user_id}")
-async def submit_application(user_id: int, req: SubmitApplicationRequest):
+async def submit_application(
+    user_id: int,
+    req: SubmitApplicationRequest,
+    background: BackgroundTasks,
+    store: UserRepository = Depends(get_user_store),
+    search: SearchIndex = Depends(get_search_index),
+    duplicates: DuplicateIndex = Depends(get_duplicate_index),
+    jobs: JobQueue = Depends(get_job_queue),
+):
     """
     Save submission data.
+
+    The form is taken from `data`, or else from the autosaved
+    `submission:<categorySlug>` draft, and must pass validation (422 with
+    the issues otherwise). Submissions without either are accepted as
+    before, since older clients keep the form in the browser.
+
+    The form and the attachments' text are queued for indexing for
+    reviewers' evidence search (a resubmission replaces a queued job), and
+    after responding its responses are checked for near-duplicates of
+    other submissions.
     """
-    db = load_users()
-    users = db.get("users", [])
+    user = await get_user_or_404(store, user_id)
+    form = req.data
+    if form is None:
+        form = (user.get("draft") or {}).get(submission_draft_key(req.categorySlug))
+    if form is not None:
+        validator = get_validator(req.categorySlug, form.get("employeeSubcategory") or None)
+        if validator is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Unknown category"
+            )
+        result = validator.validate(form)
+        if not result.valid:
+            raise HTTPException(
+                status_code=422,
+                detail={"message": "Submission is incomplete", **result.to_dict()}
+            )
+
+    def apply(user: dict) -> None:
+        submissions = user.get("submissions", {})
+        submissions[req.categorySlug] = {
+            "referenceNumber": req.referenceNumber,
+            "submittedAt": req.submittedAt
+        }
+        if form is not None:
+            submissions[req.categorySlug]["data"] = form
+        user["submissions"] = submissions
+
+        # Also make sure appliedCategories has it?
+
+    search.put_user(await store.update(user_id, apply))
+    await asyncio.to_thread(
+        jobs.enqueue,
+        EVIDENCE_INDEX,
+        {"userId": user_id, "categorySlug": req.categorySlug, "form": form},
+        dedup_key=f"evidence:{user_id}:{req.categorySlug}",
+        replace=True,
+    )
+    if form is not None:
+        background.add_task(check_near_duplicates, duplicates, user_id, req.categorySlug, form)
 
-    user = next((u for u in users if u["id"] == user_id), None)
+    return {"message": "Application submitted successfully"}
 
-    if not user:
+
+def check_near_duplicates(duplicates: DuplicateIndex, user_id: int, category_slug: str, form: dict) -> None:
+    log_pairs(duplicates.add_submission(user_id, category_slug, form))
+
+
+@router.post("/validate-submission")
+async def validate_submission(req: ValidateSubmissionRequest):
+    """
+    Validate a submission form without saving it.
+    """
+    validator = get_validator(req.categorySlug, req.data.get("employeeSubcategory") or None)
+    if validator is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
+            detail="Unknown category"
         )
+    return json_response(validator.validate(req.data).to_dict())
 
-    submissions = user.get("submissions", {})
-    submissions[req.categorySlug] = {
-        "referenceNumber": req.referenceNumber,
-        "submittedAt": req.submittedAt
-    }
-    user["submissions"] = submissions
 
-    # Also make sure appliedCategories has it?
-    
-    db["users"] = users
-    save_users(db)
+# ═══ Admin Endpoints ═══
 
-    return {"message": "Application submitted successfully"}
 
+REGISTRATION_EVENT = "registration"
+
+
+def publish_registration(
+    events: EventBroker, user_id: int, category_slug: str, new_status: str, previous: Optional[str]
+) -> None:
+    """Tell the live admin streams a registration changed status."""
+    events.publish(REGISTRATION_EVENT, {
+        "userId": user_id,
+        "categorySlug": category_slug,
+        "status": new_status,
+        "previousStatus": previous,
+        "at": utc_timestamp(),
+    })
+
+# Largest page the registration listings hand out.
+PAGE_MAX = 500
+
+
+async def registration_page(
+    store: UserRepository,
+    status_: str,
+    category: Optional[str],
+    submitted_from: Optional[str],
+    submitted_to: Optional[str],
+    cursor: Optional[str],
+    limit: int,
+) -> dict:
+    """One page of registrations in `status_`, read from the status index."""
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
 
-# ═══ Admin Endpoints ═══
+    rows, next_entry = await store.registrations(
+        status_, category, submitted_from, submitted_to, after, limit
+    )
+    items = []
+    for user, (registered_at, user_id, cat_slug) in rows:
+        # Find registration data from the draft for this category
+        draft = user.get("draft", {}) or {}
+        items.append({
+            "userId": user_id,
+            "email": user["email"],
+            "categorySlug": cat_slug,
+            "status": status_,
+            "registrationData": draft.get(cat_slug, {}),
+            "submittedAt": registered_at or None,
+        })
+    return {
+        "items": items,
+        "total": await store.count_registrations(status_, category, submitted_from, submitted_to),
+        "nextCursor": encode_cursor(next_entry) if next_entry else None,
+    }
+
+
+@router.get("/admin/registrations")
+async def list_registrations(
+    status_: str = Query("waiting-approval", alias="status"),
+    category: Optional[str] = None,
+    submittedFrom: Optional[str] = None,
+    submittedTo: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=PAGE_MAX),
+    store: UserRepository = Depends(get_user_store),
+):
+    """
+    List category registrations by status (waiting-approval, qualified,
+    rejected, ...), oldest first.
+    Filter by category slug and by registration time (`submittedFrom`
+    inclusive, `submittedTo` exclusive, ISO 8601). Pass the returned
+    `nextCursor` back as `cursor` to fetch the following page.
+    """
+    return json_response(await registration_page(store, status_, category, submittedFrom, submittedTo, cursor, limit))
 
 
 @router.get("/admin/pending-registrations")
-async def get_pending_registrations():
+async def get_pending_registrations(
+    category: Optional[str] = None,
+    submittedFrom: Optional[str] = None,
+    submittedTo: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX),
+    store: UserRepository = Depends(get_user_store),
+):
     """
-    Get all users that have categories with 'waiting-approval' status.
-    Returns a list of pending registration items.
+    Get registrations with 'waiting-approval' status.
+    Returns every pending registration unless `limit` is given; then one
+    page at a time, as with `/admin/registrations`.
     """
-    db = load_users()
-    users = db.get("users", [])
+    page = await registration_page(
+        store, "waiting-approval", category, submittedFrom, submittedTo, cursor, limit or PAGE_MAX
+    )
+    pending = page["items"]
+    while limit is None and page["nextCursor"]:
+        page = await registration_page(
+            store, "waiting-approval", category, submittedFrom, submittedTo, page["nextCursor"], PAGE_MAX
+        )
+        pending.extend(page["items"])
+    return json_response({"pending": pending, "total": page["total"], "nextCursor": page["nextCursor"]})
+
+
+@router.get("/admin/registration-events")
+async def registration_events(
+    category: Optional[str] = None,
+    status_: Optional[str] = Query(None, alias="status"),
+    lastEventId: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None),
+    events: EventBroker = Depends(get_event_broker),
+):
+    """
+    Server-Sent Events stream of registration status changes (event
+    `registration`, data `{"userId", "categorySlug", "status",
+    "previousStatus", "at"}`), from `complete-registration` and the review
+    endpoints. Filter by category slug and by new or previous status.
+
+    Reconnecting with `Last-Event-ID` (or `lastEventId`) replays what was
+    missed. If that is not possible, a `reset` event asks the client to
+    reload `pending-registrations` before continuing.
+    """
+    def match(event: Event) -> bool:
+        data = event.data
+        if event.type != REGISTRATION_EVENT:
+            return False
+        if category is not None and data["categorySlug"] != category:
+            return False
+        return status_ is None or status_ in (data["status"], data["previousStatus"])
 
-    pending = []
-    for user in users:
-        category_statuses = user.get("categoryStatuses", {})
-        for cat_slug, cat_status in category_statuses.items():
-            if cat_status == "waiting-approval":
-                # Find registration data from the draft for this category
-                draft = user.get("draft", {}) or {}
-                reg_draft = draft.get(cat_slug, {})
-                pending.append({
-                    "userId": user["id"],
-                    "email": user["email"],
-                    "categorySlug": cat_slug,
-                    "registrationData": reg_draft,
-                    "submittedAt": None,
-                })
-    return {"pending": pending}
+    return StreamingResponse(
+        events.stream(last_event_id or lastEventId, match),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 class ApproveRejectRequest(BaseModel):
@@ -359,7 +774,12 @@ class ApproveRejectRequest(BaseModel):
 
 
 @router.post("/admin/review-registration")
-async def review_registration(req: ApproveRejectRequest):
+async def review_registration(
+    req: ApproveRejectRequest,
+    store: UserRepository = Depends(get_user_store),
+    search: SearchIndex = Depends(get_search_index),
+    events: EventBroker = Depends(get_event_broker),
+):
     """
     Approve or reject a pending registration.
     Approve → status becomes 'qualified' (user can proceed to submission).
@@ -371,34 +791,157 @@ async def review_registration(req: ApproveRejectRequest):
             detail="Action must be 'approve' or 'reject'"
         )
 
-    db = load_users()
-    users = db.get("users", [])
+    await get_user_or_404(store, req.userId)
+    new_status = REVIEW_STATUSES[req.action]
 
-    user = next((u for u in users if u["id"] == req.userId), None)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    def apply(user: dict) -> None:
+        error = registration_review_error(user, req.categorySlug)
+        if error is not None:
+            raise HTTPException(status_code=error[0], detail=error[1])
+        category_statuses = user.get("categoryStatuses", {})
+        category_statuses[req.categorySlug] = new_status
+        user["categoryStatuses"] = category_statuses
 
-    category_statuses = user.get("categoryStatuses", {})
-    if req.categorySlug not in category_statuses:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Category registration not found for this user"
-        )
+    search.put_user(await store.update(req.userId, apply))
+    publish_registration(events, req.userId, req.categorySlug, new_status, "waiting-approval")
+
+    return {"message": f"Registration {req.action}d successfully", "newStatus": new_status}
+
+
+REVIEW_STATUSES = {"approve": "qualified", "reject": "rejected"}
+
+# Decisions accepted by one bulk review request.
+MAX_BULK_DECISIONS = 1000
+
+
+def registration_review_error(user: dict, category_slug: str) -> Optional[tuple[int, str]]:
+    """(status code, detail) if the registration cannot be approved or rejected."""
+    category_status = (user.get("categoryStatuses") or {}).get(category_slug)
+    if category_status is None:
+        return status.HTTP_404_NOT_FOUND, "Category registration not found for this user"
+    if category_status != "waiting-approval":
+        return status.HTTP_400_BAD_REQUEST, "This registration is not in 'waiting-approval' state"
+    return None
+
+
+class BulkReviewRequest(BaseModel):
+    decisions: list[ApproveRejectRequest] = Field(..., min_length=1, max_length=MAX_BULK_DECISIONS)
+    allOrNothing: bool = False  # apply nothing if any decision is invalid
 
-    if category_statuses[req.categorySlug] != "waiting-approval":
+
+@router.post("/admin/review-registrations")
+async def review_registrations(
+    req: BulkReviewRequest,
+    store: UserRepository = Depends(get_user_store),
+    search: SearchIndex = Depends(get_search_index),
+    events: EventBroker = Depends(get_event_broker),
+):
+    """
+    Approve or reject many pending registrations at once.
+
+    Every decision is checked first and reported in `items`, in request
+    order: `{"userId", "categorySlug", "action", "status", "newStatus"}`
+    for applied ones, `status` and `detail` (as the single-decision endpoint
+    would answer) for the rest. The valid decisions are then applied
+    together in one write. With `allOrNothing`, any invalid decision makes
+    it 409 with the items and nothing is applied.
+    """
+    items: list[dict] = []
+    users: dict[int, Optional[dict]] = {}
+    valid: dict[int, dict[str, str]] = {}
+    for decision in req.decisions:
+        item = {"userId": decision.userId, "categorySlug": decision.categorySlug, "action": decision.action}
+        items.append(item)
+        if decision.userId not in users:
+            users[decision.userId] = await store.get(decision.userId)
+        user = users[decision.userId]
+        if decision.action not in REVIEW_STATUSES:
+            error = status.HTTP_400_BAD_REQUEST, "Action must be 'approve' or 'reject'"
+        elif user is None:
+            error = status.HTTP_404_NOT_FOUND, "User not found"
+        elif decision.categorySlug in valid.get(decision.userId, {}):
+            error = status.HTTP_409_CONFLICT, "Duplicate decision for this registration"
+        else:
+            error = registration_review_error(user, decision.categorySlug)
+        if error is not None:
+            item["status"], item["detail"] = error
+            continue
+        new_status = REVIEW_STATUSES[decision.action]
+        valid.setdefault(decision.userId, {})[decision.categorySlug] = new_status
+        item["status"], item["newStatus"] = status.HTTP_200_OK, new_status
+
+    applied = sum(len(decisions) for decisions in valid.values())
+    if req.allOrNothing and applied < len(items):
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="This registration is not in 'waiting-approval' state"
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Some decisions are invalid; nothing was applied", "items": items},
         )
 
-    new_status = "qualified" if req.action == "approve" else "rejected"
-    category_statuses[req.categorySlug] = new_status
-    user["categoryStatuses"] = category_statuses
-
-    db["users"] = users
-    save_users(db)
+    def decide(decisions: dict[str, str]):
+        def apply(user: dict) -> None:
+            # Re-checked against the latest version: a concurrent review
+            # aborts the whole batch rather than overwriting it.
+            for category_slug in decisions:
+                if registration_review_error(user, category_slug) is not None:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="A registration changed during the review; nothing was applied",
+                    )
+            user["categoryStatuses"] = {**user.get("categoryStatuses", {}), **decisions}
+        return apply
+
+    updated = await store.update_many(
+        {user_id: decide(decisions) for user_id, decisions in valid.items()},
+        paths=[("categoryStatuses",)],
+    )
+    for user in updated.values():
+        search.put_user(user)
+    for user_id, decisions in valid.items():
+        for category_slug, new_status in decisions.items():
+            publish_registration(events, user_id, category_slug, new_status, "waiting-approval")
+
+    return json_response({"items": items, "applied": applied, "failed": len(items) - applied})
+
+
+@router.get("/admin/search")
+async def search_applications(
+    q: str = Query(..., min_length=1, description="Name, email, ID number, reference, project title or response text"),
+    category: Optional[str] = None,
+    status_: Optional[str] = Query(None, alias="status"),
+    limit: int = Query(20, ge=1, le=100),
+    store: UserRepository = Depends(get_user_store),
+    search: SearchIndex = Depends(get_search_index),
+):
+    """
+    Full-text search over applications (Arabic and English), best match first.
+    Filter by category slug and registration status.
+    """
+    await search.ensure_loaded(store)
+    hits, total = search.search(q, limit, category, status_)
+    return json_response({
+        "items": [{**hit.info, "score": round(hit.score, 4)} for hit in hits],
+        "total": total,
+    })
+
+
+@router.get("/admin/export")
+async def export_applications_file(
+    format_: str = Query("ndjson", alias="format", pattern="^(ndjson|csv|xlsx)$"),
+    category: Optional[str] = Query(None, description="Category slug, or a base category such as `employee`"),
+    status_: Optional[str] = Query(None, alias="status", description="Registration status, e.g. `qualified`"),
+    submitted: Optional[bool] = None,
+    store: UserRepository = Depends(get_user_store),
+):
+    """
+    Every registration, draft and submission, one row per applicant and
+    category, as NDJSON, CSV or XLSX.
 
-    return {"message": f"Registration {req.action}d successfully", "newStatus": new_status}
+    The file is streamed while users are read in batches, so memory stays
+    flat however many applications there are.
+    """
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    return StreamingResponse(
+        export_applications(store, format_, category, status_, submitted),
+        media_type=FORMATS[format_],
+        headers={"Content-Disposition": f'attachment; filename="applications-{stamp}.{format_}"'},
+    )
@@ -0,0 +1,58 @@
+"""
+Background job progress.
+
+    GET /jobs/stats                  queue depth per kind and status
+    GET /jobs?kind=...&status=...    recently updated jobs
+    GET /jobs/{id}                   one job: status, progress, result or error
+
+Jobs are queued by other endpoints (e.g. submissions queue evidence
+indexing) and run by the workers started with the app; see
+:mod:`app.services.jobs`.
+"""
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.api.deps import get_job_queue, get_worker_pools
+from app.api.responses import json_response
+from app.services.jobs import JobQueue, WorkerPool
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def job_stats(
+    queue: JobQueue = Depends(get_job_queue),
+    pools: tuple[WorkerPool, ...] = Depends(get_worker_pools),
+):
+    depth = await asyncio.to_thread(queue.depth)
+    return json_response({
+        "depth": depth,
+        "queued": sum(counts.get("queued", 0) for counts in depth.values()),
+        "running": sum(counts.get("running", 0) for counts in depth.values()),
+        "workers": [
+            {"name": pool.name, "workers": pool.workers, "processes": pool.processes, "kinds": sorted(pool.handlers)}
+            for pool in pools
+        ],
+    })
+
+
+@router.get("")
+async def list_jobs(
+    kind: Optional[str] = None,
+    status_: Optional[str] = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=500),
+    queue: JobQueue = Depends(get_job_queue),
+):
+    jobs = await asyncio.to_thread(queue.list, kind, status_, limit)
+    return json_response({"items": [job.to_dict() for job in jobs]})
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: int, queue: JobQueue = Depends(get_job_queue)):
+    job = await asyncio.to_thread(queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return json_response(job.to_dict())
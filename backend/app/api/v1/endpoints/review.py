@@ -0,0 +1,188 @@
+"""
+Reviewer tools.
+
+    GET  /review/evidence?q=...&category=...&criterion=...   passages supporting a criterion
+    GET  /review/duplicates?category=...&userId=...          near-duplicate responses
+    POST /review/duplicates/rescan                            recheck every submission
+    POST /review/suggestions/{user_id}/{category_slug}        LLM-suggested criterion scores
+                                                              (?background=true queues a job)
+    PUT  /review/scores/{user_id}/{category_slug}             record a judge's scores
+    GET  /review/scores/{user_id}/{category_slug}             every judge's scores and the standing
+    GET  /review/leaderboard/{category_slug}?normalized=...   ranked submissions
+
+Submitted forms and their attachments' text are indexed when a
+submission is made; see :mod:`app.rag.retrieval` and
+:mod:`app.rag.near_duplicates`. Suggested scores come from
+:mod:`app.rag.llm_review` and are cached per response text; judges'
+scores and rankings from :mod:`app.services.scoring`.
+"""
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel, Field
+
+from app.api.deps import (
+    get_duplicate_index,
+    get_evidence_index,
+    get_job_queue,
+    get_review_service,
+    get_scoreboard,
+    get_user_store,
+)
+from app.api.responses import json_response
+from app.api.v1.endpoints.auth import get_user_or_404
+from app.rag.llm_review import ReviewError, ReviewService
+from app.rag.near_duplicates import DuplicateIndex
+from app.rag.retrieval import EvidenceIndex
+from app.services.jobs import JobQueue
+from app.services.scoring import Scoreboard, ScoreError
+from app.services.tasks import SUBMISSION_REVIEW, review_requests
+from app.services.user_store import UserRepository
+
+router = APIRouter()
+
+
+@router.get("/evidence")
+async def search_evidence(
+    q: str = Query(..., min_length=1, description="What to look for, e.g. the criterion's description"),
+    category: Optional[str] = Query(None, description="Category slug, e.g. `employee-supervisory-leader`"),
+    criterion: Optional[str] = Query(None, description="Criterion id, e.g. `ldr-innov`"),
+    k: int = Query(10, ge=1, le=100),
+    index: EvidenceIndex = Depends(get_evidence_index),
+):
+    """Passages from responses and attachments, most similar first."""
+    # Embedding may call out to the embedding API; keep it off the event loop.
+    hits = await asyncio.to_thread(index.search, q, k, category, criterion)
+    return json_response({
+        "items": [
+            {"id": hit.id, "score": round(hit.score, 4), "criterionId": hit.criterion or None, **hit.meta}
+            for hit in hits
+        ]
+    })
+
+
+@router.get("/duplicates")
+async def list_duplicates(
+    category: Optional[str] = Query(None, description="Category slug on either side of the pair"),
+    userId: Optional[int] = Query(None, description="Applicant on either side of the pair"),
+    minScore: Optional[float] = Query(None, ge=0, le=1),
+    limit: int = Query(100, ge=1, le=1000),
+    store: UserRepository = Depends(get_user_store),
+    duplicates: DuplicateIndex = Depends(get_duplicate_index),
+):
+    """Pairs of criterion responses with estimated Jaccard similarity over the threshold."""
+    await duplicates.ensure_loaded(store)
+    pairs = duplicates.pairs(category, userId, minScore, limit)
+    return json_response({"threshold": duplicates.threshold, "items": [pair.to_dict() for pair in pairs]})
+
+
+@router.post("/duplicates/rescan")
+async def rescan_duplicates(
+    store: UserRepository = Depends(get_user_store),
+    duplicates: DuplicateIndex = Depends(get_duplicate_index),
+):
+    """Rebuild the near-duplicate index from every submission (e.g. after changing the threshold)."""
+    users = [user async for batch in store.scan() for user in batch]
+    try:
+        return await asyncio.to_thread(duplicates.rescan, users)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+
+
+@router.post("/suggestions/{user_id}/{category_slug}")
+async def suggest_scores(
+    user_id: int,
+    category_slug: str,
+    background: bool = Query(False, description="Queue a job instead of waiting for the LLM"),
+    store: UserRepository = Depends(get_user_store),
+    reviews: ReviewService = Depends(get_review_service),
+    jobs: JobQueue = Depends(get_job_queue),
+):
+    """Scores and comments suggested by the LLM for each answered criterion of a submission.
+
+    Responses reviewed before (same text, model and prompt) come from the
+    cache and cost nothing. With `background=true` the review is queued
+    and 202 returns the job's id; `GET /jobs/{id}` has the items once it
+    is done.
+    """
+    user = await get_user_or_404(store, user_id)
+    form = ((user.get("submissions") or {}).get(category_slug) or {}).get("data")
+    if not isinstance(form, dict):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No submitted form for this category")
+    requests = review_requests(category_slug, form)
+    if requests is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown category: {category_slug}")
+
+    if background:
+        payload = {
+            "userId": user_id,
+            "categorySlug": category_slug,
+            "requests": [
+                {"criterionId": r.criterion_id, "maxPoints": r.max_points, "text": r.text} for r in requests
+            ],
+        }
+        job = await asyncio.to_thread(
+            jobs.enqueue, SUBMISSION_REVIEW, payload, dedup_key=f"review:{user_id}:{category_slug}", replace=True
+        )
+        return json_response({"jobId": job.id, "status": job.status}, status_code=status.HTTP_202_ACCEPTED)
+    try:
+        results = await reviews.review(requests)
+    except ReviewError as exc:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)) from exc
+    return json_response({
+        "items": [
+            {"criterionId": request.criterion_id, "maxPoints": request.max_points, **result}
+            for request, result in zip(requests, results)
+        ]
+    })
+
+
+class ScoreSheet(BaseModel):
+    judge: str = Field(..., min_length=1)
+    scores: dict[str, Optional[float]]  # criterion id → score on its scale; null clears it
+
+
+@router.put("/scores/{user_id}/{category_slug}")
+async def set_scores(
+    user_id: int,
+    category_slug: str,
+    sheet: ScoreSheet,
+    store: UserRepository = Depends(get_user_store),
+    scoreboard: Scoreboard = Depends(get_scoreboard),
+):
+    """Record one judge's scores for a submitted application; returns its new standing."""
+    user = await get_user_or_404(store, user_id)
+    if category_slug not in (user.get("submissions") or {}):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No submission for this category")
+    try:
+        standing = await scoreboard.set_scores(user_id, category_slug, sheet.judge, sheet.scores)
+    except ScoreError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return json_response({"standing": standing})
+
+
+@router.get("/scores/{user_id}/{category_slug}")
+async def get_scores(user_id: int, category_slug: str, scoreboard: Scoreboard = Depends(get_scoreboard)):
+    try:
+        judges, standing = scoreboard.sheet(user_id, category_slug)
+    except ScoreError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return json_response({"judges": judges, "standing": standing})
+
+
+@router.get("/leaderboard/{category_slug}")
+async def leaderboard(
+    category_slug: str,
+    normalized: bool = Query(False, description="Rank by judge-normalized (z-score) totals"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    scoreboard: Scoreboard = Depends(get_scoreboard),
+):
+    """Scored submissions of a category, best first."""
+    try:
+        items, total = scoreboard.leaderboard(category_slug, offset, limit, normalized)
+    except ScoreError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return json_response({"items": items, "total": total})
@@ -0,0 +1,223 @@
+"""
+Resumable attachment uploads.
+
+    POST   /uploads                    open an upload: {userId, categorySlug, fileName, size}
+    PATCH  /uploads/{id}               append the request body at `Upload-Offset`
+    HEAD   /uploads/{id}               current offset (resume after a dropped connection)
+    DELETE /uploads/{id}               abort
+
+Bodies are streamed to disk as they arrive; see :mod:`app.services.uploads`
+for storage and quota rules. Completed documents are queued for text
+extraction (:mod:`app.rag.extraction`), whose progress is reported per
+attachment.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse, PlainTextResponse
+from pydantic import BaseModel
+
+from app.api.deps import get_extraction_service, get_upload_service, get_user_store
+from app.api.responses import json_response
+from app.api.v1.endpoints.auth import get_user_or_404
+from app.rag.extraction import PENDING, ExtractionService
+from app.services.uploads import CHUNK_BYTES, Attachment, UploadError, UploadService, UploadSession
+from app.services.user_store import UserRepository
+
+router = APIRouter()
+
+
+class CreateUploadRequest(BaseModel):
+    userId: int
+    categorySlug: str
+    fileName: str
+    size: int
+    criterionId: Optional[str] = None
+
+
+def _raise(exc: UploadError):
+    raise HTTPException(status_code=exc.status_code, detail=str(exc)) from exc
+
+
+def _attachment_response(attachment: Attachment) -> dict:
+    return {
+        "id": attachment.id,
+        "sha256": attachment.sha256,
+        "fileName": attachment.file_name,
+        "contentType": attachment.content_type,
+        "size": attachment.size,
+        "criterionId": attachment.criterion_id,
+        "uploadedAt": attachment.uploaded_at,
+    }
+
+
+def _session_response(session: UploadSession) -> dict:
+    return {
+        "uploadId": session.id,
+        "fileName": session.file_name,
+        "size": session.size,
+        "offset": session.offset,
+        "complete": session.complete,
+        "chunkSize": CHUNK_BYTES,
+    }
+
+
+@router.post("", status_code=status.HTTP_201_CREATED)
+async def create_upload(
+    request: CreateUploadRequest,
+    store: UserRepository = Depends(get_user_store),
+    uploads: UploadService = Depends(get_upload_service),
+):
+    """Open an upload; the declared size counts against the quota immediately."""
+    await get_user_or_404(store, request.userId)
+    try:
+        session = await uploads.create(
+            request.userId, request.categorySlug, request.fileName, request.size, request.criterionId
+        )
+    except UploadError as exc:
+        _raise(exc)
+    return _session_response(session)
+
+
+@router.patch("/{upload_id}")
+async def append_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    uploads: UploadService = Depends(get_upload_service),
+    extraction: ExtractionService = Depends(get_extraction_service),
+):
+    """Append the raw request body at `Upload-Offset`.
+
+    On 409 or a dropped connection, `HEAD /uploads/{id}` gives the offset
+    to continue from.
+    """
+    try:
+        attachment = await uploads.append(upload_id, upload_offset, request.stream())
+    except UploadError as exc:
+        _raise(exc)
+    if attachment is None:
+        return _session_response(uploads.get(upload_id))
+    extraction.submit(attachment.sha256, uploads.blob_path(attachment.sha256), attachment.content_type)
+    return {
+        "uploadId": upload_id,
+        "offset": attachment.size,
+        "complete": True,
+        "attachment": _attachment_response(attachment),
+    }
+
+
+@router.head("/{upload_id}")
+async def upload_offset(upload_id: str, uploads: UploadService = Depends(get_upload_service)):
+    try:
+        session = uploads.get(upload_id)
+    except UploadError as exc:
+        _raise(exc)
+    return Response(
+        headers={"Upload-Offset": str(session.offset), "Upload-Length": str(session.size), "Cache-Control": "no-store"}
+    )
+
+
+@router.get("/{upload_id}")
+async def get_upload(upload_id: str, uploads: UploadService = Depends(get_upload_service)):
+    try:
+        return _session_response(uploads.get(upload_id))
+    except UploadError as exc:
+        _raise(exc)
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload(upload_id: str, uploads: UploadService = Depends(get_upload_service)):
+    try:
+        uploads.abort(upload_id)
+    except UploadError as exc:
+        _raise(exc)
+
+
+@router.get("/files/{sha256}")
+async def download_file(sha256: str, uploads: UploadService = Depends(get_upload_service)):
+    """Blobs are immutable (named by their hash), so they may be cached forever."""
+    try:
+        path = uploads.blob_path(sha256)
+    except UploadError as exc:
+        _raise(exc)
+    return FileResponse(
+        path,
+        headers={"ETag": f'"{sha256}"', "Cache-Control": "private, max-age=31536000, immutable"},
+    )
+
+
+@router.get("/submissions/{user_id}/{category_slug}")
+async def list_attachments(
+    user_id: int,
+    category_slug: str,
+    uploads: UploadService = Depends(get_upload_service),
+):
+    try:
+        attachments = uploads.attachments(user_id, category_slug)
+        used = uploads.submission_bytes(user_id, category_slug)
+    except UploadError as exc:
+        _raise(exc)
+    return json_response({
+        "attachments": [_attachment_response(a) for a in attachments],
+        "usedBytes": used,
+        "quotaBytes": uploads.max_submission_bytes,
+        "maxFileBytes": uploads.max_file_bytes,
+    })
+
+
+@router.delete("/submissions/{user_id}/{category_slug}/{attachment_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_attachment(
+    user_id: int,
+    category_slug: str,
+    attachment_id: str,
+    uploads: UploadService = Depends(get_upload_service),
+):
+    try:
+        await uploads.remove_attachment(user_id, category_slug, attachment_id)
+    except UploadError as exc:
+        _raise(exc)
+
+
+@router.get("/submissions/{user_id}/{category_slug}/{attachment_id}/extraction")
+async def extraction_status(
+    user_id: int,
+    category_slug: str,
+    attachment_id: str,
+    uploads: UploadService = Depends(get_upload_service),
+    extraction: ExtractionService = Depends(get_extraction_service),
+):
+    """Text extraction status, with page/slide/sheet offsets once done.
+
+    Attachments without a result (e.g. uploaded before extraction existed)
+    are queued on first request.
+    """
+    try:
+        attachment = uploads.attachment(user_id, category_slug, attachment_id)
+        result = extraction.status(attachment.sha256)
+        if result is None:
+            job = extraction.submit(attachment.sha256, uploads.blob_path(attachment.sha256), attachment.content_type)
+            result = job.result() if job.done() else {"sha256": attachment.sha256, "status": PENDING}
+    except UploadError as exc:
+        _raise(exc)
+    return json_response({"attachmentId": attachment_id, **result})
+
+
+@router.get("/submissions/{user_id}/{category_slug}/{attachment_id}/text", response_class=PlainTextResponse)
+async def extracted_text(
+    user_id: int,
+    category_slug: str,
+    attachment_id: str,
+    uploads: UploadService = Depends(get_upload_service),
+    extraction: ExtractionService = Depends(get_extraction_service),
+):
+    """The normalized text; offsets from the extraction status index into it."""
+    try:
+        attachment = uploads.attachment(user_id, category_slug, attachment_id)
+    except UploadError as exc:
+        _raise(exc)
+    path = extraction.text(attachment.sha256)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Text has not been extracted")
+    return FileResponse(path, media_type="text/plain; charset=utf-8")
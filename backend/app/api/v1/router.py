@@ -5,7 +5,7 @@ Each domain gets its own file under endpoints/ and is included here.
 
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import health, auth
+from app.api.v1.endpoints import health, auth, jobs, review, uploads
 from app.api.content import router as content_router
 from app.api.categories import router as categories_router
 
@@ -13,6 +13,9 @@ api_router = APIRouter()
 
 api_router.include_router(health.router, prefix="/health", tags=["health"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
+api_router.include_router(uploads.router, prefix="/uploads", tags=["uploads"])
+api_router.include_router(review.router, prefix="/review", tags=["review"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
 api_router.include_router(content_router, tags=["content"])
 api_router.include_router(categories_router, tags=["categories"])
 
@@ -13,11 +13,89 @@ class Settings(BaseSettings):
     # CORS
     CORS_ORIGINS: list[str] = ["http://localhost:3000", "http://localhost:3001", "http://localhost:3002"]
 
-    # Database
+    # Database (empty → JSON user store; e.g. sqlite+aiosqlite:///./data/app.db)
     DATABASE_URL: str = ""
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+
+    # JSON user store (empty → backend/data/users.json)
+    USERS_DB_PATH: str = ""
+    # Change feed shared by uvicorn workers (empty → single process, no feed)
+    USERS_CHANGE_FEED_PATH: str = ""
+    USERS_CHANGE_POLL_INTERVAL: float = 0.05
+
+    # Password hashing (scrypt cost; workers: 0 → one process per CPU)
+    PASSWORD_SCRYPT_N: int = 2**14
+    PASSWORD_SCRYPT_R: int = 8
+    PASSWORD_SCRYPT_P: int = 1
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Attachment uploads (empty dir → backend/data/uploads)
+    UPLOADS_DIR: str = ""
+    UPLOAD_MAX_FILE_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_MAX_SUBMISSION_BYTES: int = 200 * 1024 * 1024
+    UPLOAD_SESSION_TTL_SECONDS: int = 24 * 60 * 60
+
+    # Attachment text extraction (empty dir → backend/data/extracted;
+    # workers: processes, 0 → one per CPU)
+    EXTRACTION_CACHE_DIR: str = ""
+    EXTRACTION_WORKERS: int = 1
+
+    # Near-duplicate responses (MinHash/LSH; scan workers: processes, 0 → one per CPU)
+    DUPLICATE_THRESHOLD: float = 0.8
+    DUPLICATE_NUM_PERM: int = 128
+    DUPLICATE_SCAN_WORKERS: int = 0
+
+    # Judges' scores (empty → backend/data/scores.json, plus a journal next to it)
+    SCORES_PATH: str = ""
+
+    # Background jobs (empty → backend/data/jobs.sqlite3). Threads run every
+    # kind in the API process; process workers (0 → none) take the kinds
+    # that can run elsewhere. Leases expire after the visibility timeout.
+    JOBS_DB_PATH: str = ""
+    JOB_WORKERS: int = 2
+    JOB_PROCESS_WORKERS: int = 0
+    JOB_VISIBILITY_TIMEOUT: float = 600.0
+    JOB_MAX_ATTEMPTS: int = 5
+
+    # Admission control: per request class (static, reads, writes, uploads,
+    # admin) [concurrency, queue, timeout seconds], overriding the defaults
+    # in app.middleware.admission; e.g. ADMISSION_LIMITS='{"writes": [32, 512, 5]}'
+    ADMISSION_CONTROL: bool = True
+    ADMISSION_LIMITS: dict[str, list[float]] = {}
+
+    # Login attempts (token buckets per client IP and per email; 0 → unlimited)
+    LOGIN_IP_PER_MINUTE: float = 60.0
+    LOGIN_IP_BURST: int = 20
+    LOGIN_EMAIL_PER_MINUTE: float = 5.0
+    LOGIN_EMAIL_BURST: int = 10
+
+    # Observability (requests slower than this are logged; 0 disables)
+    SLOW_REQUEST_MS: float = 1000.0
 
     # LLM / Embedding
     OPENAI_API_KEY: str = ""
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"
+
+    # Evidence index (empty dir → backend/data/vectors; provider: "hashing"
+    # works offline, "openai" calls OPENAI_BASE_URL/embeddings)
+    VECTOR_INDEX_DIR: str = ""
+    EMBEDDING_PROVIDER: str = "hashing"
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_DIM: int = 512
+
+    # Automated review of criterion responses (chat completions at
+    # OPENAI_BASE_URL; empty cache dir → backend/data/reviews)
+    LLM_REVIEW_MODEL: str = "gpt-4o-mini"
+    LLM_REVIEW_CACHE_DIR: str = ""
+    LLM_REVIEW_BATCH_SIZE: int = 8
+    LLM_REVIEW_MAX_CONCURRENCY: int = 4
+    LLM_REVIEW_TOKENS_PER_MINUTE: int = 200_000
+    LLM_REVIEW_MAX_RETRIES: int = 5
 
     class Config:
         env_file = ".env"
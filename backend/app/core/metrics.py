@@ -0,0 +1,186 @@
+"""
+In-process metrics exposed in the Prometheus text format.
+
+A deliberately small subset of ``prometheus_client``: counters, gauges and
+histograms with fixed label names, registered in a module-level
+:data:`REGISTRY` and rendered by :func:`render`.
+
+Metrics updated from other threads (e.g. the journal writer) take a lock.
+Metrics only ever touched on the event loop pass ``threadsafe=False`` and
+skip it, which keeps the per-request cost of the HTTP metrics to a few
+dict operations.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Iterator, Sequence
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; the prometheus_client defaults.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Bytes.
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), threadsafe: bool = True):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock() if threadsafe else None
+        self._values: dict[tuple, object] = {}
+        REGISTRY.append(self)
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+    def _snapshot(self) -> list:
+        if self._lock is None:
+            return list(self._values.items())
+        with self._lock:
+            return list(self._values.items())
+
+    def _labels(self, values: tuple, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        if self._lock is None:
+            self._values[labels] = self._values.get(labels, 0) + amount
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def _samples(self) -> Iterator[str]:
+        for labels, value in self._snapshot():
+            yield f"{self.name}{self._labels(labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        threadsafe: bool = True,
+    ):
+        super().__init__(name, documentation, labelnames, threadsafe)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels) -> None:
+        if self._lock is None:
+            self._observe(value, labels)
+            return
+        with self._lock:
+            self._observe(value, labels)
+
+    def _observe(self, value: float, labels: tuple) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            # Per-bucket counts (last slot is +Inf), then sum.
+            state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    @contextmanager
+    def time(self, *labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels) -> int:
+        state = self._values.get(labels)
+        return sum(state[0]) if state else 0
+
+    def _samples(self) -> Iterator[str]:
+        items = [(labels, list(counts), total) for labels, (counts, total) in self._snapshot()]
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket = f'le="{le}"'
+                yield f"{self.name}_bucket{self._labels(labels, bucket)} {cumulative}"
+            yield f"{self.name}_sum{self._labels(labels)} {_number(total)}"
+            yield f"{self.name}_count{self._labels(labels)} {cumulative}"
+
+
+REGISTRY: list[_Metric] = []
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+# ── Application metrics ──
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by method, route template and status code.",
+    ("method", "route", "status"), threadsafe=False,
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route template.",
+    ("method", "route"), threadsafe=False,
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "HTTP response body size by method and route template.",
+    ("method", "route"), buckets=SIZE_BUCKETS, threadsafe=False,
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests currently being served, by method.",
+    ("method",), threadsafe=False,
+)
+ADMISSION_RUNNING = Gauge(
+    "admission_running", "Requests admitted and running, by admission class.", ("class",),
+)
+ADMISSION_QUEUED = Gauge(
+    "admission_queued", "Requests waiting for admission, by class.", ("class",),
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total", "Requests shed with a 503, by class and reason (queue_full, timeout).",
+    ("class", "reason"),
+)
+STORE_IO = Histogram(
+    "user_store_io_seconds", "Time spent reading or writing the users.json snapshot.",
+    ("operation",),
+)
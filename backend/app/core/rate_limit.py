@@ -0,0 +1,58 @@
+"""Token-bucket rate limits (per client IP and per account for logins)."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+
+class TokenBuckets:
+    """One token bucket per key: ``burst`` tokens, refilled at ``per_minute``.
+
+    At most ``max_keys`` buckets are kept; the least recently used are
+    dropped, which only makes a forgotten key start with a full bucket.
+    ``per_minute=0`` disables the limit.
+    """
+
+    def __init__(
+        self,
+        per_minute: float,
+        burst: int,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()  # key → (tokens, updated)
+        self._lock = threading.Lock()
+
+    def take(self, key: str) -> float:
+        """Spend a token for ``key``: 0 if there was one, else seconds until there is."""
+        if not self.rate:
+            return 0.0
+        now = self._clock()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+            self._buckets[key] = (tokens - 1 if not wait else tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class LoginLimiter:
+    """Login attempts per client IP and per email address."""
+
+    def __init__(self, ip: TokenBuckets, email: TokenBuckets):
+        self.ip = ip
+        self.email = email
+
+    def check(self, client_ip: Optional[str], email: str) -> float:
+        """0 if the attempt may go ahead, else seconds to wait."""
+        wait = self.ip.take(client_ip or "unknown")
+        if wait:
+            return wait
+        return self.email.take(email.strip().lower())
@@ -1,4 +1,133 @@
 """
 Authentication & authorization helpers.
 Add JWT validation, API-key checks, etc. here.
+
+Passwords are stored as scrypt hashes::
+
+    scrypt$<n>$<r>$<p>$<salt>$<hash>        (salt and hash: unpadded base64)
+
+scrypt costs tens of milliseconds of CPU per call by design, so
+:class:`PasswordHasher` runs it in a bounded process pool and the event
+loop only awaits the result. Entries that are still plaintext (the legacy
+JSON store) or were hashed with a lower cost than configured are reported
+by :meth:`PasswordHasher.verify` so the caller can store an upgraded hash
+after a successful login.
 """
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import secrets
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional
+
+SCHEME = "scrypt"
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # maxmem: OpenSSL's 32 MiB default is too small for n=2**15, r=8.
+    return hashlib.scrypt(
+        password.encode("utf-8"), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + (1 << 20), dklen=KEY_BYTES
+    )
+
+
+def hash_password(password: str, n: int, r: int, p: int) -> str:
+    """Hash ``password`` with a fresh salt (CPU-bound; runs in the pool)."""
+    salt = secrets.token_bytes(SALT_BYTES)
+    key = _scrypt(password, salt, n, r, p)
+    return f"{SCHEME}${n}${r}${p}${_b64encode(salt)}${_b64encode(key)}"
+
+
+def parse_hash(stored: str) -> Optional[tuple[int, int, int, bytes, bytes]]:
+    """``(n, r, p, salt, key)`` for a scrypt hash, or None for anything else."""
+    parts = stored.split("$")
+    if len(parts) != 6 or parts[0] != SCHEME:
+        return None
+    try:
+        return int(parts[1]), int(parts[2]), int(parts[3]), _b64decode(parts[4]), _b64decode(parts[5])
+    except ValueError:
+        return None
+
+
+def verify_password(stored: str, password: str) -> bool:
+    """Constant-time check of ``password`` against a stored hash or legacy plaintext."""
+    parsed = parse_hash(stored)
+    if parsed is None:
+        return hmac.compare_digest(stored.encode("utf-8"), password.encode("utf-8"))
+    n, r, p, salt, key = parsed
+    return hmac.compare_digest(_scrypt(password, salt, n, r, p), key)
+
+
+class PasswordHasher:
+    """scrypt hashing and verification off the event loop.
+
+    ``workers`` processes do the hashing (``0`` → one per CPU); at most
+    ``max_pending`` calls are queued or running at once, so a login storm
+    waits on the semaphore instead of piling up work in the pool.
+    ``workers=None`` hashes on the default thread pool instead, which
+    avoids process start-up in tests and scripts.
+    """
+
+    def __init__(self, n: int = 2**14, r: int = 8, p: int = 1, workers: Optional[int] = 0, max_pending: int = 64):
+        self.n, self.r, self.p = n, r, p
+        self.workers = (os.cpu_count() or 1) if workers == 0 else workers
+        self._executor: Optional[Executor] = None
+        self._slots = asyncio.Semaphore(max_pending)
+        # Verified when the email is unknown, so response time does not
+        # reveal which accounts exist. Created on first use, in the pool.
+        self._dummy: Optional[str] = None
+
+    def needs_rehash(self, stored: str) -> bool:
+        parsed = parse_hash(stored)
+        return parsed is None or parsed[:3] != (self.n, self.r, self.p)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password, self.n, self.r, self.p)
+
+    async def verify(self, stored: Optional[str], password: str) -> tuple[bool, Optional[str]]:
+        """``(ok, upgraded)``; ``upgraded`` is a new hash to store, or None.
+
+        Pass ``stored=None`` for an unknown user: the dummy hash is checked
+        so the call takes as long as a real one, and the result is False.
+        """
+        if stored is None:
+            if self._dummy is None:
+                self._dummy = await self.hash(secrets.token_hex(8))
+            await self._run(verify_password, self._dummy, password)
+            return False, None
+        if not await self._run(verify_password, stored, password):
+            return False, None
+        if self.needs_rehash(stored):
+            return True, await self.hash(password)
+        return True, None
+
+    async def _run(self, fn, *args):
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.workers is None:
+            return None
+        if self._executor is None:
+            # spawn: the API process has threads (journal writer, DB pool)
+            # that must not be forked mid-operation.
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
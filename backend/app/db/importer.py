@@ -0,0 +1,141 @@
+"""
+Import ``data/users.json`` into the SQL database.
+
+    python -m app.db.importer [path/to/users.json] [--database-url URL] [--batch-size 500]
+
+The file is parsed incrementally, one user object at a time, so memory
+stays flat however large it is. Rows are inserted in batches, one
+transaction per batch. Run it with the API stopped: journalled changes
+that have not been compacted into the snapshot yet are refused rather than
+silently dropped.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+from pathlib import Path
+from typing import Iterator
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.db.session import create_engine
+from app.services.sql_user_store import (
+    SqlUserStore,
+    applications_t,
+    drafts_t,
+    registrations_t,
+    user_to_rows,
+    users_t,
+)
+from app.services.user_store import DEFAULT_DB_PATH
+
+BATCH_SIZE = 500
+CHUNK_SIZE = 1 << 16
+
+_USERS_ARRAY = re.compile(r'"users"\s*:\s*\[')
+_SKIP = re.compile(r"[\s,]*")
+
+
+def iter_users(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """Yield the objects of the top-level ``"users"`` array one at a time."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        while True:
+            match = _USERS_ARRAY.search(buffer)
+            if match:
+                buffer = buffer[match.end():]
+                break
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            # Keep a tail in case the key straddles two chunks.
+            buffer = buffer[-16:] + chunk
+
+        eof = False
+        while True:
+            buffer = buffer[_SKIP.match(buffer).end():]
+            if buffer.startswith("]"):
+                return
+            try:
+                user, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+            yield user
+            buffer = buffer[end:]
+
+
+async def import_users(engine: AsyncEngine, path: Path, batch_size: int = BATCH_SIZE) -> int:
+    """Create the schema and insert every user in ``path``; returns the count."""
+    await SqlUserStore(engine).open()
+    total = 0
+    batch: list[dict] = []
+    for user in iter_users(path):
+        batch.append(user)
+        if len(batch) >= batch_size:
+            await _insert_batch(engine, batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        await _insert_batch(engine, batch)
+        total += len(batch)
+
+    if engine.dialect.name == "postgresql":
+        # Explicit ids bypass the sequence; move it past the imported rows.
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "SELECT setval(pg_get_serial_sequence('users', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM users"
+            ))
+    return total
+
+
+async def _insert_batch(engine: AsyncEngine, users: list[dict]) -> None:
+    rows = {users_t: [], registrations_t: [], drafts_t: [], applications_t: []}
+    for user in users:
+        split = user_to_rows(user)
+        rows[users_t].append(split.user)
+        for table, key_column, children in (
+            (registrations_t, "category_slug", split.registrations),
+            (drafts_t, "key", split.drafts),
+            (applications_t, "category_slug", split.applications),
+        ):
+            rows[table].extend({"user_id": user["id"], key_column: k, **v} for k, v in children.items())
+    async with engine.begin() as conn:
+        for table, values in rows.items():
+            if values:
+                await conn.execute(insert(table), values)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", type=Path, default=DEFAULT_DB_PATH)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("set DATABASE_URL or pass --database-url")
+    journal = args.path.with_name(args.path.stem + ".journal.jsonl")
+    if journal.exists() and journal.stat().st_size:
+        parser.error(f"{journal} has uncompacted changes; start and stop the API once to fold them in")
+
+    async def run() -> int:
+        engine = create_engine(args.database_url)
+        try:
+            return await import_users(engine, args.path, args.batch_size)
+        finally:
+            await engine.dispose()
+
+    print(f"Imported {asyncio.run(run())} users into {args.database_url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,3 +2,16 @@
 SQLAlchemy (or other ORM) models.
 Add one file per domain, e.g. models/evaluation.py
 """
+
+from app.db.models.base import Base
+from app.db.models.user import Draft, Registration, User
+from app.db.models.application import Application, ApplicationStatus
+
+__all__ = [
+    "Base",
+    "User",
+    "Registration",
+    "Draft",
+    "Application",
+    "ApplicationStatus",
+]
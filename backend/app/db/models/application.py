@@ -0,0 +1,52 @@
+"""
+Submitted applications, following the data model in spec §9.2.
+"""
+
+import enum
+import uuid
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import JSON, DateTime, Enum, ForeignKey, Index, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.models.base import Base, TimestampMixin
+
+
+class ApplicationStatus(str, enum.Enum):
+    draft = "draft"
+    submitted = "submitted"
+    under_review = "under_review"
+    needs_completion = "needs_completion"
+    accepted = "accepted"
+    rejected = "rejected"
+
+
+def _uuid() -> str:
+    return str(uuid.uuid4())
+
+
+class Application(TimestampMixin, Base):
+    __tablename__ = "applications"
+    __table_args__ = (
+        Index("ix_applications_user_slug", "user_id", "category_slug", unique=True),
+        Index("ix_applications_category_status", "category", "status"),
+    )
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_uuid)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    # Full slug used by the API, e.g. "employee-nonsupervisory-administrative".
+    category_slug: Mapped[str] = mapped_column(String(128))
+    # employee | department | project | knowledge | green
+    category: Mapped[str] = mapped_column(String(32))
+    sub_category: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    status: Mapped[ApplicationStatus] = mapped_column(
+        Enum(ApplicationStatus, native_enum=False, length=32), default=ApplicationStatus.draft
+    )
+    # Sent by the client with the submission; not unique (the JSON store never enforced it).
+    reference_number: Mapped[Optional[str]] = mapped_column(String(64), index=True, nullable=True)
+    submitted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    applicant_info: Mapped[Optional[dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    nomination_reason: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    category_specific_fields: Mapped[Optional[dict[str, Any]]] = mapped_column(JSON, nullable=True)
+
@@ -0,0 +1,68 @@
+"""
+Applicant accounts, their category registrations and per-category drafts.
+"""
+
+from typing import Any, Optional
+
+from sqlalchemy import JSON, Boolean, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.db.models.base import Base, TimestampMixin
+
+
+class User(TimestampMixin, Base):
+    __tablename__ = "users"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    email: Mapped[str] = mapped_column(String(320), unique=True)
+    password: Mapped[str] = mapped_column(Text)
+    registered: Mapped[bool] = mapped_column(Boolean, default=False)
+    applied: Mapped[bool] = mapped_column(Boolean, default=False)
+    is_admin: Mapped[bool] = mapped_column(Boolean, default=False)
+    is_director: Mapped[bool] = mapped_column(Boolean, default=False)
+    registration_data: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    # Top-level user document keys without a dedicated column.
+    extra: Mapped[dict[str, Any]] = mapped_column(JSON, default=dict)
+    # Optimistic concurrency token, bumped on every write.
+    version: Mapped[int] = mapped_column(Integer, default=0)
+
+    registrations: Mapped[list["Registration"]] = relationship(
+        back_populates="user", cascade="all, delete-orphan"
+    )
+    drafts: Mapped[list["Draft"]] = relationship(back_populates="user", cascade="all, delete-orphan")
+
+
+class Registration(TimestampMixin, Base):
+    """One (user, category slug) row backing `appliedCategories`,
+    `categoryStatuses` and `categoryRegisteredAt`."""
+
+    __tablename__ = "registrations"
+    __table_args__ = (
+        Index("ix_registrations_status_listing", "status", "registered_at", "user_id", "category_slug"),
+        Index("ix_registrations_category_status", "category_slug", "status", "registered_at"),
+    )
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    category_slug: Mapped[str] = mapped_column(String(128), primary_key=True)
+    status: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    applied: Mapped[bool] = mapped_column(Boolean, default=True)
+    # Position in `appliedCategories`.
+    position: Mapped[int] = mapped_column(Integer, default=0)
+    # ISO 8601 text ('' for legacy rows) so it orders and pages exactly like
+    # the JSON store's status index cursors.
+    registered_at: Mapped[str] = mapped_column(String(40), default="")
+
+    user: Mapped[User] = relationship(back_populates="registrations")
+
+
+class Draft(TimestampMixin, Base):
+    """Autosaved form state for one draft key (usually a category slug)."""
+
+    __tablename__ = "drafts"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key: Mapped[str] = mapped_column(String(128), primary_key=True)
+    data: Mapped[Any] = mapped_column(JSON, nullable=True)
+    version: Mapped[int] = mapped_column(Integer, default=0)
+
+    user: Mapped[User] = relationship(back_populates="drafts")
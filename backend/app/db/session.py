@@ -2,7 +2,69 @@
 Database session / engine setup.
 """
 
-# from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-# from app.core.config import settings
-#
-# engine = create_async_engine(settings.DATABASE_URL, echo=False)
+from functools import lru_cache
+from typing import AsyncIterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+
+
+def create_engine(url: str, **kwargs) -> AsyncEngine:
+    """Create an async engine with pool settings from `settings`.
+
+    SQLite gets WAL journaling, a busy timeout and foreign keys; an
+    in-memory SQLite database shares one connection (StaticPool).
+    """
+    parsed = make_url(url)
+    options: dict = {"echo": settings.DB_ECHO, "pool_pre_ping": True}
+    if parsed.get_backend_name() == "sqlite":
+        options["connect_args"] = {"timeout": settings.DB_POOL_TIMEOUT}
+        if parsed.database in (None, "", ":memory:"):
+            options["poolclass"] = StaticPool
+    if "poolclass" not in options and "poolclass" not in kwargs:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    options.update(kwargs)
+    engine = create_async_engine(url, **options)
+
+    if parsed.get_backend_name() == "sqlite":
+        @event.listens_for(engine.sync_engine, "connect")
+        def _sqlite_pragmas(dbapi_connection, _record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+    return engine
+
+
+def create_sessionmaker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+@lru_cache
+def get_engine() -> AsyncEngine:
+    """Process-wide engine for `settings.DATABASE_URL`."""
+    if not settings.DATABASE_URL:
+        raise RuntimeError("DATABASE_URL is not configured")
+    return create_engine(settings.DATABASE_URL)
+
+
+@lru_cache
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    return create_sessionmaker(get_engine())
+
+
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """Yield a pooled session, closing it when the request is done."""
+    async with get_sessionmaker()() as session:
+        yield session
@@ -2,19 +2,77 @@
 Sharjah Assets — FastAPI Application Entry Point
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
+from app.api.cache import reload_static_responses
+from app.api.deps import (
+    get_duplicate_index,
+    get_event_broker,
+    get_evidence_index,
+    get_extraction_service,
+    get_password_hasher,
+    get_review_service,
+    get_scoreboard,
+    get_search_index,
+    get_user_store,
+    get_worker_pools,
+)
 from app.api.v1.router import api_router
+from app.core import metrics
 from app.core.config import settings
+from app.middleware.admission import AdmissionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the user store (or create the SQL schema) before serving, and
+    # flush its journal / close the connection pool on shutdown.
+    store = await asyncio.to_thread(get_user_store)
+    await store.open()
+    reload_static_responses()
+    # Fill the in-memory admin indexes in the background; reads wait for them.
+    builds = [
+        asyncio.create_task(get_search_index().ensure_loaded(store)),
+        asyncio.create_task(get_duplicate_index().ensure_loaded(store)),
+    ]
+    # Run queued background jobs, including ones left over from before a restart.
+    workers = get_worker_pools()
+    for pool in workers:
+        pool.start()
+    yield
+    if get_event_broker.cache_info().currsize:
+        get_event_broker().close()  # end open admin streams
+    for build in builds:
+        build.cancel()
+    for pool in workers:
+        await asyncio.to_thread(pool.close)
+    await store.aclose()
+    get_password_hasher().close()
+    get_extraction_service().close()
+    if get_evidence_index.cache_info().currsize:  # don't create the index just to close it
+        get_evidence_index().close()
+    if get_review_service.cache_info().currsize:
+        get_review_service().close()
+    if get_scoreboard.cache_info().currsize:
+        await asyncio.to_thread(get_scoreboard().close)
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
+    lifespan=lifespan,
 )
 
 # --- Middleware ----------------------------------------------------------
+# Innermost of the three, so its 503s still get CORS headers and metrics.
+app.add_middleware(AdmissionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -22,6 +80,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added last so it is outermost and times everything, including CORS.
+app.add_middleware(MetricsMiddleware)
 
 # --- Routers -------------------------------------------------------------
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
@@ -30,3 +90,8 @@ app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 @app.get("/health", tags=["health"])
 async def health_check():
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
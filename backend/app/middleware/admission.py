@@ -0,0 +1,185 @@
+"""
+Admission control: per-class concurrency caps with bounded wait queues.
+
+Every API request is put in a class by method and path:
+
+    static    GET /content/*, /categories*        cheap, cached responses
+    reads     GET /auth/*                         profile, drafts
+    writes    POST/PATCH /auth/*                  drafts, registration, submission, login
+    uploads   /uploads/*
+    admin     /auth/admin/*, /review/*, /jobs/*   listings, exports, scoring
+
+Each class runs at most ``concurrency`` requests at once; up to ``queue``
+more wait (first come, first served) for at most ``timeout`` seconds.
+Anything beyond that gets an immediate 503 with ``Retry-After``, so a
+deadline-day burst of draft saves queues against its own cap instead of
+delaying profile reads or static content. Health, metrics and the admin
+event stream (long-lived, idle) are not limited.
+
+A plain ASGI middleware, like :mod:`app.middleware.metrics`, so the
+permit covers the whole response, including streamed bodies.
+"""
+
+import asyncio
+import json
+import math
+import threading
+from collections import deque
+from typing import NamedTuple, Optional
+
+from app.core.config import settings
+from app.core.metrics import ADMISSION_QUEUED, ADMISSION_REJECTED, ADMISSION_RUNNING
+
+
+class Limit(NamedTuple):
+    concurrency: int
+    queue: int
+    timeout: float
+
+
+DEFAULT_LIMITS = {
+    "static": Limit(256, 1024, 2.0),
+    "reads": Limit(128, 512, 2.0),
+    "writes": Limit(16, 256, 5.0),
+    "uploads": Limit(8, 64, 10.0),
+    "admin": Limit(8, 32, 10.0),
+}
+
+# Paths left out of admission control, under the API prefix.
+EXEMPT = ("/health", "/auth/admin/registration-events")
+
+
+def request_class(method: str, path: str, prefix: str = settings.API_V1_PREFIX) -> Optional[str]:
+    """The admission class of a request, or None if it is not limited."""
+    if not path.startswith(prefix + "/"):
+        return None
+    path = path[len(prefix):]
+    if path.startswith(EXEMPT):
+        return None
+    if path.startswith(("/auth/admin/", "/review/", "/jobs")):
+        return "admin"
+    if path.startswith("/uploads"):
+        return "uploads"
+    if path.startswith("/auth/"):
+        return "reads" if method in ("GET", "HEAD") else "writes"
+    return "static"
+
+
+class _Waiter:
+    __slots__ = ("future", "granted")
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.granted = False
+
+
+class Gate:
+    """A concurrency cap with a bounded FIFO wait queue.
+
+    Thread-safe, and waiters may be on different event loops (as with the
+    test client); a released permit is handed straight to the next waiter.
+    """
+
+    def __init__(self, name: str, limit: Limit):
+        self.name = name
+        self.limit = limit
+        self.running = 0
+        self._waiters: deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> Optional[str]:
+        """None once admitted, else why not (``"queue_full"`` or ``"timeout"``)."""
+        with self._lock:
+            if self.running < self.limit.concurrency and not self._waiters:
+                self.running += 1
+                return None
+            if len(self._waiters) >= self.limit.queue:
+                return "queue_full"
+            waiter = _Waiter(asyncio.get_running_loop().create_future())
+            self._waiters.append(waiter)
+        ADMISSION_QUEUED.inc(self.name)
+        try:
+            await asyncio.wait_for(waiter.future, self.limit.timeout)
+        except BaseException as exc:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+            if granted and isinstance(exc, asyncio.TimeoutError):
+                return None  # the permit arrived as the wait ran out
+            if granted:
+                self.release()
+            if isinstance(exc, asyncio.TimeoutError):
+                return "timeout"
+            raise
+        finally:
+            ADMISSION_QUEUED.dec(self.name)
+        return None
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._waiters:
+                self.running -= 1
+                return
+            waiter = self._waiters.popleft()
+            waiter.granted = True  # the permit passes on; running is unchanged
+        future = waiter.future
+        try:
+            future.get_loop().call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+        except RuntimeError:  # the waiter's loop is gone; so is the waiter
+            self.release()
+
+
+def configured_limits() -> dict[str, Limit]:
+    """:data:`DEFAULT_LIMITS` with the overrides in ``settings.ADMISSION_LIMITS``."""
+    limits = dict(DEFAULT_LIMITS)
+    for name, values in settings.ADMISSION_LIMITS.items():
+        limits[name] = Limit(int(values[0]), int(values[1]), float(values[2]))
+    return limits
+
+
+class AdmissionMiddleware:
+    def __init__(self, app, limits: Optional[dict[str, Limit]] = None, enabled: Optional[bool] = None):
+        self.app = app
+        self.enabled = settings.ADMISSION_CONTROL if enabled is None else enabled
+        self.gates = {name: Gate(name, limit) for name, limit in (limits or configured_limits()).items()}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+        gate = self.gates.get(request_class(scope["method"], scope["path"]))
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+
+        rejected = await gate.acquire()
+        if rejected is not None:
+            ADMISSION_REJECTED.inc(gate.name, rejected)
+            await reject(send, gate.limit)
+            return
+        ADMISSION_RUNNING.inc(gate.name)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            ADMISSION_RUNNING.dec(gate.name)
+            gate.release()
+
+
+async def reject(send, limit: Limit) -> None:
+    """A 503 asking the client to come back after about one queue timeout."""
+    body = json.dumps({"detail": "Server busy, please retry shortly"}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+            (b"retry-after", str(max(1, math.ceil(limit.timeout))).encode("ascii")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
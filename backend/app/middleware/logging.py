@@ -1,3 +1,26 @@
 """
 Request / response logging middleware.
 """
+
+import logging
+
+logger = logging.getLogger("app.requests")
+
+
+def log_slow_request(method: str, route: str, path: str, status: int, duration: float, size: int) -> None:
+    """Emit one logfmt-style line for a request over the slow threshold.
+
+    The fields are also attached as ``extra`` for JSON log handlers.
+    """
+    fields = {
+        "method": method,
+        "route": route,
+        "path": path,
+        "status": status,
+        "duration_ms": round(duration * 1000, 1),
+        "bytes": size,
+    }
+    logger.warning(
+        "slow_request " + " ".join(f"{key}={value}" for key, value in fields.items()),
+        extra={"request": fields},
+    )
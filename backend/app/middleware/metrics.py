@@ -0,0 +1,73 @@
+"""
+Request metrics middleware.
+
+A plain ASGI middleware (no ``BaseHTTPMiddleware`` task/stream overhead)
+that records, per route template (``/api/v1/auth/me/{user_id}``, not the
+raw path, so label cardinality stays bounded):
+
+- request count by status code,
+- latency histogram,
+- response body size histogram,
+- in-flight requests by method.
+
+Requests slower than ``settings.SLOW_REQUEST_MS`` are logged through
+:func:`app.middleware.logging.log_slow_request`.
+"""
+
+import time
+
+from app.core.config import settings
+from app.core.metrics import HTTP_IN_PROGRESS, HTTP_LATENCY, HTTP_REQUESTS, HTTP_RESPONSE_SIZE
+from app.middleware.logging import log_slow_request
+
+# Label for requests that did not match any route (404s, probes).
+UNMATCHED = "<unmatched>"
+
+
+def route_template(scope) -> str:
+    """The matched route's path template, or :data:`UNMATCHED`."""
+    # Newer FastAPI resolves included routers lazily and keeps the full
+    # template (with the router prefixes) on the effective route context;
+    # scope["route"] then only carries the router-relative path.
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(context, "path", None) or getattr(scope.get("route"), "path", None)
+    return path or UNMATCHED
+
+
+class MetricsMiddleware:
+    def __init__(self, app, slow_request_ms: float | None = None):
+        self.app = app
+        threshold = settings.SLOW_REQUEST_MS if slow_request_ms is None else slow_request_ms
+        self.slow_threshold = threshold / 1000 if threshold > 0 else float("inf")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            HTTP_IN_PROGRESS.dec(method)
+            # The router records the match in the (shared) scope.
+            route = route_template(scope)
+            HTTP_REQUESTS.inc(method, route, status_code)
+            HTTP_LATENCY.observe(duration, method, route)
+            HTTP_RESPONSE_SIZE.observe(size, method, route)
+            if duration >= self.slow_threshold:
+                log_slow_request(method, route, scope["path"], status_code, duration, size)
@@ -0,0 +1,104 @@
+"""Text embedders for the evidence index.
+
+Every embedder returns L2-normalized float32 rows, so cosine similarity
+is a dot product. ``name`` identifies the vector space: an index built
+with one embedder refuses to load with another.
+
+- :class:`HashingEmbedder`: offline, deterministic feature hashing of
+  words, word bigrams and character trigrams (the "hashing trick"); no
+  model, no network. The trigrams let Arabic words match through attached
+  prefixes (و، ال، ب...).
+- :class:`RemoteEmbedder`: an OpenAI-compatible ``/embeddings`` API. Pass
+  an ``httpx`` transport to point it at a stub.
+"""
+
+import math
+import re
+import zlib
+from collections import Counter
+from typing import Optional, Protocol, Sequence
+
+import httpx
+import numpy as np
+
+from app.rag.normalize import strip_diacritics
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+class Embedder(Protocol):
+    name: str
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """``(len(texts), dim)`` float32, each row unit length (or zero)."""
+        ...
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+class HashingEmbedder:
+    """Signed feature hashing of words, bigrams and trigrams with sublinear TF."""
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-v1-{dim}"
+
+    def _features(self, text: str) -> Counter:
+        tokens = _TOKEN.findall(strip_diacritics(text).lower())
+        features = Counter(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+        for token in tokens:
+            padded = f"<{token}>"
+            features.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, count in self._features(text).items():
+                # crc32 rather than hash(): stable across processes and restarts.
+                h = zlib.crc32(feature.encode("utf-8"))
+                out[row, h % self.dim] += (1.0 if h & 0x80000000 else -1.0) * (1.0 + math.log(count))
+        return normalize_rows(out)
+
+
+class RemoteEmbedder:
+    """Embeddings from an OpenAI-compatible API, batched."""
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "text-embedding-3-small",
+        dim: int = 256,
+        base_url: str = "https://api.openai.com/v1",
+        batch_size: int = 128,
+        transport: Optional[httpx.BaseTransport] = None,
+        timeout: float = 30.0,
+    ):
+        self.dim = dim
+        self.model = model
+        self.name = f"remote-{model}-{dim}"
+        self.batch_size = batch_size
+        self._client = httpx.Client(
+            base_url=base_url,
+            headers={"Authorization": f"Bearer {api_key}"},
+            transport=transport,
+            timeout=timeout,
+        )
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(texts), self.batch_size):
+            batch = [t or " " for t in texts[start:start + self.batch_size]]
+            res = self._client.post("/embeddings", json={"model": self.model, "input": batch, "dimensions": self.dim})
+            res.raise_for_status()
+            for item in res.json()["data"]:
+                out[start + item["index"]] = item["embedding"]
+        return normalize_rows(out)
+
+    def close(self) -> None:
+        self._client.close()
@@ -0,0 +1,321 @@
+"""Text extraction from attachments, cached by content hash.
+
+PDF, DOCX, PPTX and XLSX files are turned into normalized text plus the
+character range of every page, slide or sheet ("units")::
+
+    <cache>/<sha[:2]>/<sha256>.txt    units joined by blank lines
+    <cache>/<sha[:2]>/<sha256>.json   {"status", "units": [{kind, number, start, end}], ...}
+
+Each extractor is a generator over units, and units are written to the
+text file as they are produced, so memory stays at about one page no
+matter how long the document is. The Office formats are ZIP packages of
+XML and are parsed incrementally with the standard library; PDFs need the
+optional ``pypdf`` package.
+
+:class:`ExtractionService` runs extractions in a process pool, never on
+the request path. The uploaded blob is named by its SHA-256, and so is
+the cache entry, so a file that is re-uploaded or attached to several
+criteria is parsed once.
+"""
+
+import json
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional
+from xml.etree.ElementTree import iterparse
+
+from app.rag.normalize import normalize_text
+from app.services.persistence import atomic_write_bytes
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / "data" / "extracted"
+
+# Bump to invalidate cached results after extractor changes.
+EXTRACTOR_VERSION = 1
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"  # nothing to extract (images; PDFs without pypdf)
+
+UNIT_SEPARATOR = "\n\n"
+
+Unit = tuple[str, int, str]  # (kind, number, raw text)
+
+
+class ExtractorUnavailable(Exception):
+    """The optional library needed for this file type is not installed."""
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _numbered(names: list[str], pattern: str) -> list[str]:
+    regex = re.compile(pattern)
+    found = [(int(m.group(1)), name) for name in names if (m := regex.fullmatch(name))]
+    return [name for _, name in sorted(found)]
+
+
+# ── Extractors ──
+
+
+def iter_docx(path: Path) -> Iterator[Unit]:
+    """Pages of a Word document, split at explicit and last-rendered page breaks."""
+    with zipfile.ZipFile(path) as package, package.open("word/document.xml") as xml:
+        page, lines, line = 1, [], []
+        for event, elem in iterparse(xml, events=("start", "end")):
+            tag = _local(elem.tag)
+            if event == "start":
+                if tag == "lastRenderedPageBreak" or (
+                    tag == "br" and any(_local(k) == "type" and v == "page" for k, v in elem.attrib.items())
+                ):
+                    # Word writes both markers at a hard break; count it once.
+                    if lines or line:
+                        lines.append("".join(line))
+                        line = []
+                        yield "page", page, "\n".join(lines)
+                        page, lines = page + 1, []
+                continue
+            if tag == "t":
+                line.append(elem.text or "")
+            elif tag == "tab":
+                line.append("\t")
+            elif tag == "br":
+                line.append("\n")
+            elif tag == "p":
+                lines.append("".join(line))
+                line = []
+                elem.clear()
+        lines.append("".join(line))
+        yield "page", page, "\n".join(lines)
+
+
+def iter_pptx(path: Path) -> Iterator[Unit]:
+    """Slides of a presentation, in slide-number order."""
+    with zipfile.ZipFile(path) as package:
+        for number, name in enumerate(_numbered(package.namelist(), r"ppt/slides/slide(\d+)\.xml"), 1):
+            paragraphs, current = [], []
+            with package.open(name) as xml:
+                for _, elem in iterparse(xml):
+                    tag = _local(elem.tag)
+                    if tag == "t":
+                        current.append(elem.text or "")
+                    elif tag == "p":
+                        paragraphs.append("".join(current))
+                        current = []
+                        elem.clear()
+            yield "slide", number, "\n".join(paragraphs)
+
+
+def _shared_strings(package: zipfile.ZipFile) -> list[str]:
+    if "xl/sharedStrings.xml" not in package.namelist():
+        return []
+    strings, parts = [], []
+    with package.open("xl/sharedStrings.xml") as xml:
+        for _, elem in iterparse(xml):
+            tag = _local(elem.tag)
+            if tag == "t":
+                parts.append(elem.text or "")
+            elif tag == "si":
+                strings.append("".join(parts))
+                parts = []
+                elem.clear()
+    return strings
+
+
+def iter_xlsx(path: Path) -> Iterator[Unit]:
+    """Worksheets as tab-separated rows; shared strings are resolved."""
+    with zipfile.ZipFile(path) as package:
+        strings = _shared_strings(package)
+        for number, name in enumerate(_numbered(package.namelist(), r"xl/worksheets/sheet(\d+)\.xml"), 1):
+            rows, cells = [], []
+            cell_type, value, inline = None, None, []
+            with package.open(name) as xml:
+                for event, elem in iterparse(xml, events=("start", "end")):
+                    tag = _local(elem.tag)
+                    if event == "start":
+                        if tag == "c":
+                            cell_type, value, inline = elem.get("t"), None, []
+                        continue
+                    if tag == "v":
+                        value = elem.text
+                    elif tag == "t":
+                        inline.append(elem.text or "")
+                    elif tag == "c":
+                        if cell_type == "s" and value is not None:
+                            cells.append(strings[int(value)] if int(value) < len(strings) else "")
+                        elif cell_type == "inlineStr":
+                            cells.append("".join(inline))
+                        elif value is not None:
+                            cells.append(value)
+                    elif tag == "row":
+                        if any(cells):
+                            rows.append("\t".join(cells))
+                        cells = []
+                        elem.clear()
+            yield "sheet", number, "\n".join(rows)
+
+
+def iter_pdf(path: Path) -> Iterator[Unit]:
+    """Pages of a PDF via pypdf, which parses each page only when asked for it."""
+    try:
+        from pypdf import PdfReader
+    except ImportError as exc:
+        raise ExtractorUnavailable("PDF extraction requires the pypdf package") from exc
+    reader = PdfReader(path)
+    for number, page in enumerate(reader.pages, 1):
+        yield "page", number, page.extract_text() or ""
+
+
+EXTRACTORS = {
+    "application/pdf": iter_pdf,
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": iter_docx,
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation": iter_pptx,
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": iter_xlsx,
+}
+
+
+# ── Cache ──
+
+
+def cache_paths(cache_dir: Path, sha256: str) -> tuple[Path, Path]:
+    """``(text, metadata)`` paths of a cache entry."""
+    base = Path(cache_dir) / sha256[:2] / sha256
+    return base.with_suffix(".txt"), base.with_suffix(".json")
+
+
+def read_result(cache_dir: Path, sha256: str) -> Optional[dict]:
+    """Cached metadata for ``sha256``, or None if absent or from an older extractor."""
+    _, meta_path = cache_paths(cache_dir, sha256)
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+    return meta if meta.get("version") == EXTRACTOR_VERSION else None
+
+
+def extract_to_cache(blob_path: str, content_type: str, cache_dir: str, sha256: str) -> dict:
+    """Extract ``blob_path`` into the cache and return its metadata.
+
+    Runs in a worker process. Failures on a given file are cached too (the
+    bytes will not change); a missing optional library is not, so the file
+    is retried once it is installed.
+    """
+    text_path, meta_path = cache_paths(Path(cache_dir), sha256)
+    text_path.parent.mkdir(parents=True, exist_ok=True)
+    meta = {"version": EXTRACTOR_VERSION, "sha256": sha256, "contentType": content_type}
+    extractor = EXTRACTORS[content_type]
+    tmp = text_path.with_name(f".{text_path.name}.{os.getpid()}.tmp")
+    units, offset = [], 0
+    try:
+        with open(tmp, "w", encoding="utf-8") as out:
+            for kind, number, raw in extractor(Path(blob_path)):
+                text = normalize_text(raw)
+                if units:
+                    out.write(UNIT_SEPARATOR)
+                    offset += len(UNIT_SEPARATOR)
+                out.write(text)
+                units.append({"kind": kind, "number": number, "start": offset, "end": offset + len(text)})
+                offset += len(text)
+        os.replace(tmp, text_path)
+    except ExtractorUnavailable as exc:
+        return {**meta, "status": SKIPPED, "error": str(exc)}
+    except Exception as exc:  # noqa: BLE001 - corrupt or unexpected files
+        meta.update(status=FAILED, error=f"{type(exc).__name__}: {exc}")
+    else:
+        meta.update(status=DONE, chars=offset, units=units)
+    finally:
+        tmp.unlink(missing_ok=True)
+    atomic_write_bytes(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+    return meta
+
+
+class ExtractionService:
+    """Schedules extractions on a worker pool and reports their status.
+
+    ``workers`` processes do the parsing (``0`` → one per CPU);
+    ``workers=None`` uses a single background thread instead, which avoids
+    process start-up in tests and scripts. Jobs are plain
+    :class:`concurrent.futures.Future` objects, so they are independent of
+    the event loop of the request that started them.
+    """
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, workers: Optional[int] = 1):
+        self.cache_dir = Path(cache_dir)
+        self.workers = (os.cpu_count() or 1) if workers == 0 else workers
+        self._executor: Optional[Executor] = None
+        self._jobs: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, sha256: str, blob_path: Path, content_type: str) -> Future:
+        """Start extracting ``blob_path`` unless it is cached or already running.
+
+        The future resolves to the result metadata.
+        """
+        if content_type not in EXTRACTORS:
+            meta = {"sha256": sha256, "contentType": content_type, "status": SKIPPED}
+            return self._resolved({**meta, "error": "No text to extract from this file type"})
+        cached = read_result(self.cache_dir, sha256)
+        if cached is not None:
+            return self._resolved(cached)
+        with self._lock:
+            job = self._jobs.get(sha256)
+            if job is None:
+                job = self._get_executor().submit(
+                    extract_to_cache, str(blob_path), content_type, str(self.cache_dir), sha256
+                )
+                self._jobs[sha256] = job
+                job.add_done_callback(lambda _, key=sha256: self._finished(key))
+        return job
+
+    def status(self, sha256: str) -> Optional[dict]:
+        """Result metadata, ``{"status": "pending"}`` while queued or running, else None."""
+        with self._lock:
+            job = self._jobs.get(sha256)
+        if job is not None and not job.done():
+            return {"sha256": sha256, "status": PENDING}
+        if job is not None and job.exception() is not None:
+            return {"sha256": sha256, "status": FAILED, "error": str(job.exception())}
+        if job is not None:
+            return job.result()
+        return read_result(self.cache_dir, sha256)
+
+    def text(self, sha256: str) -> Optional[Path]:
+        """Path of the extracted text, if extraction has finished."""
+        meta = read_result(self.cache_dir, sha256)
+        if meta is None or meta["status"] != DONE:
+            return None
+        return cache_paths(self.cache_dir, sha256)[0]
+
+    @staticmethod
+    def _resolved(result: dict) -> Future:
+        done: Future = Future()
+        done.set_result(result)
+        return done
+
+    def _finished(self, sha256: str) -> None:
+        with self._lock:
+            job = self._jobs.get(sha256)
+            # Keep results that were not written to the cache (skipped, or the
+            # worker crashed) so status() can still report them.
+            if job is not None and job.exception() is None and read_result(self.cache_dir, sha256) is not None:
+                del self._jobs[sha256]
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.workers is None:
+                self._executor = ThreadPoolExecutor(1, thread_name_prefix="extraction")
+            else:
+                # spawn, as for password hashing: the API process has threads.
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
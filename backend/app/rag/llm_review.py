@@ -0,0 +1,378 @@
+"""Automated review of criterion responses by an LLM.
+
+Every review request is a criterion response (its criterion id, the
+points it is worth and the text) sent to an OpenAI-compatible
+``/chat/completions`` API, which answers with a suggested score and
+short comments. :class:`ReviewService` keeps that cheap and polite:
+
+- **Cache.** Results are stored on disk under the SHA-256 of the model,
+  the prompt template and the request, so an unchanged response is never
+  reviewed twice, across restarts too::
+
+      <cache>/<key[:2]>/<key>.json
+
+  Identical requests in flight share one job.
+- **Batching.** Requests queued within ``batch_wait`` seconds of each
+  other go out in one completion of up to ``batch_size`` responses.
+- **Limits.** At most ``max_concurrency`` completions are in flight and
+  a token bucket holds estimated usage under ``tokens_per_minute``.
+- **Retries.** Timeouts, connection errors, 429 and 5xx responses are
+  retried with exponential backoff and jitter, honouring ``Retry-After``.
+
+The service runs its own event loop on a background thread with one
+pooled :class:`httpx.AsyncClient`; callers get plain
+:class:`concurrent.futures.Future` objects, which are independent of the
+event loop of the request that started them (see :meth:`ReviewService.review`).
+Pass an ``httpx`` transport to point it at a stub, such as
+``benchmarks/fake_llm.py``.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+import httpx
+
+from app.services.persistence import atomic_write_bytes
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / "data" / "reviews"
+
+SYSTEM_PROMPT = """\
+You assist the jury of the Sharjah Assets excellence award. You receive a
+JSON object {"responses": [...]}; each response has an "id", the
+"criterionId" it answers, the "maxPoints" the criterion is worth and the
+applicant's "text" (Arabic or English). Judge how well each text
+addresses its criterion with concrete, measurable evidence.
+
+Reply with JSON only: {"reviews": [{"id": <id>, "score": <integer from 0
+to maxPoints>, "comments": "<two sentences at most, in the language of
+the text>"}]}, one review per response."""
+
+# Changing the prompt invalidates cached reviews.
+TEMPLATE_DIGEST = hashlib.sha256(SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:16]
+
+# Rough tokens per character (Arabic is denser than English) and per request.
+CHARS_PER_TOKEN = 3
+REQUEST_OVERHEAD_TOKENS = len(SYSTEM_PROMPT) // CHARS_PER_TOKEN + 50
+REPLY_TOKENS_PER_ITEM = 80
+
+RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+MAX_BACKOFF_SECONDS = 30.0
+
+
+class ReviewError(Exception):
+    """The provider failed, or replied with something that is not a review."""
+
+
+@dataclass(frozen=True)
+class ReviewRequest:
+    criterion_id: str
+    max_points: int
+    text: str
+
+    def key(self, model: str) -> str:
+        payload = json.dumps([model, TEMPLATE_DIGEST, self.criterion_id, self.max_points, self.text])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def tokens(self) -> int:
+        return len(self.text) // CHARS_PER_TOKEN + REPLY_TOKENS_PER_ITEM
+
+
+class ReviewCache:
+    """Reviews on disk, one small JSON file per key."""
+
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            return json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, key: str, review: dict) -> None:
+        atomic_write_bytes(self._path(key), json.dumps(review, ensure_ascii=False).encode("utf-8"))
+
+
+class TokenBucket:
+    """Token-rate limit; used only on the service's event loop.
+
+    Requests larger than the bucket still go through once it is full, and
+    usage reported above the estimate is paid back as debt.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.rate = tokens_per_minute / 60.0
+        self.capacity = float(tokens_per_minute)
+        self.level = self.capacity
+        self._updated: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        if self._updated is not None:
+            self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: int) -> None:
+        loop = asyncio.get_running_loop()
+        async with self._lock:  # first come, first served
+            needed = min(float(tokens), self.capacity)
+            self._refill(loop.time())
+            if self.level < needed:
+                await asyncio.sleep((needed - self.level) / self.rate)
+                self._refill(loop.time())
+            self.level -= tokens
+
+    def adjust(self, tokens: int) -> None:
+        """Account for ``tokens`` more (or, negative, fewer) than acquired."""
+        self.level = min(self.capacity, self.level - tokens)
+
+
+@dataclass
+class _Job:
+    request: ReviewRequest
+    key: str
+    future: Future
+
+
+class ReviewService:
+    """Batched, rate-limited, cached reviews from a chat completions API."""
+
+    def __init__(
+        self,
+        api_key: str = "",
+        model: str = "gpt-4o-mini",
+        base_url: str = "https://api.openai.com/v1",
+        cache_dir: Path = DEFAULT_CACHE_DIR,
+        batch_size: int = 8,
+        batch_wait: float = 0.05,
+        max_concurrency: int = 4,
+        tokens_per_minute: int = 200_000,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        timeout: float = 60.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.model = model
+        self.cache = ReviewCache(cache_dir)
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.stats = {"requests": 0, "cached": 0, "completions": 0, "retries": 0, "failures": 0, "tokens": 0}
+        self._client_options = {
+            "base_url": base_url,
+            "headers": {"Authorization": f"Bearer {api_key}"} if api_key else {},
+            "timeout": timeout,
+            "transport": transport,
+            "limits": httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+        }
+        self._lock = threading.Lock()
+        self._jobs: dict[str, Future] = {}  # in flight, by key
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ── Callers ──
+
+    def submit(self, request: ReviewRequest) -> Future:
+        """Review ``request``; the future resolves to ``{"score", "comments", "model", "cached"}``."""
+        key = request.key(self.model)
+        with self._lock:
+            self.stats["requests"] += 1
+            job = self._jobs.get(key)
+            if job is not None:
+                return job
+        cached = self.cache.get(key)
+        if cached is not None:
+            with self._lock:
+                self.stats["cached"] += 1
+            done: Future = Future()
+            done.set_result({**cached, "cached": True})
+            return done
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                job = self._jobs[key] = Future()
+                job.add_done_callback(lambda _, key=key: self._finished(key))
+                self._start()
+                self._loop.call_soon_threadsafe(self._queue.put_nowait, _Job(request, key, job))
+        return job
+
+    async def review(self, requests: Iterable[ReviewRequest]) -> list[dict]:
+        """Reviews of ``requests``, in order; raises :class:`ReviewError` if any failed."""
+        return list(await asyncio.gather(*(asyncio.wrap_future(self.submit(r)) for r in requests)))
+
+    def _finished(self, key: str) -> None:
+        with self._lock:
+            self._jobs.pop(key, None)
+
+    # ── Worker loop ──
+
+    def _start(self) -> None:
+        """Start the worker thread (caller holds ``_lock``)."""
+        if self._thread is not None:
+            return
+        started = threading.Event()
+        self._thread = threading.Thread(target=asyncio.run, args=(self._main(started),), name="llm-review", daemon=True)
+        self._thread.start()
+        started.wait()
+
+    async def _main(self, started: threading.Event) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        slots = asyncio.Semaphore(self.max_concurrency)
+        bucket = TokenBucket(self.tokens_per_minute)
+        sending: set[asyncio.Task] = set()
+        started.set()
+        async with httpx.AsyncClient(**self._client_options) as client:
+            while True:
+                # Take a slot before collecting a batch, so requests queued
+                # while every slot is busy go out together.
+                await slots.acquire()
+                batch = await self._next_batch()
+                if not batch:
+                    slots.release()
+                    break
+                task = asyncio.create_task(self._send(client, bucket, batch))
+                sending.add(task)
+                task.add_done_callback(lambda t: (sending.discard(t), slots.release()))
+            await asyncio.gather(*sending, return_exceptions=True)
+
+    async def _next_batch(self) -> list[_Job]:
+        """Up to ``batch_size`` queued jobs; empty when the service is closing."""
+        job = await self._queue.get()
+        if job is None:
+            return []
+        batch = [job]
+        deadline = self._loop.time() + self.batch_wait
+        while len(batch) < self.batch_size:
+            try:
+                job = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    job = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if job is None:
+                self._queue.put_nowait(None)  # stop after this batch
+                break
+            batch.append(job)
+        return batch
+
+    async def _send(self, client: httpx.AsyncClient, bucket: TokenBucket, batch: list[_Job]) -> None:
+        estimate = REQUEST_OVERHEAD_TOKENS + sum(job.request.tokens() for job in batch)
+        await bucket.acquire(estimate)
+        try:
+            reviews, used = await self._complete(client, batch)
+        except Exception as exc:  # noqa: BLE001 - every job must be resolved
+            with self._lock:
+                self.stats["failures"] += len(batch)
+            error = exc if isinstance(exc, ReviewError) else ReviewError(f"{type(exc).__name__}: {exc}")
+            for job in batch:
+                job.future.set_exception(error)
+            return
+        if used:
+            bucket.adjust(used - estimate)
+        with self._lock:
+            self.stats["tokens"] += used or estimate
+        for index, job in enumerate(batch):
+            review = reviews.get(index)
+            if review is None:
+                job.future.set_exception(ReviewError(f"No review for criterion {job.request.criterion_id}"))
+                continue
+            await asyncio.to_thread(self.cache.put, job.key, review)
+            job.future.set_result({**review, "cached": False})
+
+    async def _complete(self, client: httpx.AsyncClient, batch: list[_Job]) -> tuple[dict[int, dict], int]:
+        """``({batch index: review}, tokens used)`` for one completion, with retries."""
+        responses = [
+            {"id": index, "criterionId": job.request.criterion_id, "maxPoints": job.request.max_points,
+             "text": job.request.text}
+            for index, job in enumerate(batch)
+        ]
+        body = {
+            "model": self.model,
+            "temperature": 0,
+            "response_format": {"type": "json_object"},
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": json.dumps({"responses": responses}, ensure_ascii=False)},
+            ],
+        }
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                res = await client.post("/chat/completions", json=body)
+                if res.status_code not in RETRY_STATUSES:
+                    break
+                retry_after = _retry_after(res)
+                failure = f"HTTP {res.status_code}"
+            except (httpx.TimeoutException, httpx.TransportError) as exc:
+                failure = f"{type(exc).__name__}: {exc}"
+            if attempt == self.max_retries:
+                raise ReviewError(f"Gave up after {attempt + 1} attempts: {failure}")
+            with self._lock:
+                self.stats["retries"] += 1
+            # Full jitter keeps parallel batches from retrying in lockstep.
+            delay = min(MAX_BACKOFF_SECONDS, self.backoff * 2**attempt) * random.random()
+            await asyncio.sleep(max(delay, retry_after or 0.0))
+        if res.status_code >= 400:
+            raise ReviewError(f"HTTP {res.status_code}: {res.text[:200]}")
+        with self._lock:
+            self.stats["completions"] += 1
+        return _parse_reviews(res.json(), batch, self.model)
+
+    def close(self) -> None:
+        """Finish queued reviews and stop the worker thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+        if thread is not None:
+            thread.join()
+
+
+def _retry_after(res: httpx.Response) -> Optional[float]:
+    try:
+        return float(res.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _parse_reviews(payload: dict, batch: list[_Job], model: str) -> tuple[dict[int, dict], int]:
+    try:
+        content = json.loads(payload["choices"][0]["message"]["content"])
+        items = content["reviews"]
+    except (KeyError, IndexError, TypeError, ValueError) as exc:
+        raise ReviewError(f"Unexpected completion: {exc!r}") from exc
+    reviews = {}
+    for item in items if isinstance(items, list) else ():
+        index = item.get("id") if isinstance(item, dict) else None
+        if not isinstance(index, int) or not 0 <= index < len(batch):
+            continue
+        try:
+            score = int(item["score"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        reviews[index] = {
+            "score": max(0, min(batch[index].request.max_points, score)),
+            "comments": str(item.get("comments") or ""),
+            "model": model,
+        }
+    used = (payload.get("usage") or {}).get("total_tokens") or 0
+    return reviews, int(used)
@@ -0,0 +1,323 @@
+"""Near-duplicate criterion responses across submissions (MinHash + LSH).
+
+Each criterion response of a submitted form is folded
+(:func:`~app.rag.normalize.fold_arabic`), cut into overlapping word
+shingles and summarized by a MinHash signature: the minimum of
+``num_perm`` random hash permutations over its shingles. The fraction
+of equal signature positions estimates the Jaccard similarity of two
+responses' shingle sets.
+
+Signatures are split into ``bands`` of ``rows`` values; two responses
+that agree on a whole band land in the same bucket and become a
+candidate pair, so a new submission is compared only with the responses
+it shares a bucket with instead of with every response. Bands and rows
+are chosen for the threshold (:func:`lsh_params`). Candidates whose
+estimated similarity reaches the threshold are reported.
+
+:meth:`DuplicateIndex.add_submission` handles submissions as they
+arrive. :meth:`DuplicateIndex.rescan` rebuilds the whole index for an
+award cycle, computing signatures in a process pool.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import re
+import threading
+import time
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from app.rag.normalize import fold_arabic
+from app.services.user_store import UserRepository
+
+logger = logging.getLogger("app.review")
+
+_WORD = re.compile(r"[^\W_]+")
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 32) - 1
+
+SHINGLE_WORDS = 3
+# Shorter responses ("نعم", "as above") match each other by chance.
+MIN_WORDS = 12
+SCAN_CHUNK = 256
+
+ResponseKey = tuple[int, str, str]  # (user id, category slug, criterion id)
+
+
+@dataclass(frozen=True)
+class DuplicatePair:
+    first: ResponseKey
+    second: ResponseKey
+    score: float  # estimated Jaccard similarity
+
+    def to_dict(self) -> dict:
+        def side(key: ResponseKey) -> dict:
+            return {"userId": key[0], "categorySlug": key[1], "criterionId": key[2]}
+
+        return {"first": side(self.first), "second": side(self.second), "score": round(self.score, 3)}
+
+
+def log_pairs(pairs: Iterable[DuplicatePair]) -> None:
+    """One logfmt-style ``near_duplicate`` line per pair, for alerting."""
+    for pair in pairs:
+        fields = {
+            "first": "/".join(map(str, pair.first)),
+            "second": "/".join(map(str, pair.second)),
+            "score": round(pair.score, 3),
+        }
+        logger.warning(
+            "near_duplicate " + " ".join(f"{key}={value}" for key, value in fields.items()),
+            extra={"duplicate": fields},
+        )
+
+
+@lru_cache
+def lsh_params(threshold: float, num_perm: int) -> tuple[int, int]:
+    """``(bands, rows)`` minimizing the false positive + false negative area around ``threshold``."""
+    s = np.linspace(0, 1, 201)
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        p = 1 - (1 - s ** rows) ** bands  # probability of becoming a candidate
+        error = np.mean(np.where(s < threshold, p, 1 - p))
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+@lru_cache
+def permutations(num_perm: int, seed: int = 1) -> tuple[np.ndarray, np.ndarray]:
+    """Coefficients of the hash permutations ``(a·x + b) mod p``; a, b < 2³¹ so nothing overflows."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 31, num_perm, dtype=np.uint64)
+    b = rng.integers(0, 1 << 31, num_perm, dtype=np.uint64)
+    return a[:, None], b[:, None]
+
+
+def response_words(text: str) -> list[str]:
+    return _WORD.findall(fold_arabic(text))
+
+
+def shingle_hashes(words: list[str], size: int = SHINGLE_WORDS) -> np.ndarray:
+    if len(words) <= size:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in set(shingles)), dtype=np.uint64)
+
+
+def minhash(words: list[str], num_perm: int) -> np.ndarray:
+    """MinHash signature (``num_perm`` uint32 values) of a response's shingles."""
+    a, b = permutations(num_perm)
+    hashed = ((a * shingle_hashes(words)[None, :] + b) % _PRIME) & _MASK
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def signatures(texts: list[str], num_perm: int) -> list[np.ndarray]:
+    """Signatures of ``texts``; runs in batch-scan worker processes."""
+    return [minhash(response_words(text), num_perm) for text in texts]
+
+
+def form_responses(form: Optional[dict]) -> Iterator[tuple[str, str]]:
+    """``(criterion id, text)`` of the responses long enough to compare."""
+    responses = (form or {}).get("criteriaResponses")
+    for criterion_id, response in (responses if isinstance(responses, dict) else {}).items():
+        text = response.get("text") if isinstance(response, dict) else None
+        if isinstance(text, str) and len(text.split()) >= MIN_WORDS:
+            yield criterion_id, text
+
+
+def submitted_responses(users: Iterable[dict]) -> Iterator[tuple[ResponseKey, str]]:
+    for user in users:
+        for slug, submission in (user.get("submissions") or {}).items():
+            for criterion_id, text in form_responses((submission or {}).get("data")):
+                yield (user["id"], slug, criterion_id), text
+
+
+class _State:
+    """Signatures, LSH buckets and the pairs found so far."""
+
+    def __init__(self, bands: int, rows: int):
+        self.bands = bands
+        self.rows = rows
+        self.signatures: dict[ResponseKey, np.ndarray] = {}
+        self.buckets: list[dict[bytes, set[ResponseKey]]] = [{} for _ in range(bands)]
+        self.pairs: dict[tuple[ResponseKey, ResponseKey], float] = {}
+        self.partners: dict[ResponseKey, set[ResponseKey]] = {}
+
+    def _band_keys(self, signature: np.ndarray) -> Iterator[tuple[int, bytes]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, key: ResponseKey, signature: np.ndarray, threshold: float) -> list[DuplicatePair]:
+        self.remove(key)
+        candidates: set[ResponseKey] = set()
+        for band, band_key in self._band_keys(signature):
+            bucket = self.buckets[band].setdefault(band_key, set())
+            candidates |= bucket
+            bucket.add(key)
+        self.signatures[key] = signature
+        found = []
+        for other in candidates:
+            score = float(np.count_nonzero(self.signatures[other] == signature)) / len(signature)
+            if score >= threshold:
+                pair = (min(key, other), max(key, other))
+                self.pairs[pair] = score
+                self.partners.setdefault(key, set()).add(other)
+                self.partners.setdefault(other, set()).add(key)
+                found.append(DuplicatePair(*pair, score))
+        return found
+
+    def remove(self, key: ResponseKey) -> None:
+        signature = self.signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, band_key in self._band_keys(signature):
+            bucket = self.buckets[band].get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self.buckets[band][band_key]
+        for other in self.partners.pop(key, ()):
+            del self.pairs[(min(key, other), max(key, other))]
+            self.partners[other].discard(key)
+
+
+class DuplicateIndex:
+    """Near-duplicate responses of submitted forms, found as they arrive.
+
+    ``workers`` processes compute signatures in :meth:`rescan` (``0`` →
+    one per CPU, ``None`` → a background thread, for tests).
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, workers: Optional[int] = 0):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.workers = workers
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self.ready = False  # set once a full scan has been loaded
+        self._lock = threading.Lock()
+        self._building = False
+        self._state = _State(self.bands, self.rows)
+        self._submissions: dict[tuple[int, str], list[ResponseKey]] = {}
+        # Submissions indexed while a rescan runs, applied on top of its result.
+        self._arrived: Optional[dict[tuple[int, str], list[tuple[ResponseKey, np.ndarray]]]] = None
+
+    # ── Incremental ──
+
+    def add_submission(self, user_id: int, category_slug: str, form: Optional[dict]) -> list[DuplicatePair]:
+        """(Re)index a submitted form; returns the near-duplicates of its responses."""
+        responses = list(form_responses(form))
+        computed = signatures([text for _, text in responses], self.num_perm)
+        keys = [(user_id, category_slug, criterion_id) for criterion_id, _ in responses]
+        with self._lock:
+            for key in self._submissions.pop((user_id, category_slug), ()):
+                self._state.remove(key)
+            self._submissions[(user_id, category_slug)] = keys
+            if self._arrived is not None:
+                self._arrived[(user_id, category_slug)] = list(zip(keys, computed))
+            found = []
+            for key, signature in zip(keys, computed):
+                found += self._state.add(key, signature, self.threshold)
+        return found
+
+    def remove_submission(self, user_id: int, category_slug: str) -> None:
+        with self._lock:
+            for key in self._submissions.pop((user_id, category_slug), ()):
+                self._state.remove(key)
+
+    # ── Batch ──
+
+    def rescan(self, users: Iterable[dict]) -> dict:
+        """Rebuild from every submitted form in ``users``; signatures are computed in parallel.
+
+        Submissions indexed while the scan runs win over what it read.
+        Raises ``RuntimeError`` if another scan is running.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            if self._arrived is not None:
+                raise RuntimeError("A duplicate scan is already running")
+            self._arrived = {}
+        try:
+            items = list(submitted_responses(users))
+            texts = [text for _, text in items]
+            chunks = [texts[i:i + SCAN_CHUNK] for i in range(0, len(texts), SCAN_CHUNK)]
+            with self._executor() as pool:
+                computed = [s for chunk in pool.map(signatures, chunks, [self.num_perm] * len(chunks)) for s in chunk]
+
+            state = _State(self.bands, self.rows)
+            submissions: dict[tuple[int, str], list[ResponseKey]] = {}
+            for (key, _), signature in zip(items, computed):
+                state.add(key, signature, self.threshold)
+                submissions.setdefault(key[:2], []).append(key)
+            with self._lock:
+                for submission, entries in self._arrived.items():
+                    for key in submissions.pop(submission, ()):
+                        state.remove(key)
+                    submissions[submission] = [key for key, _ in entries]
+                    for key, signature in entries:
+                        state.add(key, signature, self.threshold)
+                self._state, self._submissions = state, submissions
+                self.ready = True
+        finally:
+            with self._lock:
+                self._arrived = None
+        return {
+            "responses": len(state.signatures),
+            "pairs": len(state.pairs),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def _executor(self) -> Executor:
+        if self.workers is None:
+            return ThreadPoolExecutor(1, thread_name_prefix="near-duplicates")
+        # spawn, as for password hashing: the API process has threads.
+        return ProcessPoolExecutor(self.workers or None, mp_context=multiprocessing.get_context("spawn"))
+
+    async def ensure_loaded(self, store: UserRepository) -> None:
+        """Scan ``store`` once; concurrent callers wait for it."""
+        while not self.ready:
+            with self._lock:
+                claimed = not self._building
+                self._building = True
+            if not claimed:
+                await asyncio.sleep(0.05)
+                continue
+            try:
+                users = [user async for batch in store.scan() for user in batch]
+                await asyncio.to_thread(self.rescan, users)
+            finally:
+                with self._lock:
+                    self._building = False
+
+    # ── Reads ──
+
+    def pairs(
+        self,
+        category: Optional[str] = None,
+        user_id: Optional[int] = None,
+        min_score: Optional[float] = None,
+        limit: int = 100,
+    ) -> list[DuplicatePair]:
+        """Pairs involving ``category``/``user_id`` (either side), most similar first."""
+        with self._lock:
+            items = list(self._state.pairs.items())
+        found = [
+            DuplicatePair(a, b, score)
+            for (a, b), score in items
+            if (category is None or category in (a[1], b[1]))
+            and (user_id is None or user_id in (a[0], b[0]))
+            and (min_score is None or score >= min_score)
+        ]
+        found.sort(key=lambda pair: -pair.score)
+        return found[:limit]
+
+    def __len__(self) -> int:
+        return len(self._state.signatures)
@@ -0,0 +1,48 @@
+"""Text normalization shared by extraction, validation and search.
+
+Extracted text is kept readable: diacritics and letter forms are left
+alone except where extraction tools mangle them. PDFs often store Arabic
+as presentation forms (U+FB50–U+FEFF), which NFKC folds back to the base
+letters, and justified text is stretched with tatweel.
+"""
+
+import re
+import unicodedata
+
+TATWEEL = "\u0640"
+# Zero-width and bidi control characters that PDF/Office producers sprinkle in.
+_INVISIBLE = dict.fromkeys(
+    map(ord, "\u200b\u200c\u200d\u200e\u200f\u202a\u202b\u202c\u202d\u202e\u2066\u2067\u2068\u2069\ufeff\u00ad" + TATWEEL)
+)
+# Harakat, Quranic annotation marks and superscript alef.
+_DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed]")
+# Letter variants that spelling does not reliably distinguish, folded for
+# matching: hamza forms of alef, alef maqsura, ta marbuta, hamza carriers,
+# and Arabic-Indic digits.
+_FOLD = str.maketrans("أإآٱىةؤئ٠١٢٣٤٥٦٧٨٩۰۱۲۳۴۵۶۷۸۹", "اااايهوي01234567890123456789")
+_SPACES = re.compile(r"[^\S\n]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+def normalize_text(text: str) -> str:
+    """NFKC, drop invisible characters and tatweel, collapse whitespace.
+
+    Line breaks are kept (one blank line at most) so paragraphs survive.
+    """
+    text = unicodedata.normalize("NFKC", text).translate(_INVISIBLE)
+    text = _SPACES.sub(" ", text.replace("\r\n", "\n").replace("\r", "\n"))
+    text = _BLANK_LINES.sub("\n\n", text)
+    return "\n".join(line.strip() for line in text.split("\n")).strip()
+
+
+def strip_diacritics(text: str) -> str:
+    """Drop Arabic diacritics and tatweel, e.g. for counting or matching words."""
+    return _DIACRITICS.sub("", text).replace(TATWEEL, "")
+
+
+def fold_arabic(text: str) -> str:
+    """Lower-case, strip diacritics and fold letter variants, for search matching.
+
+    ``"إدارةُ الأصولِ"`` and ``"اداره الاصول"`` fold to the same string.
+    """
+    return strip_diacritics(unicodedata.normalize("NFKC", text)).translate(_FOLD).lower()
@@ -0,0 +1,160 @@
+"""Evidence retrieval for reviewers.
+
+Each submitted form is indexed as passages of about :data:`PASSAGE_WORDS`
+words: its criterion responses, and the extracted text of its attachments
+(:mod:`app.rag.extraction`), one page/slide/sheet at a time so a hit can
+point at the page it came from. Entry ids are
+``<user>:<category>:resp:<criterion>:<n>`` and
+``<user>:<category>:file:<attachment>:<n>``, so resubmitting replaces a
+submission's passages with one prefix delete.
+
+Passages are tagged with the category slug and the criterion they answer
+(an attachment's criterion is the one it was uploaded for), which is what
+"evidence supporting criterion X" filters on.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from app.rag.embeddings import Embedder
+from app.rag.extraction import DONE, ExtractionService
+from app.rag.vector_index import Entry, Hit, VectorIndex
+from app.services.uploads import UploadService
+
+DEFAULT_INDEX_DIR = Path(__file__).resolve().parents[2] / "data" / "vectors"
+
+PASSAGE_WORDS = 150
+SNIPPET_CHARS = 280
+# How long indexing a submission waits for attachments still being extracted.
+EXTRACTION_WAIT_SECONDS = 120.0
+
+
+@dataclass
+class Document:
+    """Extracted text of one attachment."""
+
+    attachment_id: str
+    file_name: str
+    criterion_id: Optional[str]
+    text: str
+    units: list[dict]  # {kind, number, start, end}, see app.rag.extraction
+
+
+def load_documents(
+    uploads: UploadService,
+    extraction: ExtractionService,
+    user_id: int,
+    category_slug: str,
+    timeout: float = EXTRACTION_WAIT_SECONDS,
+) -> list[Document]:
+    """Extracted text of a submission's attachments, waiting for running extractions.
+
+    Files without text (images, failed or timed-out extractions) are left out.
+    """
+    documents = []
+    for attachment in uploads.attachments(user_id, category_slug):
+        job = extraction.submit(attachment.sha256, uploads.blob_path(attachment.sha256), attachment.content_type)
+        try:
+            result = job.result(timeout)
+        except Exception:  # timed out, or the worker failed
+            continue
+        text_path = extraction.text(attachment.sha256)
+        if result.get("status") != DONE or text_path is None:
+            continue
+        documents.append(
+            Document(
+                attachment.id,
+                attachment.file_name,
+                attachment.criterion_id,
+                text_path.read_text(encoding="utf-8"),
+                result["units"],
+            )
+        )
+    return documents
+
+
+def passages(text: str, words: int = PASSAGE_WORDS) -> Iterator[str]:
+    tokens = text.split()
+    for start in range(0, len(tokens), words):
+        yield " ".join(tokens[start:start + words])
+
+
+def _snippet(passage: str) -> str:
+    return passage if len(passage) <= SNIPPET_CHARS else passage[: SNIPPET_CHARS - 1].rstrip() + "…"
+
+
+class EvidenceIndex:
+    """Submission passages in a :class:`VectorIndex`, embedded by ``embedder``."""
+
+    def __init__(self, root: Path, embedder: Embedder):
+        self.embedder = embedder
+        self.index = VectorIndex(root, embedder.dim, embedder.name)
+
+    @staticmethod
+    def submission_prefix(user_id: int, category_slug: str) -> str:
+        return f"{user_id}:{category_slug}:"
+
+    def index_submission(
+        self,
+        user_id: int,
+        category_slug: str,
+        form: Optional[dict],
+        documents: Iterable[Document] = (),
+    ) -> int:
+        """Replace the passages of a submission; returns how many were indexed."""
+        prefix = self.submission_prefix(user_id, category_slug)
+        base = {"userId": user_id, "categorySlug": category_slug}
+        entries: list[Entry] = []
+        texts: list[str] = []
+
+        def add(entry_id: str, criterion: Optional[str], text: str, **meta) -> None:
+            entries.append(Entry(entry_id, category_slug, criterion or "", {**base, **meta, "snippet": _snippet(text)}))
+            texts.append(text)
+
+        responses = (form or {}).get("criteriaResponses")
+        for criterion_id, response in (responses if isinstance(responses, dict) else {}).items():
+            text = response.get("text") if isinstance(response, dict) else None
+            if isinstance(text, str):
+                for n, passage in enumerate(passages(text)):
+                    add(f"{prefix}resp:{criterion_id}:{n}", criterion_id, passage, kind="response")
+
+        for doc in documents:
+            n = 0
+            for unit in doc.units:
+                for passage in passages(doc.text[unit["start"]:unit["end"]]):
+                    add(
+                        f"{prefix}file:{doc.attachment_id}:{n}",
+                        doc.criterion_id,
+                        passage,
+                        kind="attachment",
+                        attachmentId=doc.attachment_id,
+                        fileName=doc.file_name,
+                        unit=unit["kind"],
+                        page=unit["number"],
+                    )
+                    n += 1
+
+        vectors = self.embedder.embed(texts) if texts else None
+        self.index.delete_prefix(prefix)
+        if entries:
+            self.index.add(entries, vectors)
+        return len(entries)
+
+    def remove_submission(self, user_id: int, category_slug: str) -> int:
+        return self.index.delete_prefix(self.submission_prefix(user_id, category_slug))
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        category: Optional[str] = None,
+        criterion: Optional[str] = None,
+    ) -> list[Hit]:
+        return self.index.search(self.embedder.embed([query])[0], k, category, criterion)
+
+    def close(self) -> None:
+        self.index.close()
+        close = getattr(self.embedder, "close", None)
+        if close is not None:
+            close()
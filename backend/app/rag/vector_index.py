@@ -0,0 +1,267 @@
+"""Memory-mapped vector index with filtered top-k cosine search.
+
+Layout under ``root``::
+
+    index.json      {"dim", "embedder", "capacity"}
+    vectors.f32     float32 matrix, ``capacity`` rows × ``dim``, memory-mapped
+    entries.jsonl   append-only log: {"row", "id", "category", "criterion", ...}
+                    or {"delete": id}
+
+Rows are appended; re-adding an id or deleting it only marks the old row
+dead, so updates never rewrite the matrix. :meth:`VectorIndex.compact`
+drops dead rows once they pile up. Category and criterion are kept as
+small integer codes next to the matrix so filters are one vectorized
+comparison, and the similarity of every candidate row is a single
+matrix-vector product.
+"""
+
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from app.services.persistence import atomic_write_bytes
+
+INITIAL_CAPACITY = 1024
+
+
+@dataclass
+class Entry:
+    id: str
+    category: str
+    criterion: str = ""
+    meta: dict = field(default_factory=dict)  # stored as is (user id, snippet, page, ...)
+
+
+@dataclass
+class Hit:
+    id: str
+    score: float
+    category: str
+    criterion: str
+    meta: dict
+
+
+class _Codes:
+    """Interned strings ↔ small ints for vectorized filtering."""
+
+    def __init__(self):
+        self.codes: dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        return self.codes.setdefault(value, len(self.codes))
+
+    def lookup(self, value: str) -> int:
+        return self.codes.get(value, -1)
+
+
+class VectorIndex:
+    def __init__(self, root: Path, dim: int, embedder: str):
+        self.root = Path(root)
+        self.dim = dim
+        self.embedder = embedder
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._reset_state()
+        info_path = self.root / "index.json"
+        if info_path.exists():
+            info = json.loads(info_path.read_text(encoding="utf-8"))
+            if (info["dim"], info["embedder"]) != (dim, embedder):
+                raise ValueError(
+                    f"Index at {self.root} was built with {info['embedder']} ({info['dim']}d); "
+                    f"rebuild it to use {embedder} ({dim}d)"
+                )
+            self._open_matrix(info["capacity"])
+            self._replay()
+        else:
+            self._open_matrix(INITIAL_CAPACITY)
+        self._log = open(self.root / "entries.jsonl", "a", encoding="utf-8")
+
+    def _reset_state(self) -> None:
+        self.count = 0  # rows used, including dead ones
+        self._meta: list[Optional[Entry]] = []
+        self._rows: dict[str, int] = {}
+        self._categories = _Codes()
+        self._criteria = _Codes()
+        self._category = np.zeros(0, dtype=np.int32)
+        self._criterion = np.zeros(0, dtype=np.int32)
+        self._alive = np.zeros(0, dtype=bool)
+
+    # ── Storage ──
+
+    def _open_matrix(self, capacity: int) -> None:
+        path = self.root / "vectors.f32"
+        size = capacity * self.dim * 4
+        with open(path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self.capacity = capacity
+        self._vectors = np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        for name in ("_category", "_criterion", "_alive"):
+            array = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[: len(array)] = array[:capacity]
+            setattr(self, name, grown)
+        atomic_write_bytes(
+            self.root / "index.json",
+            json.dumps({"dim": self.dim, "embedder": self.embedder, "capacity": capacity}).encode("utf-8"),
+        )
+
+    def _replay(self) -> None:
+        path = self.root / "entries.jsonl"
+        if not path.exists():
+            return
+        with open(path, "r+b") as f:
+            good = 0
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn final line from a crash: drop it so later appends
+                    # stay readable. Its vector row is simply reused.
+                    f.truncate(good)
+                    break
+                good += len(line)
+                if "delete" in record:
+                    self._kill(record["delete"])
+                else:
+                    self._place(record["row"], Entry(record["id"], record["category"], record["criterion"], record["meta"]))
+
+    def _place(self, row: int, entry: Entry) -> None:
+        self._kill(entry.id)
+        while len(self._meta) <= row:
+            self._meta.append(None)
+        self._meta[row] = entry
+        self._rows[entry.id] = row
+        self._category[row] = self._categories.code(entry.category)
+        self._criterion[row] = self._criteria.code(entry.criterion)
+        self._alive[row] = True
+        self.count = max(self.count, row + 1)
+
+    def _kill(self, entry_id: str) -> bool:
+        row = self._rows.pop(entry_id, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._meta[row] = None
+        return True
+
+    # ── Writes ──
+
+    def add(self, entries: list[Entry], vectors: np.ndarray) -> None:
+        """Insert or replace ``entries`` with their (normalized) vectors."""
+        if len(entries) != len(vectors):
+            raise ValueError("entries and vectors differ in length")
+        if not entries:
+            return
+        with self._lock:
+            self._add(entries, vectors)
+
+    def _add(self, entries: list[Entry], vectors: np.ndarray) -> None:
+        if self.count + len(entries) > self.capacity:
+            capacity = self.capacity
+            while self.count + len(entries) > capacity:
+                capacity *= 2
+            self._vectors.flush()
+            self._open_matrix(capacity)
+        start = self.count
+        self._vectors[start:start + len(entries)] = vectors
+        self._vectors.flush()
+        lines = []
+        for offset, entry in enumerate(entries):
+            self._place(start + offset, entry)
+            record = {
+                "row": start + offset,
+                "id": entry.id,
+                "category": entry.category,
+                "criterion": entry.criterion,
+                "meta": entry.meta,
+            }
+            lines.append(json.dumps(record, ensure_ascii=False))
+        self._append_log(lines)
+
+    def delete(self, ids: Iterable[str]) -> int:
+        with self._lock:
+            removed = [entry_id for entry_id in ids if self._kill(entry_id)]
+            self._append_log(json.dumps({"delete": entry_id}) for entry_id in removed)
+        return len(removed)
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete every entry whose id starts with ``prefix``."""
+        with self._lock:
+            ids = [entry_id for entry_id in self._rows if entry_id.startswith(prefix)]
+        return self.delete(ids)
+
+    def _append_log(self, lines: Iterable[str]) -> None:
+        data = "".join(f"{line}\n" for line in lines)
+        if data:
+            self._log.write(data)
+            self._log.flush()
+            os.fsync(self._log.fileno())
+
+    def compact(self) -> None:
+        """Rewrite the matrix and log without dead rows."""
+        with self._lock:
+            live = np.flatnonzero(self._alive[: self.count])
+            vectors = np.array(self._vectors[live])
+            entries = [self._meta[row] for row in live]
+            self._log.close()
+            del self._vectors
+            for name in ("vectors.f32", "entries.jsonl"):
+                (self.root / name).unlink(missing_ok=True)
+            self._reset_state()
+            self._open_matrix(max(INITIAL_CAPACITY, 1 << max(len(live) - 1, 0).bit_length()))
+            self._log = open(self.root / "entries.jsonl", "a", encoding="utf-8")
+            self._add(entries, vectors)
+
+    @property
+    def live(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, entry_id: str) -> bool:
+        return entry_id in self._rows
+
+    # ── Search ──
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        category: Optional[str] = None,
+        criterion: Optional[str] = None,
+    ) -> list[Hit]:
+        """Top ``k`` live rows by cosine similarity to ``query`` (a unit vector)."""
+        with self._lock:
+            n = self.count
+            mask = self._alive[:n].copy()
+            if category is not None:
+                mask &= self._category[:n] == self._categories.lookup(category)
+            if criterion is not None:
+                mask &= self._criterion[:n] == self._criteria.lookup(criterion)
+            candidates = np.flatnonzero(mask)
+            if not len(candidates) or k <= 0:
+                return []
+            query = np.asarray(query, dtype=np.float32)
+            if len(candidates) > n // 2:
+                # Mostly unfiltered: one pass over the contiguous matrix.
+                scores = self._vectors[:n] @ query
+                scores = scores[candidates]
+            else:
+                scores = self._vectors[candidates] @ query
+            k = min(k, len(candidates))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            hits = []
+            for i in top:
+                entry = self._meta[candidates[i]]
+                hits.append(Hit(entry.id, float(scores[i]), entry.category, entry.criterion, entry.meta))
+            return hits
+
+    def close(self) -> None:
+        with self._lock:
+            self._vectors.flush()
+            self._log.close()
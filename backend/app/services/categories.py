@@ -4,6 +4,8 @@ Currently hardcoded — designed to swap to a database later without
 changing the API contract.
 """
 
+from functools import lru_cache
+
 from app.api.schemas import Category, SubCategory, BilingualText
 
 
@@ -92,9 +94,16 @@ def get_all_categories() -> list[Category]:
     ]
 
 
+@lru_cache(maxsize=1)
+def _categories_by_id() -> dict[str, Category]:
+    return {cat.id: cat for cat in get_all_categories()}
+
+
 def get_category_by_id(category_id: str) -> Category | None:
     """Retrieve a single category by its ID."""
-    for cat in get_all_categories():
-        if cat.id == category_id:
-            return cat
-    return None
+    return _categories_by_id().get(category_id)
+
+
+def reload_categories() -> None:
+    """Drop the id index so the next lookup rebuilds it from the source."""
+    _categories_by_id.cache_clear()
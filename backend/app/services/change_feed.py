@@ -0,0 +1,194 @@
+"""Change notifications between processes sharing a data directory.
+
+Every uvicorn worker loads its own copy of the users into memory, so a
+write in one worker must reach the others before they serve that user
+again. :class:`ChangeFeed` is a ``changes`` table in a local SQLite
+database (WAL mode) whose ``generation`` column is a monotonically
+increasing store generation::
+
+    generation  origin            key      data
+    41          host:812:3f…      user:6   {"op": "set", "id": 6, ...}
+
+- A writer takes the database's write lock (:meth:`ChangeFeed.transaction`),
+  catches up on changes it has not seen, applies its own change and
+  publishes it; the lock is what keeps two workers from overwriting each
+  other's update to the same user or allocating the same id.
+- A reader asks :meth:`ChangeFeed.changed` before serving a request. It is
+  ``PRAGMA data_version``, which only moves when *another* connection
+  committed, so the common case costs a few microseconds and no query.
+  When it moved, :meth:`ChangeFeed.since` returns the new changes, and the
+  caller replaces just those keys: caches are invalidated per key rather
+  than flushed, and a client reading from any worker sees its own writes.
+- :meth:`ChangeFeed.watch` polls the same counter on a thread, so
+  listeners (e.g. search indexes) hear about changes without waiting for a
+  request. The standard library has no inotify; this is a stat-free
+  counter check every ``interval`` seconds.
+
+Rows at or below the generation of the last snapshot are pruned with
+:meth:`ChangeFeed.prune`; a process that had not caught up to them gets
+:class:`ChangeFeedPruned` and reloads the snapshot instead.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, NamedTuple, Optional
+
+logger = logging.getLogger("app.changes")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS changes (
+    generation INTEGER PRIMARY KEY AUTOINCREMENT,
+    origin TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class ChangeFeedPruned(Exception):
+    """The changes after the requested generation are no longer all in the feed."""
+
+
+class Change(NamedTuple):
+    generation: int
+    origin: str
+    key: str
+    data: Any
+
+
+class ChangeFeed:
+    """Store generations and changed keys, shared through a SQLite file."""
+
+    def __init__(self, path: Path, origin: Optional[str] = None):
+        self.path = Path(path)
+        self.origin = origin or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._local = threading.local()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections are not shareable.
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")  # durability comes from the store's own journal
+            self._local.db = db
+            self._local.version = None
+        return db
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Hold the cross-process write lock; :meth:`publish` inside it."""
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def publish(self, key: str, data: Any) -> int:
+        """Record a change (inside :meth:`transaction`); returns its generation."""
+        db = self._connection()
+        if not db.in_transaction:
+            raise RuntimeError("publish() outside transaction()")
+        cursor = db.execute(
+            "INSERT INTO changes (origin, key, data) VALUES (?, ?, ?)",
+            (self.origin, key, json.dumps(data, ensure_ascii=False)),
+        )
+        return cursor.lastrowid
+
+    def changed(self) -> bool:
+        """Whether another connection committed since this thread last asked."""
+        db = self._connection()
+        version = db.execute("PRAGMA data_version").fetchone()[0]
+        moved = version != self._local.version
+        self._local.version = version
+        return moved
+
+    def since(self, generation: int) -> list[Change]:
+        """Changes after ``generation``, oldest first.
+
+        Raises :class:`ChangeFeedPruned` if some of them were pruned already.
+        """
+        db = self._connection()
+        own = not db.in_transaction
+        if own:
+            db.execute("BEGIN")  # one read snapshot for both queries
+        try:
+            row = db.execute("SELECT value FROM meta WHERE name = 'pruned'").fetchone()
+            if row and row[0] > generation:
+                raise ChangeFeedPruned(f"changes up to {row[0]} were pruned (asked from {generation})")
+            rows = db.execute(
+                "SELECT generation, origin, key, data FROM changes WHERE generation > ? ORDER BY generation",
+                (generation,),
+            ).fetchall()
+        finally:
+            if own:
+                db.execute("COMMIT")
+        return [Change(g, origin, key, json.loads(data)) for g, origin, key, data in rows]
+
+    def current(self) -> int:
+        """The latest generation (0 if nothing was ever published)."""
+        db = self._connection()
+        row = db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+        return row[0] if row else 0
+
+    def prune(self, upto: int) -> int:
+        """Delete changes at or below ``upto`` (already folded into a snapshot; inside :meth:`transaction`)."""
+        db = self._connection()
+        db.execute(
+            "INSERT INTO meta (name, value) VALUES ('pruned', ?)"
+            " ON CONFLICT (name) DO UPDATE SET value = max(value, excluded.value)",
+            (upto,),
+        )
+        return db.execute("DELETE FROM changes WHERE generation <= ?", (upto,)).rowcount
+
+    # ── Watching ──
+
+    def watch(self, callback: Callable[[], None], interval: float = 0.05) -> None:
+        """Call ``callback`` on a thread whenever another process commits a change."""
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+
+        def loop() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    if self.changed():
+                        callback()
+                except Exception:  # noqa: BLE001 - keep watching
+                    logger.exception("change_watch_failed path=%s", self.path)
+            self._close_connection()
+
+        self._watcher = threading.Thread(target=loop, name=f"change-feed:{self.path.name}", daemon=True)
+        self._watcher.start()
+
+    def close(self) -> None:
+        """Stop the watcher and close this thread's connection."""
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            self._stop.set()
+            watcher.join()
+        self._close_connection()
+
+    def _close_connection(self) -> None:
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
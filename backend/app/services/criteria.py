@@ -0,0 +1,139 @@
+"""Submission criteria per award category.
+
+Mirrors the validation-relevant parts of the frontend's
+`src/data/submissionCriteria.ts` (ids, points, rating scales, limits and
+extra fields); titles, descriptions and evidence lists stay in the
+frontend. Keep the two in sync when criteria change.
+
+Criteria patterns:
+
+- A: non-supervisory employees (administrative, specialist, technical,
+  customer service)
+- B: the unsung hero, rated 1–10 per criterion by the direct supervisor
+- C: supervisory employees (leader, future leader)
+- department, project, knowledge and green
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+MAX_WORDS_PER_CRITERION = 400
+MAX_FILES_PER_CRITERION = 15
+MIN_RESPONSE_CHARS = 10
+
+SUBMISSION_STEPS = ("intro", "criteria", "review", "confirmation")
+
+
+@dataclass(frozen=True)
+class CriterionDefinition:
+    id: str
+    points: int
+    group: Optional[str] = None  # "enablers" | "results"
+    rating_scale: Optional[tuple[int, int]] = None
+
+
+@dataclass(frozen=True)
+class ExtraField:
+    id: str
+    type: str  # "text" | "number" | "date" | "textarea" | "select"
+    required: bool = True
+
+
+@dataclass(frozen=True)
+class SubmissionConfig:
+    slugs: tuple[str, ...]
+    criteria: tuple[CriterionDefinition, ...]
+    extra_fields: tuple[ExtraField, ...]
+    total_points: int
+    steps: tuple[str, ...] = SUBMISSION_STEPS
+    max_words_per_criterion: int = MAX_WORDS_PER_CRITERION
+    max_files_per_criterion: int = MAX_FILES_PER_CRITERION
+    min_response_chars: int = MIN_RESPONSE_CHARS
+
+
+def _criteria(*items: tuple, group: Optional[str] = None, rating_scale=None) -> tuple[CriterionDefinition, ...]:
+    return tuple(CriterionDefinition(id, points, group, rating_scale) for id, points in items)
+
+
+PATTERN_A = _criteria(("emp-perf", 40), ("emp-init", 15), ("emp-collab", 15), ("emp-resp", 15), ("emp-learn", 15))
+PATTERN_B = _criteria(
+    ("unsung-achievements", 20),
+    ("unsung-rules", 20),
+    ("unsung-appearance", 20),
+    ("unsung-attendance", 20),
+    ("unsung-teamwork", 20),
+    rating_scale=(1, 10),
+)
+LEADER = _criteria(
+    ("ldr-perf", 20), ("ldr-innov", 15), ("ldr-stake", 15), ("ldr-account", 15), ("ldr-learn", 15), ("ldr-vision", 20)
+)
+FUTURE_LEADER = _criteria(
+    ("fl-perf", 20), ("fl-init", 15), ("fl-collab", 15), ("fl-resp", 15), ("fl-learn", 15), ("fl-vision", 20)
+)
+DEPARTMENT = _criteria(("dept-plan", 200), ("dept-resources", 300), ("dept-people", 200), ("dept-results", 300))
+PROJECT = _criteria(("proj-design", 20), ("proj-exec", 30), ("proj-results", 50))
+KNOWLEDGE = _criteria(
+    ("km-strategy", 150),
+    ("km-culture", 100),
+    ("km-tech", 100),
+    ("km-innov", 120),
+    ("km-community", 80),
+    ("km-transparency", 50),
+    group="enablers",
+) + _criteria(("km-app", 120), ("km-measure", 80), ("km-learn", 100), ("km-sustain", 100), group="results")
+GREEN = _criteria(
+    ("green-resources", 140),
+    ("green-waste", 130),
+    ("green-innov", 130),
+    ("green-supply", 100),
+    ("green-community", 100),
+    group="enablers",
+) + _criteria(("green-design", 150), ("green-performance", 150), ("green-impact", 100), group="results")
+
+EMPLOYEE_EXTRA_FIELDS = (
+    ExtraField("department", "text"),
+    ExtraField("yearsOfService", "number"),
+    ExtraField("position", "text"),
+)
+
+SUBMISSION_CONFIGS = (
+    SubmissionConfig(("employee-nonsupervisory",), PATTERN_A, EMPLOYEE_EXTRA_FIELDS, 100),
+    SubmissionConfig(("employee-supervisory",), LEADER, EMPLOYEE_EXTRA_FIELDS, 100),
+    SubmissionConfig(
+        ("department",), DEPARTMENT, (ExtraField("deptName", "text"), ExtraField("deptHeadName", "text")), 1000
+    ),
+    SubmissionConfig(
+        ("project",),
+        PROJECT,
+        (ExtraField("projectName", "text"), ExtraField("projectLead", "text"), ExtraField("projectDuration", "text")),
+        100,
+    ),
+    SubmissionConfig(("knowledge",), KNOWLEDGE, (ExtraField("kmDept", "text"),), 1000),
+    SubmissionConfig(("green",), GREEN, (ExtraField("greenDept", "text"),), 1000),
+)
+
+NON_SUPERVISORY_CRITERIA = {"unsung": PATTERN_B}
+SUPERVISORY_CRITERIA = {"leader": LEADER, "futureleader": FUTURE_LEADER}
+
+
+def get_submission_config(slug: str) -> Optional[SubmissionConfig]:
+    return next((config for config in SUBMISSION_CONFIGS if slug in config.slugs), None)
+
+
+def get_criteria(slug: str, subcategory: Optional[str]) -> tuple[CriterionDefinition, ...]:
+    """Criteria for a category; employee categories depend on the sub-category."""
+    if slug == "employee-supervisory":
+        return SUPERVISORY_CRITERIA.get(subcategory or "", LEADER)
+    if slug == "employee-nonsupervisory":
+        return NON_SUPERVISORY_CRITERIA.get(subcategory or "", PATTERN_A)
+    config = get_submission_config(slug)
+    return config.criteria if config else ()
+
+
+def split_submission_slug(full_slug: str) -> tuple[str, Optional[str]]:
+    """`employee-supervisory-leader` → (`employee-supervisory`, `leader`); others unchanged."""
+    if full_slug.startswith("employee-"):
+        parts = full_slug.split("-", 2)
+        if len(parts) == 3:
+            return f"{parts[0]}-{parts[1]}", parts[2]
+    return full_slug, None
@@ -0,0 +1,170 @@
+"""In-process publish/subscribe of admin events, streamed as Server-Sent Events.
+
+Endpoints :meth:`EventBroker.publish` what changed (e.g. a registration's
+status); each open ``text/event-stream`` response is a
+:class:`Subscription` with a bounded buffer. An idle stream is a task
+waiting on an :class:`asyncio.Event`, woken only by a publish (or a
+keep-alive comment every ``keepalive`` seconds), so open admin tabs cost
+nothing between changes.
+
+Event ids are ``<epoch>-<seq>``: a sequence number within this process,
+prefixed by a per-process token. The broker keeps the last ``history``
+events, so a client reconnecting with ``Last-Event-ID`` gets what it
+missed. When that is not possible (the id is from another process or a
+restart, it is older than the history, or the client fell more than
+``buffer`` events behind), the stream sends a ``reset`` event instead:
+the client should reload its list, then keep reading.
+"""
+
+import asyncio
+import json
+import threading
+import uuid
+from collections import deque
+from typing import AsyncIterator, Callable, NamedTuple, Optional
+
+HISTORY = 1000
+BUFFER = 256
+KEEPALIVE = 15.0
+RESET = "reset"
+
+
+class Event(NamedTuple):
+    id: str
+    type: str
+    data: dict
+
+
+def encode_sse(event: Event) -> bytes:
+    """``event`` in the ``text/event-stream`` wire format."""
+    data = json.dumps(event.data, ensure_ascii=False)
+    return f"id: {event.id}\nevent: {event.type}\ndata: {data}\n\n".encode("utf-8")
+
+
+class Subscription:
+    """One stream's pending events; created on the loop that reads it."""
+
+    def __init__(self, size: int):
+        self._size = size
+        self._events: deque[Event] = deque()
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self.lost_at: Optional[str] = None  # id of the newest dropped event, if any
+        self.closed = False
+
+    def _put(self, event: Event) -> None:
+        # Called with the broker lock held, from any thread.
+        if len(self._events) >= self._size:
+            self._events.clear()
+            self.lost_at = event.id
+        else:
+            self._events.append(event)
+        self._notify()
+
+    def _notify(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:  # the loop is closed; so is the stream
+            pass
+
+
+class EventBroker:
+    """Fan-out of events to subscribers, with a short history for resuming."""
+
+    def __init__(self, history: int = HISTORY, buffer: int = BUFFER, keepalive: float = KEEPALIVE):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.buffer = buffer
+        self.keepalive = keepalive
+        self._seq = 0
+        self._history: deque[Event] = deque(maxlen=history)
+        self._subscribers: set[Subscription] = set()
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, type_: str, data: dict) -> Event:
+        """Record an event and hand it to every subscriber (any thread)."""
+        with self._lock:
+            self._seq += 1
+            event = Event(f"{self.epoch}-{self._seq}", type_, data)
+            self._history.append(event)
+            for subscription in self._subscribers:
+                subscription._put(event)
+        return event
+
+    def _missed(self, last_event_id: str) -> Optional[list[Event]]:
+        """Events after ``last_event_id``, or None if they cannot all be replayed."""
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > self._seq:
+            return None
+        missed = self._seq - int(seq)
+        if missed > len(self._history):
+            return None
+        return list(self._history)[len(self._history) - missed:] if missed else []
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        """A subscription to future events, after the ones missed since ``last_event_id``."""
+        subscription = Subscription(self.buffer)
+        with self._lock:
+            if last_event_id:
+                missed = self._missed(last_event_id)
+                if missed is None or len(missed) > self.buffer:
+                    subscription.lost_at = f"{self.epoch}-{self._seq}"
+                else:
+                    subscription._events.extend(missed)
+            subscription.closed = self._closed
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _drain(self, subscription: Subscription) -> tuple[Optional[str], list[Event]]:
+        with self._lock:
+            lost_at, subscription.lost_at = subscription.lost_at, None
+            events = list(subscription._events)
+            subscription._events.clear()
+        return lost_at, events
+
+    async def stream(
+        self,
+        last_event_id: Optional[str] = None,
+        match: Optional[Callable[[Event], bool]] = None,
+    ) -> AsyncIterator[bytes]:
+        """An SSE body: missed events, then new ones as they are published.
+
+        Ends when the broker is closed; ``match`` filters the events sent.
+        """
+        subscription = self.subscribe(last_event_id)
+        try:
+            yield b"retry: 2000\n\n"
+            while True:
+                subscription._wakeup.clear()
+                lost_at, events = self._drain(subscription)
+                if lost_at is not None:
+                    yield encode_sse(Event(lost_at, RESET, {}))
+                chunk = b"".join(encode_sse(event) for event in events if match is None or match(event))
+                if chunk:
+                    yield chunk
+                if lost_at is not None or events:
+                    continue
+                if subscription.closed:
+                    return
+                try:
+                    await asyncio.wait_for(subscription._wakeup.wait(), self.keepalive)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    def close(self) -> None:
+        """End every stream once it has sent what it has buffered."""
+        with self._lock:
+            self._closed = True
+            for subscription in self._subscribers:
+                subscription.closed = True
+                subscription._notify()
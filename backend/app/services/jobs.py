@@ -0,0 +1,487 @@
+"""Persistent background jobs: a SQLite queue and a pool of workers.
+
+Jobs are rows of ``jobs`` in a SQLite database (WAL mode, so readers
+never wait for the writer and several processes can share it)::
+
+    queued ──claim──▶ running ──complete──▶ done
+      ▲                  │
+      └──fail (retries)──┤──fail (last attempt)──▶ failed
+                         └──lease expired──▶ queued again (or failed)
+
+- **Priorities.** Workers claim the ready job with the highest priority,
+  oldest first.
+- **Deduplication.** At most one *queued* job per ``dedup_key``;
+  enqueueing another returns it (optionally replacing its payload), so a
+  burst of resubmissions is processed once, with the latest data.
+- **Retries.** A failed attempt is requeued after exponential backoff
+  with jitter until ``max_attempts``.
+- **Visibility timeout.** A claim is a lease until ``locked_until``;
+  workers extend it while they report progress. If a worker dies (or the
+  server restarts) mid-job, the lease expires and another worker picks
+  the job up. Results of a worker that lost its lease are ignored.
+
+:class:`WorkerPool` runs handlers on threads in this process, or in
+spawned processes that open the database themselves (handlers must then
+be importable, module-level functions). Handlers receive the payload and
+a :class:`JobContext` for progress reports, and return a JSON-serializable
+result.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+logger = logging.getLogger("app.jobs")
+
+DEFAULT_JOBS_PATH = Path(__file__).resolve().parents[2] / "data" / "jobs.sqlite3"
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+MAX_BACKOFF_SECONDS = 600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    dedup_key TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_at REAL NOT NULL,
+    locked_until REAL,
+    worker TEXT,
+    progress REAL,
+    message TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_dedup ON jobs (dedup_key) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority DESC, run_at, id);
+CREATE INDEX IF NOT EXISTS jobs_lease ON jobs (status, locked_until);
+"""
+
+
+@dataclass
+class Job:
+    id: int
+    kind: str
+    payload: Any
+    priority: int
+    dedup_key: Optional[str]
+    status: str
+    attempts: int
+    max_attempts: int
+    run_at: float
+    locked_until: Optional[float]
+    worker: Optional[str]
+    progress: Optional[float]
+    message: Optional[str]
+    result: Any
+    error: Optional[str]
+    created_at: float
+    updated_at: float
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        values = dict(row)
+        values["payload"] = json.loads(values["payload"])
+        values["result"] = None if values["result"] is None else json.loads(values["result"])
+        return cls(**values)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "priority": self.priority,
+            "attempts": self.attempts,
+            "maxAttempts": self.max_attempts,
+            "progress": self.progress,
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "createdAt": self.created_at,
+            "updatedAt": self.updated_at,
+            "runAt": self.run_at,
+        }
+
+
+def backoff_delay(attempts: int, base: float) -> float:
+    """Delay before retry number ``attempts`` (1-based): exponential, with jitter."""
+    return min(MAX_BACKOFF_SECONDS, base * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+
+
+class JobQueue:
+    """Jobs in a SQLite database; safe to share between threads and processes."""
+
+    def __init__(self, path: Path = DEFAULT_JOBS_PATH, max_attempts: int = 5, backoff: float = 2.0):
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._local = threading.local()
+        self._wake = threading.Condition()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections are not shareable.
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")  # take the write lock up front
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    # ── Producers ──
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Any = None,
+        priority: int = 0,
+        dedup_key: Optional[str] = None,
+        replace: bool = False,
+        delay: float = 0.0,
+        max_attempts: Optional[int] = None,
+    ) -> Job:
+        """Queue a job, or return the queued job with the same ``dedup_key``.
+
+        With ``replace``, that job takes the new payload and the higher of
+        the two priorities.
+        """
+        now = time.time()
+        data = json.dumps(payload, ensure_ascii=False)
+        with self._transaction() as db:
+            if dedup_key is not None:
+                row = db.execute(
+                    "SELECT * FROM jobs WHERE dedup_key = ? AND status = ?", (dedup_key, QUEUED)
+                ).fetchone()
+                if row is not None:
+                    if replace:
+                        db.execute(
+                            "UPDATE jobs SET payload = ?, priority = MAX(priority, ?), updated_at = ? WHERE id = ?",
+                            (data, priority, now, row["id"]),
+                        )
+                        row = db.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+                    return Job.from_row(row)
+            cursor = db.execute(
+                "INSERT INTO jobs (kind, payload, priority, dedup_key, status, max_attempts, run_at, created_at,"
+                " updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (kind, data, priority, dedup_key, QUEUED, max_attempts or self.max_attempts, now + delay, now, now),
+            )
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (cursor.lastrowid,)).fetchone()
+        self.notify()
+        return Job.from_row(row)
+
+    # ── Workers ──
+
+    def claim(self, worker: str, kinds: Optional[Iterable[str]] = None, visibility: float = 300.0) -> Optional[Job]:
+        """Lease the next ready job of ``kinds`` (any kind if None) for ``visibility`` seconds."""
+        now = time.time()
+        kinds = tuple(kinds) if kinds is not None else None
+        kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})" if kinds else ""
+        with self._transaction() as db:
+            self._expire_leases(db, now)
+            row = db.execute(
+                f"SELECT id FROM jobs WHERE status = ? AND run_at <= ?{kind_filter}"
+                " ORDER BY priority DESC, run_at, id LIMIT 1",
+                (QUEUED, now, *(kinds or ())),
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, locked_until = ?, worker = ?, updated_at = ?"
+                " WHERE id = ?",
+                (RUNNING, now + visibility, worker, now, row["id"]),
+            )
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+        return Job.from_row(row)
+
+    def _expire_leases(self, db: sqlite3.Connection, now: float) -> None:
+        expired = db.execute(
+            "SELECT id, attempts, max_attempts, dedup_key FROM jobs WHERE status = ? AND locked_until < ?",
+            (RUNNING, now),
+        ).fetchall()
+        for row in expired:
+            requeue = row["attempts"] < row["max_attempts"]
+            if requeue and row["dedup_key"] is not None and db.execute(
+                "SELECT 1 FROM jobs WHERE dedup_key = ? AND status = ?", (row["dedup_key"], QUEUED)
+            ).fetchone():
+                requeue = False  # a newer job with the same key is already queued
+            db.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, locked_until = NULL, run_at = ?, error = ?, updated_at = ?"
+                " WHERE id = ?",
+                (QUEUED if requeue else FAILED, now, "Lease expired (worker stopped or timed out)", now, row["id"]),
+            )
+            logger.warning("job_lease_expired id=%s requeued=%s", row["id"], requeue)
+
+    def heartbeat(
+        self,
+        job_id: int,
+        worker: str,
+        visibility: float,
+        progress: Optional[float] = None,
+        message: Optional[str] = None,
+    ) -> bool:
+        """Extend a lease and record progress; False if the worker no longer holds it."""
+        now = time.time()
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET locked_until = ?, progress = COALESCE(?, progress), message = COALESCE(?, message),"
+                " updated_at = ? WHERE id = ? AND worker = ? AND status = ?",
+                (now + visibility, progress, message, now, job_id, worker, RUNNING),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker: str, result: Any = None) -> bool:
+        now = time.time()
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET status = ?, result = ?, progress = 1.0, error = NULL, locked_until = NULL,"
+                " updated_at = ? WHERE id = ? AND worker = ? AND status = ?",
+                (DONE, json.dumps(result, ensure_ascii=False), now, job_id, worker, RUNNING),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker: str, error: str) -> bool:
+        """Record a failed attempt; the job is retried after a backoff unless it was the last one."""
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT attempts, max_attempts, dedup_key FROM jobs WHERE id = ? AND worker = ? AND status = ?",
+                (job_id, worker, RUNNING),
+            ).fetchone()
+            if row is None:
+                return False
+            retry = row["attempts"] < row["max_attempts"]
+            if retry and row["dedup_key"] is not None and db.execute(
+                "SELECT 1 FROM jobs WHERE dedup_key = ? AND status = ?", (row["dedup_key"], QUEUED)
+            ).fetchone():
+                retry = False
+            run_at = now + backoff_delay(row["attempts"], self.backoff) if retry else now
+            db.execute(
+                "UPDATE jobs SET status = ?, error = ?, run_at = ?, worker = NULL, locked_until = NULL, updated_at = ?"
+                " WHERE id = ?",
+                (QUEUED if retry else FAILED, error, run_at, now, job_id),
+            )
+        return True
+
+    def wait(self, timeout: float) -> None:
+        """Sleep until a job is enqueued in this process (or :meth:`notify`), or ``timeout``."""
+        with self._wake:
+            self._wake.wait(timeout)
+
+    def notify(self) -> None:
+        with self._wake:
+            self._wake.notify_all()
+
+    # ── Reads ──
+
+    def get(self, job_id: int) -> Optional[Job]:
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return None if row is None else Job.from_row(row)
+
+    def list(self, kind: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> list[Job]:
+        """Most recently updated jobs first."""
+        clauses, params = [], []
+        for column, value in (("kind", kind), ("status", status)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connection().execute(
+            f"SELECT * FROM jobs{where} ORDER BY updated_at DESC, id DESC LIMIT ?", (*params, limit)
+        ).fetchall()
+        return [Job.from_row(row) for row in rows]
+
+    def depth(self) -> dict[str, dict[str, int]]:
+        """``{kind: {status: count}}``."""
+        rows = self._connection().execute("SELECT kind, status, COUNT(*) FROM jobs GROUP BY kind, status").fetchall()
+        depth: dict[str, dict[str, int]] = {}
+        for kind, status, count in rows:
+            depth.setdefault(kind, {})[status] = count
+        return depth
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished jobs last updated more than ``older_than`` seconds ago."""
+        with self._transaction() as db:
+            cursor = db.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?", (DONE, FAILED, time.time() - older_than)
+            )
+            return cursor.rowcount
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
+class JobContext:
+    """What a handler knows about its job; :meth:`progress` also extends the lease."""
+
+    def __init__(self, queue: JobQueue, job: Job, worker: str, visibility: float):
+        self.queue = queue
+        self.job = job
+        self.worker = worker
+        self.visibility = visibility
+
+    def progress(self, fraction: Optional[float] = None, message: Optional[str] = None) -> bool:
+        """Report progress; False means the lease was lost and the result will be ignored."""
+        return self.queue.heartbeat(self.job.id, self.worker, self.visibility, fraction, message)
+
+
+Handler = Callable[[Any, JobContext], Any]
+
+
+def run_job(queue: JobQueue, handlers: dict[str, Handler], job: Job, worker: str, visibility: float) -> None:
+    handler = handlers.get(job.kind)
+    if handler is None:
+        queue.fail(job.id, worker, f"No handler for job kind {job.kind!r}")
+        return
+    started = time.perf_counter()
+    try:
+        result = handler(job.payload, JobContext(queue, job, worker, visibility))
+    except Exception as exc:  # noqa: BLE001 - recorded on the job
+        logger.warning("job_failed id=%s kind=%s attempt=%s error=%r", job.id, job.kind, job.attempts, exc)
+        queue.fail(job.id, worker, f"{type(exc).__name__}: {exc}")
+        return
+    if not queue.complete(job.id, worker, result):
+        logger.warning("job_lease_lost id=%s kind=%s", job.id, job.kind)
+    logger.info("job_done id=%s kind=%s ms=%.1f", job.id, job.kind, (time.perf_counter() - started) * 1e3)
+
+
+def work(
+    queue: JobQueue,
+    handlers: dict[str, Handler],
+    worker: str,
+    stop,
+    visibility: float,
+    poll_interval: float,
+) -> None:
+    """Claim and run jobs of the handled kinds until ``stop`` is set."""
+    kinds = tuple(handlers)
+    while not stop.is_set():
+        try:
+            job = queue.claim(worker, kinds, visibility)
+        except sqlite3.OperationalError as exc:  # e.g. locked for longer than the busy timeout
+            logger.warning("job_claim_failed worker=%s error=%r", worker, exc)
+            job = None
+        if job is None:
+            queue.wait(poll_interval)
+            continue
+        run_job(queue, handlers, job, worker, visibility)
+    queue.close()
+
+
+def _process_main(path: str, handlers: dict[str, Handler], worker: str, stop, visibility: float, poll: float) -> None:
+    work(JobQueue(Path(path)), handlers, worker, stop, visibility, poll)
+
+
+class WorkerPool:
+    """Runs queued jobs of the kinds in ``handlers``.
+
+    ``workers`` threads in this process, or with ``processes=True`` that
+    many spawned processes (``0`` → one per CPU), which open the queue
+    database themselves; their handlers must be picklable module-level
+    functions.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: dict[str, Handler],
+        workers: int = 2,
+        processes: bool = False,
+        visibility: float = 300.0,
+        poll_interval: float = 1.0,
+        name: str = "jobs",
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = (os.cpu_count() or 1) if workers == 0 else workers
+        self.processes = processes
+        self.visibility = visibility
+        self.poll_interval = poll_interval
+        self.name = name
+        self._stop = None
+        self._runners: list = []
+
+    def _worker_id(self, index: int) -> str:
+        return f"{socket.gethostname()}:{os.getpid()}:{self.name}-{index}"
+
+    def start(self) -> None:
+        if self._runners:
+            return
+        if self.processes:
+            context = multiprocessing.get_context("spawn")  # as for password hashing: we have threads
+            self._stop = context.Event()
+            for index in range(self.workers):
+                args = (str(self.queue.path), self.handlers, f"{self._worker_id(index)}:p", self._stop,
+                        self.visibility, self.poll_interval)
+                runner = context.Process(target=_process_main, args=args, name=f"{self.name}-{index}", daemon=True)
+                runner.start()
+                self._runners.append(runner)
+            return
+        self._stop = threading.Event()
+        for index in range(self.workers):
+            args = (self.queue, self.handlers, self._worker_id(index), self._stop, self.visibility, self.poll_interval)
+            runner = threading.Thread(target=work, args=args, name=f"{self.name}-{index}", daemon=True)
+            runner.start()
+            self._runners.append(runner)
+
+    def run_pending(self, limit: Optional[int] = None) -> int:
+        """Run ready jobs on the calling thread until none are left (for tests and scripts)."""
+        worker, ran = self._worker_id(0) + ":inline", 0
+        while limit is None or ran < limit:
+            job = self.queue.claim(worker, tuple(self.handlers), self.visibility)
+            if job is None:
+                break
+            run_job(self.queue, self.handlers, job, worker, self.visibility)
+            ran += 1
+        return ran
+
+    def close(self, timeout: float = 30.0) -> None:
+        """Stop claiming jobs and wait up to ``timeout`` for running ones.
+
+        Jobs still running after that are picked up again once their lease expires.
+        """
+        if self._stop is None:
+            return
+        self._stop.set()
+        self.queue.notify()
+        deadline = time.monotonic() + timeout
+        for runner in self._runners:
+            runner.join(max(0.0, deadline - time.monotonic()))
+        self._runners, self._stop = [], None
@@ -0,0 +1,132 @@
+"""JSON Merge Patch (RFC 7396) and JSON Patch (RFC 6902) application.
+
+Both functions are pure: they return a new document and leave the input
+untouched.
+"""
+
+import copy
+from typing import Any
+
+MERGE_PATCH_MEDIA_TYPE = "application/merge-patch+json"
+JSON_PATCH_MEDIA_TYPE = "application/json-patch+json"
+
+
+class JsonPatchError(ValueError):
+    """The patch document is malformed or does not apply to the target."""
+
+
+class JsonPatchTestFailed(JsonPatchError):
+    """A JSON Patch ``test`` operation did not match."""
+
+
+def merge_patch(target: Any, patch: Any) -> Any:
+    """Apply an RFC 7396 merge patch to ``target``."""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
+
+
+def apply_json_patch(target: Any, operations: Any) -> Any:
+    """Apply an RFC 6902 operation list to ``target``."""
+    if not isinstance(operations, list):
+        raise JsonPatchError("JSON Patch document must be an array of operations")
+    doc = copy.deepcopy(target)
+    for operation in operations:
+        if not isinstance(operation, dict) or "op" not in operation or "path" not in operation:
+            raise JsonPatchError("Each operation needs 'op' and 'path'")
+        op = operation["op"]
+        path = _parse_pointer(operation["path"])
+        if op == "add":
+            doc = _add(doc, path, copy.deepcopy(_value(operation)))
+        elif op == "remove":
+            doc = _remove(doc, path)[0]
+        elif op == "replace":
+            doc = _remove(doc, path)[0]
+            doc = _add(doc, path, copy.deepcopy(_value(operation)))
+        elif op == "move":
+            source = _parse_pointer(operation.get("from", ""))
+            if path[: len(source)] == source and path != source:
+                raise JsonPatchError("Cannot move a value into one of its children")
+            doc, value = _remove(doc, source)
+            doc = _add(doc, path, value)
+        elif op == "copy":
+            value = _get(doc, _parse_pointer(operation.get("from", "")))
+            doc = _add(doc, path, copy.deepcopy(value))
+        elif op == "test":
+            if _get(doc, path) != _value(operation):
+                raise JsonPatchTestFailed(f"Test failed at '{operation['path']}'")
+        else:
+            raise JsonPatchError(f"Unknown operation '{op}'")
+    return doc
+
+
+def _value(operation: dict) -> Any:
+    if "value" not in operation:
+        raise JsonPatchError(f"Operation '{operation['op']}' needs a 'value'")
+    return operation["value"]
+
+
+def _parse_pointer(pointer: Any) -> list[str]:
+    if not isinstance(pointer, str) or (pointer and not pointer.startswith("/")):
+        raise JsonPatchError(f"Invalid JSON pointer {pointer!r}")
+    if not pointer:
+        return []
+    return [part.replace("~1", "/").replace("~0", "~") for part in pointer[1:].split("/")]
+
+
+def _index(container: list, token: str, allow_end: bool) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index '{token}'")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index {index} out of range")
+    return index
+
+
+def _get(doc: Any, path: list[str]) -> Any:
+    for token in path:
+        if isinstance(doc, dict):
+            if token not in doc:
+                raise JsonPatchError(f"Path segment '{token}' not found")
+            doc = doc[token]
+        elif isinstance(doc, list):
+            doc = doc[_index(doc, token, allow_end=False)]
+        else:
+            raise JsonPatchError(f"Cannot descend into scalar at '{token}'")
+    return doc
+
+
+def _add(doc: Any, path: list[str], value: Any) -> Any:
+    if not path:
+        return value
+    parent = _get(doc, path[:-1])
+    token = path[-1]
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_index(parent, token, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Cannot add to scalar at '{token}'")
+    return doc
+
+
+def _remove(doc: Any, path: list[str]) -> tuple[Any, Any]:
+    if not path:
+        return None, doc
+    parent = _get(doc, path[:-1])
+    token = path[-1]
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"Path segment '{token}' not found")
+        return doc, parent.pop(token)
+    if isinstance(parent, list):
+        return doc, parent.pop(_index(parent, token, allow_end=False))
+    raise JsonPatchError(f"Cannot remove from scalar at '{token}'")
@@ -0,0 +1,182 @@
+"""Crash-safe file persistence helpers.
+
+- :func:`atomic_write_bytes` replaces a file via temp-file + ``fsync`` +
+  rename, so readers and a crashed process only ever see the old or the
+  new contents, never a truncated file.
+- :class:`JournalWriter` owns an append-only journal and performs all of
+  its I/O on a single background thread. Records are applied in the order
+  they were submitted; everything queued while a write is in flight goes
+  into the next write and shares a single ``fsync`` (group commit).
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Optional
+
+# Upper bound on records folded into one write/fsync.
+MAX_BATCH = 1024
+
+_LINE = "line"
+_TASK = "task"
+_STOP = "stop"
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Durably replace ``path`` with ``data``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    _fsync_dir(path.parent)
+
+
+def _fsync_dir(directory: Path) -> None:
+    # Persist the rename itself. Not supported on every platform (Windows).
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class JournalWriter:
+    """Single-writer, group-committing append log.
+
+    ``append`` and ``run`` return :class:`concurrent.futures.Future` objects
+    so callers on any thread or event loop can wait for durability
+    (``await asyncio.wrap_future(fut)`` from async code).
+    """
+
+    def __init__(self, path: Path, max_batch: int = MAX_BATCH):
+        self.path = Path(path)
+        self.max_batch = max_batch
+        self.commits = 0
+        self.records = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._file = None
+
+    def append(self, line: bytes) -> Future:
+        """Queue one journal record; resolves once it has been fsynced."""
+        return self._submit(_LINE, line)
+
+    def run(self, task: Callable[[], object]) -> Future:
+        """Run ``task`` on the writer thread after every record queued before it."""
+        return self._submit(_TASK, task)
+
+    def truncate(self) -> None:
+        """Empty the journal. Only call from a task passed to :meth:`run`."""
+        f = self._open()
+        f.truncate(0)
+        f.flush()
+        os.fsync(f.fileno())
+
+    def close(self) -> None:
+        """Drain outstanding records and stop the writer thread."""
+        with self._start_lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        self._queue.put((_STOP, None, Future()))
+        thread.join()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # ── Writer thread ──
+
+    def _submit(self, kind: str, payload) -> Future:
+        future: Future = Future()
+        self._ensure_started()
+        self._queue.put((kind, payload, future))
+        return future
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name=f"journal-writer:{self.path.name}", daemon=True
+                )
+                self._thread.start()
+
+    def _open(self):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "ab")
+        return self._file
+
+    def _loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not self._process(batch):
+                return
+
+    def _process(self, batch: list) -> bool:
+        pending: list[tuple[bytes, Future]] = []
+        for kind, payload, future in batch:
+            if kind == _LINE:
+                pending.append((payload, future))
+                continue
+            self._commit(pending)
+            pending = []
+            if kind == _STOP:
+                # Anything queued after close() is still written.
+                while True:
+                    try:
+                        kind, payload, future = self._queue.get_nowait()
+                    except queue.Empty:
+                        return False
+                    if kind == _LINE:
+                        self._commit([(payload, future)])
+                    elif kind == _TASK:
+                        self._run_task(payload, future)
+            self._run_task(payload, future)
+        self._commit(pending)
+        return True
+
+    def _commit(self, pending: list[tuple[bytes, Future]]) -> None:
+        if not pending:
+            return
+        try:
+            f = self._open()
+            f.write(b"".join(line for line, _ in pending))
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException as exc:  # noqa: BLE001 - reported to every waiter
+            for _, future in pending:
+                future.set_exception(exc)
+            return
+        self.commits += 1
+        self.records += len(pending)
+        for _, future in pending:
+            future.set_result(None)
+
+    @staticmethod
+    def _run_task(task: Callable[[], object], future: Future) -> None:
+        try:
+            future.set_result(task())
+        except BaseException as exc:  # noqa: BLE001
+            future.set_exception(exc)
@@ -0,0 +1,348 @@
+"""Judges' scores, weighted totals and per-category leaderboards.
+
+Each judge scores each criterion of a submission on the criterion's own
+scale (:mod:`app.services.criteria`): 0 to its points (40-15-15-15-15,
+20-15-15-15-15-20, EFQM 200-300-200-300, the 1000-point knowledge and
+green schemes), or its rating scale (the unsung hero's 1–10), which is
+weighted to the criterion's points. A judge's total for a submission is
+the weighted sum of the criteria they scored; the submission's total is
+the mean over its judges.
+
+Per category, scores live in a float32 array ``(entries, judges,
+criteria)`` (NaN = not scored) next to a float64 ``(entries, judges)``
+array of judge totals. Running count/sum/sum-of-squares per judge give
+each judge's mean and spread, for z-score normalization: a harsh and a
+lenient judge then count alike. Changing one score touches one judge
+total, one judge's running sums and one entry's position in the sorted
+leaderboard (a bisect), not the rest of the cycle. Normalized scores
+depend on every score of the judge, so they are recomputed for the
+category, vectorized, the next time they are read.
+
+Scores are persisted like users: a ``scores.json`` snapshot plus a
+journal of changes, replayed on startup.
+"""
+
+import asyncio
+import json
+import threading
+from bisect import bisect_left, insort
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Mapping, Optional
+
+import numpy as np
+
+from app.services.persistence import JournalWriter, atomic_write_bytes
+from app.services.validation import get_validator
+
+DEFAULT_SCORES_PATH = Path(__file__).resolve().parents[2] / "data" / "scores.json"
+
+# Journal records accumulated before the snapshot is rewritten.
+COMPACT_THRESHOLD = 10_000
+
+
+class ScoreError(ValueError):
+    """Unknown category or criterion, or a score outside the criterion's scale."""
+
+
+def competition_ranks(values: np.ndarray) -> np.ndarray:
+    """1-based ranks, highest value first; ties share the best rank ("1224")."""
+    descending = np.sort(-values)
+    return np.searchsorted(descending, -values, side="left") + 1
+
+
+class CategoryBoard:
+    """Scores and leaderboard of one category."""
+
+    def __init__(self, category_slug: str):
+        validator = get_validator(category_slug)
+        if validator is None:
+            raise ScoreError(f"Unknown category: {category_slug}")
+        criteria = validator.criteria
+        self.category_slug = category_slug
+        self.criteria = tuple(c.id for c in criteria)
+        self._column = {c.id: i for i, c in enumerate(criteria)}
+        self.low = np.array([c.rating_scale[0] if c.rating_scale else 0 for c in criteria], dtype=np.float32)
+        self.high = np.array([c.rating_scale[1] if c.rating_scale else c.points for c in criteria], dtype=np.float32)
+        # Points per unit of the criterion's scale.
+        self.weights = np.array([c.points for c in criteria], dtype=np.float64) / self.high
+        self.max_total = float(sum(c.points for c in criteria))
+
+        self.user_ids: list[int] = []
+        self.judges: list[str] = []
+        self._entry: dict[int, int] = {}
+        self._judge: dict[str, int] = {}
+        self.scores = np.full((16, 4, len(criteria)), np.nan, dtype=np.float32)
+        self.totals = np.full((16, 4), np.nan, dtype=np.float64)
+        self._entry_sum = np.zeros(16)
+        self._entry_count = np.zeros(16, dtype=np.int32)
+        self._judge_n = np.zeros(4)
+        self._judge_sum = np.zeros(4)
+        self._judge_sq = np.zeros(4)
+        self._order: list[tuple[float, int]] = []  # (-mean total, user id), ascending
+        self._key: dict[int, float] = {}
+        self._normalized: Optional[np.ndarray] = None  # mean z-score per entry; None → stale
+
+    # ── Writes ──
+
+    def validate(self, scores: Mapping[str, Optional[float]]) -> list[tuple[int, float]]:
+        """``(column, value)`` pairs; NaN clears a score."""
+        columns = []
+        for criterion_id, value in scores.items():
+            column = self._column.get(criterion_id)
+            if column is None:
+                raise ScoreError(f"Unknown criterion for {self.category_slug}: {criterion_id}")
+            if value is None:
+                columns.append((column, np.nan))
+                continue
+            if not self.low[column] <= value <= self.high[column]:
+                raise ScoreError(
+                    f"{criterion_id} must be between {self.low[column]:g} and {self.high[column]:g}, got {value}"
+                )
+            columns.append((column, float(value)))
+        return columns
+
+    def set(self, user_id: int, judge: str, columns: list[tuple[int, float]]) -> None:
+        """Apply validated scores of one judge for one submission."""
+        entry, j = self._entry_index(user_id), self._judge_index(judge)
+        for column, value in columns:
+            self.scores[entry, j, column] = value
+        row = self.scores[entry, j]
+        scored = ~np.isnan(row)
+        new = float(np.dot(row[scored], self.weights[scored])) if scored.any() else np.nan
+        old = float(self.totals[entry, j])
+        if old == new or (np.isnan(old) and np.isnan(new)):
+            return
+        self.totals[entry, j] = new
+        for total, sign in ((old, -1), (new, 1)):
+            if not np.isnan(total):
+                self._judge_n[j] += sign
+                self._judge_sum[j] += sign * total
+                self._judge_sq[j] += sign * total * total
+                self._entry_sum[entry] += sign * total
+                self._entry_count[entry] += sign
+        self._reposition(user_id, entry)
+        self._normalized = None
+
+    def _reposition(self, user_id: int, entry: int) -> None:
+        key = self._key.pop(user_id, None)
+        if key is not None:
+            del self._order[bisect_left(self._order, (key, user_id))]
+        if self._entry_count[entry]:
+            key = -self._entry_sum[entry] / self._entry_count[entry]
+            self._key[user_id] = key
+            insort(self._order, (key, user_id))
+
+    def _entry_index(self, user_id: int) -> int:
+        entry = self._entry.get(user_id)
+        if entry is None:
+            entry = self._entry[user_id] = len(self.user_ids)
+            self.user_ids.append(user_id)
+            if entry >= len(self._entry_sum):
+                self._grow(2 * entry, self.scores.shape[1])
+        return entry
+
+    def _judge_index(self, judge: str) -> int:
+        j = self._judge.get(judge)
+        if j is None:
+            j = self._judge[judge] = len(self.judges)
+            self.judges.append(judge)
+            if j >= len(self._judge_n):
+                self._grow(len(self._entry_sum), 2 * j)
+        return j
+
+    def _grow(self, entries: int, judges: int) -> None:
+        old_e, old_j = self.totals.shape
+        scores = np.full((entries, judges, len(self.criteria)), np.nan, dtype=np.float32)
+        scores[:old_e, :old_j] = self.scores
+        totals = np.full((entries, judges), np.nan)
+        totals[:old_e, :old_j] = self.totals
+        self.scores, self.totals = scores, totals
+        for name, size in (("_entry_sum", entries), ("_entry_count", entries), ("_judge_n", judges),
+                           ("_judge_sum", judges), ("_judge_sq", judges)):
+            array = getattr(self, name)
+            grown = np.zeros(size, dtype=array.dtype)
+            grown[: len(array)] = array
+            setattr(self, name, grown)
+
+    # ── Reads ──
+
+    def _z_scores(self, totals: np.ndarray) -> np.ndarray:
+        """z-scores of judge totals (rows: entries) within each judge's totals; 0 where unscored."""
+        n_judges = len(self.judges)
+        n = np.maximum(self._judge_n[:n_judges], 1)
+        mean = self._judge_sum[:n_judges] / n
+        std = np.sqrt(np.maximum(self._judge_sq[:n_judges] / n - mean * mean, 0.0))
+        # A judge with a single score (or all equal) has no spread; count them as average.
+        z = np.divide(totals - mean, std, out=np.zeros_like(totals), where=std > 1e-9)
+        z[np.isnan(totals)] = 0.0
+        return z
+
+    def normalized(self) -> np.ndarray:
+        """Mean over judges of each entry's z-score within that judge's totals (NaN if unscored)."""
+        if self._normalized is None:
+            n_entries = len(self.user_ids)
+            z = self._z_scores(self.totals[:n_entries, : len(self.judges)])
+            counts = self._entry_count[:n_entries]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self._normalized = np.where(counts > 0, z.sum(axis=1) / counts, np.nan)
+        return self._normalized
+
+    def _row(self, user_id: int, rank: int) -> dict:
+        entry = self._entry[user_id]
+        if self._normalized is not None:
+            normalized = self._normalized[entry]
+        else:  # one entry needs only its own judges' statistics
+            z = self._z_scores(self.totals[entry : entry + 1, : len(self.judges)])
+            normalized = z.sum() / self._entry_count[entry] if self._entry_count[entry] else np.nan
+        return {
+            "rank": rank,
+            "userId": user_id,
+            "total": round(float(self._entry_sum[entry] / self._entry_count[entry]), 2),
+            "maxTotal": self.max_total,
+            "normalized": None if np.isnan(normalized) else round(float(normalized), 3),
+            "judges": int(self._entry_count[entry]),
+        }
+
+    def leaderboard(self, offset: int = 0, limit: int = 50, normalized: bool = False) -> tuple[list[dict], int]:
+        """One page of ranked entries and the number of scored entries."""
+        total = len(self._order)
+        if not normalized:
+            page = self._order[offset:offset + limit]
+            return [self._row(user_id, bisect_left(self._order, (key,)) + 1) for key, user_id in page], total
+        values = self.normalized()
+        scored = np.flatnonzero(self._entry_count[: len(self.user_ids)] > 0)
+        ranks = competition_ranks(values[scored])
+        order = np.lexsort((np.array(self.user_ids)[scored], ranks))[offset:offset + limit]
+        return [self._row(self.user_ids[scored[i]], int(ranks[i])) for i in order], total
+
+    def standing(self, user_id: int) -> Optional[dict]:
+        key = self._key.get(user_id)
+        if key is None:
+            return None
+        return self._row(user_id, bisect_left(self._order, (key,)) + 1)
+
+    def sheet(self, user_id: int) -> dict[str, dict]:
+        """``{judge: {"scores": {criterion: value}, "total"}}`` for one submission."""
+        entry = self._entry.get(user_id)
+        if entry is None:
+            return {}
+        sheets = {}
+        for j, judge in enumerate(self.judges):
+            if np.isnan(self.totals[entry, j]):
+                continue
+            row = self.scores[entry, j]
+            sheets[judge] = {
+                "scores": {c: float(row[i]) for i, c in enumerate(self.criteria) if not np.isnan(row[i])},
+                "total": round(float(self.totals[entry, j]), 2),
+            }
+        return sheets
+
+
+class Scoreboard:
+    """Every category's board, persisted as snapshot + journal (``path=None``: memory only)."""
+
+    def __init__(self, path: Optional[Path] = DEFAULT_SCORES_PATH, compact_threshold: int = COMPACT_THRESHOLD):
+        self.path = Path(path) if path is not None else None
+        self.compact_threshold = compact_threshold
+        self._boards: dict[str, CategoryBoard] = {}
+        self._lock = threading.Lock()
+        self._journal_records = 0
+        self._writer: Optional[JournalWriter] = None
+        if self.path is not None:
+            self.journal_path = self.path.with_name(self.path.stem + ".journal.jsonl")
+            self._load()
+            self._writer = JournalWriter(self.journal_path)
+
+    def _load(self) -> None:
+        if self.path.exists():
+            for record in json.loads(self.path.read_text(encoding="utf-8")).get("scores", []):
+                self._replay(record)
+        if not self.journal_path.exists():
+            return
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # a torn last line from an interrupted append
+                self._replay(record)
+                self._journal_records += 1
+
+    def _replay(self, record: dict) -> None:
+        try:
+            board = self.board(record["categorySlug"])
+            board.set(record["userId"], record["judge"], board.validate(record["scores"]))
+        except ScoreError:
+            pass  # the criteria changed since; the score no longer applies
+
+    def board(self, category_slug: str) -> CategoryBoard:
+        """The board of ``category_slug``; raises :class:`ScoreError` if unknown."""
+        board = self._boards.get(category_slug)
+        if board is None:
+            board = self._boards[category_slug] = CategoryBoard(category_slug)
+        return board
+
+    async def set_scores(
+        self, user_id: int, category_slug: str, judge: str, scores: Mapping[str, Optional[float]]
+    ) -> Optional[dict]:
+        """Record one judge's scores (``None`` clears one); returns the submission's new standing."""
+        with self._lock:
+            board = self.board(category_slug)
+            board.set(user_id, judge, board.validate(scores))
+            standing = board.standing(user_id)
+            done = self._commit({"userId": user_id, "categorySlug": category_slug, "judge": judge,
+                                 "scores": dict(scores)})
+        await asyncio.wrap_future(done)
+        return standing
+
+    def _commit(self, record: dict) -> Future:
+        if self._writer is None:
+            done: Future = Future()
+            done.set_result(None)
+            return done
+        done = self._writer.append((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+        self._journal_records += 1
+        if self._journal_records >= self.compact_threshold:
+            self._schedule_compaction()
+        return done
+
+    def _schedule_compaction(self) -> Future:
+        # Snapshot under the lock, so it matches everything journalled so far.
+        records = [
+            {"userId": user_id, "categorySlug": slug, "judge": judge, "scores": sheet["scores"]}
+            for slug, board in self._boards.items()
+            for user_id in board.user_ids
+            for judge, sheet in board.sheet(user_id).items()
+        ]
+        self._journal_records = 0
+
+        def compact():
+            atomic_write_bytes(self.path, json.dumps({"scores": records}, ensure_ascii=False).encode("utf-8"))
+            self._writer.truncate()
+
+        return self._writer.run(compact)
+
+    def leaderboard(
+        self, category_slug: str, offset: int = 0, limit: int = 50, normalized: bool = False
+    ) -> tuple[list[dict], int]:
+        with self._lock:
+            return self.board(category_slug).leaderboard(offset, limit, normalized)
+
+    def sheet(self, user_id: int, category_slug: str) -> tuple[dict, Optional[dict]]:
+        """Each judge's scores for a submission, and its standing."""
+        with self._lock:
+            board = self.board(category_slug)
+            return board.sheet(user_id), board.standing(user_id)
+
+    def close(self) -> None:
+        """Fold the journal into the snapshot and stop the writer thread."""
+        if self._writer is None:
+            return
+        if self._journal_records:
+            with self._lock:
+                done = self._schedule_compaction()
+            done.result()
+        self._writer.close()
@@ -0,0 +1,348 @@
+"""Full-text search over applications for admins.
+
+Every (user, category) the user has touched is one document: the
+account email, the registration draft of that category, and the
+submitted form (or, before submission, its autosaved draft), including
+the criterion responses. Users with no category yet get one document
+under the empty category so they can still be found by email.
+
+Text is folded (:func:`~app.rag.normalize.fold_arabic`: diacritics,
+alef/ya/ta marbuta/hamza variants, Arabic-Indic digits, case), split into
+words and lightly stemmed: common Arabic prefixes and suffixes (after
+Light10) and English plural ``s``. Documents are ranked with BM25.
+
+The index lives in memory and is updated per user as the auth endpoints
+write. Postings are append-only: a changed document gets a new number
+and the old one is marked dead, so an autosave never rewrites other
+users' postings. Dead postings are dropped once they outnumber live
+documents. Scoring is vectorized with NumPy over the posting arrays of
+the query terms only.
+"""
+
+import asyncio
+import math
+import re
+import threading
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+from app.rag.normalize import fold_arabic, strip_diacritics
+from app.services.user_store import UserRepository
+from app.services.validation import parse_submission_draft_key, submission_draft_key
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+# Enumerations and file lists in drafts and forms; not worth indexing.
+SKIP_KEYS = frozenset(
+    {"answers", "files", "rating", "selectedCategory", "employeeGroup", "employeeSubcat", "employeeSubcategory"}
+)
+
+# Light10 affixes, in folded form (ة → ه).
+_AR_PREFIXES = ("وال", "فال", "بال", "كال", "لل", "ال")
+_AR_SUFFIXES = ("ها", "ان", "ات", "ون", "ين", "يه", "ه", "ي")
+
+# Dead documents tolerated before postings are compacted.
+COMPACT_MIN_DEAD = 1024
+
+
+def _is_arabic(token: str) -> bool:
+    return "؀" <= token[0] <= "ۿ"
+
+
+def stem(token: str) -> str:
+    """Light stem of a folded token."""
+    if _is_arabic(token):
+        if len(token) >= 4 and token[0] == "و":
+            token = token[1:]
+        for prefix in _AR_PREFIXES:
+            if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+                token = token[len(prefix):]
+                break
+        for suffix in _AR_SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+                token = token[: -len(suffix)]
+        return token
+    if token.isascii() and token.isalpha() and len(token) > 3:
+        if token.endswith("ies") and not token.endswith(("eies", "aies")):
+            return token[:-3] + "y"
+        if token.endswith("es") and not token.endswith(("aes", "ees", "oes")):
+            return token[:-1]
+        if token.endswith("s") and not token.endswith(("us", "ss")):
+            return token[:-1]
+    return token
+
+
+@lru_cache(maxsize=1 << 17)
+def _term(word: str) -> str:
+    return stem(fold_arabic(word))
+
+
+def analyze(text: str) -> list[str]:
+    """Search terms of ``text``, in order."""
+    # Diacritics would split words, so they go first; the rest of the
+    # folding is cached per distinct word.
+    return [_term(word) for word in _TOKEN.findall(strip_diacritics(text).lower())]
+
+
+def _collect(value: Any, out: list[str]) -> None:
+    if isinstance(value, str):
+        out.append(value)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            if key not in SKIP_KEYS:
+                _collect(item, out)
+    elif isinstance(value, list):
+        for item in value:
+            _collect(item, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out.append(str(value))
+
+
+def _dict(value: Any) -> dict:
+    return value if isinstance(value, dict) else {}
+
+
+def user_documents(user: dict) -> dict[str, tuple[str, dict]]:
+    """``{category: (text, info)}`` for every application of ``user``."""
+    drafts = user.get("draft") or {}
+    submissions = user.get("submissions") or {}
+    statuses = user.get("categoryStatuses") or {}
+    categories = set(user.get("appliedCategories") or ()) | statuses.keys() | submissions.keys()
+    categories.update(parse_submission_draft_key(key) or key for key in drafts)
+    email = user.get("email") or ""
+
+    documents = {}
+    for category in categories or ("",):
+        registration = _dict(drafts.get(category))
+        submission = _dict(submissions.get(category))
+        form = _dict(submission.get("data") or drafts.get(submission_draft_key(category)))
+        texts = [email, submission.get("referenceNumber") or ""]
+        _collect(registration, texts)
+        _collect(form, texts)
+        name = " ".join(filter(None, (registration.get("firstName"), registration.get("lastName"))))
+        documents[category] = (
+            "\n".join(texts),
+            {
+                "userId": user["id"],
+                "categorySlug": category,
+                "email": email,
+                "name": name or form.get("fullName") or None,
+                "status": statuses.get(category),
+                "referenceNumber": submission.get("referenceNumber"),
+            },
+        )
+    return documents
+
+
+@dataclass
+class SearchHit:
+    score: float
+    info: dict
+
+
+class _Codes:
+    """Interned strings ↔ small ints for vectorized filtering."""
+
+    def __init__(self):
+        self.codes: dict[Optional[str], int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        return self.codes.setdefault(value, len(self.codes))
+
+    def lookup(self, value: Optional[str]) -> int:
+        return self.codes.get(value, -1)
+
+
+class SearchIndex:
+    """BM25 over application documents, updated one user at a time."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ready = False  # set once every user has been loaded
+        self._lock = threading.Lock()
+        self._building = False
+        self._postings: dict[str, tuple[array, array]] = {}  # term → (doc numbers, frequencies)
+        self._docs: dict[int, dict[str, int]] = {}  # user id → category → doc number
+        self._info: list[Optional[dict]] = []
+        self._digest: list[int] = []
+        self._categories = _Codes()
+        self._statuses = _Codes()
+        self._lengths = np.zeros(1024, dtype=np.float32)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._category = np.zeros(1024, dtype=np.int32)
+        self._status = np.zeros(1024, dtype=np.int32)
+        self._live = 0
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return self._live
+
+    # ── Writes ──
+
+    def put_user(self, user: dict) -> None:
+        """Re-index ``user`` after a write; unchanged documents are left alone."""
+        documents = user_documents(user)
+        with self._lock:
+            self._put(user["id"], documents)
+            self._maybe_compact()
+
+    def load_users(self, users: Iterable[dict]) -> None:
+        """Index users from a full scan, skipping any a write has indexed since."""
+        prepared = [(user["id"], user_documents(user)) for user in users]
+        with self._lock:
+            for user_id, documents in prepared:
+                if user_id not in self._docs:
+                    self._put(user_id, documents)
+
+    async def ensure_loaded(self, store: UserRepository) -> None:
+        """Load every user from ``store`` once; concurrent callers wait for it."""
+        while not self.ready:
+            if not self._claim_build():
+                await asyncio.sleep(0.05)
+                continue
+            try:
+                async for batch in store.scan():
+                    await asyncio.to_thread(self.load_users, batch)
+            finally:
+                with self._lock:
+                    self._building = False
+            self.ready = True
+
+    def _claim_build(self) -> bool:
+        with self._lock:
+            if self.ready or self._building:
+                return False
+            self._building = True
+            return True
+
+    def _put(self, user_id: int, documents: dict[str, tuple[str, dict]]) -> None:
+        current = self._docs.setdefault(user_id, {})
+        for category in current.keys() - documents.keys():
+            self._kill(current.pop(category))
+        for category, (text, info) in documents.items():
+            doc = current.get(category)
+            digest = hash(text)
+            if doc is not None and self._digest[doc] == digest:
+                if self._info[doc] != info:
+                    self._info[doc] = info
+                    self._status[doc] = self._statuses.code(info["status"])
+                continue
+            if doc is not None:
+                self._kill(doc)
+            current[category] = self._add(text, info, digest)
+
+    def _add(self, text: str, info: dict, digest: int) -> int:
+        doc = len(self._info)
+        if doc >= len(self._alive):
+            self._grow(2 * len(self._alive))
+        terms = analyze(text)
+        postings = self._postings
+        for term, count in Counter(terms).items():
+            entry = postings.get(term)
+            if entry is None:
+                entry = postings[term] = (array("i"), array("f"))
+            entry[0].append(doc)
+            entry[1].append(count)
+        self._info.append(info)
+        self._digest.append(digest)
+        self._lengths[doc] = len(terms)
+        self._alive[doc] = True
+        self._category[doc] = self._categories.code(info["categorySlug"])
+        self._status[doc] = self._statuses.code(info["status"])
+        self._live += 1
+        self._total_length += len(terms)
+        return doc
+
+    def _kill(self, doc: int) -> None:
+        self._alive[doc] = False
+        self._info[doc] = None
+        self._live -= 1
+        self._total_length -= float(self._lengths[doc])
+
+    def _grow(self, capacity: int) -> None:
+        for name in ("_lengths", "_alive", "_category", "_status"):
+            array_ = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array_.dtype)
+            grown[: len(array_)] = array_
+            setattr(self, name, grown)
+
+    def _maybe_compact(self) -> None:
+        dead = len(self._info) - self._live
+        if dead >= COMPACT_MIN_DEAD and dead > self._live:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Renumber live documents and drop dead postings."""
+        n = len(self._info)
+        alive = self._alive[:n]
+        renumber = np.cumsum(alive, dtype=np.int64) - 1
+        for term, (docs, freqs) in list(self._postings.items()):
+            docs = np.array(docs, dtype=np.int32)
+            keep = alive[docs]
+            if not keep.any():
+                del self._postings[term]
+                continue
+            self._postings[term] = (
+                array("i", renumber[docs[keep]].astype(np.int32).tobytes()),
+                array("f", np.array(freqs, dtype=np.float32)[keep].tobytes()),
+            )
+        live = np.flatnonzero(alive)
+        self._info = [self._info[doc] for doc in live]
+        self._digest = [self._digest[doc] for doc in live]
+        for name in ("_lengths", "_alive", "_category", "_status"):
+            array_ = getattr(self, name)
+            compacted = np.zeros(max(1024, len(array_)), dtype=array_.dtype)
+            compacted[: len(live)] = array_[live]
+            setattr(self, name, compacted)
+        for categories in self._docs.values():
+            for category, doc in categories.items():
+                categories[category] = int(renumber[doc])
+
+    # ── Search ──
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        category: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> tuple[list[SearchHit], int]:
+        """Best ``limit`` matches for ``query`` and the total number of matches."""
+        terms = set(analyze(query))
+        with self._lock:
+            n = len(self._info)
+            if not terms or not self._live:
+                return [], 0
+            alive = self._alive[:n]
+            avg_length = self._total_length / self._live or 1.0
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[:n] / avg_length)
+            scores = np.zeros(n, dtype=np.float32)
+            for term in terms:
+                entry = self._postings.get(term)
+                if entry is None:
+                    continue
+                docs = np.array(entry[0], dtype=np.int32)  # copies: appends stay possible
+                freqs = np.array(entry[1], dtype=np.float32)
+                df = int(np.count_nonzero(alive[docs]))
+                if not df:
+                    continue
+                idf = math.log(1 + (self._live - df + 0.5) / (df + 0.5))
+                scores[docs] += idf * freqs * (self.k1 + 1) / (freqs + norm[docs])
+
+            mask = alive & (scores > 0)
+            if category is not None:
+                mask &= self._category[:n] == self._categories.lookup(category)
+            if status is not None:
+                mask &= self._status[:n] == self._statuses.lookup(status)
+            matches = np.flatnonzero(mask)
+            if not len(matches) or limit <= 0:
+                return [], len(matches)
+            top = matches[np.argpartition(-scores[matches], min(limit, len(matches)) - 1)[:limit]]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [SearchHit(float(scores[doc]), self._info[doc]) for doc in top], len(matches)
@@ -0,0 +1,404 @@
+"""SQL-backed user repository for the auth endpoints.
+
+Users live in the ``users``, ``registrations``, ``drafts`` and
+``applications`` tables (see :mod:`app.db.models`) and are assembled into
+the same dict shape :class:`~app.services.user_store.UserStore` serves, so
+the endpoints work unchanged when ``settings.DATABASE_URL`` is set.
+
+:meth:`SqlUserStore.update` runs the mutation against a freshly loaded
+copy and writes back only the rows that differ. A ``users.version`` check
+turns concurrent updates of the same user into retries instead of lost
+writes.
+"""
+
+import copy
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Iterable, Optional, Sequence
+
+from sqlalchemy import and_, delete, func, insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.db.models import Application, ApplicationStatus, Base, Draft, Registration, User
+from app.services.status_index import Entry
+from app.services.user_store import DuplicateEmailError, KeyPath, copy_paths
+
+users_t = User.__table__
+registrations_t = Registration.__table__
+drafts_t = Draft.__table__
+applications_t = Application.__table__
+
+# User document key → users column.
+USER_COLUMNS = {
+    "email": "email",
+    "password": "password",
+    "registered": "registered",
+    "applied": "applied",
+    "isAdmin": "is_admin",
+    "isDirector": "is_director",
+    "registrationData": "registration_data",
+}
+# Keys mapped to child tables rather than stored in users.extra.
+CHILD_KEYS = {
+    "appliedCategories", "categoryStatuses", "categoryRegisteredAt",
+    "draft", "draftVersions", "submissions",
+}
+CATEGORIES = ("employee", "department", "project", "knowledge", "green")
+
+# Attempts before a contended update gives up.
+UPDATE_RETRIES = 5
+
+
+class ConcurrentUpdateError(RuntimeError):
+    """The user kept changing underneath an update."""
+
+
+class _StaleVersion(Exception):
+    pass
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse the frontend's ISO 8601 timestamps (`...Z`); None if unparseable."""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def format_timestamp(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    if value.tzinfo is None:  # SQLite drops the offset; values are stored in UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def split_category_slug(slug: str) -> tuple[str, Optional[str]]:
+    """`employee-nonsupervisory-administrative` → (`employee`, `nonsupervisory-administrative`)."""
+    base, _, rest = slug.partition("-")
+    if base in CATEGORIES:
+        return base, rest or None
+    return slug, None
+
+
+@dataclass
+class UserRows:
+    """A user document split into per-table column dicts."""
+
+    user: dict[str, Any]
+    registrations: dict[str, dict[str, Any]] = field(default_factory=dict)
+    drafts: dict[str, dict[str, Any]] = field(default_factory=dict)
+    applications: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+
+# A submitted form (see app.services.validation) is split over the
+# application's columns: the nomination reason, the category-specific
+# parts, and the applicant's details (everything else).
+FORM_SPECIFIC_KEYS = ("extraFields", "criteriaResponses")
+
+
+def form_to_columns(form: Optional[dict]) -> dict[str, Any]:
+    if form is None:
+        return {"applicant_info": None, "nomination_reason": None, "category_specific_fields": None}
+    return {
+        "applicant_info": {
+            k: v for k, v in form.items() if k != "nominationReason" and k not in FORM_SPECIFIC_KEYS
+        },
+        "nomination_reason": form.get("nominationReason"),
+        "category_specific_fields": {k: form[k] for k in FORM_SPECIFIC_KEYS if k in form},
+    }
+
+
+def columns_to_form(row: Any) -> dict[str, Any]:
+    """``{"data": form}`` for an application row that has one, else ``{}``."""
+    if row["applicant_info"] is None:
+        return {}
+    form = dict(row["applicant_info"])
+    if row["nomination_reason"] is not None:
+        form["nominationReason"] = row["nomination_reason"]
+    form.update(row["category_specific_fields"] or {})
+    return {"data": form}
+
+
+def user_to_rows(doc: dict) -> UserRows:
+    """Split a user document into table rows (without surrogate keys)."""
+    user_row = {column: doc.get(key) for key, column in USER_COLUMNS.items()}
+    for flag in ("registered", "applied", "is_admin", "is_director"):
+        user_row[flag] = bool(user_row[flag])
+    user_row["extra"] = {
+        k: v for k, v in doc.items() if k != "id" and k not in USER_COLUMNS and k not in CHILD_KEYS
+    }
+    if "id" in doc:
+        user_row["id"] = doc["id"]
+    rows = UserRows(user=user_row)
+
+    applied = list(doc.get("appliedCategories") or [])
+    statuses = doc.get("categoryStatuses") or {}
+    registered_at = doc.get("categoryRegisteredAt") or {}
+    for slug in dict.fromkeys([*applied, *statuses]):
+        rows.registrations[slug] = {
+            "status": statuses.get(slug),
+            "applied": slug in applied,
+            "position": applied.index(slug) if slug in applied else len(applied),
+            "registered_at": registered_at.get(slug) or "",
+        }
+
+    versions = doc.get("draftVersions") or {}
+    for key, data in (doc.get("draft") or {}).items():
+        rows.drafts[key] = {"data": data, "version": versions.get(key, 0)}
+
+    for slug, submission in (doc.get("submissions") or {}).items():
+        category, sub_category = split_category_slug(slug)
+        submission = submission or {}
+        rows.applications[slug] = {
+            "category": category,
+            "sub_category": sub_category,
+            "status": ApplicationStatus.submitted,
+            "reference_number": submission.get("referenceNumber"),
+            "submitted_at": parse_timestamp(submission.get("submittedAt")),
+            **form_to_columns(submission.get("data")),
+        }
+    return rows
+
+
+def rows_to_user(
+    user_row: Any,
+    registrations: Iterable[Any],
+    drafts: Iterable[Any],
+    applications: Iterable[Any],
+) -> dict:
+    """Assemble a user document from table rows (mappings)."""
+    doc = {"id": user_row["id"]}
+    for key, column in USER_COLUMNS.items():
+        doc[key] = user_row[column]
+    registrations = sorted(registrations, key=lambda r: r["position"])
+    doc["appliedCategories"] = [r["category_slug"] for r in registrations if r["applied"]]
+    doc["categoryStatuses"] = {r["category_slug"]: r["status"] for r in registrations if r["status"] is not None}
+    doc["categoryRegisteredAt"] = {r["category_slug"]: r["registered_at"] for r in registrations if r["registered_at"]}
+    drafts = list(drafts)
+    doc["draft"] = {d["key"]: d["data"] for d in drafts} if drafts else None
+    doc["draftVersions"] = {d["key"]: d["version"] for d in drafts if d["version"]}
+    doc["submissions"] = {
+        a["category_slug"]: {
+            "referenceNumber": a["reference_number"],
+            "submittedAt": format_timestamp(a["submitted_at"]),
+            **columns_to_form(a),
+        }
+        for a in applications
+        if a["status"] != ApplicationStatus.draft
+    }
+    doc.update(user_row["extra"] or {})
+    return doc
+
+
+class SqlUserStore:
+    """:class:`~app.services.user_store.UserRepository` over an async engine."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    async def open(self) -> None:
+        """Create missing tables (local SQLite and tests; use migrations in production)."""
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def aclose(self) -> None:
+        await self.engine.dispose()
+
+    # ── Reads ──
+
+    async def get(self, user_id: int) -> Optional[dict]:
+        async with self.engine.connect() as conn:
+            return (await _load_users(conn, [user_id])).get(user_id)
+
+    async def get_by_email(self, email: str) -> Optional[dict]:
+        async with self.engine.connect() as conn:
+            user_id = (await conn.execute(select(users_t.c.id).where(users_t.c.email == email))).scalar()
+            if user_id is None:
+                return None
+            return (await _load_users(conn, [user_id])).get(user_id)
+
+    async def count_registrations(
+        self,
+        status: str,
+        category: Optional[str] = None,
+        registered_from: Optional[str] = None,
+        registered_to: Optional[str] = None,
+    ) -> int:
+        r = registrations_t.c
+        query = select(func.count()).select_from(registrations_t).where(r.status == status)
+        if category is not None:
+            query = query.where(r.category_slug == category)
+        if registered_from:
+            query = query.where(r.registered_at >= registered_from)
+        if registered_to:
+            query = query.where(r.registered_at < registered_to)
+        async with self.engine.connect() as conn:
+            return (await conn.execute(query)).scalar_one()
+
+    async def registrations(
+        self,
+        status: str,
+        category: Optional[str] = None,
+        registered_from: Optional[str] = None,
+        registered_to: Optional[str] = None,
+        cursor: Optional[Entry] = None,
+        limit: int = 100,
+    ) -> tuple[list[tuple[dict, Entry]], Optional[Entry]]:
+        """Same ordering, filters and cursors as the JSON store's status index."""
+        r = registrations_t.c
+        key = (r.registered_at, r.user_id, r.category_slug)
+        query = select(*key).where(r.status == status)
+        if category is not None:
+            query = query.where(r.category_slug == category)
+        if registered_from:
+            query = query.where(r.registered_at >= registered_from)
+        if registered_to:
+            query = query.where(r.registered_at < registered_to)
+        if cursor is not None:
+            query = query.where(tuple_(*key) > tuple_(*cursor))
+        query = query.order_by(*key).limit(limit + 1)
+
+        async with self.engine.connect() as conn:
+            entries = [tuple(row) for row in (await conn.execute(query)).all()]
+            has_more = len(entries) > limit
+            entries = entries[:limit]
+            users = await _load_users(conn, {entry[1] for entry in entries})
+        next_cursor = entries[-1] if has_more and entries else None
+        return [(users[entry[1]], entry) for entry in entries], next_cursor
+
+    async def scan(self, batch_size: int = 1000) -> AsyncIterator[list[dict]]:
+        """Every user in id order, one batch per query (no connection held between batches)."""
+        after = 0
+        while True:
+            query = select(users_t.c.id).where(users_t.c.id > after).order_by(users_t.c.id).limit(batch_size)
+            async with self.engine.connect() as conn:
+                ids = (await conn.execute(query)).scalars().all()
+                users = await _load_users(conn, ids)
+            if not ids:
+                return
+            after = ids[-1]
+            yield [users[user_id] for user_id in ids]
+
+    # ── Writes ──
+
+    async def create(self, fields: dict[str, Any]) -> dict:
+        rows = user_to_rows(fields)
+        try:
+            async with self.engine.begin() as conn:
+                result = await conn.execute(insert(users_t).values(**rows.user))
+                user_id = result.inserted_primary_key[0]
+                await _write_children(conn, user_id, UserRows(user={}), rows)
+        except IntegrityError as exc:
+            # Only the email constraint is a client error; anything else is a bug.
+            if await self.get_by_email(fields.get("email")) is not None:
+                raise DuplicateEmailError(fields.get("email")) from exc
+            raise
+        return {"id": user_id, **fields}
+
+    async def update(
+        self,
+        user_id: int,
+        mutate: Callable[[dict], None],
+        paths: Optional[Sequence[KeyPath]] = None,
+    ) -> dict:
+        """Apply ``mutate`` to the latest version of the user and persist the diff."""
+        for _ in range(UPDATE_RETRIES):
+            try:
+                async with self.engine.begin() as conn:
+                    loaded = await _load_users(conn, [user_id], with_version=True)
+                    if user_id not in loaded:
+                        raise KeyError(user_id)
+                    before, version = loaded[user_id]
+                    user = copy.deepcopy(before) if paths is None else copy_paths(before, paths)
+                    mutate(user)
+                    await _write_user(conn, user_id, version, user_to_rows(before), user_to_rows(user))
+                return user
+            except _StaleVersion:
+                continue
+        raise ConcurrentUpdateError(f"User {user_id} is being updated concurrently")
+
+    async def update_many(
+        self,
+        mutations: dict[int, Callable[[dict], None]],
+        paths: Optional[Sequence[KeyPath]] = None,
+    ) -> dict[int, dict]:
+        """Apply every mutation in one transaction; any failure rolls all of them back."""
+        if not mutations:
+            return {}
+        for _ in range(UPDATE_RETRIES):
+            try:
+                async with self.engine.begin() as conn:
+                    loaded = await _load_users(conn, mutations, with_version=True)
+                    missing = [user_id for user_id in mutations if user_id not in loaded]
+                    if missing:
+                        raise KeyError(missing[0])
+                    users = {}
+                    for user_id, mutate in mutations.items():
+                        before, version = loaded[user_id]
+                        user = copy.deepcopy(before) if paths is None else copy_paths(before, paths)
+                        mutate(user)
+                        await _write_user(conn, user_id, version, user_to_rows(before), user_to_rows(user))
+                        users[user_id] = user
+                return users
+            except _StaleVersion:
+                continue
+        raise ConcurrentUpdateError("Users are being updated concurrently")
+
+
+async def _load_users(conn: AsyncConnection, ids: Iterable[int], with_version: bool = False) -> dict:
+    ids = list(ids)
+    if not ids:
+        return {}
+    user_rows = (await conn.execute(select(users_t).where(users_t.c.id.in_(ids)))).mappings().all()
+    children: dict[str, dict[int, list]] = {}
+    for name, table in (("registrations", registrations_t), ("drafts", drafts_t), ("applications", applications_t)):
+        grouped = children[name] = {}
+        for row in (await conn.execute(select(table).where(table.c.user_id.in_(ids)))).mappings():
+            grouped.setdefault(row["user_id"], []).append(row)
+    users = {}
+    for row in user_rows:
+        doc = rows_to_user(
+            row,
+            children["registrations"].get(row["id"], []),
+            children["drafts"].get(row["id"], []),
+            children["applications"].get(row["id"], []),
+        )
+        users[row["id"]] = (doc, row["version"]) if with_version else doc
+    return users
+
+
+async def _write_user(conn: AsyncConnection, user_id: int, version: int, before: UserRows, after: UserRows) -> None:
+    changed = {k: v for k, v in after.user.items() if k != "id" and before.user.get(k) != v}
+    result = await conn.execute(
+        update(users_t)
+        .where(and_(users_t.c.id == user_id, users_t.c.version == version))
+        .values(version=version + 1, **changed)
+    )
+    if result.rowcount != 1:
+        raise _StaleVersion()
+    await _write_children(conn, user_id, before, after)
+
+
+async def _write_children(conn: AsyncConnection, user_id: int, before: UserRows, after: UserRows) -> None:
+    for table, key_column, old, new in (
+        (registrations_t, "category_slug", before.registrations, after.registrations),
+        (drafts_t, "key", before.drafts, after.drafts),
+        (applications_t, "category_slug", before.applications, after.applications),
+    ):
+        key = table.c[key_column]
+        removed = old.keys() - new.keys()
+        if removed:
+            await conn.execute(delete(table).where(and_(table.c.user_id == user_id, key.in_(removed))))
+        added = [{"user_id": user_id, key_column: k, **new[k]} for k in new.keys() - old.keys()]
+        if added:
+            await conn.execute(insert(table), added)
+        for k in new.keys() & old.keys():
+            if new[k] != old[k]:
+                await conn.execute(
+                    update(table).where(and_(table.c.user_id == user_id, key == k)).values(**new[k])
+                )
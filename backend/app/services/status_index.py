@@ -0,0 +1,112 @@
+"""Secondary index of category registrations by status.
+
+Each registration is an entry ``(registeredAt, userId, categorySlug)``
+kept in sorted lists per status and per ``(status, category)``. Listing a
+page is a bisect to the cursor (or date bound) plus a slice, so admin
+polling costs O(log n + page size) instead of a scan over every user.
+
+Registrations made before ``categoryRegisteredAt`` was recorded sort first
+with an empty timestamp.
+"""
+
+import base64
+import binascii
+import json
+from bisect import bisect_left, bisect_right, insort
+from typing import Iterator, Optional
+
+Entry = tuple[str, int, str]
+
+
+def encode_cursor(entry: Entry) -> str:
+    """Opaque, URL-safe pagination cursor for the entry a page ended on."""
+    raw = json.dumps(list(entry), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Entry:
+    """Inverse of :func:`encode_cursor`; raises ``ValueError`` if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        registered_at, user_id, category = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(registered_at, str) or not isinstance(user_id, int) or not isinstance(category, str):
+        raise ValueError("Invalid cursor")
+    return registered_at, user_id, category
+
+
+def registrations_of(user: Optional[dict]) -> Iterator[tuple[str, Entry]]:
+    """``(status, entry)`` for every category registration of ``user``."""
+    if not user:
+        return
+    registered_at = user.get("categoryRegisteredAt") or {}
+    for category, status in (user.get("categoryStatuses") or {}).items():
+        yield status, (registered_at.get(category) or "", user["id"], category)
+
+
+class StatusIndex:
+    """Sorted registration entries keyed by status and by (status, category)."""
+
+    def __init__(self) -> None:
+        self._entries: dict[tuple[str, Optional[str]], list[Entry]] = {}
+
+    def update(self, previous: Optional[dict], current: dict) -> None:
+        """Re-index one user after it changed from ``previous`` to ``current``."""
+        before = set(registrations_of(previous))
+        after = set(registrations_of(current))
+        for status, entry in before - after:
+            self._remove(status, entry)
+        for status, entry in after - before:
+            self._add(status, entry)
+
+    def count(
+        self,
+        status: str,
+        category: Optional[str] = None,
+        registered_from: Optional[str] = None,
+        registered_to: Optional[str] = None,
+    ) -> int:
+        """Number of entries in the range :meth:`page` would walk."""
+        entries = self._entries.get((status, category), [])
+        start = bisect_left(entries, (registered_from,)) if registered_from else 0
+        stop = bisect_left(entries, (registered_to,)) if registered_to else len(entries)
+        return max(0, stop - start)
+
+    def page(
+        self,
+        status: str,
+        category: Optional[str] = None,
+        registered_from: Optional[str] = None,
+        registered_to: Optional[str] = None,
+        cursor: Optional[Entry] = None,
+        limit: int = 100,
+    ) -> tuple[list[Entry], Optional[Entry]]:
+        """One page of entries in registration order.
+
+        ``registered_from`` is inclusive and ``registered_to`` exclusive (ISO
+        8601 strings compare correctly as text). Returns the entries and the
+        entry to resume after, or ``None`` on the last page.
+        """
+        entries = self._entries.get((status, category), [])
+        if cursor is not None:
+            start = bisect_right(entries, cursor)
+        else:
+            start = 0
+        if registered_from:
+            start = max(start, bisect_left(entries, (registered_from,)))
+        stop = bisect_left(entries, (registered_to,)) if registered_to else len(entries)
+        page = entries[start:min(stop, start + limit)]
+        has_more = start + limit < stop
+        return page, (page[-1] if page and has_more else None)
+
+    def _add(self, status: str, entry: Entry) -> None:
+        for key in ((status, None), (status, entry[2])):
+            insort(self._entries.setdefault(key, []), entry)
+
+    def _remove(self, status: str, entry: Entry) -> None:
+        for key in ((status, None), (status, entry[2])):
+            entries = self._entries.get(key, [])
+            i = bisect_left(entries, entry)
+            if i < len(entries) and entries[i] == entry:
+                del entries[i]
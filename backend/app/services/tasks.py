@@ -0,0 +1,89 @@
+"""Handlers of the background jobs the API enqueues (see :mod:`app.services.jobs`).
+
+    evidence.index      embed a submission's responses and attachments for evidence search
+    review.submission   LLM-suggested scores for a submission's responses
+
+``evidence.index`` writes this process's evidence index, so it runs on
+the API's worker threads. ``review.submission`` only talks to the LLM API
+and its on-disk cache, so it can also run in worker processes
+(``JOB_PROCESS_WORKERS``), which build their own review service.
+"""
+
+import asyncio
+from typing import Any, Optional
+
+from app.rag.extraction import ExtractionService
+from app.rag.llm_review import ReviewRequest, ReviewService
+from app.rag.retrieval import EvidenceIndex, load_documents
+from app.services.jobs import Handler, JobContext
+from app.services.uploads import UploadService
+from app.services.validation import get_validator
+
+EVIDENCE_INDEX = "evidence.index"
+SUBMISSION_REVIEW = "review.submission"
+
+
+def review_requests(category_slug: str, form: dict) -> Optional[list[ReviewRequest]]:
+    """One request per answered criterion of ``form``; None for an unknown category."""
+    validator = get_validator(category_slug, form.get("employeeSubcategory"))
+    if validator is None:
+        return None
+    responses = form.get("criteriaResponses") or {}
+    requests = []
+    for criterion in validator.criteria:
+        text = (responses.get(criterion.id) or {}).get("text")
+        if isinstance(text, str) and text.strip():
+            requests.append(ReviewRequest(criterion.id, criterion.points, text))
+    return requests
+
+
+def index_evidence(
+    evidence: EvidenceIndex,
+    uploads: UploadService,
+    extraction: ExtractionService,
+    payload: dict,
+    ctx: JobContext,
+) -> dict:
+    """May wait for running extractions and call the embedding API."""
+    user_id, category_slug = payload["userId"], payload["categorySlug"]
+    ctx.progress(0.0, "Waiting for attachment text")
+    documents = load_documents(uploads, extraction, user_id, category_slug)
+    ctx.progress(0.5, f"Embedding {len(documents)} attachment(s)")
+    passages = evidence.index_submission(user_id, category_slug, payload.get("form"), documents)
+    return {"passages": passages, "attachments": len(documents)}
+
+
+def review_submission(reviews: ReviewService, payload: dict, ctx: JobContext) -> dict:
+    requests = [ReviewRequest(r["criterionId"], r["maxPoints"], r["text"]) for r in payload["requests"]]
+    ctx.progress(0.0, f"Reviewing {len(requests)} response(s)")
+    results = asyncio.run(reviews.review(requests))
+    return {
+        "items": [
+            {"criterionId": request.criterion_id, "maxPoints": request.max_points, **result}
+            for request, result in zip(requests, results)
+        ]
+    }
+
+
+def review_submission_in_worker(payload: dict, ctx: JobContext) -> Any:
+    """``review.submission`` in a worker process, with that process's review service."""
+    from app.api.deps import get_review_service
+
+    return review_submission(get_review_service(), payload, ctx)
+
+
+# Kinds that may run in worker processes, with importable handlers.
+PROCESS_HANDLERS: dict[str, Handler] = {SUBMISSION_REVIEW: review_submission_in_worker}
+
+
+def thread_handlers(
+    evidence: EvidenceIndex,
+    uploads: UploadService,
+    extraction: ExtractionService,
+    reviews: ReviewService,
+) -> dict[str, Handler]:
+    """Every kind, bound to this process's services."""
+    return {
+        EVIDENCE_INDEX: lambda payload, ctx: index_evidence(evidence, uploads, extraction, payload, ctx),
+        SUBMISSION_REVIEW: lambda payload, ctx: review_submission(reviews, payload, ctx),
+    }
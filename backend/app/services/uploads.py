@@ -0,0 +1,436 @@
+"""Resumable attachment uploads with content-addressed storage.
+
+Layout under the uploads directory::
+
+    partial/<upload_id>.part       bytes received so far
+    partial/<upload_id>.json       upload session (declared size, offset, ...)
+    blobs/<sha[:2]>/<sha256>       finished files, one per distinct content
+    manifests/<user_id>/<slug>.json  attachments of one submission
+    quota.lock                     serializes quota checks and manifest updates
+
+An upload is opened with its declared size, which is reserved against the
+submission quota up front. Chunks are appended at the current offset and
+hashed as they arrive, so memory use is one chunk regardless of file size
+and nothing past the declared size (≤ ``max_file_bytes``) is ever written.
+When the last byte lands, the part file is renamed to its SHA-256 blob
+path, or dropped if that content is already stored, and the attachment is
+added to the submission manifest.
+
+Sessions are persisted next to their part files, and read from there on
+every request, so an interrupted upload can be resumed from
+:attr:`UploadSession.offset` after a restart or on another worker. A
+writer holds an exclusive ``flock`` on the part file. A session nobody has
+written to for ``session_ttl`` seconds is dropped, along with its
+reservation, on the next lookup or quota check.
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Iterator, Optional
+
+from app.services.persistence import atomic_write_bytes
+
+DEFAULT_UPLOADS_DIR = Path(__file__).resolve().parents[2] / "data" / "uploads"
+
+MAX_FILE_BYTES = 10 * 1024 * 1024
+MAX_SUBMISSION_BYTES = 200 * 1024 * 1024
+# Suggested client chunk size; any chunking works.
+CHUNK_BYTES = 1024 * 1024
+# Seconds an upload may sit idle before its session and reservation are dropped.
+SESSION_TTL = 24 * 60 * 60
+
+# Extension → (content type, magic prefixes of the first bytes).
+ALLOWED_TYPES: dict[str, tuple[str, tuple[bytes, ...]]] = {
+    ".pdf": ("application/pdf", (b"%PDF-",)),
+    ".png": ("image/png", (b"\x89PNG\r\n\x1a\n",)),
+    ".jpg": ("image/jpeg", (b"\xff\xd8\xff",)),
+    ".jpeg": ("image/jpeg", (b"\xff\xd8\xff",)),
+    ".docx": ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", (b"PK\x03\x04",)),
+    ".pptx": ("application/vnd.openxmlformats-officedocument.presentationml.presentation", (b"PK\x03\x04",)),
+    ".xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", (b"PK\x03\x04",)),
+}
+MAGIC_BYTES = max(len(prefix) for _, prefixes in ALLOWED_TYPES.values() for prefix in prefixes)
+
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+_SAFE_SEGMENT = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+
+class UploadError(Exception):
+    """Base class; ``status_code`` is the HTTP status the API should answer with."""
+
+    status_code = 400
+
+
+class UploadNotFound(UploadError):
+    status_code = 404
+
+
+class UploadConflict(UploadError):
+    """Wrong offset, or another request is already writing this upload."""
+
+    status_code = 409
+
+
+class QuotaExceeded(UploadError):
+    status_code = 413
+
+
+class UnsupportedFileType(UploadError):
+    status_code = 415
+
+
+@dataclass
+class UploadSession:
+    id: str
+    user_id: int
+    category_slug: str
+    file_name: str
+    content_type: str
+    size: int
+    offset: int = 0
+    criterion_id: Optional[str] = None
+    created_at: str = ""
+
+    @property
+    def complete(self) -> bool:
+        return self.offset == self.size
+
+
+@dataclass
+class Attachment:
+    id: str
+    sha256: str
+    file_name: str
+    content_type: str
+    size: int
+    criterion_id: Optional[str] = None
+    uploaded_at: str = ""
+
+
+@dataclass
+class _Progress:
+    # In-memory state of a session's part file; rebuilt from disk if lost
+    # or if another worker has written since.
+    hasher: "hashlib._Hash"
+    offset: int
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _check_segment(value: str, what: str) -> str:
+    if not _SAFE_SEGMENT.match(value):
+        raise UploadError(f"Invalid {what}")
+    return value
+
+
+class UploadService:
+    """Upload sessions, quotas and blob storage rooted at ``root``."""
+
+    def __init__(
+        self,
+        root: Path = DEFAULT_UPLOADS_DIR,
+        max_file_bytes: int = MAX_FILE_BYTES,
+        max_submission_bytes: int = MAX_SUBMISSION_BYTES,
+        session_ttl: float = SESSION_TTL,
+    ):
+        self.root = Path(root)
+        self.max_file_bytes = max_file_bytes
+        self.max_submission_bytes = max_submission_bytes
+        self.session_ttl = session_ttl
+        self.partial_dir = self.root / "partial"
+        self.blob_dir = self.root / "blobs"
+        self.manifest_dir = self.root / "manifests"
+        for directory in (self.partial_dir, self.blob_dir, self.manifest_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        self._progress: dict[str, _Progress] = {}
+        self._lock = threading.Lock()
+        self._open_sessions()  # drop what expired while the server was down
+
+    # ── Sessions ──
+
+    async def create(
+        self,
+        user_id: int,
+        category_slug: str,
+        file_name: str,
+        size: int,
+        criterion_id: Optional[str] = None,
+    ) -> UploadSession:
+        """Open an upload, reserving ``size`` bytes of the submission quota."""
+        return await asyncio.to_thread(self._create, user_id, category_slug, file_name, size, criterion_id)
+
+    def _create(
+        self,
+        user_id: int,
+        category_slug: str,
+        file_name: str,
+        size: int,
+        criterion_id: Optional[str] = None,
+    ) -> UploadSession:
+        _check_segment(category_slug, "category")
+        if criterion_id is not None:
+            _check_segment(criterion_id, "criterion")
+        extension = os.path.splitext(file_name)[1].lower()
+        if extension not in ALLOWED_TYPES:
+            raise UnsupportedFileType(
+                f"Only {', '.join(sorted(e.lstrip('.').upper() for e in ALLOWED_TYPES))} files are accepted"
+            )
+        if size <= 0:
+            raise UploadError("File is empty")
+        if size > self.max_file_bytes:
+            raise QuotaExceeded(f"Files are limited to {self.max_file_bytes // (1024 * 1024)} MB")
+
+        session = UploadSession(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            category_slug=category_slug,
+            file_name=os.path.basename(file_name)[:255],
+            content_type=ALLOWED_TYPES[extension][0],
+            size=size,
+            criterion_id=criterion_id,
+            created_at=_now(),
+        )
+        with self._quota_lock():
+            used = self.submission_bytes(user_id, category_slug)
+            if used + size > self.max_submission_bytes:
+                raise QuotaExceeded(
+                    f"Submission would exceed {self.max_submission_bytes // (1024 * 1024)} MB "
+                    f"({used} bytes already used or reserved)"
+                )
+            self._part_path(session.id).touch()
+            self._save_session(session)
+        self._progress[session.id] = _Progress(hashlib.sha256(), 0)
+        return session
+
+    def get(self, upload_id: str) -> UploadSession:
+        """The session as last saved, by this worker or any other."""
+        session = self._read_session(upload_id)
+        if session is None:
+            raise UploadNotFound("Upload not found")
+        return session
+
+    def abort(self, upload_id: str) -> None:
+        with self._writing(upload_id):
+            self._discard(self.get(upload_id))
+
+    async def append(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> Optional[Attachment]:
+        """Write streamed bytes at ``offset``; returns the attachment once complete.
+
+        Bytes that arrived before an error or disconnect are kept, so the
+        client can resume from the session's new offset.
+        """
+        with self._writing(upload_id) as f:
+            # Read under the lock: another worker may have just written.
+            session = self.get(upload_id)
+            progress = await asyncio.to_thread(self._load_progress, session)
+            if offset != progress.offset:
+                raise UploadConflict(f"Upload is at offset {progress.offset}")
+
+            discarded = False
+            try:
+                # The type is sniffed once the first MAGIC_BYTES have arrived,
+                # which may take more than one request.
+                head = None
+                if progress.offset < MAGIC_BYTES:
+                    head = self._part_path(upload_id).read_bytes()[:progress.offset]
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    if progress.offset + len(chunk) > session.size:
+                        raise QuotaExceeded(f"Upload is larger than its declared size of {session.size} bytes")
+                    if head is not None:
+                        head += chunk[:MAGIC_BYTES - len(head)]
+                        if len(head) >= MAGIC_BYTES or len(head) == session.size:
+                            self._check_magic(session, head)
+                            head = None
+                    f.write(chunk)
+                    progress.hasher.update(chunk)
+                    progress.offset += len(chunk)
+                f.flush()
+                if progress.offset == session.size:
+                    await asyncio.to_thread(os.fsync, f.fileno())
+            except UnsupportedFileType:
+                self._discard(session)
+                discarded = True
+                raise
+            finally:
+                if not discarded:
+                    session.offset = progress.offset
+                    await asyncio.to_thread(self._save_session, session)
+
+            if not session.complete:
+                return None
+            return await asyncio.to_thread(self._finish, session, progress.hasher.hexdigest())
+
+    # ── Submissions ──
+
+    def attachments(self, user_id: int, category_slug: str) -> list[Attachment]:
+        path = self._manifest_path(user_id, category_slug)
+        if not path.exists():
+            return []
+        return [Attachment(**item) for item in json.loads(path.read_text(encoding="utf-8"))["attachments"]]
+
+    def attachment(self, user_id: int, category_slug: str, attachment_id: str) -> Attachment:
+        for attachment in self.attachments(user_id, category_slug):
+            if attachment.id == attachment_id:
+                return attachment
+        raise UploadNotFound("Attachment not found")
+
+    def submission_bytes(self, user_id: int, category_slug: str) -> int:
+        """Bytes attached to the submission plus bytes reserved by open uploads."""
+        stored = sum(a.size for a in self.attachments(user_id, category_slug))
+        reserved = sum(
+            s.size for s in self._open_sessions() if s.user_id == user_id and s.category_slug == category_slug
+        )
+        return stored + reserved
+
+    async def remove_attachment(self, user_id: int, category_slug: str, attachment_id: str) -> None:
+        """Detach a file from a submission; the blob stays (it may be shared)."""
+        await asyncio.to_thread(self._remove_attachment, user_id, category_slug, attachment_id)
+
+    def _remove_attachment(self, user_id: int, category_slug: str, attachment_id: str) -> None:
+        with self._quota_lock():
+            attachments = self.attachments(user_id, category_slug)
+            remaining = [a for a in attachments if a.id != attachment_id]
+            if len(remaining) == len(attachments):
+                raise UploadNotFound("Attachment not found")
+            self._save_manifest(user_id, category_slug, remaining)
+
+    def blob_path(self, sha256: str) -> Path:
+        if not _SHA256.match(sha256):
+            raise UploadNotFound("File not found")
+        path = self.blob_dir / sha256[:2] / sha256
+        if not path.exists():
+            raise UploadNotFound("File not found")
+        return path
+
+    # ── Internals ──
+
+    def _part_path(self, upload_id: str) -> Path:
+        return self.partial_dir / f"{upload_id}.part"
+
+    def _session_path(self, upload_id: str) -> Path:
+        return self.partial_dir / f"{upload_id}.json"
+
+    def _read_session(self, upload_id: str) -> Optional[UploadSession]:
+        """The saved session, or None if there is none or it has expired."""
+        if not _UPLOAD_ID.match(upload_id):
+            return None
+        path = self._session_path(upload_id)
+        try:
+            idle = time.time() - path.stat().st_mtime  # rewritten on every append
+            session = UploadSession(**json.loads(path.read_text(encoding="utf-8")))
+        except FileNotFoundError:
+            return None
+        if idle > self.session_ttl:
+            try:
+                with self._writing(upload_id):
+                    self._discard(session)
+            except UploadError:
+                return session  # being written to right now, so not idle after all
+            return None
+        return session
+
+    def _open_sessions(self) -> list[UploadSession]:
+        """Every unexpired session, whichever worker opened it."""
+        sessions = (self._read_session(path.stem) for path in self.partial_dir.glob("*.json"))
+        return [session for session in sessions if session is not None]
+
+    @contextmanager
+    def _writing(self, upload_id: str) -> Iterator[BinaryIO]:
+        """The part file opened for appending, held exclusively across workers."""
+        try:
+            fd = os.open(self._part_path(upload_id), os.O_WRONLY | os.O_APPEND)
+        except FileNotFoundError:
+            raise UploadNotFound("Upload not found") from None
+        with open(fd, "ab") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadConflict("Another request is writing this upload") from None
+            yield f
+
+    @contextmanager
+    def _quota_lock(self) -> Iterator[None]:
+        """Serializes quota checks and manifest updates, across threads and workers."""
+        with self._lock, open(self.root / "quota.lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def _manifest_path(self, user_id: int, category_slug: str) -> Path:
+        return self.manifest_dir / str(int(user_id)) / f"{_check_segment(category_slug, 'category')}.json"
+
+    def _save_session(self, session: UploadSession) -> None:
+        atomic_write_bytes(self._session_path(session.id), json.dumps(asdict(session)).encode("utf-8"))
+
+    def _save_manifest(self, user_id: int, category_slug: str, attachments: list[Attachment]) -> None:
+        data = {"attachments": [asdict(a) for a in attachments]}
+        atomic_write_bytes(
+            self._manifest_path(user_id, category_slug), json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+        )
+
+    def _load_progress(self, session: UploadSession) -> _Progress:
+        progress = self._progress.get(session.id)
+        if progress is None or progress.offset != session.offset:
+            # Resumed after a restart or on another worker: rebuild the hash
+            # from the part file, trusting only the bytes the session recorded.
+            hasher = hashlib.sha256()
+            with open(self._part_path(session.id), "r+b") as f:
+                f.truncate(session.offset)
+                while block := f.read(CHUNK_BYTES):
+                    hasher.update(block)
+            progress = self._progress[session.id] = _Progress(hasher, session.offset)
+        return progress
+
+    @staticmethod
+    def _check_magic(session: UploadSession, head: bytes) -> None:
+        extension = os.path.splitext(session.file_name)[1].lower()
+        if not head.startswith(ALLOWED_TYPES[extension][1]):
+            raise UnsupportedFileType(f"File content does not look like a {extension.lstrip('.').upper()} file")
+
+    def _finish(self, session: UploadSession, sha256: str) -> Attachment:
+        blob = self.blob_dir / sha256[:2] / sha256
+        part = self._part_path(session.id)
+        if blob.exists():
+            part.unlink()  # already stored: deduplicated
+        else:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(part, blob)
+        attachment = Attachment(
+            id=uuid.uuid4().hex,
+            sha256=sha256,
+            file_name=session.file_name,
+            content_type=session.content_type,
+            size=session.size,
+            criterion_id=session.criterion_id,
+            uploaded_at=_now(),
+        )
+        # Add the attachment before releasing the reservation so the quota
+        # never briefly under-counts.
+        with self._quota_lock():
+            attachments = self.attachments(session.user_id, session.category_slug)
+            self._save_manifest(session.user_id, session.category_slug, [*attachments, attachment])
+            self._forget(session)
+        return attachment
+
+    def _discard(self, session: UploadSession) -> None:
+        self._part_path(session.id).unlink(missing_ok=True)
+        self._forget(session)
+
+    def _forget(self, session: UploadSession) -> None:
+        self._session_path(session.id).unlink(missing_ok=True)
+        self._progress.pop(session.id, None)
@@ -0,0 +1,510 @@
+"""In-memory user store backed by ``data/users.json``.
+
+The JSON file is parsed once when the store is created. Reads are served
+from hash indexes by ``id`` and ``email``; writes append the changed user
+to a journal next to the snapshot (``users.journal.jsonl``) instead of
+re-serialising every other user. The journal is replayed on startup and
+folded back into ``users.json`` by :meth:`UserStore.compact`.
+
+Stored user dicts are never mutated in place: :meth:`UserStore.update`
+applies changes to a copy and swaps it in, so a dict returned by
+:meth:`UserStore.get` is a consistent, read-only view. Changes are applied
+in memory synchronously, in order, and the journal I/O runs on the
+:class:`~app.services.persistence.JournalWriter` thread, so the event loop
+never blocks on disk and requests for unrelated users only share fsyncs.
+
+Journal records are either ``put`` (the whole user) or ``set`` (only the
+sub-documents at the paths an update declared it touches), so a small edit
+to a large user costs bytes proportional to the edit. :meth:`UserStore.update_many`
+writes one ``batch`` record holding several of them: a single line, so a
+torn write loses the whole batch rather than part of it.
+
+Every write also maintains a :class:`~app.services.status_index.StatusIndex`
+over ``categoryStatuses`` for paginated admin listings.
+
+Several processes (uvicorn workers) can share the files when given a
+:class:`~app.services.change_feed.ChangeFeed`. Writes then run under the
+feed's cross-process lock and publish their record with the next store
+generation, which is also stamped on the journal line. Reads first apply
+the records other processes published, per user. Journal lines from
+different processes may land out of order, so on load they are replayed
+by generation, merged with any feed records not journalled yet.
+"""
+
+import asyncio
+import copy
+import json
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, Protocol, Sequence
+
+from app.core.metrics import STORE_IO
+from app.services.change_feed import ChangeFeed, ChangeFeedPruned
+from app.services.persistence import JournalWriter, atomic_write_bytes
+from app.services.status_index import Entry, StatusIndex
+
+# Path to the JSON database file
+DEFAULT_DB_PATH = Path(__file__).resolve().parents[2] / "data" / "users.json"
+
+# Journal records accumulated before the snapshot is rewritten.
+COMPACT_THRESHOLD = 1000
+
+# A key path into a user document, e.g. ("draft", "project").
+KeyPath = tuple[str, ...]
+
+
+class DuplicateEmailError(ValueError):
+    """A user with this email already exists."""
+
+
+class UserRepository(Protocol):
+    """What the auth endpoints need from a user backend.
+
+    Implemented by :class:`UserStore` (JSON file) and
+    :class:`~app.services.sql_user_store.SqlUserStore` (SQL database);
+    ``get_user_store`` picks one from ``settings.DATABASE_URL``.
+    """
+
+    async def get(self, user_id: int) -> Optional[dict]: ...
+
+    async def get_by_email(self, email: str) -> Optional[dict]: ...
+
+    async def create(self, fields: dict[str, Any]) -> dict: ...
+
+    async def update(
+        self,
+        user_id: int,
+        mutate: Callable[[dict], None],
+        paths: Optional[Sequence[KeyPath]] = None,
+    ) -> dict: ...
+
+    async def update_many(
+        self,
+        mutations: dict[int, Callable[[dict], None]],
+        paths: Optional[Sequence[KeyPath]] = None,
+    ) -> dict[int, dict]:
+        """Like :meth:`update` for several users, all or nothing."""
+        ...
+
+    async def count_registrations(
+        self,
+        status: str,
+        category: Optional[str] = None,
+        registered_from: Optional[str] = None,
+        registered_to: Optional[str] = None,
+    ) -> int: ...
+
+    async def registrations(
+        self,
+        status: str,
+        category: Optional[str] = None,
+        registered_from: Optional[str] = None,
+        registered_to: Optional[str] = None,
+        cursor: Optional[Entry] = None,
+        limit: int = 100,
+    ) -> tuple[list[tuple[dict, Entry]], Optional[Entry]]: ...
+
+    def scan(self, batch_size: int = 1000) -> AsyncIterator[list[dict]]:
+        """Every user, in batches of up to ``batch_size`` (for building indexes)."""
+        ...
+
+    async def open(self) -> None: ...
+
+    async def aclose(self) -> None: ...
+
+
+def load_users(path: Path) -> dict:
+    """Load users from JSON file."""
+    if not path.exists():
+        return {"users": []}
+    with STORE_IO.time("load"), open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_users(path: Path, data: dict) -> None:
+    """Atomically save users to JSON file."""
+    with STORE_IO.time("save"):
+        atomic_write_bytes(path, json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8"))
+
+
+class UserStore:
+    """Users indexed by id and email, persisted as snapshot + journal."""
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_DB_PATH,
+        compact_threshold: int = COMPACT_THRESHOLD,
+        feed: Optional[ChangeFeed] = None,
+    ):
+        self.path = Path(path)
+        self.journal_path = self.path.with_name(self.path.stem + ".journal.jsonl")
+        self.compact_threshold = compact_threshold
+        self.feed = feed
+        self._by_id: dict[int, dict] = {}
+        self._by_email: dict[str, int] = {}
+        self._max_id = 0
+        self._statuses = StatusIndex()
+        self._journal_records = 0
+        self._generation = 0
+        self._listeners: list[Callable[[dict], None]] = []
+        self._lock = threading.Lock()
+        self._load()
+        self._writer = JournalWriter(self.journal_path)
+
+    # ── Loading ──
+
+    def _load(self) -> None:
+        while True:
+            self._by_id, self._by_email, self._max_id = {}, {}, 0
+            self._statuses = StatusIndex()
+            self._journal_records = 0
+            try:
+                return self._load_files()
+            except ChangeFeedPruned:
+                continue  # another process compacted meanwhile; its snapshot covers the gap
+
+    def _load_files(self) -> None:
+        snapshot = load_users(self.path)
+        for user in snapshot.get("users", []):
+            self._index(user)
+        self._generation = snapshot.get("generation", 0)
+        logged: dict[int, dict] = {}
+        if self.journal_path.exists():
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn last line from an interrupted append; everything
+                        # before it was written completely.
+                        break
+                    self._journal_records += 1
+                    generation = record.pop("gen", None)
+                    if generation is None:
+                        self._apply(record)
+                    elif generation > self._generation:  # else already in the snapshot
+                        logged[generation] = record
+        if self.feed is not None:
+            self.feed.changed()  # later calls report only newer commits
+            for change in self.feed.since(self._generation):
+                logged.setdefault(change.generation, change.data)
+        for generation in sorted(logged):
+            self._apply(logged[generation])
+            self._generation = generation
+
+    def _apply(self, record: dict) -> None:
+        op = record.get("op")
+        if op == "put":
+            self._index(record["user"])
+        elif op == "set":
+            changes = record.get("set", [])
+            removals = record.get("unset", [])
+            paths = [tuple(path) for path, _ in changes] + [tuple(path) for path in removals]
+            user = copy_paths(self._by_id[record["id"]], paths)
+            for path, value in changes:
+                _parent(user, path)[path[-1]] = value
+            for path in removals:
+                _parent(user, path).pop(path[-1], None)
+            self._index(user)
+        elif op == "batch":
+            for inner in record["records"]:
+                self._apply(inner)
+
+    def _index(self, user: dict) -> None:
+        previous = self._by_id.get(user["id"])
+        if previous is not None and previous["email"] != user["email"]:
+            self._by_email.pop(previous["email"], None)
+        self._by_id[user["id"]] = user
+        self._by_email[user["email"]] = user["id"]
+        self._max_id = max(self._max_id, user["id"])
+        self._statuses.update(previous, user)
+
+    # ── Changes from other processes ──
+
+    def subscribe(self, listener: Callable[[dict], None]) -> None:
+        """Call ``listener(user)`` for each user changed by another process."""
+        self._listeners.append(listener)
+
+    def sync(self) -> None:
+        """Apply what other processes published since the last call (cheap if nothing)."""
+        if self.feed is not None and self.feed.changed():
+            self._refresh()
+
+    def _refresh(self) -> None:
+        with self._lock:
+            self._catch_up()
+
+    def _catch_up(self) -> None:
+        try:
+            changes = self.feed.since(self._generation)
+        except ChangeFeedPruned:
+            # Another process compacted past what we have applied: start
+            # over from its snapshot, which includes everything pruned.
+            previous = self._by_id
+            self._load()
+            changed = {i for i, user in self._by_id.items() if previous.get(i) != user}
+            changes = []
+        else:
+            changed = set()
+        for change in changes:
+            if change.origin != self.feed.origin:
+                self._apply(change.data)
+                changed.update(_record_ids(change.data))
+            self._generation = change.generation
+        for user_id in changed:
+            for listener in self._listeners:
+                listener(self._by_id[user_id])
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        """The store lock and, with a feed, the cross-process one, caught up."""
+        with self._lock:
+            if self.feed is None:
+                yield
+                return
+            with self.feed.transaction():
+                self._catch_up()
+                yield
+
+    # ── Reads ──
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(list(self._by_id.values()))
+
+    async def get(self, user_id: int) -> Optional[dict]:
+        """Return the user with ``user_id`` or ``None``."""
+        self.sync()
+        return self._by_id.get(user_id)
+
+    async def get_by_email(self, email: str) -> Optional[dict]:
+        """Return the user registered with ``email`` or ``None``."""
+        self.sync()
+        user_id = self._by_email.get(email)
+        return None if user_id is None else self._by_id[user_id]
+
+    async def count_registrations(
+        self,
+        status: str,
+        category: Optional[str] = None,
+        registered_from: Optional[str] = None,
+        registered_to: Optional[str] = None,
+    ) -> int:
+        """Number of category registrations currently in ``status``.
+
+        Takes the same filters as :meth:`registrations`.
+        """
+        self.sync()
+        with self._lock:
+            return self._statuses.count(status, category, registered_from, registered_to)
+
+    async def registrations(
+        self,
+        status: str,
+        category: Optional[str] = None,
+        registered_from: Optional[str] = None,
+        registered_to: Optional[str] = None,
+        cursor: Optional[Entry] = None,
+        limit: int = 100,
+    ) -> tuple[list[tuple[dict, Entry]], Optional[Entry]]:
+        """A page of ``(user, entry)`` pairs for registrations in ``status``.
+
+        See :meth:`StatusIndex.page` for the filter and cursor semantics.
+        """
+        self.sync()
+        with self._lock:
+            entries, next_cursor = self._statuses.page(
+                status, category, registered_from, registered_to, cursor, limit
+            )
+            return [(self._by_id[entry[1]], entry) for entry in entries], next_cursor
+
+    async def scan(self, batch_size: int = 1000) -> AsyncIterator[list[dict]]:
+        """Every user as of the start of the scan, in batches."""
+        self.sync()
+        users = list(self._by_id.values())
+        for start in range(0, len(users), batch_size):
+            yield users[start:start + batch_size]
+
+    # ── Writes ──
+
+    async def create(self, fields: dict[str, Any]) -> dict:
+        """Insert a new user, assigning the next free id."""
+        with self._write_lock():
+            if fields.get("email") in self._by_email:
+                raise DuplicateEmailError(fields["email"])
+            user = {"id": self._max_id + 1, **fields}
+            done = self._commit(user)
+        await asyncio.wrap_future(done)
+        return user
+
+    async def update(
+        self,
+        user_id: int,
+        mutate: Callable[[dict], None],
+        paths: Optional[Sequence[KeyPath]] = None,
+    ) -> dict:
+        """Apply ``mutate`` to a copy of the user, then persist and return it.
+
+        ``mutate`` runs under the store lock against the latest version, so
+        concurrent updates to the same user are serialized instead of
+        overwriting each other. If it raises, nothing is changed.
+
+        With ``paths``, ``mutate`` may only change the values at those key
+        paths: only they are copied and only they are journalled.
+        """
+        with self._write_lock():
+            current = self._by_id.get(user_id)
+            if current is None:
+                raise KeyError(user_id)
+            user = copy.deepcopy(current) if paths is None else copy_paths(current, paths)
+            mutate(user)
+            done = self._commit(user, paths)
+        await asyncio.wrap_future(done)
+        return user
+
+    async def update_many(
+        self,
+        mutations: dict[int, Callable[[dict], None]],
+        paths: Optional[Sequence[KeyPath]] = None,
+    ) -> dict[int, dict]:
+        """Apply ``mutations[user_id]`` to each user, then persist them in one journal record.
+
+        Every mutation runs under the store lock before anything is
+        swapped in: if one raises (or a user does not exist), no user is
+        changed. The batch is a single journal line, so it is also
+        durable as a whole.
+        """
+        with self._write_lock():
+            missing = [user_id for user_id in mutations if user_id not in self._by_id]
+            if missing:
+                raise KeyError(missing[0])
+            users = {}
+            for user_id, mutate in mutations.items():
+                current = self._by_id[user_id]
+                user = copy.deepcopy(current) if paths is None else copy_paths(current, paths)
+                mutate(user)
+                users[user_id] = user
+            if not users:
+                return {}
+            records = []
+            for user in users.values():
+                self._index(user)
+                records.append(_record(user, paths))
+            done = self._append({"op": "batch", "records": records})
+        await asyncio.wrap_future(done)
+        return users
+
+    def _commit(self, user: dict, paths: Optional[Sequence[KeyPath]] = None):
+        self._index(user)
+        return self._append(_record(user, paths))
+
+    def _append(self, record: dict):
+        if self.feed is not None:
+            self._generation = self.feed.publish(",".join(f"user:{i}" for i in _record_ids(record)), record)
+            record = {**record, "gen": self._generation}
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        done = self._writer.append(line.encode("utf-8"))
+        self._journal_records += 1
+        if self._journal_records >= self.compact_threshold:
+            self._schedule_compaction()
+        return done
+
+    def _schedule_compaction(self):
+        self._journal_records = 0
+        if self.feed is not None:
+            return self._writer.run(self._compact_shared)
+        # Users are copy-on-write, so this shallow list is a consistent view
+        # matching everything journalled so far.
+        users = list(self._by_id.values())
+
+        def compact():
+            save_users(self.path, {"users": users})
+            self._writer.truncate()
+
+        return self._writer.run(compact)
+
+    def _compact_shared(self) -> None:
+        # Holding the feed lock, no process can publish a change the snapshot
+        # would miss. Journal lines still in flight for older generations may
+        # land after the truncation; loading skips them.
+        with self._lock, self.feed.transaction():
+            self._catch_up()
+            users, generation = list(self._by_id.values()), self._generation
+            save_users(self.path, {"generation": generation, "users": users})
+            self._writer.truncate()
+            self.feed.prune(generation)
+
+    def compact(self) -> None:
+        """Fold the journal into the ``users.json`` snapshot and wait for it."""
+        with self._lock:
+            done = self._schedule_compaction()
+        done.result()
+
+    def close(self) -> None:
+        """Compact any journalled changes and stop the writer thread."""
+        if self._journal_records:
+            self.compact()
+        self._writer.close()
+        if self.feed is not None:
+            self.feed.close()
+
+    def watch(self, interval: float = 0.05) -> None:
+        """Apply other processes' changes (and tell listeners) as they happen, not only on reads."""
+        if self.feed is not None:
+            self.feed.watch(self._refresh, interval)
+
+    async def open(self) -> None:
+        """Nothing to do: the snapshot and journal are loaded on construction."""
+
+    async def aclose(self) -> None:
+        await asyncio.to_thread(self.close)
+
+
+def _record_ids(record: dict) -> list[int]:
+    if record["op"] == "batch":
+        return [i for inner in record["records"] for i in _record_ids(inner)]
+    return [record["user"]["id"] if record["op"] == "put" else record["id"]]
+
+
+def _record(user: dict, paths: Optional[Sequence[KeyPath]]) -> dict:
+    """The journal record for ``user``: all of it, or only the values at ``paths``."""
+    if paths is None:
+        return {"op": "put", "user": user}
+    record = {"op": "set", "id": user["id"], "set": [], "unset": []}
+    for path in paths:
+        parent = _parent(user, path)
+        if path[-1] in parent:
+            record["set"].append([list(path), parent[path[-1]]])
+        else:
+            record["unset"].append(list(path))
+    return record
+
+
+def _parent(user: dict, path: Sequence[str]) -> dict:
+    """The dict holding ``path[-1]``, creating empty dicts along the way."""
+    node = user
+    for key in path[:-1]:
+        child = node.get(key)
+        if not isinstance(child, dict):
+            child = node[key] = {}
+        node = child
+    return node
+
+
+def copy_paths(user: dict, paths: Sequence[KeyPath]) -> dict:
+    """Copy ``user`` deeply along ``paths`` only, sharing everything else."""
+    root = dict(user)
+    for path in paths:
+        node = root
+        for key in path[:-1]:
+            child = node.get(key)
+            node[key] = dict(child) if isinstance(child, dict) else {}
+            node = node[key]
+        if path[-1] in node:
+            node[path[-1]] = copy.deepcopy(node[path[-1]])
+    return root
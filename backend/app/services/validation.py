@@ -0,0 +1,298 @@
+"""Server-side validation of award submissions.
+
+A submission form has the frontend's `SubmissionFormData` shape::
+
+    {"employeeSubcategory", "fullName", "employeeId", "email", "phone",
+     "nominationReason", "extraFields": {...},
+     "criteriaResponses": {criterion_id: {"text", "files": [...], "rating"?}}}
+
+:func:`get_validator` compiles the criteria of a category/sub-category
+into one check per criterion plus one for the form-level fields, and is
+cached, so a validator is built once per pattern. Issues use the
+frontend's `submission.validation.*` message keys as codes, with their
+message parameters alongside (e.g. ``{"code": "wordLimitExceeded",
+"max": 400, "current": 412}``).
+
+Autosave sends small deltas. :func:`delta_from_merge_patch` and
+:func:`delta_from_json_patch` work out which criteria a patch touched,
+and :meth:`SubmissionValidator.revalidate` rechecks only those and keeps
+the previous results for the rest.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+from app.rag.normalize import strip_diacritics
+from app.services.criteria import (
+    CriterionDefinition,
+    SubmissionConfig,
+    get_criteria,
+    get_submission_config,
+    split_submission_slug,
+)
+
+SUBMISSION_DRAFT_PREFIX = "submission:"
+
+# Numbers keep their separators ("1,000", "٣٫٥"); words may contain
+# apostrophes and hyphens ("don't", "e-services").
+_WORD = re.compile(r"\d+(?:[.,٫٬]\d+)+|[^\W_]+(?:['’\-][^\W_]+)*")
+_SAM_EMAIL = re.compile(r"^[A-Za-z0-9._%+\-]+@sam\.ae$", re.IGNORECASE)
+# UAE mobile: 05X XXX XXXX, optionally as +971 / 00971 5X XXX XXXX.
+_UAE_MOBILE = re.compile(r"^(?:\+971|00971|0)5\d{8}$")
+_PHONE_SEPARATORS = re.compile(r"[\s\-().]")
+_ARABIC_DIGITS = str.maketrans("٠١٢٣٤٥٦٧٨٩", "0123456789")
+
+Issue = dict[str, Any]
+
+
+def count_words(text: str) -> int:
+    """Words in mixed Arabic/English text.
+
+    Unlike splitting on whitespace, punctuation on its own ("-", "،") is
+    not a word, words joined by Arabic punctuation are separate, and
+    diacritics or tatweel do not break a word apart.
+    """
+    return len(_WORD.findall(strip_diacritics(text)))
+
+
+def is_sam_email(value: str) -> bool:
+    return bool(_SAM_EMAIL.match(value.strip()))
+
+
+def is_uae_mobile(value: str) -> bool:
+    return bool(_UAE_MOBILE.match(_PHONE_SEPARATORS.sub("", value.translate(_ARABIC_DIGITS))))
+
+
+def submission_draft_key(full_slug: str) -> str:
+    """Draft key under which a category's submission form is autosaved."""
+    return f"{SUBMISSION_DRAFT_PREFIX}{full_slug}"
+
+
+def parse_submission_draft_key(draft_key: str) -> Optional[str]:
+    """The category slug of a submission draft key, else None."""
+    if draft_key.startswith(SUBMISSION_DRAFT_PREFIX):
+        return draft_key[len(SUBMISSION_DRAFT_PREFIX):] or None
+    return None
+
+
+@dataclass
+class ValidationResult:
+    fields: dict[str, list[Issue]] = field(default_factory=dict)
+    criteria: dict[str, list[Issue]] = field(default_factory=dict)
+    word_counts: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def valid(self) -> bool:
+        return not any(self.fields.values()) and not any(self.criteria.values())
+
+    def to_dict(self) -> dict:
+        return {
+            "valid": self.valid,
+            "fields": {k: v for k, v in self.fields.items() if v},
+            "criteria": {k: v for k, v in self.criteria.items() if v},
+            "wordCounts": self.word_counts,
+        }
+
+
+@dataclass(frozen=True)
+class Delta:
+    """What a patch touched: form-level fields, and criteria (None → all)."""
+
+    fields: bool = False
+    criteria: Optional[frozenset[str]] = frozenset()
+
+
+ALL = Delta(True, None)
+
+
+def _merge(a: Delta, b: Delta) -> Delta:
+    criteria = None if a.criteria is None or b.criteria is None else a.criteria | b.criteria
+    return Delta(a.fields or b.fields, criteria)
+
+
+def delta_from_merge_patch(patch: Any) -> Delta:
+    if not isinstance(patch, dict):
+        return ALL
+    delta = Delta()
+    for key, value in patch.items():
+        if key == "criteriaResponses":
+            touched = Delta(criteria=frozenset(value)) if isinstance(value, dict) else Delta(criteria=None)
+        elif key == "employeeSubcategory":
+            return ALL
+        else:
+            touched = Delta(fields=True)
+        delta = _merge(delta, touched)
+    return delta
+
+
+def _pointer_delta(pointer: str) -> Delta:
+    parts = [p.replace("~1", "/").replace("~0", "~") for p in pointer.split("/")[1:]]
+    if not parts or parts[0] == "employeeSubcategory":
+        return ALL
+    if parts[0] == "criteriaResponses":
+        return Delta(criteria=frozenset(parts[1:2])) if len(parts) > 1 else Delta(criteria=None)
+    return Delta(fields=True)
+
+
+def delta_from_json_patch(operations: Any) -> Delta:
+    if not isinstance(operations, list):
+        return ALL
+    delta = Delta()
+    for op in operations:
+        if not isinstance(op, dict) or not isinstance(op.get("path"), str):
+            return ALL
+        if op.get("op") == "test":
+            continue
+        delta = _merge(delta, _pointer_delta(op["path"]))
+        if isinstance(op.get("from"), str) and op.get("op") == "move":
+            delta = _merge(delta, _pointer_delta(op["from"]))
+    return delta
+
+
+CriterionCheck = Callable[[Any], tuple[list[Issue], int]]
+
+
+class SubmissionValidator:
+    """Compiled checks for one category/sub-category."""
+
+    def __init__(self, config: SubmissionConfig, criteria: tuple[CriterionDefinition, ...]):
+        self.config = config
+        self.criteria = criteria
+        self._checks: dict[str, CriterionCheck] = {c.id: self._compile(c) for c in criteria}
+        # Extra fields are only required when the form has a step that asks for them.
+        self._required = tuple(f.id for f in config.extra_fields if f.required and "info" in config.steps)
+        self._numeric = tuple(f.id for f in config.extra_fields if f.type == "number")
+
+    def _compile(self, criterion: CriterionDefinition) -> CriterionCheck:
+        max_words = self.config.max_words_per_criterion
+        max_files = self.config.max_files_per_criterion
+        min_chars = self.config.min_response_chars
+        scale = criterion.rating_scale
+
+        def check(response: Any) -> tuple[list[Issue], int]:
+            if not isinstance(response, dict):
+                response = {}
+            text = response.get("text")
+            text = text.strip() if isinstance(text, str) else ""
+            words = count_words(text) if text else 0
+            issues: list[Issue] = []
+            if not text:
+                issues.append({"code": "responseRequired"})
+            else:
+                if len(text) < min_chars:
+                    issues.append({"code": "responseTooShort", "min": min_chars})
+                if max_words and words > max_words:
+                    issues.append({"code": "wordLimitExceeded", "max": max_words, "current": words})
+            files = response.get("files") or []
+            if max_files and isinstance(files, list) and len(files) > max_files:
+                issues.append({"code": "fileLimitExceeded", "max": max_files, "current": len(files)})
+            if scale is not None:
+                rating = response.get("rating")
+                if rating is None:
+                    issues.append({"code": "ratingRequired", "min": scale[0], "max": scale[1]})
+                elif not isinstance(rating, int) or isinstance(rating, bool) or not scale[0] <= rating <= scale[1]:
+                    issues.append({"code": "ratingOutOfRange", "min": scale[0], "max": scale[1]})
+            return issues, words
+
+        return check
+
+    def _check_fields(self, form: dict) -> dict[str, list[Issue]]:
+        issues: dict[str, list[Issue]] = {}
+        email = form.get("email")
+        if isinstance(email, str) and email.strip() and not is_sam_email(email):
+            issues["email"] = [{"code": "invalidEmail", "domain": "sam.ae"}]
+        phone = form.get("phone")
+        if isinstance(phone, str) and phone.strip() and not is_uae_mobile(phone):
+            issues["phone"] = [{"code": "invalidPhone"}]
+        extra = form.get("extraFields") if isinstance(form.get("extraFields"), dict) else {}
+        for field_id in self._required:
+            value = extra.get(field_id)
+            if value is None or (isinstance(value, str) and not value.strip()):
+                issues[f"extraFields.{field_id}"] = [{"code": "fieldRequired"}]
+        for field_id in self._numeric:
+            value = extra.get(field_id)
+            if isinstance(value, str) and value.strip() and not _is_number(value):
+                issues[f"extraFields.{field_id}"] = [{"code": "invalidNumber"}]
+        return issues
+
+    def validate(self, form: Any) -> ValidationResult:
+        """Check every criterion and field in one pass over the form."""
+        return self.revalidate(form, None, ALL)
+
+    def revalidate(self, form: Any, previous: Optional[ValidationResult], delta: Delta) -> ValidationResult:
+        """Recheck what ``delta`` touched; the rest is taken from ``previous``."""
+        if not isinstance(form, dict):
+            form = {}
+        if previous is None:
+            delta = ALL
+        result = ValidationResult(
+            fields=dict(previous.fields) if previous else {},
+            criteria=dict(previous.criteria) if previous else {},
+            word_counts=dict(previous.word_counts) if previous else {},
+        )
+        if delta.fields:
+            result.fields = self._check_fields(form)
+        responses = form.get("criteriaResponses")
+        if not isinstance(responses, dict):
+            responses = {}
+        touched = self._checks if delta.criteria is None else [c for c in delta.criteria if c in self._checks]
+        for criterion_id in touched:
+            issues, words = self._checks[criterion_id](responses.get(criterion_id))
+            result.criteria[criterion_id] = issues
+            result.word_counts[criterion_id] = words
+        return result
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value.translate(_ARABIC_DIGITS))
+    except ValueError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=64)
+def get_validator(full_slug: str, subcategory: Optional[str] = None) -> Optional[SubmissionValidator]:
+    """Validator for a category slug (e.g. `employee-supervisory-leader`), or None if unknown.
+
+    ``subcategory`` (the form's `employeeSubcategory`) is used when the
+    slug does not name one, e.g. `employee-nonsupervisory`.
+    """
+    slug, from_slug = split_submission_slug(full_slug)
+    config = get_submission_config(slug)
+    if config is None:
+        return None
+    return SubmissionValidator(config, get_criteria(slug, from_slug or subcategory))
+
+
+class RecentResults:
+    """Last validation result per (user, draft key), tagged with the draft version.
+
+    Lets an autosave revalidate against the result of the previous save;
+    a miss (another worker handled it, or it was evicted) costs one full
+    validation.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[int, str], tuple[int, ValidationResult]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, draft_key: str, version: int) -> Optional[ValidationResult]:
+        with self._lock:
+            entry = self._entries.get((user_id, draft_key))
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end((user_id, draft_key))
+            return entry[1]
+
+    def put(self, user_id: int, draft_key: str, version: int, result: ValidationResult) -> None:
+        with self._lock:
+            self._entries[(user_id, draft_key)] = (version, result)
+            self._entries.move_to_end((user_id, draft_key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,4 @@
+"""
+Performance benchmarks. Run from `backend/`, e.g.
+`python -m benchmarks.bench_user_store`.
+"""
@@ -0,0 +1,103 @@
+"""
+Registration review: one request per decision vs the bulk endpoint.
+
+For each dataset size a synthetic dataset is generated (see
+:mod:`benchmarks.datasets`) and its first `--decisions` waiting-approval
+registrations are approved twice over fresh copies of the store:
+
+- single: sequential `POST /auth/admin/review-registration`, as an admin
+          working through the list one row at a time
+- bulk:   `POST /auth/admin/review-registrations` with up to
+          `MAX_BULK_DECISIONS` decisions per request, applied in one write
+
+Throughput is decisions per second; `fsyncs` counts journal commits.
+
+    python -m benchmarks.bench_bulk_review [--sizes 1000,10000] [--decisions 300] [--backend json|sqlite]
+"""
+
+import argparse
+import asyncio
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from app.api.deps import get_user_store
+from app.api.v1.endpoints.auth import MAX_BULK_DECISIONS
+from app.main import app
+from benchmarks.datasets import write_dataset
+from benchmarks.load import inprocess_client
+
+
+def pending(dataset: Path, limit: int) -> list[dict]:
+    decisions = []
+    for user in json.loads(dataset.read_text(encoding="utf-8"))["users"]:
+        for slug, status in user["categoryStatuses"].items():
+            if status == "waiting-approval" and len(decisions) < limit:
+                decisions.append({"userId": user["id"], "categorySlug": slug, "action": "approve"})
+    return decisions
+
+
+async def run(dataset: Path, backend: str, decisions: list[dict], bulk: bool) -> dict:
+    workdir = Path(tempfile.mkdtemp(prefix="bench-review-"))
+    try:
+        copy = workdir / "users.json"
+        shutil.copy(dataset, copy)
+        async with inprocess_client(copy, backend, workdir) as client:
+            store = app.dependency_overrides[get_user_store]()
+            writer = getattr(store, "_writer", None)
+            commits = writer.commits if writer else 0
+            applied = 0
+            start = time.perf_counter()
+            if bulk:
+                for offset in range(0, len(decisions), MAX_BULK_DECISIONS):
+                    res = await client.post(
+                        "/auth/admin/review-registrations",
+                        json={"decisions": decisions[offset:offset + MAX_BULK_DECISIONS]},
+                    )
+                    applied += res.json()["applied"]
+            else:
+                for decision in decisions:
+                    res = await client.post("/auth/admin/review-registration", json=decision)
+                    applied += res.status_code == 200
+            elapsed = time.perf_counter() - start
+            return {
+                "seconds": elapsed,
+                "decisions_per_s": applied / elapsed,
+                "fsyncs": (writer.commits - commits) if writer else None,
+                "applied": applied,
+            }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1000,10000")
+    parser.add_argument("--decisions", type=int, default=300)
+    parser.add_argument("--backend", choices=("json", "sqlite"), default="json")
+    args = parser.parse_args()
+
+    columns = ["users", "mode", "applied", "seconds", "decisions_per_s", "fsyncs"]
+    print(" ".join(f"{c:>15}" for c in columns))
+    for users in (int(s) for s in args.sizes.split(",")):
+        workdir = Path(tempfile.mkdtemp(prefix="bench-review-data-"))
+        try:
+            dataset = write_dataset(workdir / "users.json", users)
+            decisions = pending(dataset, args.decisions)
+            for mode in ("single", "bulk"):
+                row = {"users": users, "mode": mode, **asyncio.run(run(dataset, args.backend, decisions, mode == "bulk"))}
+                print(" ".join(
+                    f"{'-':>15}" if row[c] is None
+                    else f"{row[c]:>15}" if isinstance(row[c], str)
+                    else f"{row[c]:>15,}" if isinstance(row[c], int)
+                    else f"{row[c]:>15,.3f}"
+                    for c in columns
+                ))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
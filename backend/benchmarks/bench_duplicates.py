@@ -0,0 +1,68 @@
+"""
+Near-duplicate detection: full rescan time by worker count, and the cost
+of checking one new submission.
+
+Synthetic submissions get criterion responses stitched from random
+Arabic/English sentences; a share of them copy another applicant's
+response with a few words changed, so LSH has real pairs to find.
+
+    python -m benchmarks.bench_duplicates [--submissions 2000,20000] [--workers 1,2,4] [--copies 0.05]
+"""
+
+import argparse
+import os
+import random
+import time
+
+from app.rag.near_duplicates import DuplicateIndex
+from benchmarks.datasets import REASONS
+
+CRITERIA = ("proj-design", "proj-execution", "proj-results", "proj-sustainability")
+WORDS = " ".join(REASONS).split()
+
+
+def make_response(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 160)))
+
+
+def make_users(n: int, copies: float, rng: random.Random) -> list[dict]:
+    users = []
+    for user_id in range(1, n + 1):
+        responses = {c: make_response(rng) for c in CRITERIA}
+        if users and rng.random() < copies:
+            source = rng.choice(users)["submissions"]["project"]["data"]["criteriaResponses"]
+            words = source[rng.choice(CRITERIA)]["text"].split()
+            for _ in range(max(1, len(words) // 40)):
+                words[rng.randrange(len(words))] = rng.choice(WORDS)
+            responses[rng.choice(CRITERIA)] = " ".join(words)
+        form = {"criteriaResponses": {c: {"text": t, "files": []} for c, t in responses.items()}}
+        users.append({"id": user_id, "submissions": {"project": {"data": form}}})
+    return users
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--submissions", default="2000,20000")
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}")
+    parser.add_argument("--copies", type=float, default=0.05)
+    args = parser.parse_args()
+
+    columns = ["submissions", "workers", "responses", "pairs", "rescan_s", "add_ms"]
+    print(" ".join(f"{c:>12}" for c in columns))
+    for n in (int(s) for s in args.submissions.split(",")):
+        rng = random.Random(0)
+        users = make_users(n, args.copies, rng)
+        for workers in dict.fromkeys(int(w) for w in args.workers.split(",")):
+            index = DuplicateIndex(workers=workers)
+            row = {"submissions": n, "workers": workers, **index.rescan(users)}
+            row["rescan_s"] = row.pop("seconds")
+            extra = make_users(50, 1.0, rng)[1:]
+            start = time.perf_counter()
+            for user in extra:
+                index.add_submission(n + user["id"], "project", user["submissions"]["project"]["data"])
+            row["add_ms"] = (time.perf_counter() - start) * 1e3 / len(extra)
+            print(" ".join(f"{row[c]:>12,}" if isinstance(row[c], int) else f"{row[c]:>12,.2f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Application export: throughput and memory of the streaming formats.
+
+A synthetic dataset (see :mod:`benchmarks.datasets`) is loaded into a
+`UserStore` and exported through `export_applications` without keeping
+the output. Peak memory is what the export allocates on top of the
+loaded store, measured with tracemalloc in a second, untimed pass. It
+should stay flat as users grow, while the whole export (`output_mb`) is
+what building it in memory would take.
+
+    python -m benchmarks.bench_export [--sizes 10000,100000] [--formats ndjson,csv,xlsx]
+"""
+
+import argparse
+import asyncio
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from app.services.export import export_applications, user_rows
+from app.services.user_store import UserStore
+from benchmarks.datasets import write_dataset
+
+
+async def count_rows(store: UserStore) -> int:
+    return sum([sum(1 for user in users for _ in user_rows(user)) async for users in store.scan()])
+
+
+async def drain(store: UserStore, fmt: str) -> tuple[int, int]:
+    size = chunks = 0
+    async for chunk in export_applications(store, fmt):
+        size += len(chunk)
+        chunks += 1
+    return size, chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--formats", default="ndjson,csv,xlsx")
+    args = parser.parse_args()
+
+    columns = ["users", "format", "seconds", "rows_per_s", "output_mb", "chunks", "peak_mb"]
+    print(" ".join(f"{c:>12}" for c in columns))
+    for users in (int(s) for s in args.sizes.split(",")):
+        workdir = Path(tempfile.mkdtemp(prefix="bench-export-"))
+        try:
+            store = UserStore(write_dataset(workdir / "users.json", users))
+            rows = asyncio.run(count_rows(store))
+            for fmt in args.formats.split(","):
+                start = time.perf_counter()
+                size, chunks = asyncio.run(drain(store, fmt))
+                elapsed = time.perf_counter() - start
+                tracemalloc.start()
+                asyncio.run(drain(store, fmt))
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                row = {
+                    "users": users, "format": fmt, "seconds": elapsed, "rows_per_s": rows / elapsed,
+                    "output_mb": size / 2**20, "chunks": chunks, "peak_mb": peak / 2**20,
+                }
+                print(" ".join(
+                    f"{row[c]:>12}" if isinstance(row[c], str)
+                    else f"{row[c]:>12,}" if isinstance(row[c], int)
+                    else f"{row[c]:>12,.2f}"
+                    for c in columns
+                ))
+            store.close()
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+LLM review queue: naive one-completion-per-response calls vs the batched,
+rate-limited, cached `ReviewService`, against the fake provider.
+
+The provider (`benchmarks.fake_llm`) runs in-process with a fixed latency
+per completion and answers 429 beyond `--provider-concurrency`
+completions in flight. The naive client fires every response at once and
+retries 429s after `Retry-After`; the service batches and stays under
+its own concurrency limit. A second pass over the same responses shows
+the cache.
+
+    python -m benchmarks.bench_llm_review [--responses 200] [--latency 0.2] [--batch-size 8]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+
+import httpx
+
+from app.rag.llm_review import SYSTEM_PROMPT, ReviewRequest, ReviewService
+from benchmarks.datasets import REASONS
+from benchmarks.fake_llm import create_app
+
+BASE_URL = "http://fake-llm"
+
+
+def make_requests(n: int, rng: random.Random) -> list[ReviewRequest]:
+    words = " ".join(REASONS).split()
+    return [
+        ReviewRequest(f"crit-{i % 5}", 20, " ".join(rng.choice(words) for _ in range(rng.randint(40, 300))))
+        for i in range(n)
+    ]
+
+
+async def naive(requests: list[ReviewRequest], transport: httpx.AsyncBaseTransport) -> None:
+    async with httpx.AsyncClient(base_url=BASE_URL, transport=transport, timeout=60) as client:
+
+        async def one(request: ReviewRequest) -> None:
+            item = {"id": 0, "criterionId": request.criterion_id, "maxPoints": request.max_points, "text": request.text}
+            body = {"messages": [{"role": "system", "content": SYSTEM_PROMPT},
+                                 {"role": "user", "content": json.dumps({"responses": [item]})}]}
+            while True:
+                res = await client.post("/chat/completions", json=body)
+                if res.status_code != 429:
+                    res.raise_for_status()
+                    return
+                await asyncio.sleep(float(res.headers.get("retry-after", "0.1")))
+
+        await asyncio.gather(*(one(r) for r in requests))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--responses", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--provider-concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    requests = make_requests(args.responses, random.Random(0))
+
+    columns = ["run", "seconds", "completions", "rate_limited", "tokens"]
+    print(" ".join(f"{c:>14}" for c in columns))
+
+    def report(run: str, seconds: float, stats: dict, tokens: int) -> None:
+        row = [run, f"{seconds:.2f}", stats["requests"], stats["rate_limited"], tokens]
+        print(" ".join(f"{v:>14}" for v in row))
+
+    provider = create_app(args.latency, args.provider_concurrency)
+    start = time.perf_counter()
+    asyncio.run(naive(requests, httpx.ASGITransport(app=provider)))
+    report("naive", time.perf_counter() - start, provider.state.stats, 0)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        provider = create_app(args.latency, args.provider_concurrency)
+        service = ReviewService(
+            cache_dir=cache_dir,
+            base_url=BASE_URL,
+            batch_size=args.batch_size,
+            max_concurrency=args.concurrency,
+            transport=httpx.ASGITransport(app=provider),
+        )
+        for run in ("service", "service, cached"):
+            start = time.perf_counter()
+            asyncio.run(service.review(requests))
+            report(run, time.perf_counter() - start, dict(provider.state.stats), service.stats["tokens"])
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
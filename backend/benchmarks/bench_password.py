@@ -0,0 +1,58 @@
+"""
+Password verification throughput: logins/sec per core and with the pool.
+
+For each scrypt cost the single-call latency is measured inline, then
+`--logins` concurrent verifications are pushed through a `PasswordHasher`
+with 1..N worker processes. `per_core` should stay close to
+`1000 / verify_ms`; if it drops, the pool (pickling, queueing) is the
+bottleneck rather than scrypt itself.
+
+    python -m benchmarks.bench_password [--costs 14,15] [--workers 1,2,4] [--logins 200]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from app.core.security import PasswordHasher, hash_password, verify_password
+
+
+async def _pool_rate(n: int, workers: int, logins: int) -> float:
+    hasher = PasswordHasher(n=n, workers=workers, max_pending=4 * workers)
+    try:
+        stored = await hasher.hash("password123")
+        # Start every worker process before timing.
+        await asyncio.gather(*(hasher.verify(stored, "password123") for _ in range(workers)))
+        start = time.perf_counter()
+        await asyncio.gather(*(hasher.verify(stored, "password123") for _ in range(logins)))
+        return logins / (time.perf_counter() - start)
+    finally:
+        hasher.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--costs", default="14,15", help="log2 of the scrypt N parameter")
+    parser.add_argument("--workers", default=",".join(str(w) for w in sorted({1, 2, os.cpu_count() or 1})))
+    parser.add_argument("--logins", type=int, default=200)
+    args = parser.parse_args()
+
+    columns = ["log2_n", "workers", "verify_ms", "logins_per_s", "per_core"]
+    print(" ".join(f"{c:>13}" for c in columns))
+    for log_n in (int(c) for c in args.costs.split(",")):
+        n = 2**log_n
+        stored = hash_password("password123", n, 8, 1)
+        start = time.perf_counter()
+        for _ in range(5):
+            verify_password(stored, "password123")
+        verify_ms = (time.perf_counter() - start) / 5 * 1e3
+
+        for workers in (int(w) for w in args.workers.split(",")):
+            rate = asyncio.run(_pool_rate(n, workers, args.logins))
+            row = [log_n, workers, f"{verify_ms:.1f}", f"{rate:.1f}", f"{rate / workers:.1f}"]
+            print(" ".join(f"{v:>13}" for v in row))
+
+
+if __name__ == "__main__":
+    main()
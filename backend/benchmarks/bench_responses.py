@@ -0,0 +1,98 @@
+"""
+Response serialization: FastAPI's default path vs :mod:`app.api.responses`.
+
+Payloads are built from a synthetic dataset (see :mod:`benchmarks.datasets`),
+using its most draft-heavy applicants, the way each endpoint builds them,
+and encoded both ways:
+
+- before: what FastAPI does with a returned dict. For routes with a
+          `response_model` it validates the dict against the model, then
+          dumps it. For other routes it runs `jsonable_encoder`, then
+          `JSONResponse` renders the result.
+- after:  `json_response`, which encodes the trusted dict once (orjson
+          when installed)
+
+Times are per response, in microseconds. The rest of the request (routing,
+dependencies, the store lookup) is the same for both.
+
+    python -m benchmarks.bench_responses [--users 1000] [--repeat 500]
+"""
+
+import argparse
+import asyncio
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.api.responses import json_response, orjson
+from app.api.v1.endpoints.auth import UserResponse, registration_page, user_response
+from app.services.user_store import UserStore
+from benchmarks.datasets import write_dataset
+
+
+def per_call_us(fn: Callable[[], Any], repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def payloads(store: UserStore) -> dict[str, tuple[Any, Callable[[Any], bytes]]]:
+    """Endpoint → (payload, FastAPI's encoding of it)."""
+    heaviest = max(store, key=lambda user: len(json.dumps(user.get("draft") or {}, ensure_ascii=False)))
+    draft_key = max(heaviest["draft"], key=lambda key: len(json.dumps(heaviest["draft"][key], ensure_ascii=False)))
+    user_adapter = TypeAdapter(UserResponse)
+
+    def model_route(payload):
+        return user_adapter.dump_json(user_adapter.validate_python(payload))
+
+    def dict_route(payload):
+        return JSONResponse(jsonable_encoder(payload)).body
+
+    page = asyncio.run(registration_page(store, "waiting-approval", None, None, None, None, 100))
+    return {
+        "GET /auth/me/{id}": (user_response(heaviest), model_route),
+        "GET /auth/draft/{id}/{key}": ({"key": draft_key, "version": 3, "draft": heaviest["draft"][draft_key]}, dict_route),
+        "GET /auth/admin/registrations": (page, dict_route),
+        "GET /auth/admin/pending-registrations": (
+            {"pending": page["items"], "total": page["total"], "nextCursor": page["nextCursor"]}, dict_route
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"encoder: {'orjson ' + orjson.__version__ if orjson else 'json (stdlib)'}")
+    columns = ["endpoint", "payload_kb", "before_us", "after_us", "speedup"]
+    print(f"{columns[0]:<40}" + " ".join(f"{c:>12}" for c in columns[1:]))
+    workdir = Path(tempfile.mkdtemp(prefix="bench-responses-"))
+    try:
+        store = UserStore(write_dataset(workdir / "users.json", args.users))
+        for endpoint, (payload, before) in payloads(store).items():
+            body = json_response(payload).body
+            assert json.loads(body) == json.loads(before(payload)), endpoint
+            before_us = per_call_us(lambda: before(payload), args.repeat)
+            after_us = per_call_us(lambda: json_response(payload).body, args.repeat)
+            print(
+                f"{endpoint:<40}{len(body) / 1024:>12,.1f} {before_us:>12,.1f} {after_us:>12,.1f}"
+                f" {before_us / after_us:>11,.1f}x"
+            )
+        store.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
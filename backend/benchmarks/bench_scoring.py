@@ -0,0 +1,86 @@
+"""
+Scoring: cost of one score change with the incremental leaderboard vs
+recomputing the category from its score array.
+
+A category is filled with random scores from several judges, then single
+criterion scores are changed one at a time. "incremental" is
+`CategoryBoard.set` plus reading the entry's standing; "recompute" is
+the full vectorized pass (weighted totals, means and a sort) that the
+incremental update avoids. Reading the judge-normalized leaderboard after
+a change costs one vectorized z-score pass over the category.
+
+    python -m benchmarks.bench_scoring [--entries 1000,10000] [--judges 7] [--changes 2000]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.services.scoring import CategoryBoard
+
+CATEGORY = "knowledge"
+
+
+def fill(entries: int, judges: int, rng: random.Random) -> CategoryBoard:
+    board = CategoryBoard(CATEGORY)
+    high = board.high.tolist()
+    for user_id in range(1, entries + 1):
+        for judge in rng.sample(range(judges), k=3):
+            board.set(user_id, f"judge-{judge}", [(c, float(rng.randint(0, int(h)))) for c, h in enumerate(high)])
+    return board
+
+
+def recompute(board: CategoryBoard) -> np.ndarray:
+    n_entries, n_judges = len(board.user_ids), len(board.judges)
+    scores = board.scores[:n_entries, :n_judges]
+    totals = np.where(np.isnan(scores).all(axis=2), np.nan, np.nansum(scores * board.weights, axis=2))
+    return np.argsort(-np.nanmean(totals, axis=1), kind="stable")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", default="1000,10000")
+    parser.add_argument("--judges", type=int, default=7)
+    parser.add_argument("--changes", type=int, default=2000)
+    args = parser.parse_args()
+
+    columns = ["entries", "build_s", "incremental_us", "recompute_us", "normalized_us"]
+    print(" ".join(f"{c:>15}" for c in columns))
+    for entries in (int(s) for s in args.entries.split(",")):
+        rng = random.Random(0)
+        start = time.perf_counter()
+        board = fill(entries, args.judges, rng)
+        row = {"entries": entries, "build_s": time.perf_counter() - start}
+
+        changes = []
+        for _ in range(args.changes):
+            user_id = rng.randint(1, entries)
+            entry = board._entry[user_id]
+            judge = board.judges[int(np.flatnonzero(~np.isnan(board.totals[entry, : len(board.judges)]))[0])]
+            column = rng.randrange(len(board.criteria))
+            changes.append((user_id, judge, column, float(rng.randint(0, int(board.high[column])))))
+
+        start = time.perf_counter()
+        for user_id, judge, column, value in changes:
+            board.set(user_id, judge, [(column, value)])
+            board.standing(user_id)
+        row["incremental_us"] = (time.perf_counter() - start) * 1e6 / len(changes)
+
+        repeat = max(1, min(200, args.changes // 10))
+        start = time.perf_counter()
+        for _ in range(repeat):
+            recompute(board)
+        row["recompute_us"] = (time.perf_counter() - start) * 1e6 / repeat
+
+        start = time.perf_counter()
+        for user_id, judge, column, value in changes[:repeat]:
+            board.set(user_id, judge, [(column, value + 0.5 if value < board.high[column] else value - 0.5)])
+            board.leaderboard(limit=10, normalized=True)
+        row["normalized_us"] = (time.perf_counter() - start) * 1e6 / repeat
+        print(" ".join(f"{row[c]:>15,}" if isinstance(row[c], int) else f"{row[c]:>15,.2f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
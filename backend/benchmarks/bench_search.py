@@ -0,0 +1,79 @@
+"""
+Admin full-text search: index build time, query latency and update cost.
+
+Synthetic applicants from `benchmarks.datasets` are indexed in memory,
+then a mix of queries (names, ID numbers, common and rare Arabic/English
+words, with and without filters) is timed. Queries should stay under
+50 ms at 100k documents.
+
+    python -m benchmarks.bench_search [--sizes 1000,10000,100000] [--repeat 50]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from app.services.search_index import SearchIndex
+from benchmarks.datasets import make_applicant, make_draft
+
+QUERIES = (
+    {"query": "فاطمة المنصوري"},
+    {"query": "Omar Haddad"},
+    {"query": "إدارة الأصول وخفض التكاليف"},  # in many documents
+    {"query": "asset-tracking project KPI"},
+    {"query": "ترشيد استهلاك الطاقة", "category": "green"},
+    {"query": "applicant", "status": "qualified"},  # matches every document
+)
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    return sorted(samples)[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def bench_size(n: int, repeat: int) -> dict:
+    rng = random.Random(0)
+    users = [make_applicant(i, rng) for i in range(1, n + 1)]
+    index = SearchIndex()
+    start = time.perf_counter()
+    index.load_users(users)
+    row = {"users": n, "documents": len(index), "build_s": time.perf_counter() - start}
+
+    id_number = next(u for u in users if u["draft"])["registrationData"]["idNumber"]
+    queries = QUERIES + ({"query": id_number},)
+    samples = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            index.search(**query)
+            samples.append((time.perf_counter() - start) * 1e3)
+    row["query_p50_ms"] = statistics.median(samples)
+    row["query_p95_ms"] = _percentile(samples, 0.95)
+    row["query_max_ms"] = max(samples)
+
+    # An autosave that changes one category's draft.
+    registered = [u for u in users if u["draft"]][:repeat]
+    start = time.perf_counter()
+    for user in registered:
+        slug = next(iter(user["draft"]))
+        user["draft"][slug] = make_draft(slug, rng, "سارة", "الكتبي")
+        index.put_user(user)
+    row["update_ms"] = (time.perf_counter() - start) * 1e3 / max(1, len(registered))
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    columns = ["users", "documents", "build_s", "query_p50_ms", "query_p95_ms", "query_max_ms", "update_ms"]
+    print(" ".join(f"{c:>13}" for c in columns))
+    for n in (int(s) for s in args.sizes.split(",")):
+        row = bench_size(n, args.repeat)
+        print(" ".join(f"{row[c]:>13,}" if isinstance(row[c], int) else f"{row[c]:>13,.2f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Per-request cost of the user store versus the legacy full load/save.
+
+For each dataset size a synthetic `users.json` is written to a temp dir and
+both access paths are timed:
+
+- legacy: `json.load` the whole file, linear scan, `json.dump` it back
+- store:  `UserStore.get_by_email` (read) and `UserStore.update` (write)
+- burst:  `--burst` concurrent updates to distinct users, showing the
+          per-write cost once the journal writer group-commits them
+
+The store columns should stay flat as the user count grows.
+
+    python -m benchmarks.bench_user_store [--sizes 10,1000,100000] [--legacy-max 10000]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.user_store import UserStore, load_users, save_users
+
+
+def make_user(user_id: int) -> dict:
+    """A registered applicant with a one-category draft, similar to the seed data."""
+    return {
+        "id": user_id,
+        "email": f"user{user_id}@sam.ae",
+        "password": "password123",
+        "registered": True,
+        "applied": False,
+        "appliedCategories": ["project"],
+        "categoryStatuses": {"project": "qualified"},
+        "registrationData": {"category": "project", "firstName": "أحمد", "lastName": "Ali"},
+        "draft": {
+            "project": {
+                "selectedCategory": "project",
+                "answers": {"proj-completed": "yes", "proj-kpi": "yes"},
+                "nominationReason": "مشروع لتحسين كفاءة إدارة الأصول " * 8,
+            }
+        },
+        "submissions": {},
+    }
+
+
+def _timed(fn, repeat: int) -> float:
+    """Median wall time of `fn` in microseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def _timed_async(fn, repeat: int) -> float:
+    """Median wall time of awaiting `fn()` in microseconds, on one event loop."""
+    async def run():
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await fn()
+            samples.append((time.perf_counter() - start) * 1e6)
+        return statistics.median(samples)
+
+    return asyncio.run(run())
+
+
+def bench_size(n: int, repeat: int, legacy: bool, burst: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "users.json"
+        save_users(path, {"users": [make_user(i) for i in range(1, n + 1)]})
+        target = n // 2 + 1
+        email = f"user{target}@sam.ae"
+        row = {"users": n}
+
+        if legacy:
+            def legacy_read():
+                users = load_users(path)["users"]
+                next(u for u in users if u["email"] == email)
+
+            def legacy_write():
+                db = load_users(path)
+                user = next(u for u in db["users"] if u["id"] == target)
+                user["applied"] = not user["applied"]
+                save_users(path, db)
+
+            row["legacy_read_us"] = _timed(legacy_read, max(1, repeat // 20))
+            row["legacy_write_us"] = _timed(legacy_write, max(1, repeat // 20))
+
+        start = time.perf_counter()
+        store = UserStore(path, compact_threshold=10 ** 9)
+        row["store_load_ms"] = (time.perf_counter() - start) * 1e3
+
+        def store_read():
+            return store.get_by_email(email)
+
+        def toggle(user):
+            user["applied"] = not user["applied"]
+
+        def store_write():
+            return store.update(target, toggle)
+
+        async def store_burst():
+            ids = [1 + (i * 7919) % n for i in range(burst)]
+            await asyncio.gather(*(store.update(i, toggle) for i in ids))
+
+        row["store_read_us"] = _timed_async(store_read, repeat)
+        row["store_write_us"] = _timed_async(store_write, repeat)
+        commits = store._writer.commits
+        row["burst_write_us"] = _timed_async(store_burst, 5) / burst
+        row["records_per_fsync"] = burst * 5 / (store._writer.commits - commits)
+        store.close()
+        return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10,100,1000,10000,100000")
+    parser.add_argument("--legacy-max", type=int, default=10000, help="skip the legacy path above this size")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--burst", type=int, default=256, help="concurrent writes per burst")
+    args = parser.parse_args()
+
+    # Times are medians; *_us is microseconds per request.
+    columns = [
+        "users", "legacy_read_us", "legacy_write_us", "store_load_ms",
+        "store_read_us", "store_write_us", "burst_write_us", "records_per_fsync",
+    ]
+    print(" ".join(f"{c:>17}" for c in columns))
+    for n in (int(s) for s in args.sizes.split(",")):
+        row = bench_size(n, args.repeat, legacy=n <= args.legacy_max, burst=args.burst)
+        print(" ".join(f"{row[c]:>17,}" if c == "users" else f"{row[c]:>17,.1f}" if c in row else f"{'-':>17}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Synthetic applicant datasets shaped like `data/users.json`.
+
+Users get bilingual registration data, one to three category drafts with
+Arabic/English free text, and a mix of registration states (none yet,
+waiting for approval, qualified, submitted) so the admin listings and the
+write paths all have realistic work to do. Generation is seeded and
+streamed to disk, so 100k users need little memory.
+
+    python -m benchmarks.datasets --users 10000 --out /tmp/users.json [--sqlite /tmp/app.db]
+
+Every applicant can log in with `applicant{id}@example.ae` / `password{id}`.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from pathlib import Path
+
+from app.db.importer import import_users
+from app.db.session import create_engine
+
+CATEGORY_SLUGS = (
+    "department",
+    "project",
+    "green",
+    "knowledge",
+    "employee-nonsupervisory-administrative",
+    "employee-nonsupervisory-specialist",
+    "employee-nonsupervisory-technical",
+    "employee-nonsupervisory-customerservice",
+    "employee-nonsupervisory-unsung",
+    "employee-supervisory-leader",
+    "employee-supervisory-futureleader",
+)
+
+FIRST_NAMES = ("أحمد", "محمد", "فاطمة", "مريم", "خالد", "سارة", "عبدالله", "نورة", "Omar", "Aisha", "Yousef", "Layla")
+LAST_NAMES = ("المنصوري", "الشامسي", "الكتبي", "النعيمي", "السويدي", "Al Hammadi", "Al Marzouqi", "Haddad")
+JOB_TITLES = ("مهندس مشاريع", "أخصائي موارد بشرية", "محلل بيانات", "Project Manager", "Customer Service Lead")
+DEPARTMENTS = ("إدارة الأصول", "الشؤون المالية", "تقنية المعلومات", "Facilities Management", "Strategy & Excellence")
+REASONS = (
+    "قاد المرشح مبادرة لتحسين كفاءة إدارة الأصول وخفض التكاليف التشغيلية بنسبة ملحوظة خلال العام.",
+    "ساهم في رقمنة الإجراءات الداخلية وتقليل زمن إنجاز المعاملات للمتعاملين.",
+    "Delivered the asset-tracking project on time and under budget, with measurable KPI improvements.",
+    "Introduced a knowledge-sharing programme adopted by three departments across SAM.",
+    "تبنّى ممارسات خضراء لترشيد استهلاك الطاقة والمياه في مرافق المؤسسة.",
+)
+ANSWER_KEYS = {
+    "project": ("proj-completed", "proj-duration", "proj-charter", "proj-kpi"),
+    "department": ("dept-structure", "dept-kpi", "dept-plan"),
+    "green": ("green-initiative", "green-impact"),
+    "knowledge": ("km-policy", "km-platform"),
+    "employee": ("spec-years", "spec-qualification", "spec-no-supervisory", "cs-external"),
+}
+
+
+def _base_category(slug: str) -> str:
+    return slug.split("-", 1)[0]
+
+
+def make_draft(slug: str, rng: random.Random, first: str, last: str) -> dict:
+    """One category's form draft, filled to a random degree."""
+    base = _base_category(slug)
+    group, _, subcat = slug.partition("-")[2].partition("-")
+    filled = rng.random()
+    draft = {
+        "selectedCategory": base,
+        "employeeGroup": group or None,
+        "employeeSubcat": subcat,
+        "answers": {key: rng.choice(("yes", "no")) for key in ANSWER_KEYS[base] if rng.random() < filled},
+        "nominationReason": " ".join(rng.sample(REASONS, k=rng.randint(1, 3))) if filled > 0.3 else "",
+        "firstName": first,
+        "lastName": last,
+        "jobTitle": rng.choice(JOB_TITLES),
+        "idNumber": f"784{rng.randint(10**11, 10**12 - 1)}",
+        "mobile": f"+97150{rng.randint(1000000, 9999999)}",
+        "email": "",
+        "department": rng.choice(DEPARTMENTS),
+    }
+    if base in ("project", "department"):
+        draft["projectTeamMembers"] = [
+            {"name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", "title": rng.choice(JOB_TITLES)}
+            for _ in range(rng.randint(1, 5))
+        ]
+    return draft
+
+
+def make_applicant(user_id: int, rng: random.Random) -> dict:
+    """A synthetic user; roughly a quarter have not registered for anything yet."""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    email = f"applicant{user_id}@example.ae"
+    user = {
+        "id": user_id,
+        "email": email,
+        "password": f"password{user_id}",
+        "registered": False,
+        "applied": False,
+        "appliedCategories": [],
+        "categoryStatuses": {},
+        "categoryRegisteredAt": {},
+        "draft": None,
+        "submissions": {},
+    }
+    state = rng.random()
+    if state < 0.25:
+        return user
+
+    slugs = rng.sample(CATEGORY_SLUGS, k=rng.randint(1, 3))
+    user["draft"] = {slug: make_draft(slug, rng, first, last) for slug in slugs}
+    user["draft"][slugs[0]]["email"] = email
+    user["registered"] = True
+    user["registrationData"] = {
+        "category": _base_category(slugs[0]),
+        "firstName": first,
+        "lastName": last,
+        "idNumber": user["draft"][slugs[0]]["idNumber"],
+        "mobile": user["draft"][slugs[0]]["mobile"],
+        "email": email,
+    }
+    for slug in slugs[:2]:
+        day = rng.randint(1, 28)
+        user["appliedCategories"].append(slug)
+        user["categoryStatuses"][slug] = "waiting-approval" if state < 0.6 else "qualified"
+        user["categoryRegisteredAt"][slug] = (
+            f"2026-02-{day:02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00.000Z"
+        )
+    if state > 0.85:
+        slug = user["appliedCategories"][0]
+        user["applied"] = True
+        user["submissions"][slug] = {
+            "referenceNumber": f"SAM-{user_id:07d}",
+            "submittedAt": "2026-03-01T09:00:00.000Z",
+        }
+    return user
+
+
+def write_dataset(path: Path, users: int, seed: int = 0) -> Path:
+    """Write a `users.json` with `users` synthetic applicants."""
+    rng = random.Random(seed)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"users": [\n')
+        for user_id in range(1, users + 1):
+            if user_id > 1:
+                f.write(",\n")
+            f.write(json.dumps(make_applicant(user_id, rng), ensure_ascii=False))
+        f.write("\n]}\n")
+    return path
+
+
+async def import_dataset(json_path: Path, database_url: str) -> int:
+    """Load a dataset file into a (new) SQL database."""
+    engine = create_engine(database_url)
+    try:
+        return await import_users(engine, json_path)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, required=True)
+    parser.add_argument("--sqlite", type=Path, help="also import into this SQLite file")
+    args = parser.parse_args()
+
+    write_dataset(args.out, args.users, args.seed)
+    print(f"Wrote {args.users} users to {args.out}")
+    if args.sqlite:
+        count = asyncio.run(import_dataset(args.out, f"sqlite+aiosqlite:///{args.sqlite}"))
+        print(f"Imported {count} users into {args.sqlite}")
+
+
+if __name__ == "__main__":
+    main()
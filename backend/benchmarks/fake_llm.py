@@ -0,0 +1,93 @@
+"""
+A local stand-in for an OpenAI-compatible chat completions API.
+
+`POST /chat/completions` answers the review prompt of
+`app.rag.llm_review` deterministically: every response in the request
+gets a score proportional to its length (capped at its points) and a
+one-line comment, after `latency` seconds. It can also misbehave like a
+real provider: 429 with `Retry-After` beyond `max_concurrency` requests
+in flight, and a 500 on every `fail_every`-th request. Counters are in
+`app.state.stats` and at `GET /stats`.
+
+In-process (tests): `httpx.ASGITransport(app=create_app())`. As a server
+(benchmarks):
+
+    python -m benchmarks.fake_llm [--port 8100] [--latency 0.2] [--max-concurrency 8]
+
+then point `OPENAI_BASE_URL` at `http://127.0.0.1:8100`.
+"""
+
+import argparse
+import asyncio
+import json
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def review(item: dict) -> dict:
+    words = len(str(item.get("text", "")).split())
+    max_points = int(item.get("maxPoints") or 0)
+    return {"id": item.get("id"), "score": min(max_points, max_points * words // 150), "comments": f"{words} words."}
+
+
+def create_app(latency: float = 0.0, max_concurrency: int = 0, fail_every: int = 0) -> FastAPI:
+    app = FastAPI(title="Fake LLM provider")
+    app.state.stats = {"requests": 0, "items": 0, "rate_limited": 0, "failed": 0, "in_flight": 0, "peak": 0}
+    stats = app.state.stats
+
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        if fail_every and stats["requests"] % fail_every == 0:
+            stats["failed"] += 1
+            return JSONResponse({"error": {"message": "Injected failure"}}, status_code=500)
+        if max_concurrency and stats["in_flight"] >= max_concurrency:
+            stats["rate_limited"] += 1
+            return JSONResponse({"error": {"message": "Rate limited"}}, status_code=429, headers={"Retry-After": "0.05"})
+        stats["in_flight"] += 1
+        stats["peak"] = max(stats["peak"], stats["in_flight"])
+        try:
+            if latency:
+                await asyncio.sleep(latency)
+            prompt = json.loads(body["messages"][-1]["content"])
+            reviews = [review(item) for item in prompt["responses"]]
+        finally:
+            stats["in_flight"] -= 1
+        stats["items"] += len(reviews)
+        content = json.dumps({"reviews": reviews}, ensure_ascii=False)
+        prompt_tokens = sum(len(m["content"]) for m in body["messages"]) // 3
+        return {
+            "object": "chat.completion",
+            "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(content) // 3,
+                "total_tokens": prompt_tokens + len(content) // 3,
+            },
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--fail-every", type=int, default=0)
+    args = parser.parse_args()
+    app = create_app(args.latency, args.max_concurrency, args.fail_every)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+Load test for the auth API against synthetic datasets.
+
+For each dataset size a fresh dataset is generated (see
+:mod:`benchmarks.datasets`) and every scenario is driven by `--concurrency`
+workers until `--requests` requests have completed:
+
+- login                   POST /auth/login
+- me                      GET  /auth/me/{id}
+- draft_save              POST /auth/draft/{id}
+- complete_registration   POST /auth/complete-registration/{id}
+- submit_application      POST /auth/submit-application/{id}
+- admin_pending           GET  /auth/admin/pending-registrations?limit=50
+
+Modes:
+
+- inprocess: httpx over ASGI, no network; measures the application itself
+- uvicorn:   a local `uvicorn app.main:app` subprocess over HTTP
+
+Throughput and p50/p95/p99 latencies are printed and can be written as
+JSON; `--baseline` compares against a saved run and exits 1 when a
+scenario's p95 or throughput regressed by more than `--tolerance`.
+
+    python -m benchmarks.load --sizes 1000,10000 --mode inprocess --output results.json
+    python -m benchmarks.load --sizes 1000 --mode uvicorn --backend sqlite --baseline results.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+import httpx
+
+from benchmarks.datasets import CATEGORY_SLUGS, import_dataset, make_draft, write_dataset
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+API = "/auth"  # relative to the clients' /api/v1 base URL
+
+SCENARIOS = (
+    "login",
+    "me",
+    "draft_save",
+    "complete_registration",
+    "submit_application",
+    "admin_pending",
+)
+
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def scenario_requests(users: int) -> dict[str, Request]:
+    """One request factory per scenario; `i` is the request's sequence number."""
+    rng = random.Random(1)
+    drafts = [make_draft(slug, rng, "مريم", "Haddad") for slug in CATEGORY_SLUGS]
+
+    def user_for(i: int) -> int:
+        # Spread requests over the whole dataset rather than a hot few users.
+        return 1 + (i * 7919) % users
+
+    async def login(client, i):
+        user_id = user_for(i)
+        return await client.post(
+            f"{API}/login", json={"email": f"applicant{user_id}@example.ae", "password": f"password{user_id}"}
+        )
+
+    async def me(client, i):
+        return await client.get(f"{API}/me/{user_for(i)}")
+
+    async def draft_save(client, i):
+        slug = CATEGORY_SLUGS[i % len(CATEGORY_SLUGS)]
+        return await client.post(f"{API}/draft/{user_for(i)}", json={"data": {slug: drafts[i % len(drafts)]}})
+
+    async def complete_registration(client, i):
+        # Each (user, category) pair can register once, and dataset users
+        # already hold real categories, so every pass uses a fresh slug.
+        slug = f"bench-{i // users}"
+        return await client.post(
+            f"{API}/complete-registration/{1 + i % users}",
+            json={"categorySlug": slug, "data": {}, "status": "waiting-approval"},
+        )
+
+    async def submit_application(client, i):
+        slug = CATEGORY_SLUGS[i % len(CATEGORY_SLUGS)]
+        return await client.post(
+            f"{API}/submit-application/{user_for(i)}",
+            json={"categorySlug": slug, "referenceNumber": f"BENCH-{i:08d}", "submittedAt": "2026-03-01T09:00:00.000Z"},
+        )
+
+    async def admin_pending(client, i):
+        return await client.get(f"{API}/admin/pending-registrations", params={"limit": 50})
+
+    return {
+        "login": login,
+        "me": me,
+        "draft_save": draft_save,
+        "complete_registration": complete_registration,
+        "submit_application": submit_application,
+        "admin_pending": admin_pending,
+    }
+
+
+def percentile(sorted_samples: list[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    if not sorted_samples:
+        return float("nan")
+    rank = max(1, min(len(sorted_samples), math.ceil(q / 100 * len(sorted_samples))))
+    return sorted_samples[rank - 1]
+
+
+async def drive(client: httpx.AsyncClient, request: Request, total: int, concurrency: int, offset: int = 0) -> dict:
+    """Run `total` requests with `concurrency` workers; latency stats in ms."""
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(offset, offset + total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                res = await request(client, i)
+                ok = res.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append((time.perf_counter() - start) * 1e3)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+# ── Targets ──
+
+
+def _database_url(workdir: Path) -> str:
+    return f"sqlite+aiosqlite:///{workdir / 'app.db'}"
+
+
+@asynccontextmanager
+async def inprocess_client(dataset: Path, backend: str, workdir: Path) -> AsyncIterator[httpx.AsyncClient]:
+    from app.api.deps import get_job_queue, get_login_limiter, get_user_store
+    from app.core.rate_limit import LoginLimiter, TokenBuckets
+    from app.db.session import create_engine
+    from app.main import app
+    from app.services.jobs import JobQueue
+    from app.services.sql_user_store import SqlUserStore
+    from app.services.user_store import UserStore
+
+    if backend == "sqlite":
+        await import_dataset(dataset, _database_url(workdir))
+        store = SqlUserStore(create_engine(_database_url(workdir)))
+    else:
+        store = await asyncio.to_thread(UserStore, dataset)
+    # Submissions queue evidence indexing; keep those jobs out of data/.
+    jobs = JobQueue(workdir / "jobs.sqlite3")
+    app.dependency_overrides[get_user_store] = lambda: store
+    app.dependency_overrides[get_job_queue] = lambda: jobs
+    # Every simulated user logs in from the same address, many times.
+    unlimited = LoginLimiter(ip=TokenBuckets(0, 0), email=TokenBuckets(0, 0))
+    app.dependency_overrides[get_login_limiter] = lambda: unlimited
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench/api/v1") as client:
+            yield client
+    finally:
+        app.dependency_overrides.pop(get_user_store, None)
+        app.dependency_overrides.pop(get_job_queue, None)
+        app.dependency_overrides.pop(get_login_limiter, None)
+        await store.aclose()
+        jobs.close()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@asynccontextmanager
+async def uvicorn_client(dataset: Path, backend: str, workdir: Path) -> AsyncIterator[httpx.AsyncClient]:
+    env = dict(
+        os.environ,
+        USERS_DB_PATH=str(dataset),
+        DATABASE_URL="",
+        SLOW_REQUEST_MS="0",
+        JOBS_DB_PATH=str(workdir / "jobs.sqlite3"),
+        LOGIN_IP_PER_MINUTE="0",
+        LOGIN_EMAIL_PER_MINUTE="0",
+    )
+    if backend == "sqlite":
+        await import_dataset(dataset, _database_url(workdir))
+        env["DATABASE_URL"] = _database_url(workdir)
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        limits = httpx.Limits(max_connections=256, max_keepalive_connections=256)
+        async with httpx.AsyncClient(base_url=f"{base_url}/api/v1", limits=limits, timeout=60) as client:
+            deadline = time.monotonic() + 120
+            while True:
+                try:
+                    if (await client.get(f"{base_url}/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not start")
+                await asyncio.sleep(0.2)
+            yield client
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+TARGETS = {"inprocess": inprocess_client, "uvicorn": uvicorn_client}
+
+
+async def bench_size(users: int, mode: str, backend: str, scenarios: list[str], total: int, concurrency: int) -> list[dict]:
+    workdir = Path(tempfile.mkdtemp(prefix="bench-load-"))
+    try:
+        dataset = await asyncio.to_thread(write_dataset, workdir / "users.json", users)
+        requests = scenario_requests(users)
+        rows = []
+        async with TARGETS[mode](dataset, backend, workdir) as client:
+            for name in scenarios:
+                # Warm up caches and connections outside the measurement.
+                warmup = min(50, total)
+                await drive(client, requests[name], warmup, concurrency)
+                stats = await drive(client, requests[name], total, concurrency, offset=warmup)
+                row = {"users": users, "mode": mode, "backend": backend, "scenario": name, **stats}
+                rows.append(row)
+                print(_format_row(row), flush=True)
+        return rows
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# ── Reporting ──
+
+COLUMNS = ("users", "mode", "backend", "scenario", "requests", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def _format_row(row: dict) -> str:
+    return " ".join(
+        f"{row[c]:>22}" if c == "scenario" else f"{row[c]:>10,}" if isinstance(row[c], (int, float)) else f"{row[c]:>10}"
+        for c in COLUMNS
+    )
+
+
+def _key(row: dict) -> tuple:
+    return row["users"], row["mode"], row["backend"], row["scenario"]
+
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Human-readable regressions of `results` against `baseline`."""
+    previous = {_key(row): row for row in baseline}
+    regressions = []
+    for row in results:
+        old = previous.get(_key(row))
+        if old is None:
+            continue
+        label = "/".join(str(part) for part in _key(row))
+        if row["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {old['p95_ms']} ms -> {row['p95_ms']} ms")
+        if row["throughput_rps"] < old["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{label}: throughput {old['throughput_rps']} -> {row['throughput_rps']} req/s")
+        if row["errors"] > old["errors"]:
+            regressions.append(f"{label}: errors {old['errors']} -> {row['errors']}")
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--mode", choices=sorted(TARGETS), default="inprocess")
+    parser.add_argument("--backend", choices=("json", "sqlite"), default="json")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="compare against a previous --output")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression ratio (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    print(" ".join(f"{c:>22}" if c == "scenario" else f"{c:>10}" for c in COLUMNS))
+    results = []
+    for users in (int(s) for s in args.sizes.split(",")):
+        results += asyncio.run(bench_size(users, args.mode, args.backend, scenarios, args.requests, args.concurrency))
+
+    if args.output:
+        report = {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "concurrency": args.concurrency,
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        matched = len({_key(row) for row in results} & {_key(row) for row in baseline})
+        print(f"No regressions beyond {args.tolerance:.0%} in {matched} scenario(s) found in {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
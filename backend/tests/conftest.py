@@ -2,10 +2,193 @@
 Shared pytest fixtures.
 """
 
+import shutil
+from pathlib import Path
+
 import pytest
 
+SEED_USERS = Path(__file__).resolve().parents[1] / "data" / "users.json"
+
 
 @pytest.fixture
 def app():
     from app.main import app
     return app
+
+
+@pytest.fixture
+def users_path(tmp_path):
+    """A private copy of the seed `users.json`."""
+    path = tmp_path / "users.json"
+    shutil.copy(SEED_USERS, path)
+    return path
+
+
+@pytest.fixture
+def user_store(app, users_path):
+    """Route the auth endpoints to a store over a temporary copy of the seed data."""
+    from app.api.deps import get_user_store
+    from app.services.user_store import UserStore
+
+    store = UserStore(users_path)
+    app.dependency_overrides[get_user_store] = lambda: store
+    yield store
+    app.dependency_overrides.pop(get_user_store, None)
+    store.close()
+
+
+@pytest.fixture(autouse=True)
+def password_hasher(app):
+    """A cheap, in-thread scrypt hasher so tests don't spawn worker processes."""
+    from app.api.deps import get_password_hasher
+    from app.core.security import PasswordHasher
+
+    hasher = PasswordHasher(n=16, r=1, p=1, workers=None)
+    app.dependency_overrides[get_password_hasher] = lambda: hasher
+    yield hasher
+    app.dependency_overrides.pop(get_password_hasher, None)
+
+
+@pytest.fixture(autouse=True)
+def login_limiter(app):
+    """Fresh login rate limits per test, so earlier tests' logins don't count."""
+    from app.api.deps import get_login_limiter
+    from app.core.rate_limit import LoginLimiter, TokenBuckets
+
+    limiter = LoginLimiter(ip=TokenBuckets(60, 20), email=TokenBuckets(5, 10))
+    app.dependency_overrides[get_login_limiter] = lambda: limiter
+    yield limiter
+    app.dependency_overrides.pop(get_login_limiter, None)
+
+
+@pytest.fixture(autouse=True)
+def extraction_service(app, tmp_path):
+    """Text extraction on a background thread, cached under the test's tmp dir."""
+    from app.api.deps import get_extraction_service
+    from app.rag.extraction import ExtractionService
+
+    service = ExtractionService(tmp_path / "extracted", workers=None)
+    app.dependency_overrides[get_extraction_service] = lambda: service
+    yield service
+    app.dependency_overrides.pop(get_extraction_service, None)
+    service.close()
+
+
+@pytest.fixture(autouse=True)
+def upload_service(app, tmp_path_factory):
+    """Uploads stored in a tmp dir of their own."""
+    from app.api.deps import get_upload_service
+    from app.services.uploads import UploadService
+
+    service = UploadService(tmp_path_factory.mktemp("uploads"))
+    app.dependency_overrides[get_upload_service] = lambda: service
+    yield service
+    app.dependency_overrides.pop(get_upload_service, None)
+
+
+@pytest.fixture(autouse=True)
+def evidence_index(app, tmp_path_factory):
+    """An offline evidence index in a tmp dir of its own."""
+    from app.api.deps import get_evidence_index
+    from app.rag.embeddings import HashingEmbedder
+    from app.rag.retrieval import EvidenceIndex
+
+    index = EvidenceIndex(tmp_path_factory.mktemp("vectors"), HashingEmbedder())
+    app.dependency_overrides[get_evidence_index] = lambda: index
+    yield index
+    app.dependency_overrides.pop(get_evidence_index, None)
+    index.close()
+
+
+@pytest.fixture(autouse=True)
+def search_index(app):
+    """A fresh admin search index, so tests don't see each other's users."""
+    from app.api.deps import get_search_index
+    from app.services.search_index import SearchIndex
+
+    index = SearchIndex()
+    app.dependency_overrides[get_search_index] = lambda: index
+    yield index
+    app.dependency_overrides.pop(get_search_index, None)
+
+
+@pytest.fixture(autouse=True)
+def duplicate_index(app):
+    """A fresh near-duplicate index that scans on a thread instead of a process pool."""
+    from app.api.deps import get_duplicate_index
+    from app.rag.near_duplicates import DuplicateIndex
+
+    index = DuplicateIndex(workers=None)
+    app.dependency_overrides[get_duplicate_index] = lambda: index
+    yield index
+    app.dependency_overrides.pop(get_duplicate_index, None)
+
+
+@pytest.fixture
+def fake_llm():
+    """The fake chat completions provider; its counters are in ``fake_llm.state.stats``."""
+    from benchmarks.fake_llm import create_app
+
+    return create_app()
+
+
+@pytest.fixture(autouse=True)
+def review_service(app, fake_llm, tmp_path_factory):
+    """LLM reviews from the in-process fake provider, cached in a temporary directory."""
+    import httpx
+
+    from app.api.deps import get_review_service
+    from app.rag.llm_review import ReviewService
+
+    service = ReviewService(
+        cache_dir=tmp_path_factory.mktemp("reviews"),
+        base_url="http://fake-llm",
+        batch_wait=0.01,
+        backoff=0.01,
+        transport=httpx.ASGITransport(app=fake_llm),
+    )
+    app.dependency_overrides[get_review_service] = lambda: service
+    yield service
+    app.dependency_overrides.pop(get_review_service, None)
+    service.close()
+
+
+@pytest.fixture(autouse=True)
+def scoreboard(app, tmp_path_factory):
+    """Judges' scores persisted under a temporary directory."""
+    from app.api.deps import get_scoreboard
+    from app.services.scoring import Scoreboard
+
+    board = Scoreboard(tmp_path_factory.mktemp("scores") / "scores.json")
+    app.dependency_overrides[get_scoreboard] = lambda: board
+    yield board
+    app.dependency_overrides.pop(get_scoreboard, None)
+    board.close()
+
+
+@pytest.fixture(autouse=True)
+def job_queue(app, tmp_path_factory):
+    """Background jobs in a temporary database, retried without waiting; no workers unless asked for."""
+    from app.api.deps import get_job_queue, get_worker_pools
+    from app.services.jobs import JobQueue
+
+    queue = JobQueue(tmp_path_factory.mktemp("jobs") / "jobs.sqlite3", backoff=0.01)
+    app.dependency_overrides[get_job_queue] = lambda: queue
+    app.dependency_overrides[get_worker_pools] = lambda: ()
+    yield queue
+    app.dependency_overrides.pop(get_job_queue, None)
+    app.dependency_overrides.pop(get_worker_pools, None)
+    queue.close()
+
+
+@pytest.fixture
+def job_workers(app, job_queue, evidence_index, upload_service, extraction_service, review_service):
+    """Workers for every job kind; tests drain the queue with `run_pending()`."""
+    from app.api.deps import get_worker_pools
+    from app.services.jobs import WorkerPool
+    from app.services.tasks import thread_handlers
+
+    pool = WorkerPool(job_queue, thread_handlers(evidence_index, upload_service, extraction_service, review_service))
+    app.dependency_overrides[get_worker_pools] = lambda: (pool,)
+    yield pool
+    pool.close()
@@ -0,0 +1,96 @@
+"""Tests for admission control and login rate limits."""
+
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.core.rate_limit import TokenBuckets
+from app.middleware.admission import AdmissionMiddleware, Gate, Limit, request_class
+
+
+def test_requests_are_classified_by_method_and_path():
+    assert request_class("GET", "/api/v1/categories") == "static"
+    assert request_class("GET", "/api/v1/content/about") == "static"
+    assert request_class("GET", "/api/v1/auth/me/5") == "reads"
+    assert request_class("PATCH", "/api/v1/auth/draft/5/department") == "writes"
+    assert request_class("POST", "/api/v1/auth/login") == "writes"
+    assert request_class("GET", "/api/v1/auth/admin/export") == "admin"
+    assert request_class("PUT", "/api/v1/review/scores/5/project") == "admin"
+    assert request_class("POST", "/api/v1/uploads") == "uploads"
+    for path in ("/health", "/metrics", "/api/v1/health", "/api/v1/auth/admin/registration-events"):
+        assert request_class("GET", path) is None
+
+
+def test_gate_queues_up_to_its_bound_then_sheds():
+    async def scenario():
+        gate = Gate("writes", Limit(concurrency=1, queue=1, timeout=0.2))
+        assert await gate.acquire() is None
+        queued = asyncio.ensure_future(gate.acquire())
+        await asyncio.sleep(0)
+        assert gate.queued == 1
+        assert await gate.acquire() == "queue_full"
+
+        gate.release()  # handed to the waiter; still one running
+        assert await queued is None and gate.running == 1
+        assert await gate.acquire() == "timeout"
+        gate.release()
+        assert gate.running == 0 and gate.queued == 0
+
+    asyncio.run(scenario())
+
+
+def test_saturated_class_gets_fast_503_while_others_proceed():
+    release = asyncio.Event()
+
+    async def slow_app(scope, receive, send):
+        if scope["path"].startswith("/api/v1/auth/draft"):
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    app = AdmissionMiddleware(
+        slow_app,
+        limits={"writes": Limit(1, 1, 5.0), "static": Limit(1, 0, 1.0)},
+        enabled=True,
+    )
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            saves = [asyncio.ensure_future(client.post("/api/v1/auth/draft/1")) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            shed = await client.post("/api/v1/auth/draft/1")
+            static = await client.get("/api/v1/categories")
+            release.set()
+            return shed, static, [await save for save in saves]
+
+    shed, static, saves = asyncio.run(scenario())
+    assert shed.status_code == 503 and shed.headers["retry-after"] == "5"
+    assert static.status_code == 200
+    assert [save.status_code for save in saves] == [200, 200]
+
+
+def test_token_buckets_refill():
+    now = [0.0]
+    buckets = TokenBuckets(per_minute=60, burst=2, clock=lambda: now[0])
+    assert buckets.take("a") == buckets.take("a") == 0
+    assert buckets.take("a") == 1.0
+    assert buckets.take("b") == 0  # per key
+    now[0] = 1.5
+    assert buckets.take("a") == 0 and buckets.take("a") == 0.5
+    assert TokenBuckets(per_minute=0, burst=0).take("a") == 0
+
+
+def test_login_attempts_are_limited_per_email(app, user_store, login_limiter):
+    client = TestClient(app)
+    attempts = [
+        client.post("/api/v1/auth/login", json={"email": "abood@gmail.com", "password": "wrong"})
+        for _ in range(login_limiter.email.burst + 1)
+    ]
+    assert {res.status_code for res in attempts[:-1]} == {401}
+    assert attempts[-1].status_code == 429
+    assert int(attempts[-1].headers["retry-after"]) >= 1
+    # Another account from the same address is still allowed.
+    res = client.post("/api/v1/auth/login", json={"email": "other@example.com", "password": "wrong"})
+    assert res.status_code == 401
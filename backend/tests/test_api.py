@@ -48,3 +48,43 @@ def test_content_steps(app):
     assert res.status_code == 200
     data = res.json()
     assert len(data["steps"]) == 6
+
+
+def test_static_responses_revalidate_with_etag(app):
+    client = TestClient(app)
+    for path in ("/api/v1/categories", "/api/v1/categories/employee", "/api/v1/content/about"):
+        res = client.get(path)
+        etag = res.headers["etag"]
+        assert res.headers["cache-control"].startswith("public")
+
+        res = client.get(path, headers={"If-None-Match": etag})
+        assert res.status_code == 304
+        assert res.content == b""
+        assert res.headers["etag"] == etag
+
+        assert client.get(path, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_reload_static_responses_rebuilds_from_source(app, monkeypatch):
+    import app.api.categories as categories_api
+    from app.api import cache
+    from app.api.schemas import BilingualText, Category
+    from app.services import categories
+
+    client = TestClient(app)
+    before = client.get("/api/v1/categories").headers["etag"]
+    extra = Category(id="extra", name=BilingualText(ar="إضافي", en="Extra"),
+                     description=BilingualText(ar="", en=""), icon="star")
+    original = categories.get_all_categories
+    # Patched in both places: the service's id index and the API builder read it.
+    for module in (categories, categories_api):
+        monkeypatch.setattr(module, "get_all_categories", lambda: [*original(), extra])
+    try:
+        cache.reload_static_responses()
+        res = client.get("/api/v1/categories")
+        assert res.headers["etag"] != before
+        assert len(res.json()["categories"]) == 6
+        assert client.get("/api/v1/categories/extra").json()["name"]["ar"] == "إضافي"
+    finally:
+        monkeypatch.undo()
+        cache.reload_static_responses()
@@ -0,0 +1,39 @@
+"""Smoke tests for the load benchmark so it keeps working as the API evolves."""
+
+import json
+
+from benchmarks.datasets import write_dataset
+from benchmarks.load import compare, main, percentile
+
+
+def test_dataset_is_loadable_and_bilingual(tmp_path):
+    path = write_dataset(tmp_path / "users.json", 200)
+    users = json.loads(path.read_text(encoding="utf-8"))["users"]
+    assert [u["id"] for u in users] == list(range(1, 201))
+    assert any(u["draft"] and any("؀" <= ch <= "ۿ" for ch in json.dumps(u["draft"], ensure_ascii=False))
+               for u in users)
+    assert any("waiting-approval" in u["categoryStatuses"].values() for u in users)
+
+
+def test_percentile_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 99) == 99
+    assert percentile([3.0], 95) == 3.0
+
+
+def test_compare_flags_regressions():
+    base = {"users": 1000, "mode": "inprocess", "backend": "json", "scenario": "me",
+            "errors": 0, "throughput_rps": 1000.0, "p95_ms": 10.0}
+    assert compare([dict(base, p95_ms=11.0)], [base], 0.2) == []
+    assert len(compare([dict(base, p95_ms=13.0, throughput_rps=700.0)], [base], 0.2)) == 2
+
+
+def test_inprocess_run_writes_results(tmp_path):
+    output = tmp_path / "results.json"
+    args = ["--sizes", "50", "--requests", "20", "--concurrency", "4", "--output", str(output)]
+    assert main(args) == 0
+    results = json.loads(output.read_text())["results"]
+    assert {r["scenario"] for r in results} >= {"login", "me", "admin_pending"}
+    assert all(r["errors"] == 0 for r in results)
+    assert main(args + ["--baseline", str(output), "--tolerance", "100"]) == 0
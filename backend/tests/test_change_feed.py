@@ -0,0 +1,115 @@
+"""Tests for user stores shared by several worker processes through a change feed."""
+
+import asyncio
+import json
+import threading
+import time
+
+from app.services.change_feed import ChangeFeed
+from app.services.user_store import UserStore
+
+
+def worker(users_path, tmp_path, **kwargs):
+    """A store as one uvicorn worker would open it."""
+    return UserStore(users_path, feed=ChangeFeed(tmp_path / "users.changes.sqlite3"), **kwargs)
+
+
+def test_writes_are_visible_in_other_workers(users_path, tmp_path):
+    a, b = worker(users_path, tmp_path), worker(users_path, tmp_path)
+    before = asyncio.run(b.get(6))
+
+    asyncio.run(a.update(6, lambda u: u.update(draft={"department": {"firstName": "وسيم"}})))
+    created = asyncio.run(a.create({"email": "new@sam.ae", "password": "x", "registered": False, "applied": False}))
+
+    # Only the changed user is replaced; others keep their cached objects.
+    assert asyncio.run(b.get(6))["draft"] == {"department": {"firstName": "وسيم"}}
+    assert asyncio.run(b.get(6)) is not before
+    unchanged = asyncio.run(b.get(5))
+    assert asyncio.run(b.get_by_email("new@sam.ae"))["id"] == created["id"]
+    assert asyncio.run(b.get(5)) is unchanged
+
+    # b's next id accounts for a's insert, and its update builds on a's.
+    other = asyncio.run(b.create({"email": "other@sam.ae", "password": "x", "registered": False, "applied": False}))
+    assert other["id"] == created["id"] + 1
+    asyncio.run(b.update(6, lambda u: u["draft"]["department"].update(lastName="ب")))
+    assert asyncio.run(a.get(6))["draft"] == {"department": {"firstName": "وسيم", "lastName": "ب"}}
+    a.close()
+    b.close()
+
+
+def test_concurrent_creates_get_distinct_ids(users_path, tmp_path):
+    stores = [worker(users_path, tmp_path) for _ in range(3)]
+    ids, start = [], threading.Barrier(len(stores))
+
+    def register(store, n):
+        start.wait()
+        for i in range(10):
+            user = asyncio.run(store.create({"email": f"w{n}-{i}@sam.ae", "password": "x"}))
+            ids.append(user["id"])
+
+    threads = [threading.Thread(target=register, args=(store, n)) for n, store in enumerate(stores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(ids)) == 30
+    for store in stores:
+        store.close()
+    assert len(UserStore(users_path)) == 14 + 30
+
+
+def test_listeners_hear_about_remote_changes(users_path, tmp_path):
+    a, b = worker(users_path, tmp_path), worker(users_path, tmp_path)
+    heard = []
+    a.subscribe(lambda user: heard.append(("a", user["id"])))
+    b.subscribe(lambda user: heard.append(("b", user["id"], user["registered"])))
+    b.watch(interval=0.01)
+
+    asyncio.run(a.update(1, lambda u: u.update(registered=True)))
+    deadline = time.monotonic() + 5
+    while not heard and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # The writer's own changes are not echoed back to it.
+    assert heard == [("b", 1, True)]
+    a.close()
+    b.close()
+
+
+def test_restart_replays_in_generation_order(users_path, tmp_path):
+    a, b = worker(users_path, tmp_path), worker(users_path, tmp_path)
+    asyncio.run(a.update(1, lambda u: u.update(registered=True)))
+    asyncio.run(b.update(1, lambda u: u.update(registered=False)))
+
+    # Swap the journal lines, as two workers' appends may land.
+    lines = a.journal_path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["gen"] for line in lines] == [1, 2]
+    a.journal_path.write_text("\n".join(reversed(lines)) + "\n", encoding="utf-8")
+    assert asyncio.run(worker(users_path, tmp_path).get(1))["registered"] is False
+
+    # A change published but never journalled (the worker died) is recovered from the feed.
+    a.journal_path.write_text(lines[0] + "\n", encoding="utf-8")
+    assert asyncio.run(worker(users_path, tmp_path).get(1))["registered"] is False
+
+
+def test_compaction_snapshots_the_generation_and_prunes_the_feed(users_path, tmp_path):
+    a, b = worker(users_path, tmp_path, compact_threshold=3), worker(users_path, tmp_path)
+    for user_id in (1, 2):
+        asyncio.run(b.update(user_id, lambda u: u.update(registered=True)))
+    for user_id in (4, 5, 6):
+        asyncio.run(a.update(user_id, lambda u: u.update(registered=True)))
+    a.compact()
+
+    snapshot = json.loads(users_path.read_text(encoding="utf-8"))
+    assert snapshot["generation"] == 5
+    assert all(user["registered"] for user in snapshot["users"] if user["id"] <= 6)
+    assert a.feed.since(5) == []
+
+    # b never saw generations 3-5 before they were pruned; it reloads the snapshot.
+    asyncio.run(b.update(7, lambda u: u.update(registered=True)))
+    assert all(asyncio.run(b.get(i))["registered"] for i in (1, 2, 4, 5, 6, 7))
+    reloaded = UserStore(users_path)
+    assert all(asyncio.run(reloaded.get(i))["registered"] for i in (1, 2, 4, 5, 6, 7))
+    a.close()
+    b.close()
@@ -0,0 +1,110 @@
+"""Tests for partial draft autosave with optimistic versioning."""
+
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from app.services.json_patch import JsonPatchError, apply_json_patch, merge_patch
+from app.services.user_store import UserStore
+
+MERGE = {"content-type": "application/merge-patch+json"}
+JSON_PATCH = {"content-type": "application/json-patch+json"}
+
+
+def test_merge_patch_rfc7396():
+    target = {"a": "b", "c": {"d": "e", "f": "g"}}
+    assert merge_patch(target, {"a": "z", "c": {"f": None}}) == {"a": "z", "c": {"d": "e"}}
+    assert merge_patch(None, {"x": 1}) == {"x": 1}
+    assert target == {"a": "b", "c": {"d": "e", "f": "g"}}
+
+
+def test_json_patch_rfc6902():
+    doc = {"answers": {"q1": "yes"}, "files": ["a.pdf"]}
+    result = apply_json_patch(doc, [
+        {"op": "replace", "path": "/answers/q1", "value": "no"},
+        {"op": "add", "path": "/files/-", "value": "b.pdf"},
+        {"op": "move", "from": "/files/0", "path": "/first"},
+        {"op": "test", "path": "/first", "value": "a.pdf"},
+    ])
+    assert result == {"answers": {"q1": "no"}, "files": ["b.pdf"], "first": "a.pdf"}
+    assert doc["files"] == ["a.pdf"]
+
+
+def test_json_patch_rejects_bad_paths():
+    for ops in ([{"op": "remove", "path": "/missing"}], [{"op": "add", "path": "x", "value": 1}], {"op": "add"}):
+        try:
+            apply_json_patch({}, ops)
+        except JsonPatchError:
+            continue
+        raise AssertionError(f"{ops} should fail")
+
+
+def test_patch_draft_versions_and_conflicts(app, user_store):
+    client = TestClient(app)
+    url = "/api/v1/auth/draft/6/department"
+
+    res = client.get(url)
+    assert res.status_code == 200
+    etag = res.headers["etag"]
+    assert res.json()["draft"]["firstName"] == "w"
+    assert client.get(url, headers={"if-none-match": etag}).status_code == 304
+
+    res = client.patch(url, content=json.dumps({"firstName": "وسيم"}), headers={**MERGE, "if-match": etag})
+    assert res.status_code == 200
+    assert res.json() == {"key": "department", "version": 1, "changed": True}
+    new_etag = res.headers["etag"]
+
+    # A stale writer is rejected.
+    res = client.patch(url, content=json.dumps({"lastName": "x"}), headers={**MERGE, "if-match": etag})
+    assert res.status_code == 409
+
+    # Re-sending the same edit is a no-op.
+    res = client.patch(url, content=json.dumps({"firstName": "وسيم"}), headers={**MERGE, "if-match": new_etag})
+    assert res.json() == {"key": "department", "version": 1, "changed": False}
+
+    res = client.patch(
+        url,
+        content=json.dumps([{"op": "replace", "path": "/lastName", "value": "ص"}]),
+        headers=JSON_PATCH,
+    )
+    assert res.json()["version"] == 2
+
+    draft = client.get("/api/v1/auth/draft/6").json()["draft"]
+    assert draft["department"]["firstName"] == "وسيم"
+    assert draft["department"]["lastName"] == "ص"
+    assert draft["project"]["firstName"] == "ص"
+
+
+def test_patch_journals_only_the_edited_category(app, user_store):
+    client = TestClient(app)
+    client.patch("/api/v1/auth/draft/5/project", content=json.dumps({"firstName": "A"}), headers=MERGE)
+
+    records = [json.loads(line) for line in user_store.journal_path.read_text(encoding="utf-8").splitlines()]
+    assert records[-1]["op"] == "set"
+    assert [path for path, _ in records[-1]["set"]] == [["draft", "project"], ["draftVersions", "project"]]
+    assert len(json.dumps(records[-1], ensure_ascii=False)) < len(json.dumps(asyncio.run(user_store.get(5))["draft"], ensure_ascii=False))
+
+    reloaded = UserStore(user_store.path)
+    assert asyncio.run(reloaded.get(5))["draft"]["project"]["firstName"] == "A"
+    assert asyncio.run(reloaded.get(5))["draftVersions"]["project"] == 1
+
+
+def test_full_draft_save_bumps_changed_versions(app, user_store):
+    client = TestClient(app)
+    draft = client.get("/api/v1/auth/draft/6").json()["draft"]
+    draft["green"]["firstName"] = "g"
+    client.post("/api/v1/auth/draft/6", json={"data": draft})
+
+    assert client.get("/api/v1/auth/draft/6/green").json()["version"] == 1
+    assert client.get("/api/v1/auth/draft/6/project").json()["version"] == 0
+
+
+def test_invalid_patch_is_422(app, user_store):
+    client = TestClient(app)
+    res = client.patch(
+        "/api/v1/auth/draft/6/project",
+        content=json.dumps([{"op": "remove", "path": "/nope"}]),
+        headers=JSON_PATCH,
+    )
+    assert res.status_code == 422
@@ -0,0 +1,114 @@
+"""Tests for the admin event broker and the registration event stream."""
+
+import asyncio
+import json
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.services.events import RESET, EventBroker
+
+
+def parse_sse(body: str) -> list[dict]:
+    events = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith((":", "retry")))
+        if fields:
+            events.append({"id": fields["id"], "event": fields["event"], "data": json.loads(fields["data"])})
+    return events
+
+
+async def read_all(broker: EventBroker, last_event_id=None, match=None) -> list[dict]:
+    return parse_sse(b"".join([chunk async for chunk in broker.stream(last_event_id, match)]).decode("utf-8"))
+
+
+def test_stream_wakes_on_publish_from_another_thread():
+    broker = EventBroker(keepalive=5)
+
+    async def consume():
+        stream = broker.stream()
+        assert await anext(stream) == b"retry: 2000\n\n"
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0.05)
+        assert not pending.done() and broker.subscribers == 1  # idle: just waiting
+        threading.Thread(target=broker.publish, args=("registration", {"n": 1})).start()
+        chunk = await asyncio.wait_for(pending, 5)
+        await stream.aclose()
+        return chunk
+
+    [event] = parse_sse(asyncio.run(consume()).decode("utf-8"))
+    assert event == {"id": f"{broker.epoch}-1", "event": "registration", "data": {"n": 1}}
+    assert broker.subscribers == 0
+
+
+def test_resume_replays_missed_events_or_resets():
+    broker = EventBroker(history=3, buffer=10)
+    for n in range(5):
+        broker.publish("registration", {"n": n})
+    broker.close()
+
+    events = asyncio.run(read_all(broker, f"{broker.epoch}-3"))
+    assert [e["data"]["n"] for e in events] == [3, 4]
+    assert asyncio.run(read_all(broker, f"{broker.epoch}-5")) == []
+    assert asyncio.run(read_all(broker)) == []
+
+    # Older than the history, or from another process: start over.
+    for last in (f"{broker.epoch}-1", "0123abcd-4", "garbage"):
+        assert asyncio.run(read_all(broker, last)) == [{"id": f"{broker.epoch}-5", "event": RESET, "data": {}}]
+
+
+def test_slow_subscriber_gets_a_reset_instead_of_unbounded_buffering():
+    broker = EventBroker(buffer=2)
+
+    async def consume():
+        stream = broker.stream()
+        await anext(stream)
+        subscription = next(iter(broker._subscribers))
+        for n in range(5):
+            broker.publish("registration", {"n": n})
+        assert len(subscription._events) <= 2
+        broker.close()
+        return parse_sse(b"".join([chunk async for chunk in stream]).decode("utf-8"))
+
+    events = asyncio.run(consume())
+    assert events[0] == {"id": f"{broker.epoch}-3", "event": RESET, "data": {}}
+    assert [e["data"]["n"] for e in events[1:]] == [3, 4]
+
+
+def test_registration_changes_are_streamed(app, user_store):
+    from app.api.deps import get_event_broker
+
+    broker = EventBroker()
+    app.dependency_overrides[get_event_broker] = lambda: broker
+    client = TestClient(app)
+    try:
+        client.post(
+            "/api/v1/auth/complete-registration/1",
+            json={"categorySlug": "project", "data": {}, "status": "waiting-approval"},
+        )
+        client.post(
+            "/api/v1/auth/admin/review-registration",
+            json={"userId": 1, "categorySlug": "project", "action": "approve"},
+        )
+        client.post(
+            "/api/v1/auth/admin/review-registrations",
+            json={"decisions": [{"userId": 9, "categorySlug": "knowledge", "action": "reject"}]},
+        )
+        broker.close()  # so the streams below end after replaying
+
+        url = "/api/v1/auth/admin/registration-events"
+        res = client.get(url, headers={"Last-Event-ID": f"{broker.epoch}-0"})
+        assert res.headers["content-type"].startswith("text/event-stream")
+        events = parse_sse(res.text)
+        assert [(e["data"]["userId"], e["data"]["categorySlug"], e["data"]["status"]) for e in events] == [
+            (1, "project", "waiting-approval"),
+            (1, "project", "qualified"),
+            (9, "knowledge", "rejected"),
+        ]
+        assert events[1]["data"]["previousStatus"] == "waiting-approval"
+
+        # Resume after the first event, new registrations only, via the query parameter.
+        res = client.get(url, params={"lastEventId": events[0]["id"], "status": "waiting-approval", "category": "project"})
+        assert [e["id"] for e in parse_sse(res.text)] == [events[1]["id"]]
+    finally:
+        app.dependency_overrides.pop(get_event_broker, None)
@@ -0,0 +1,87 @@
+"""Tests for the streaming application exports."""
+
+import asyncio
+import csv
+import io
+import json
+import zipfile
+
+from fastapi.testclient import TestClient
+
+from app.rag.extraction import iter_xlsx
+from app.services.export import COLUMNS, CsvEncoder, export_applications, user_rows
+
+USER = {
+    "id": 7,
+    "email": "a@sam.ae",
+    "categoryStatuses": {"project": "qualified", "employee-supervisory-leader": "waiting-approval"},
+    "categoryRegisteredAt": {"project": "2026-02-01T00:00:00.000Z"},
+    "draft": {"submission:project": {}, "green": {}},
+    "submissions": {"project": {"referenceNumber": "SAM-1", "submittedAt": "2026-03-01T09:00:00.000Z"}},
+    "registrationData": {"firstName": "مريم", "mobile": "+971 50 123", "answers": {"proj-kpi": "yes"},
+                         "title": {"ar": "مشروع", "en": "Project"}},
+}
+
+
+def test_rows_flatten_registration_data_and_filter():
+    rows = list(user_rows(USER))
+    assert [r["categorySlug"] for r in rows] == ["employee-supervisory-leader", "green", "project"]
+    project = rows[2]
+    assert (project["categoryAr"], project["categoryEn"]) == ("المشروع المتميز", "Outstanding Project")
+    assert project["submitted"] and project["hasDraft"] and project["referenceNumber"] == "SAM-1"
+    assert project["registrationData.title.ar"] == "مشروع" and project["registrationData.answers.proj-kpi"] == "yes"
+    assert rows[1]["status"] is None and rows[1]["hasDraft"]
+
+    assert [r["categorySlug"] for r in user_rows(USER, category="employee")] == ["employee-supervisory-leader"]
+    assert [r["categorySlug"] for r in user_rows(USER, status="qualified")] == ["project"]
+    assert len(list(user_rows(USER, submitted=False))) == 2
+
+
+def test_csv_has_fixed_columns_and_defuses_formulas():
+    encoder = CsvEncoder()
+    data = encoder.header() + encoder.rows(user_rows(USER, category="project"))
+    assert data.startswith(b"\xef\xbb\xbf")
+    header, row = list(csv.reader(io.StringIO(data.decode("utf-8-sig"))))
+    assert tuple(header) == COLUMNS
+    values = dict(zip(header, row))
+    assert values["registrationData.mobile"] == "+971 50 123"
+    assert json.loads(values["registrationData.other"]) == {
+        "registrationData.answers.proj-kpi": "yes", "registrationData.title.ar": "مشروع",
+        "registrationData.title.en": "Project",
+    }
+    formula = CsvEncoder().rows([{"registrationData.firstName": "=HYPERLINK(1)"}])
+    assert b"'=HYPERLINK(1)" in formula
+
+
+def test_xlsx_streams_a_valid_workbook(tmp_path):
+    class Store:
+        async def scan(self, batch_size):
+            for start in range(0, 30, batch_size):
+                yield [{**USER, "id": i} for i in range(start, min(30, start + batch_size))]
+
+    async def collect(fmt):
+        return [chunk async for chunk in export_applications(Store(), fmt, category="project", batch_size=7)]
+
+    assert [len(chunk.splitlines()) for chunk in asyncio.run(collect("ndjson"))] == [7, 7, 7, 7, 2]
+
+    path = tmp_path / "export.xlsx"
+    path.write_bytes(b"".join(asyncio.run(collect("xlsx"))))
+    with zipfile.ZipFile(path) as package:
+        assert package.testzip() is None
+    (_, _, text), = iter_xlsx(path)
+    lines = text.split("\n")
+    assert lines[0].split("\t") == list(COLUMNS) and len(lines) == 31
+    assert lines[1].split("\t")[:5] == ["0", "a@sam.ae", "project", "المشروع المتميز", "Outstanding Project"]
+
+
+def test_export_endpoint(app, user_store):
+    client = TestClient(app)
+    res = client.get("/api/v1/auth/admin/export", params={"status": "waiting-approval"})
+    assert res.status_code == 200 and res.headers["content-type"] == "application/x-ndjson"
+    assert res.headers["content-disposition"].endswith('.ndjson"')
+    rows = [json.loads(line) for line in res.text.splitlines()]
+    assert len(rows) == 10 and all(r["status"] == "waiting-approval" for r in rows)
+
+    res = client.get("/api/v1/auth/admin/export", params={"format": "csv", "category": "department"})
+    assert all(row[2] == "department" for row in list(csv.reader(io.StringIO(res.text.lstrip("﻿"))))[1:])
+    assert client.get("/api/v1/auth/admin/export", params={"format": "pdf"}).status_code == 422
@@ -0,0 +1,139 @@
+"""Tests for attachment text extraction and its cache."""
+
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.rag.extraction import DONE, SKIPPED, EXTRACTORS, cache_paths, extract_to_cache
+from app.rag.normalize import normalize_text
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+A = 'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"'
+S = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+DOCX, PPTX, XLSX = (t for t in EXTRACTORS if t != "application/pdf")
+
+
+def _package(path, parts: dict):
+    with zipfile.ZipFile(path, "w") as z:
+        for name, xml in parts.items():
+            z.writestr(name, xml)
+    return path
+
+
+def _docx(path, *pages):
+    body = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'.join(
+        "".join(f"<w:p><w:r><w:t>{line}</w:t></w:r></w:p>" for line in page) for page in pages
+    )
+    return _package(path, {"word/document.xml": f"<w:document {W}><w:body>{body}</w:body></w:document>"})
+
+
+def _pptx(path, *slides):
+    parts = {
+        f"ppt/slides/slide{i}.xml": f"<p:sld xmlns:p='p' {A}><a:p><a:r><a:t>{text}</a:t></a:r></a:p></p:sld>"
+        for i, text in enumerate(slides, 1)
+    }
+    return _package(path, parts)
+
+
+def _extract(tmp_path, path, content_type):
+    return extract_to_cache(str(path), content_type, str(tmp_path / "cache"), "ab" * 32)
+
+
+def _text(tmp_path):
+    return cache_paths(tmp_path / "cache", "ab" * 32)[0].read_text(encoding="utf-8")
+
+
+def test_normalize_folds_presentation_forms_and_tatweel():
+    assert normalize_text("ﻣﺮﺣﺒﺎ  بـــك‏\r\n\n\n  world ") == "مرحبا بك\n\nworld"
+
+
+def test_docx_pages_have_offsets(tmp_path):
+    path = _docx(tmp_path / "a.docx", ["الصفحة الأولى", "first page"], ["page two"])
+    meta = _extract(tmp_path, path, DOCX)
+    text = _text(tmp_path)
+    assert meta["status"] == DONE and meta["chars"] == len(text)
+    assert [(u["kind"], u["number"]) for u in meta["units"]] == [("page", 1), ("page", 2)]
+    first, second = meta["units"]
+    assert text[first["start"]:first["end"]] == "الصفحة الأولى\nfirst page"
+    assert text[second["start"]:second["end"]] == "page two"
+
+
+def test_pptx_slides_are_in_numeric_order(tmp_path):
+    path = _pptx(tmp_path / "deck.pptx", *(f"slide {i}" for i in range(1, 12)))
+    meta = _extract(tmp_path, path, PPTX)
+    text = _text(tmp_path)
+    assert [text[u["start"]:u["end"]] for u in meta["units"]][9:] == ["slide 10", "slide 11"]
+
+
+def test_xlsx_resolves_shared_and_inline_strings(tmp_path):
+    sheet = (
+        f"<worksheet {S}><sheetData>"
+        '<row><c t="s"><v>0</v></c><c><v>42</v></c></row>'
+        '<row><c t="inlineStr"><is><t>مؤشر الأداء</t></is></c></row>'
+        "</sheetData></worksheet>"
+    )
+    strings = f"<sst {S}><si><t>KPI</t></si></sst>"
+    path = _package(tmp_path / "k.xlsx", {"xl/worksheets/sheet1.xml": sheet, "xl/sharedStrings.xml": strings})
+    meta = _extract(tmp_path, path, XLSX)
+    assert meta["units"] == [{"kind": "sheet", "number": 1, "start": 0, "end": len(_text(tmp_path))}]
+    assert _text(tmp_path) == "KPI 42\nمؤشر الأداء"
+
+
+def test_corrupt_file_is_reported_as_failed(tmp_path):
+    path = tmp_path / "broken.docx"
+    path.write_bytes(b"PK\x03\x04 not really a zip")
+    meta = _extract(tmp_path, path, DOCX)
+    assert meta["status"] == "failed" and "BadZipFile" in meta["error"]
+
+
+@pytest.fixture
+def uploads(app, tmp_path):
+    from app.api.deps import get_upload_service
+    from app.services.uploads import UploadService
+
+    service = UploadService(tmp_path / "uploads")
+    app.dependency_overrides[get_upload_service] = lambda: service
+    yield service
+    app.dependency_overrides.pop(get_upload_service, None)
+
+
+def _upload(client, user_id, path, slug="project"):
+    data = path.read_bytes()
+    upload_id = client.post(
+        "/api/v1/uploads",
+        json={"userId": user_id, "categorySlug": slug, "fileName": path.name, "size": len(data)},
+    ).json()["uploadId"]
+    res = client.patch(f"/api/v1/uploads/{upload_id}", content=data, headers={"Upload-Offset": "0"})
+    return res.json()["attachment"]
+
+
+def test_uploaded_attachment_is_extracted_once(app, user_store, uploads, extraction_service, tmp_path):
+    client = TestClient(app)
+    user_id = next(iter(user_store))["id"]
+    path = _pptx(tmp_path / "evidence.pptx", "خطة المشروع", "KPIs")
+
+    first = _upload(client, user_id, path)
+    extraction_service.submit(first["sha256"], uploads.blob_path(first["sha256"]), first["contentType"]).result()
+    base = f"/api/v1/uploads/submissions/{user_id}/project/{first['id']}"
+    status = client.get(f"{base}/extraction").json()
+    assert status["status"] == DONE and len(status["units"]) == 2
+    assert client.get(f"{base}/text").text == "خطة المشروع\n\nKPIs"
+
+    # The same file attached elsewhere reuses the cached result.
+    calls = []
+    extraction_service._get_executor = lambda: calls.append(1)
+    second = _upload(client, user_id, path, slug="green")
+    assert second["sha256"] == first["sha256"] and not calls
+    assert client.get(f"/api/v1/uploads/submissions/{user_id}/green/{second['id']}/extraction").json()["status"] == DONE
+
+
+def test_images_are_skipped(app, user_store, uploads, tmp_path):
+    client = TestClient(app)
+    user_id = next(iter(user_store))["id"]
+    path = tmp_path / "photo.png"
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + bytes(100))
+    attachment = _upload(client, user_id, path)
+    base = f"/api/v1/uploads/submissions/{user_id}/project/{attachment['id']}"
+    assert client.get(f"{base}/extraction").json()["status"] == SKIPPED
+    assert client.get(f"{base}/text").status_code == 404
@@ -0,0 +1,131 @@
+"""Tests for the persistent job queue, its workers and the job endpoints."""
+
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.services.validation import get_validator
+
+from app.services.jobs import DONE, FAILED, QUEUED, RUNNING, JobQueue, WorkerPool
+
+
+def test_priority_and_deduplication(job_queue):
+    low = job_queue.enqueue("a", {"n": 1})
+    high = job_queue.enqueue("a", {"n": 2}, priority=5)
+    first = job_queue.enqueue("b", {"v": 1}, dedup_key="k")
+    again = job_queue.enqueue("b", {"v": 2}, dedup_key="k")
+    replaced = job_queue.enqueue("b", {"v": 3}, dedup_key="k", replace=True, priority=9)
+    assert again.id == replaced.id == first.id
+    assert again.payload == {"v": 1} and replaced.payload == {"v": 3} and replaced.priority == 9
+
+    order = [job_queue.claim("w").id for _ in range(3)]
+    assert order == [first.id, high.id, low.id]
+    assert job_queue.claim("w") is None
+
+    # Once the deduplicated job is running, the same key queues a new one.
+    assert job_queue.enqueue("b", {"v": 4}, dedup_key="k").id != first.id
+    assert job_queue.depth() == {"a": {RUNNING: 2}, "b": {RUNNING: 1, QUEUED: 1}}
+
+
+def test_failures_are_retried_with_backoff(job_queue):
+    job = job_queue.enqueue("flaky", max_attempts=2)
+    calls = []
+
+    def flaky(payload, ctx):
+        calls.append(ctx.job.attempts)
+        raise RuntimeError("boom")
+
+    pool = WorkerPool(job_queue, {"flaky": flaky})
+    assert pool.run_pending() == 1
+    retried = job_queue.get(job.id)
+    assert retried.status == QUEUED and retried.run_at > retried.updated_at
+    assert retried.error == "RuntimeError: boom"
+
+    time.sleep(0.02)
+    assert pool.run_pending() == 1
+    assert job_queue.get(job.id).status == FAILED and calls == [1, 2]
+
+
+def test_expired_leases_are_requeued(job_queue):
+    job = job_queue.enqueue("slow", {"x": 1})
+    assert job_queue.claim("w1", visibility=0.01).id == job.id
+    time.sleep(0.02)
+
+    # Another worker takes it over; the first one's result is ignored.
+    assert job_queue.claim("w2").id == job.id
+    assert not job_queue.heartbeat(job.id, "w1", 10)
+    assert not job_queue.complete(job.id, "w1", "stale")
+    assert job_queue.heartbeat(job.id, "w2", 10, progress=0.5, message="Halfway")
+    assert job_queue.complete(job.id, "w2", {"ok": True})
+    done = job_queue.get(job.id)
+    assert (done.status, done.attempts, done.result, done.progress) == (DONE, 2, {"ok": True}, 1.0)
+
+
+def test_jobs_survive_restart(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    queue = JobQueue(path)
+    running = queue.enqueue("a", {"n": 1})
+    assert queue.claim("w", visibility=0.01).id == running.id
+    queued = queue.enqueue("a", {"text": "نص عربي"}, dedup_key="a:1")
+    queue.close()
+
+    time.sleep(0.02)
+    reopened = JobQueue(path)
+    assert reopened.get(queued.id).payload == {"text": "نص عربي"}
+    assert reopened.enqueue("a", None, dedup_key="a:1").id == queued.id
+    assert {reopened.claim("w2").id, reopened.claim("w2").id} == {queued.id, running.id}
+    reopened.close()
+
+
+def test_worker_threads_run_jobs(job_queue):
+    done = threading.Event()
+    seen = []
+
+    def handler(payload, ctx):
+        ctx.progress(0.5)
+        seen.append(payload)
+        if len(seen) == 3:
+            done.set()
+        return payload * 2
+
+    pool = WorkerPool(job_queue, {"double": handler}, workers=2, poll_interval=0.05)
+    pool.start()
+    jobs = [job_queue.enqueue("double", n) for n in range(3)]
+    assert done.wait(5)
+    pool.close()
+    assert sorted(seen) == [0, 1, 2]
+    deadline = time.monotonic() + 5
+    while any(job_queue.get(j.id).status != DONE for j in jobs) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [job_queue.get(j.id).result for j in jobs] == [0, 2, 4]
+
+
+def test_job_endpoints(app, user_store, job_queue, job_workers):
+    client = TestClient(app)
+    answers = {c.id: {"text": f"وصف {c.id} " + "تفاصيل " * 20, "files": []} for c in get_validator("project").criteria}
+    body = {"categorySlug": "project", "referenceNumber": "SAM-1", "submittedAt": "2026-03-01T09:00:00.000Z",
+            "data": {"criteriaResponses": answers}}
+    assert client.post("/api/v1/auth/submit-application/5", json=body).status_code == 200
+    assert job_workers.run_pending() == 1  # evidence indexing
+
+    res = client.post("/api/v1/review/suggestions/5/project", params={"background": True})
+    assert res.status_code == 202
+    job_id = res.json()["jobId"]
+    # Asking again while it is queued returns the same job.
+    assert client.post("/api/v1/review/suggestions/5/project", params={"background": True}).json()["jobId"] == job_id
+
+    stats = client.get("/api/v1/jobs/stats").json()
+    assert stats["depth"]["review.submission"] == {"queued": 1} and stats["queued"] == 1
+    assert stats["workers"][0]["kinds"] == ["evidence.index", "review.submission"]
+    assert client.get(f"/api/v1/jobs/{job_id}").json()["status"] == "queued"
+
+    assert job_workers.run_pending() == 1
+    job = client.get(f"/api/v1/jobs/{job_id}").json()
+    assert job["status"] == "done" and job["progress"] == 1.0
+    direct = client.post("/api/v1/review/suggestions/5/project").json()
+    assert job["result"] == {"items": [{**item, "cached": False} for item in direct["items"]]}
+
+    listed = client.get("/api/v1/jobs", params={"kind": "review.submission"}).json()["items"]
+    assert [j["id"] for j in listed] == [job_id]
+    assert client.get("/api/v1/jobs/999").status_code == 404
@@ -0,0 +1,111 @@
+"""Tests for the LLM review queue against the fake provider."""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.rag.llm_review import ReviewError, ReviewRequest, ReviewService, TokenBucket
+from app.services.criteria import PROJECT
+from benchmarks.fake_llm import create_app
+
+
+def _requests(n, words=30):
+    return [ReviewRequest(f"c{i}", 20, f"إجابة رقم {i} " + "كلمة " * words) for i in range(n)]
+
+
+def _service(tmp_path, provider, **options):
+    options = {"batch_wait": 0.01, "backoff": 0.01, **options}
+    return ReviewService(cache_dir=tmp_path, base_url="http://fake-llm",
+                         transport=httpx.ASGITransport(app=provider), **options)
+
+
+def test_requests_are_batched_and_cached(tmp_path):
+    provider = create_app()
+    service = _service(tmp_path, provider, batch_size=4)
+    requests = _requests(10)
+    reviews = asyncio.run(service.review(requests))
+    assert [r["score"] for r in reviews] == [min(20, 20 * 33 // 150)] * 10
+    assert not any(r["cached"] for r in reviews)
+    assert provider.state.stats["requests"] == 3  # 4 + 4 + 2
+
+    again = asyncio.run(service.review(requests + [ReviewRequest("c0", 20, requests[0].text + " تعديل")]))
+    assert [r["cached"] for r in again] == [True] * 10 + [False]
+    assert provider.state.stats["items"] == 11
+    service.close()
+
+    # The cache outlives the service; another model does not share it.
+    provider.state.stats["items"] = 0
+    restarted = _service(tmp_path, provider)
+    assert asyncio.run(restarted.review(requests[:1]))[0]["cached"]
+    other = _service(tmp_path, provider, model="other-model")
+    assert not asyncio.run(other.review(requests[:1]))[0]["cached"]
+    assert provider.state.stats["items"] == 1
+    restarted.close()
+    other.close()
+
+
+def test_identical_requests_in_flight_share_one_job(tmp_path):
+    provider = create_app(latency=0.05)
+    service = _service(tmp_path, provider)
+    request = _requests(1)[0]
+    first, second = service.submit(request), service.submit(request)
+    assert first is second
+    assert first.result(5)["score"] >= 0 and provider.state.stats["items"] == 1
+    service.close()
+
+
+def test_concurrency_limit_and_retries(tmp_path):
+    # The provider allows two completions at a time and fails every fifth.
+    provider = create_app(latency=0.02, max_concurrency=2, fail_every=5)
+    service = _service(tmp_path, provider, batch_size=2, max_concurrency=2)
+    reviews = asyncio.run(service.review(_requests(20)))
+    assert len(reviews) == 20
+    stats = provider.state.stats
+    assert stats["peak"] <= 2 and stats["rate_limited"] == 0 and stats["failed"] >= 1
+    assert service.stats["retries"] == stats["failed"] and service.stats["failures"] == 0
+    service.close()
+
+
+def test_gives_up_and_reports_errors(tmp_path):
+    service = _service(tmp_path, create_app(fail_every=1), max_retries=2)
+    with pytest.raises(ReviewError, match="after 3 attempts"):
+        asyncio.run(service.review(_requests(1)))
+    service.close()
+
+    def handler(request):
+        return httpx.Response(401, json={"error": {"message": "Invalid API key"}})
+
+    service = ReviewService(cache_dir=tmp_path, transport=httpx.MockTransport(handler), backoff=0.01)
+    with pytest.raises(ReviewError, match="HTTP 401"):
+        asyncio.run(service.review(_requests(1)))
+    assert service.stats["retries"] == 0
+    service.close()
+
+
+def test_token_bucket_waits_for_refill():
+    async def run():
+        loop = asyncio.get_running_loop()
+        bucket = TokenBucket(tokens_per_minute=6000)  # 100 per second
+        start = loop.time()
+        await bucket.acquire(6000)
+        await bucket.acquire(20)
+        return loop.time() - start
+
+    assert 0.15 <= asyncio.run(run()) < 1.0
+
+
+def test_suggestions_endpoint(app, user_store, fake_llm):
+    client = TestClient(app)
+    answers = {c.id: {"text": f"وصف {c.id} " + "تفاصيل " * 70, "files": []} for c in PROJECT}
+    body = {"categorySlug": "project", "referenceNumber": "SAM-1", "submittedAt": "2026-03-01T09:00:00.000Z",
+            "data": {"criteriaResponses": answers}}
+    assert client.post("/api/v1/auth/submit-application/6", json=body).status_code == 200
+
+    items = client.post("/api/v1/review/suggestions/6/project").json()["items"]
+    assert [i["criterionId"] for i in items] == [c.id for c in PROJECT]
+    assert all(i["score"] == i["maxPoints"] * 72 // 150 and not i["cached"] for i in items)
+    assert client.post("/api/v1/review/suggestions/6/project").json()["items"][0]["cached"]
+    assert fake_llm.state.stats["items"] == len(PROJECT)
+    assert client.post("/api/v1/review/suggestions/6/green").status_code == 404
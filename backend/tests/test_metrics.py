@@ -0,0 +1,69 @@
+"""Tests for the metrics registry, request middleware and /metrics endpoint."""
+
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.metrics import HTTP_LATENCY, HTTP_REQUESTS, STORE_IO, Counter, Histogram, REGISTRY
+from app.middleware.metrics import UNMATCHED, MetricsMiddleware
+
+
+def _private_metric(metric):
+    REGISTRY.remove(metric)
+    return metric
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = _private_metric(Histogram("t_seconds", "Test.", ("op",), buckets=(0.1, 1.0)))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "x")
+    text = histogram.render()
+    assert 't_seconds_bucket{op="x",le="0.1"} 1' in text
+    assert 't_seconds_bucket{op="x",le="1"} 2' in text
+    assert 't_seconds_bucket{op="x",le="+Inf"} 3' in text
+    assert 't_seconds_count{op="x"} 3' in text
+
+
+def test_counter_escapes_label_values():
+    counter = _private_metric(Counter("t_total", "Test.", ("path",)))
+    counter.inc('a"b')
+    assert 't_total{path="a\\"b"} 1' in counter.render()
+
+
+def test_requests_are_labelled_by_route_template(app, user_store):
+    client = TestClient(app)
+    route = "/api/v1/auth/me/{user_id}"
+    before = HTTP_REQUESTS.value("GET", route, 200)
+    client.get("/api/v1/auth/me/1")
+    client.get("/api/v1/auth/me/2")
+    assert HTTP_REQUESTS.value("GET", route, 200) == before + 2
+    assert HTTP_LATENCY.count("GET", route) >= 2
+
+    client.get("/no/such/path")
+    assert HTTP_REQUESTS.value("GET", UNMATCHED, 404) >= 1
+
+    text = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/api/v1/auth/me/{user_id}",status="200"}' in text
+    assert "# TYPE http_request_duration_seconds histogram" in text
+
+
+def test_store_snapshot_io_is_timed(user_store):
+    before = STORE_IO.count("save")
+    user_store.compact()
+    assert STORE_IO.count("save") == before + 1
+
+
+def test_slow_requests_are_logged(caplog):
+    slow = FastAPI()
+
+    @slow.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(MetricsMiddleware(slow, slow_request_ms=0.000001))
+    with caplog.at_level(logging.WARNING, logger="app.requests"):
+        client.get("/items/7")
+    record = caplog.records[-1]
+    assert record.message.startswith("slow_request method=GET route=/items/{item_id} path=/items/7 status=200")
+    assert record.request["status"] == 200
@@ -0,0 +1,141 @@
+"""Tests for near-duplicate detection of criterion responses."""
+
+import random
+import threading
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.rag import near_duplicates
+from app.rag.near_duplicates import DuplicateIndex, lsh_params, minhash, response_words, shingle_hashes
+from app.services.criteria import PROJECT
+
+ORIGINAL = (
+    "قام الفريق بتطوير منصة رقمية متكاملة لإدارة الأصول مكّنت الإدارة من تتبع المعدات "
+    "وجدولة أعمال الصيانة الوقائية وخفض التكاليف التشغيلية بنسبة خمسة عشر بالمئة خلال العام"
+)
+# The same answer re-typed: no diacritics, bare alefs, ى/ي and ة/ه swapped.
+RETYPED = (
+    "قام الفريق بتطوير منصه رقميه متكامله لاداره الاصول مكنت الاداره من تتبع المعدات "
+    "وجدوله اعمال الصيانه الوقائيه وخفض التكاليف التشغيليه بنسبه خمسه عشر بالمئه خلال العام"
+)
+UNRELATED = (
+    "Introduced a knowledge-sharing programme with monthly sessions, an internal wiki and "
+    "mentoring pairs that three departments adopted within the first six months of the year"
+)
+
+
+def _form(**responses):
+    return {"criteriaResponses": {cid: {"text": text, "files": []} for cid, text in responses.items()}}
+
+
+def _user(user_id, slug, form):
+    return {"id": user_id, "email": f"u{user_id}@sam.ae", "submissions": {slug: {"data": form}}}
+
+
+def test_signatures_estimate_jaccard():
+    rng = random.Random(0)
+    vocabulary = [f"w{i}" for i in range(400)]
+    for _ in range(5):
+        a = rng.sample(vocabulary, 120)
+        b = a[:80] + rng.sample(vocabulary, 40)
+        set_a, set_b = set(shingle_hashes(a).tolist()), set(shingle_hashes(b).tolist())
+        exact = len(set_a & set_b) / len(set_a | set_b)
+        estimate = np.mean(minhash(a, 256) == minhash(b, 256))
+        assert abs(estimate - exact) < 0.1
+
+
+def test_lsh_params_fit_the_threshold():
+    bands, rows = lsh_params(0.8, 128)
+    assert bands * rows <= 128
+    # The S-curve crosses 1/2 near the threshold.
+    assert 0.7 < (1 / bands) ** (1 / rows) < 0.9
+    assert lsh_params(0.5, 128)[1] < rows
+
+
+def test_variant_copies_are_found_across_categories():
+    index = DuplicateIndex()
+    assert index.add_submission(1, "project", _form(**{"proj-results": ORIGINAL})) == []
+    assert response_words(ORIGINAL) == response_words(RETYPED)
+
+    found = index.add_submission(2, "department", _form(**{"dept-plan": RETYPED, "dept-kpi": UNRELATED}))
+    assert [(p.first, p.second) for p in found] == [((1, "project", "proj-results"), (2, "department", "dept-plan"))]
+    assert found[0].score == 1.0
+    assert index.pairs(user_id=2) == found and index.pairs(category="green") == []
+
+
+def test_edited_copy_and_short_answers():
+    index = DuplicateIndex(threshold=0.5)
+    index.add_submission(1, "project", _form(a=ORIGINAL, short="نعم كما ذكر أعلاه"))
+    edited = ORIGINAL.replace("خمسة عشر", "عشرين")
+    found = index.add_submission(2, "project", _form(b=edited, short="نعم كما ذكر أعلاه"))
+    assert [p.second for p in found] == [(2, "project", "b")] and 0.5 <= found[0].score < 1.0
+    assert len(index) == 2  # short answers are not indexed
+
+
+def test_resubmission_replaces_pairs():
+    index = DuplicateIndex()
+    index.add_submission(1, "project", _form(a=ORIGINAL))
+    index.add_submission(2, "project", _form(a=ORIGINAL))
+    assert len(index.pairs()) == 1
+
+    assert index.add_submission(2, "project", _form(a=UNRELATED)) == []
+    assert index.pairs() == [] and len(index) == 2
+    index.remove_submission(1, "project")
+    assert len(index) == 1
+
+
+def test_rescan_keeps_submissions_arriving_during_the_scan(monkeypatch):
+    users = [_user(1, "project", _form(a=ORIGINAL)), _user(2, "green", _form(a=RETYPED)),
+             _user(3, "green", _form(a=UNRELATED)), {"id": 4, "submissions": {}}]
+    index = DuplicateIndex(workers=None)
+    scanning, release = threading.Event(), threading.Event()
+    real = near_duplicates.signatures
+
+    def slow(texts, num_perm):
+        scanning.set()
+        release.wait(5)
+        return real(texts, num_perm)
+
+    monkeypatch.setattr(near_duplicates, "signatures", slow)
+    result = {}
+    scan = threading.Thread(target=lambda: result.update(index.rescan(users)))
+    scan.start()
+    assert scanning.wait(5)
+    monkeypatch.setattr(near_duplicates, "signatures", real)
+    # Applicant 3 resubmits a copy while the scan still holds the old form.
+    index.add_submission(3, "green", _form(a=ORIGINAL))
+    with pytest.raises(RuntimeError):
+        index.rescan(users)
+    release.set()
+    scan.join(5)
+
+    assert result["responses"] == 3 and result["pairs"] == 3
+    assert {p.second[0] for p in index.pairs()} == {2, 3} and index.ready
+
+
+def _project_form(criterion_id, text):
+    return _form(**{c.id: text if c.id == criterion_id else f"إجابة {c.id}" for c in PROJECT})
+
+
+def test_submission_is_checked_and_listed_for_reviewers(app, user_store, caplog):
+    client = TestClient(app)
+    body = {"categorySlug": "project", "referenceNumber": "SAM-1", "submittedAt": "2026-03-01T09:00:00.000Z"}
+    res = client.post("/api/v1/auth/submit-application/6", json={**body, "data": _project_form("proj-results", ORIGINAL)})
+    assert res.status_code == 200
+    res = client.get("/api/v1/review/duplicates")
+    assert res.json() == {"threshold": 0.8, "items": []}
+
+    with caplog.at_level("WARNING", logger="app.review"):
+        res = client.post("/api/v1/auth/submit-application/7", json={**body, "data": _project_form("proj-design", RETYPED)})
+    assert res.status_code == 200
+    assert "near_duplicate first=6/project/proj-results second=7/project/proj-design score=1.0" in caplog.text
+
+    items = client.get("/api/v1/review/duplicates", params={"userId": 7, "minScore": 0.9}).json()["items"]
+    assert items == [{
+        "first": {"userId": 6, "categorySlug": "project", "criterionId": "proj-results"},
+        "second": {"userId": 7, "categorySlug": "project", "criterionId": "proj-design"},
+        "score": 1.0,
+    }]
+    assert client.post("/api/v1/review/duplicates/rescan").json()["pairs"] == 1
@@ -0,0 +1,72 @@
+"""Tests for crash-safe persistence and write serialization."""
+
+import asyncio
+import json
+
+import pytest
+
+from app.services.persistence import JournalWriter, atomic_write_bytes
+from app.services.user_store import UserStore
+
+
+def test_atomic_write_replaces_without_leftovers(tmp_path):
+    path = tmp_path / "users.json"
+    path.write_bytes(b"old")
+    atomic_write_bytes(path, b"new")
+    assert path.read_bytes() == b"new"
+    assert [p.name for p in tmp_path.iterdir()] == ["users.json"]
+
+
+def test_journal_writer_group_commits(tmp_path):
+    writer = JournalWriter(tmp_path / "log.jsonl")
+    futures = [writer.append(f"{i}\n".encode()) for i in range(500)]
+    for future in futures:
+        future.result()
+    writer.close()
+
+    assert (tmp_path / "log.jsonl").read_text().split() == [str(i) for i in range(500)]
+    assert writer.records == 500
+    assert writer.commits < 500
+
+
+def test_concurrent_updates_are_not_lost(users_path):
+    store = UserStore(users_path)
+
+    def add_category(slug):
+        def apply(user):
+            user["appliedCategories"] = user.get("appliedCategories", []) + [slug]
+        return apply
+
+    async def burst():
+        await asyncio.gather(*(store.update(1, add_category(f"cat-{i}")) for i in range(50)))
+
+    asyncio.run(burst())
+    store.close()
+
+    reloaded = UserStore(users_path)
+    assert sorted(asyncio.run(reloaded.get(1))["appliedCategories"]) == sorted(f"cat-{i}" for i in range(50))
+
+
+def test_failed_mutation_changes_nothing(users_path):
+    store = UserStore(users_path)
+    before = asyncio.run(store.get(5))
+
+    def apply(user):
+        user["draft"] = None
+        raise ValueError("rejected")
+
+    with pytest.raises(ValueError):
+        asyncio.run(store.update(5, apply))
+    assert asyncio.run(store.get(5)) is before
+    assert asyncio.run(store.get(5))["draft"] is not None
+    assert not store.journal_path.exists()
+
+
+def test_close_compacts_snapshot_atomically(users_path):
+    store = UserStore(users_path)
+    asyncio.run(store.update(2, lambda u: u.update(applied=True)))
+    store.close()
+
+    users = json.loads(users_path.read_text(encoding="utf-8"))["users"]
+    assert next(u for u in users if u["id"] == 2)["applied"] is True
+    assert store.journal_path.read_bytes() == b""
@@ -0,0 +1,39 @@
+"""Tests for the direct JSON response layer."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.api.responses import Encoder, dump_json, json_response
+from app.api.v1.endpoints.auth import DraftPatchResponse
+
+
+def test_dump_json_is_compact_utf8():
+    payload = {"name": "وسيم", "scores": [1, 2.5, None], "ok": True}
+    assert dump_json(payload) == json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    assert dump_json({1: "a"}) == b'{"1":"a"}'  # orjson rejects int keys; the stdlib takes over
+
+    res = json_response(payload, status_code=202, headers={"ETag": '"1"'})
+    assert (res.status_code, res.headers["etag"], res.media_type) == (202, '"1"', "application/json")
+    assert json.loads(res.body) == payload
+
+
+def test_encoder_validates_once_and_applies_dump_options():
+    encoder = Encoder(DraftPatchResponse, exclude_none=True)
+    res = encoder.response({"key": "department", "version": 2, "changed": True})
+    assert json.loads(res.body) == {"key": "department", "version": 2, "changed": True}
+    with pytest.raises(ValidationError):
+        encoder.response({"key": "department"})
+
+
+def test_user_endpoints_skip_revalidation_but_keep_their_schema(app, user_store):
+    client = TestClient(app)
+    res = client.get("/api/v1/auth/me/5")
+    assert res.headers["content-type"] == "application/json"
+    assert res.json()["email"] == "abood@gmail.com"
+    assert client.get("/api/v1/auth/me/5", params={"fields": "registered"}).json().keys() == {"id", "registered"}
+
+    schema = app.openapi()["paths"]["/api/v1/auth/me/{user_id}"]["get"]["responses"]["200"]
+    assert schema["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/UserResponse"}
@@ -0,0 +1,117 @@
+"""Tests for judges' scores, weighted totals and leaderboards."""
+
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.scoring import CategoryBoard, Scoreboard, ScoreError, competition_ranks
+
+
+def _set(board, user_id, judge, **scores):
+    board.set(user_id, judge, board.validate({k.replace("_", "-"): v for k, v in scores.items()}))
+
+
+def test_weights_follow_the_criteria():
+    efqm = CategoryBoard("department")
+    assert efqm.criteria == ("dept-plan", "dept-resources", "dept-people", "dept-results")
+    assert efqm.max_total == 1000
+    _set(efqm, 1, "a", dept_plan=200, dept_resources=150, dept_people=100, dept_results=300)
+    assert efqm.standing(1)["total"] == 750
+
+    # The unsung hero is rated 1-10 per criterion, each worth 20 points.
+    unsung = CategoryBoard("employee-nonsupervisory-unsung")
+    _set(unsung, 1, "a", unsung_achievements=10, unsung_rules=5)
+    assert unsung.standing(1)["total"] == 30 and unsung.max_total == 100
+    with pytest.raises(ScoreError):
+        unsung.validate({"unsung-rules": 0})
+    with pytest.raises(ScoreError):
+        CategoryBoard("project").validate({"proj-design": 21})
+    with pytest.raises(ScoreError):
+        CategoryBoard("project").validate({"emp-perf": 10})
+    with pytest.raises(ScoreError):
+        CategoryBoard("nonexistent")
+
+
+def test_leaderboard_updates_incrementally():
+    board = CategoryBoard("employee-nonsupervisory-administrative")
+    full = dict(emp_perf=40, emp_init=15, emp_collab=15, emp_resp=15, emp_learn=15)
+    _set(board, 1, "a", **full)
+    _set(board, 2, "a", **{**full, "emp_perf": 20})
+    _set(board, 3, "a", **{**full, "emp_perf": 20})
+    items, total = board.leaderboard()
+    assert [(r["userId"], r["rank"], r["total"]) for r in items] == [(1, 1, 100), (2, 2, 80), (3, 2, 80)]
+    assert total == 3
+
+    # A second judge and a corrected score move only the affected entry.
+    _set(board, 3, "b", **full)
+    assert board.standing(3) == {**board.standing(3), "rank": 2, "total": 90, "judges": 2}
+    _set(board, 3, "a", emp_perf=40)
+    assert [r["userId"] for r in board.leaderboard()[0]] == [1, 3, 2]
+    assert board.standing(3)["rank"] == 1
+
+    # Clearing every score of a judge removes their total.
+    _set(board, 2, "a", **{k: None for k in full})
+    assert board.standing(2) is None and board.leaderboard()[1] == 2
+    assert board.sheet(3)["b"] == {"scores": {c: float(v) for c, v in zip(board.criteria, full.values())},
+                                   "total": 100}
+
+
+def test_normalization_evens_out_harsh_and_lenient_judges():
+    board = CategoryBoard("project")
+
+    def score(user_id, judge, total):
+        _set(board, user_id, judge, proj_results=total)
+
+    # The lenient judge sees 1 and 2; the harsh judge sees 3 and 4.
+    score(1, "lenient", 50), score(2, "lenient", 40)
+    score(3, "harsh", 20), score(4, "harsh", 10)
+    raw = [r["userId"] for r in board.leaderboard()[0]]
+    assert raw == [1, 2, 3, 4]
+    items, _ = board.leaderboard(normalized=True)
+    assert [(r["userId"], r["rank"], r["normalized"]) for r in items] == [
+        (1, 1, 1.0), (3, 1, 1.0), (2, 3, -1.0), (4, 3, -1.0)
+    ]
+
+    # Matches a direct computation over the judge totals.
+    totals = board.totals[:4, :2]
+    z = (totals - np.nanmean(totals, axis=0)) / np.nanstd(totals, axis=0)
+    assert np.allclose(board.normalized(), np.nanmean(z, axis=1))
+
+
+def test_competition_ranks():
+    assert competition_ranks(np.array([5.0, 9.0, 9.0, 1.0])).tolist() == [3, 1, 1, 4]
+
+
+def test_scores_survive_restart(tmp_path):
+    path = tmp_path / "scores.json"
+    board = Scoreboard(path, compact_threshold=3)
+    for judge in ("a", "b", "c", "d"):
+        asyncio.run(board.set_scores(5, "project", judge, {"proj-design": 10, "proj-exec": 20}))
+    asyncio.run(board.set_scores(5, "project", "d", {"proj-exec": None}))
+    board.close()
+    assert path.exists()
+
+    restored = Scoreboard(path)
+    judges, standing = restored.sheet(5, "project")
+    assert judges["d"] == {"scores": {"proj-design": 10.0}, "total": 10}
+    assert standing["judges"] == 4 and standing["total"] == 25
+    restored.close()
+
+
+def test_score_endpoints(app, user_store):
+    client = TestClient(app)
+    url = "/api/v1/review/scores/5/project"
+    res = client.put(url, json={"judge": "j1", "scores": {"proj-design": 18, "proj-exec": 25, "proj-results": 40}})
+    assert res.status_code == 200 and res.json()["standing"]["total"] == 83
+    client.put("/api/v1/review/scores/6/project", json={"judge": "j1", "scores": {"proj-results": 45}})
+
+    assert client.get(url).json()["judges"]["j1"]["total"] == 83
+    board = client.get("/api/v1/review/leaderboard/project").json()
+    assert [(r["userId"], r["rank"]) for r in board["items"]] == [(5, 1), (6, 2)] and board["total"] == 2
+    assert client.get("/api/v1/review/leaderboard/project", params={"normalized": True}).json()["items"][0]["userId"] == 5
+
+    assert client.put(url, json={"judge": "j1", "scores": {"proj-design": 99}}).status_code == 400
+    assert client.put("/api/v1/review/scores/1/project", json={"judge": "j1", "scores": {}}).status_code == 404
+    assert client.get("/api/v1/review/leaderboard/unknown").status_code == 400
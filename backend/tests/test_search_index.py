@@ -0,0 +1,110 @@
+"""Tests for the admin full-text search index and its endpoint."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import search_index as search_module
+from app.services.search_index import SearchIndex, analyze
+
+
+def _user(user_id, first, last, reason="", id_number="", status="waiting-approval", **extra):
+    draft = {"firstName": first, "lastName": last, "idNumber": id_number, "nominationReason": reason,
+             "answers": {"proj-kpi": "yes"}}
+    return {
+        "id": user_id,
+        "email": f"user{user_id}@sam.ae",
+        "appliedCategories": ["project"],
+        "categoryStatuses": {"project": status},
+        "draft": {"project": draft},
+        **extra,
+    }
+
+
+def _ids(index, query, **filters):
+    hits, _ = index.search(query, **filters)
+    return [hit.info["userId"] for hit in hits]
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.load_users([
+        _user(1, "فاطمة", "الشامسي", "قادت مشروع رقمنة المعاملات", "784-1990-1234567-1"),
+        _user(2, "Omar", "Haddad", "Delivered the asset-tracking projects on time", status="qualified"),
+        _user(3, "أحمد", "المنصوري", "ساهم في ترشيد استهلاك الطاقة والمياه في المؤسسة"),
+    ])
+    return index
+
+
+def test_analyzer_folds_and_stems():
+    assert analyze("إدارةُ الأصولِ") == analyze("اداره الاصول")
+    assert analyze("المشروعات") == analyze("مشروع") == ["مشروع"]
+    assert analyze("للموظفين") == analyze("موظف")
+    assert analyze("Projects ٧٨٤") == ["project", "784"]
+
+
+def test_search_matches_arabic_variants_names_and_ids(index):
+    assert _ids(index, "فاطمه") == [1]  # ta marbuta written as ha
+    assert _ids(index, "المشاريع الرقمية مشروعات") == [1]
+    assert _ids(index, "project") == [2]
+    assert _ids(index, "1234567") == [1]
+    assert _ids(index, "مؤسسات") == [3]
+    assert _ids(index, "user2@sam.ae")[0] == 2
+    assert _ids(index, "yes") == []  # eligibility answers are not indexed
+
+
+def test_bm25_ranks_rarer_and_repeated_terms_higher():
+    index = SearchIndex()
+    index.load_users([
+        _user(1, "a", "b", "الطاقة الطاقة الطاقة"),
+        _user(2, "a", "b", "الطاقة والمياه"),
+        _user(3, "a", "b", "المياه"),
+    ])
+    hits, total = index.search("الطاقة")
+    assert [h.info["userId"] for h in hits] == [1, 2] and total == 2
+    assert _ids(index, "الطاقة المياه")[0] == 2
+
+
+def test_filters_and_updates(index):
+    assert _ids(index, "sam", status="qualified") == [2]
+    assert _ids(index, "sam", category="green") == []
+
+    index.put_user(_user(1, "فاطمة", "الشامسي", "برنامج تبادل المعرفة", status="qualified"))
+    assert _ids(index, "رقمنة") == []
+    assert _ids(index, "المعرفة", status="qualified") == [1]
+
+    index.put_user({"id": 4, "email": "new@sam.ae"})  # no application yet
+    assert index.search("new")[0][0].info["categorySlug"] == ""
+
+
+def test_compaction_keeps_results(monkeypatch):
+    monkeypatch.setattr(search_module, "COMPACT_MIN_DEAD", 2)
+    index = SearchIndex()
+    index.load_users([_user(i, "a", "b", f"نص {i}") for i in range(1, 4)])
+    for round_ in range(5):
+        index.put_user(_user(1, "a", "b", f"تحديث {round_}"))
+    assert len(index._info) < 8  # dead documents were dropped
+    assert _ids(index, "تحديث 4") == [1] and _ids(index, "نص 3")[0] == 3
+    assert index.search("a")[1] == 3
+
+
+def test_admin_search_endpoint_follows_writes(app, user_store):
+    client = TestClient(app)
+    user_id = client.post("/api/v1/auth/signup", json={"email": "layla@example.com", "password": "pw"}).json()["id"]
+    assert client.get("/api/v1/auth/admin/search", params={"q": "layla"}).json()["items"][0]["userId"] == user_id
+
+    client.patch(f"/api/v1/auth/draft/{user_id}/project", json={"firstName": "ليلى", "lastName": "حداد"})
+    client.post(
+        f"/api/v1/auth/complete-registration/{user_id}",
+        json={"categorySlug": "project", "data": {}, "status": "waiting-approval"},
+    )
+    res = client.get("/api/v1/auth/admin/search", params={"q": "ليلي", "status": "waiting-approval"}).json()
+    assert res["total"] == 1
+    assert res["items"][0] == {**res["items"][0], "name": "ليلى حداد", "categorySlug": "project"}
+
+    client.patch(
+        f"/api/v1/auth/draft/{user_id}/submission:project",
+        json={"criteriaResponses": {"proj-design": {"text": "خطة تنفيذ المشروع"}}},
+    )
+    assert client.get("/api/v1/auth/admin/search", params={"q": "خطه"}).json()["total"] == 1
+    assert client.get("/api/v1/auth/admin/search", params={"q": ""}).status_code == 422
@@ -0,0 +1,63 @@
+"""Tests for password hashing and rehash-on-login."""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.core.security import PasswordHasher, hash_password, parse_hash, verify_password
+
+
+def test_hash_round_trip():
+    stored = hash_password("كلمة-سر", 16, 1, 1)
+    assert stored.startswith("scrypt$16$1$1$")
+    assert verify_password(stored, "كلمة-سر")
+    assert not verify_password(stored, "wrong")
+    assert hash_password("كلمة-سر", 16, 1, 1) != stored  # fresh salt
+
+
+def test_verify_reports_upgrades():
+    hasher = PasswordHasher(n=32, r=1, p=1, workers=None)
+
+    ok, upgraded = asyncio.run(hasher.verify("plain", "plain"))
+    assert ok and parse_hash(upgraded)[:3] == (32, 1, 1)
+
+    ok, again = asyncio.run(hasher.verify(upgraded, "plain"))
+    assert ok and again is None
+
+    ok, upgraded = asyncio.run(hasher.verify(hash_password("pw", 16, 1, 1), "pw"))
+    assert ok and parse_hash(upgraded)[0] == 32
+
+    assert asyncio.run(hasher.verify(None, "pw")) == (False, None)
+    assert asyncio.run(hasher.verify("plain", "other")) == (False, None)
+
+
+def test_process_pool_hashing():
+    hasher = PasswordHasher(n=16, r=1, p=1, workers=1)
+    try:
+        stored = asyncio.run(hasher.hash("pw"))
+        assert asyncio.run(hasher.verify(stored, "pw")) == (True, None)
+    finally:
+        hasher.close()
+
+
+def test_login_upgrades_plaintext_password(app, user_store):
+    client = TestClient(app)
+    assert asyncio.run(user_store.get_by_email("abood@gmail.com"))["password"] == "a"
+
+    res = client.post("/api/v1/auth/login", json={"email": "abood@gmail.com", "password": "a"})
+    assert res.status_code == 200
+    stored = asyncio.run(user_store.get_by_email("abood@gmail.com"))["password"]
+    assert stored.startswith("scrypt$")
+
+    # The upgraded hash keeps working and is not rewritten again.
+    assert client.post("/api/v1/auth/login", json={"email": "abood@gmail.com", "password": "a"}).status_code == 200
+    assert asyncio.run(user_store.get_by_email("abood@gmail.com"))["password"] == stored
+    assert client.post("/api/v1/auth/login", json={"email": "abood@gmail.com", "password": "b"}).status_code == 401
+
+
+def test_signup_stores_hash(app, user_store):
+    client = TestClient(app)
+    client.post("/api/v1/auth/signup", json={"email": "hash@sam.ae", "password": "pw"})
+    assert asyncio.run(user_store.get_by_email("hash@sam.ae"))["password"].startswith("scrypt$")
+    assert client.post("/api/v1/auth/login", json={"email": "hash@sam.ae", "password": "pw"}).status_code == 200
+    assert client.post("/api/v1/auth/login", json={"email": "nobody@sam.ae", "password": "pw"}).status_code == 401
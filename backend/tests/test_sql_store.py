@@ -0,0 +1,160 @@
+"""Tests for the SQL user store, importer and the auth endpoints on top of it."""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import NullPool
+
+from app.db.importer import import_users, iter_users
+from app.db.session import create_engine
+from app.services.sql_user_store import SqlUserStore, rows_to_user, user_to_rows
+from app.services.user_store import DuplicateEmailError, UserStore
+
+
+@pytest.fixture
+def sql_store(app, users_path, tmp_path):
+    """A SQLite database imported from the seed, wired into the auth endpoints."""
+    from app.api.deps import get_user_store
+
+    # NullPool: every TestClient request runs on its own event loop.
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}", poolclass=NullPool)
+    asyncio.run(import_users(engine, users_path, batch_size=7))
+    store = SqlUserStore(engine)
+    app.dependency_overrides[get_user_store] = lambda: store
+    yield store
+    app.dependency_overrides.pop(get_user_store, None)
+    asyncio.run(store.aclose())
+
+
+def _normalized(user):
+    """Drop keys that are empty in one representation and absent in the other."""
+    return {k: v for k, v in user.items() if v not in (None, {}, [], False)}
+
+
+def test_iter_users_streams_across_chunks(users_path):
+    expected = json.loads(users_path.read_text(encoding="utf-8"))["users"]
+    assert list(iter_users(users_path, chunk_size=37)) == expected
+
+
+def test_rows_round_trip_seed_users(users_path):
+    for user in iter_users(users_path):
+        rows = user_to_rows(user)
+        assembled = rows_to_user(
+            rows.user,
+            [{"category_slug": k, **v} for k, v in rows.registrations.items()],
+            [{"key": k, **v} for k, v in rows.drafts.items()],
+            [{"category_slug": k, **v} for k, v in rows.applications.items()],
+        )
+        assert _normalized(assembled) == _normalized(user)
+
+
+def test_import_matches_json_store(sql_store, users_path):
+    json_store = UserStore(users_path)
+    try:
+        for user in json_store:
+            assert _normalized(asyncio.run(sql_store.get(user["id"]))) == _normalized(user)
+        for filters in (("waiting-approval",), ("waiting-approval", None, "2026-02-01", "2026-03-01")):
+            assert asyncio.run(sql_store.count_registrations(*filters)) == asyncio.run(
+                json_store.count_registrations(*filters)
+            )
+    finally:
+        json_store.close()
+
+
+def test_auth_flow_on_sql(app, sql_store):
+    client = TestClient(app)
+    res = client.post("/api/v1/auth/signup", json={"email": "sql@example.com", "password": "pw"})
+    assert res.status_code == 200
+    user_id = res.json()["id"]
+    assert client.post("/api/v1/auth/signup", json={"email": "sql@example.com", "password": "x"}).status_code == 400
+    assert client.post("/api/v1/auth/login", json={"email": "sql@example.com", "password": "pw"}).json()["id"] == user_id
+
+    res = client.patch(f"/api/v1/auth/draft/{user_id}/project", json={"title": "مشروع"})
+    assert res.json()["version"] == 1
+    res = client.post(
+        f"/api/v1/auth/complete-registration/{user_id}",
+        json={"categorySlug": "project", "data": {}, "status": "waiting-approval"},
+    )
+    assert res.status_code == 200
+
+    pending = client.get("/api/v1/auth/admin/registrations", params={"status": "waiting-approval", "category": "project"})
+    items = pending.json()["items"]
+    assert items[-1]["userId"] == user_id
+    assert items[-1]["registrationData"] == {"title": "مشروع"}
+
+    res = client.post(
+        "/api/v1/auth/admin/review-registration",
+        json={"userId": user_id, "categorySlug": "project", "action": "approve"},
+    )
+    assert res.status_code == 200
+    me = client.get(f"/api/v1/auth/me/{user_id}").json()
+    assert me["categoryStatuses"] == {"project": "qualified"}
+
+    res = client.post(
+        "/api/v1/auth/admin/review-registrations",
+        json={"decisions": [
+            {"userId": 6, "categorySlug": "department", "action": "approve"},
+            {"userId": 11, "categorySlug": "department", "action": "reject"},
+            {"userId": user_id, "categorySlug": "project", "action": "approve"},
+        ]},
+    )
+    assert [i["status"] for i in res.json()["items"]] == [200, 200, 400]
+    assert client.get("/api/v1/auth/me/11").json()["categoryStatuses"] == {"department": "rejected"}
+
+
+def test_scan_returns_every_user_in_batches(sql_store, users_path):
+    async def scan():
+        return [[user["id"] for user in batch] async for batch in sql_store.scan(batch_size=5)]
+
+    batches = asyncio.run(scan())
+    expected = sorted(user["id"] for user in iter_users(users_path))
+    assert [user_id for batch in batches for user_id in batch] == expected
+    assert all(len(batch) <= 5 for batch in batches)
+
+
+def test_submitted_form_survives_sql(sql_store):
+    form = {
+        "fullName": "مريم حداد",
+        "email": "maryam@sam.ae",
+        "nominationReason": "سبب الترشيح",
+        "extraFields": {"projectName": "أصول"},
+        "criteriaResponses": {"proj-design": {"text": "تصميم المشروع وخطة التنفيذ", "files": []}},
+    }
+    store_doc = {"referenceNumber": "SAM-9", "submittedAt": "2026-03-01T09:00:00.000Z", "data": form}
+
+    async def submit():
+        await sql_store.update(6, lambda user: user.setdefault("submissions", {}).update(project=store_doc))
+
+    asyncio.run(submit())
+    assert asyncio.run(sql_store.get(6))["submissions"]["project"]["data"] == form
+
+    # Reference numbers come from the client and may repeat.
+    asyncio.run(sql_store.update(7, lambda user: user.setdefault("submissions", {}).update(project=store_doc)))
+    assert asyncio.run(sql_store.get(7))["submissions"]["project"]["referenceNumber"] == "SAM-9"
+
+
+def test_create_reports_only_email_conflicts_as_duplicates(sql_store):
+    with pytest.raises(DuplicateEmailError):
+        asyncio.run(sql_store.create({"email": "abood@gmail.com", "password": "x"}))
+    with pytest.raises(IntegrityError):
+        asyncio.run(sql_store.create({"id": 6, "email": "new@example.com", "password": "x"}))
+
+
+def _all_entries(store, status):
+    seen, cursor = [], None
+    while True:
+        page, cursor = asyncio.run(store.registrations(status, cursor=cursor, limit=3))
+        seen += [entry for _, entry in page]
+        if cursor is None:
+            return seen
+
+
+def test_sql_pagination_matches_json_store(sql_store, users_path):
+    json_store = UserStore(users_path)
+    try:
+        assert _all_entries(sql_store, "waiting-approval") == _all_entries(json_store, "waiting-approval")
+    finally:
+        json_store.close()
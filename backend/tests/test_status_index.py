@@ -0,0 +1,132 @@
+"""Tests for the registration status index and paginated admin listings."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import auth
+from app.services.status_index import StatusIndex, decode_cursor, encode_cursor
+
+
+def _user(user_id, statuses, registered_at=None):
+    return {"id": user_id, "categoryStatuses": statuses, "categoryRegisteredAt": registered_at or {}}
+
+
+def test_index_tracks_status_changes():
+    index = StatusIndex()
+    before = _user(1, {"project": "waiting-approval"}, {"project": "2026-01-01T00:00:00.000Z"})
+    index.update(None, before)
+    assert index.count("waiting-approval") == 1
+    assert index.count("waiting-approval", "project") == 1
+
+    after = _user(1, {"project": "qualified"}, {"project": "2026-01-01T00:00:00.000Z"})
+    index.update(before, after)
+    assert index.count("waiting-approval") == 0
+    assert index.count("qualified", "project") == 1
+
+
+def test_page_by_cursor_and_date():
+    index = StatusIndex()
+    for i in range(1, 11):
+        index.update(None, _user(i, {"green": "waiting-approval"}, {"green": f"2026-01-{i:02d}T00:00:00.000Z"}))
+
+    seen, cursor = [], None
+    while True:
+        entries, cursor = index.page("waiting-approval", cursor=cursor, limit=3)
+        seen += [e[1] for e in entries]
+        if cursor is None:
+            break
+    assert seen == list(range(1, 11))
+
+    entries, cursor = index.page(
+        "waiting-approval", registered_from="2026-01-04", registered_to="2026-01-07", limit=10
+    )
+    assert [e[1] for e in entries] == [4, 5, 6]
+    assert cursor is None
+    assert index.count("waiting-approval", registered_from="2026-01-04", registered_to="2026-01-07") == 3
+    assert index.count("waiting-approval", "green", registered_from="2026-01-09") == 2
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    entry = ("2026-02-16T13:06:57.763Z", 6, "department")
+    assert decode_cursor(encode_cursor(entry)) == entry
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_pending_registrations_endpoint(app, user_store, monkeypatch):
+    client = TestClient(app)
+    res = client.get("/api/v1/auth/admin/pending-registrations")
+    data = res.json()
+    assert data["total"] == 10
+    assert {(p["userId"], p["categorySlug"]) for p in data["pending"]} >= {(6, "department"), (13, "green")}
+
+    first = client.get("/api/v1/auth/admin/pending-registrations", params={"limit": 4}).json()
+    second = client.get(
+        "/api/v1/auth/admin/pending-registrations", params={"limit": 4, "cursor": first["nextCursor"]}
+    ).json()
+    keys = [(p["userId"], p["categorySlug"]) for p in first["pending"] + second["pending"]]
+    assert len(set(keys)) == 8
+    assert first["total"] == 10
+
+    monkeypatch.setattr(auth, "PAGE_MAX", 3)  # the unpaged default walks every page
+    everything = client.get("/api/v1/auth/admin/pending-registrations").json()
+    assert len(everything["pending"]) == 10 and everything["nextCursor"] is None
+
+    res = client.get("/api/v1/auth/admin/pending-registrations", params={"category": "knowledge"})
+    assert [p["userId"] for p in res.json()["pending"]] == [9, 10]
+
+    assert client.get("/api/v1/auth/admin/pending-registrations", params={"cursor": "@@"}).status_code == 400
+
+
+def test_index_follows_registration_and_review(app, user_store):
+    client = TestClient(app)
+    client.post(
+        "/api/v1/auth/complete-registration/1",
+        json={"categorySlug": "project", "data": {}, "status": "waiting-approval"},
+    )
+    res = client.get(
+        "/api/v1/auth/admin/pending-registrations",
+        params={"category": "project", "submittedFrom": "2000-01-01"},
+    )
+    [item] = res.json()["pending"]
+    assert item["userId"] == 1
+    assert res.json()["total"] == 1
+    assert item["submittedAt"].endswith("Z")
+
+    client.post("/api/v1/auth/admin/review-registration", json={"userId": 1, "categorySlug": "project", "action": "approve"})
+    res = client.get("/api/v1/auth/admin/pending-registrations", params={"category": "project"})
+    assert res.json()["pending"] == []
+    res = client.get("/api/v1/auth/admin/registrations", params={"status": "qualified", "category": "project"})
+    assert 1 in [item["userId"] for item in res.json()["items"]]
+
+
+def test_bulk_review_endpoint(app, user_store):
+    client = TestClient(app)
+    url = "/api/v1/auth/admin/review-registrations"
+    decisions = [
+        {"userId": 6, "categorySlug": "department", "action": "approve"},
+        {"userId": 9, "categorySlug": "knowledge", "action": "reject"},
+        {"userId": 9, "categorySlug": "department", "action": "approve"},
+        {"userId": 5, "categorySlug": "project", "action": "approve"},  # already qualified
+        {"userId": 6, "categorySlug": "department", "action": "reject"},  # duplicate
+        {"userId": 999, "categorySlug": "project", "action": "approve"},
+        {"userId": 11, "categorySlug": "department", "action": "maybe"},
+    ]
+    journal = user_store.journal_path
+
+    # All or nothing: one invalid decision and nothing changes.
+    res = client.post(url, json={"decisions": decisions, "allOrNothing": True})
+    assert res.status_code == 409 and len(res.json()["detail"]["items"]) == len(decisions)
+    assert not journal.exists() or journal.read_text() == ""
+
+    res = client.post(url, json={"decisions": decisions})
+    body = res.json()
+    assert res.status_code == 200 and (body["applied"], body["failed"]) == (3, 4)
+    assert [i["status"] for i in body["items"]] == [200, 200, 200, 400, 409, 404, 400]
+    assert body["items"][1]["newStatus"] == "rejected"
+    assert len(journal.read_text(encoding="utf-8").splitlines()) == 1
+
+    assert client.get("/api/v1/auth/me/9").json()["categoryStatuses"]["knowledge"] == "rejected"
+    pending = client.get("/api/v1/auth/admin/pending-registrations").json()
+    assert pending["total"] == 7
+    assert client.post(url, json={"decisions": []}).status_code == 422
@@ -0,0 +1,135 @@
+"""Tests for resumable, content-addressed attachment uploads."""
+
+import hashlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.uploads import UploadService
+
+PDF = b"%PDF-1.7\n" + bytes(range(256)) * 40
+
+
+@pytest.fixture
+def uploads(app, tmp_path):
+    from app.api.deps import get_upload_service
+
+    service = UploadService(tmp_path / "uploads", max_file_bytes=64 * 1024, max_submission_bytes=128 * 1024)
+    app.dependency_overrides[get_upload_service] = lambda: service
+    yield service
+    app.dependency_overrides.pop(get_upload_service, None)
+
+
+def _user_id(user_store):
+    return next(iter(user_store))["id"]
+
+
+def _open(client, user_id, data=PDF, name="evidence.pdf", slug="project", **extra):
+    return client.post(
+        "/api/v1/uploads",
+        json={"userId": user_id, "categorySlug": slug, "fileName": name, "size": len(data), **extra},
+    )
+
+
+def _send(client, upload_id, offset, chunk):
+    return client.patch(f"/api/v1/uploads/{upload_id}", content=chunk, headers={"Upload-Offset": str(offset)})
+
+
+def test_chunked_upload_is_stored_by_hash(app, user_store, uploads):
+    client = TestClient(app)
+    user_id = _user_id(user_store)
+    upload_id = _open(client, user_id, criterionId="proj-kpi").json()["uploadId"]
+
+    half = len(PDF) // 2
+    first = _send(client, upload_id, 0, PDF[:half]).json()
+    assert first == {**first, "offset": half, "complete": False}
+    assert client.head(f"/api/v1/uploads/{upload_id}").headers["Upload-Offset"] == str(half)
+
+    done = _send(client, upload_id, half, PDF[half:]).json()
+    sha = hashlib.sha256(PDF).hexdigest()
+    assert done["complete"] and done["attachment"]["sha256"] == sha
+    assert done["attachment"]["criterionId"] == "proj-kpi"
+    assert client.get(f"/api/v1/uploads/files/{sha}").content == PDF
+    assert client.get(f"/api/v1/uploads/{upload_id}").status_code == 404
+
+    listing = client.get(f"/api/v1/uploads/submissions/{user_id}/project").json()
+    assert [a["sha256"] for a in listing["attachments"]] == [sha]
+    assert listing["usedBytes"] == len(PDF)
+
+
+def test_identical_files_share_one_blob(app, user_store, uploads):
+    client = TestClient(app)
+    user_id = _user_id(user_store)
+    for slug in ("project", "green"):
+        upload_id = _open(client, user_id, slug=slug).json()["uploadId"]
+        assert _send(client, upload_id, 0, PDF).json()["complete"]
+    assert len(list(uploads.blob_dir.rglob("*"))) == 2  # one shard directory, one blob
+    assert not list(uploads.partial_dir.iterdir())
+
+
+def test_wrong_offset_is_a_conflict(app, user_store, uploads):
+    client = TestClient(app)
+    upload_id = _open(client, _user_id(user_store)).json()["uploadId"]
+    _send(client, upload_id, 0, PDF[:100])
+    res = _send(client, upload_id, 0, PDF[:100])
+    assert res.status_code == 409
+    assert uploads.get(upload_id).offset == 100
+
+
+def test_quotas_are_enforced(app, user_store, uploads):
+    client = TestClient(app)
+    user_id = _user_id(user_store)
+    big = PDF * 10  # over the 64 KiB per-file limit
+    assert _open(client, user_id, data=big).status_code == 413
+
+    # Open uploads reserve their declared size.
+    chunk = PDF * 5
+    assert _open(client, user_id, data=chunk).status_code == 201
+    assert _open(client, user_id, data=chunk).status_code == 201
+    assert _open(client, user_id, data=chunk).status_code == 413
+    assert _open(client, user_id, data=chunk, slug="green").status_code == 201
+
+
+def test_bytes_beyond_declared_size_are_rejected(app, user_store, uploads):
+    client = TestClient(app)
+    upload_id = _open(client, _user_id(user_store), data=PDF[:100]).json()["uploadId"]
+    assert _send(client, upload_id, 0, PDF[:150]).status_code == 413
+    assert uploads._part_path(upload_id).stat().st_size <= 100
+
+
+def test_type_is_checked_by_extension_and_content(app, user_store, uploads):
+    client = TestClient(app)
+    user_id = _user_id(user_store)
+    assert _open(client, user_id, name="run.exe").status_code == 415
+
+    fake = b"MZ" + PDF[2:]
+    upload_id = _open(client, user_id, data=fake).json()["uploadId"]
+    assert _send(client, upload_id, 0, fake).status_code == 415
+    assert client.get(f"/api/v1/uploads/{upload_id}").status_code == 404
+
+
+def test_upload_resumes_after_restart(app, user_store, uploads):
+    client = TestClient(app)
+    user_id = _user_id(user_store)
+    upload_id = _open(client, user_id).json()["uploadId"]
+    _send(client, upload_id, 0, PDF[:4])  # fewer bytes than the type signature
+
+    restarted = UploadService(uploads.root, uploads.max_file_bytes, uploads.max_submission_bytes)
+    from app.api.deps import get_upload_service
+
+    app.dependency_overrides[get_upload_service] = lambda: restarted
+    assert client.head(f"/api/v1/uploads/{upload_id}").headers["Upload-Offset"] == "4"
+    done = _send(client, upload_id, 4, PDF[4:]).json()
+    assert done["attachment"]["sha256"] == hashlib.sha256(PDF).hexdigest()
+
+
+def test_remove_attachment_frees_quota(app, user_store, uploads):
+    client = TestClient(app)
+    user_id = _user_id(user_store)
+    upload_id = _open(client, user_id).json()["uploadId"]
+    attachment = _send(client, upload_id, 0, PDF).json()["attachment"]
+
+    url = f"/api/v1/uploads/submissions/{user_id}/project"
+    assert client.delete(f"{url}/{attachment['id']}").status_code == 204
+    assert client.get(url).json()["usedBytes"] == 0
+    assert client.delete(f"{url}/{attachment['id']}").status_code == 404
@@ -0,0 +1,61 @@
+"""Tests for sparse fieldsets on the user endpoints and their sub-resources."""
+
+from fastapi.testclient import TestClient
+
+
+def _largest_user(store):
+    return max(store, key=lambda u: len(str(u.get("draft"))) + len(str(u.get("submissions"))))
+
+
+def test_me_without_projection_is_unchanged(app, user_store):
+    client = TestClient(app)
+    user = _largest_user(user_store)
+    data = client.get(f"/api/v1/auth/me/{user['id']}").json()
+    assert data["draft"] == user.get("draft")
+    assert set(data) >= {"registrationData", "submissions", "draft", "isAdmin"}
+
+
+def test_fields_returns_only_requested_keys(app, user_store):
+    client = TestClient(app)
+    user = _largest_user(user_store)
+    full = client.get(f"/api/v1/auth/me/{user['id']}")
+    res = client.get(f"/api/v1/auth/me/{user['id']}", params={"fields": "registered,isAdmin"})
+    assert res.json() == {"id": user["id"], "registered": user["registered"], "isAdmin": user.get("isAdmin", False)}
+    assert len(res.content) < 200 < len(full.content)
+
+
+def test_include_adds_heavy_fields_to_light_ones(app, user_store):
+    client = TestClient(app)
+    user = _largest_user(user_store)
+    data = client.get(f"/api/v1/auth/me/{user['id']}", params={"include": "submissions"}).json()
+    assert "submissions" in data and "email" in data
+    assert "draft" not in data and "registrationData" not in data
+
+    data = client.post(
+        "/api/v1/auth/login",
+        params={"include": ""},
+        json={"email": user["email"], "password": user["password"]},
+    ).json()
+    assert not set(data) & {"draft", "submissions", "registrationData"}
+
+
+def test_unknown_field_is_rejected(app, user_store):
+    res = TestClient(app).get("/api/v1/auth/me/1", params={"fields": "registered,password"})
+    assert res.status_code == 400
+    assert "password" in res.json()["detail"]
+
+
+def test_sub_resources_revalidate(app, user_store):
+    client = TestClient(app)
+    user = _largest_user(user_store)
+    for path in ("submissions", "registration-data"):
+        res = client.get(f"/api/v1/auth/me/{user['id']}/{path}")
+        assert res.status_code == 200
+        again = client.get(f"/api/v1/auth/me/{user['id']}/{path}", headers={"If-None-Match": res.headers["etag"]})
+        assert again.status_code == 304
+
+    res = client.get(f"/api/v1/auth/draft/{user['id']}")
+    assert res.json() == {"draft": user.get("draft")}
+    etag = res.headers["etag"]
+    client.post(f"/api/v1/auth/draft/{user['id']}", json={"data": {"new": {"x": 1}}})
+    assert client.get(f"/api/v1/auth/draft/{user['id']}", headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,100 @@
+"""Tests for the indexed user store and the auth endpoints built on it."""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.user_store import UserStore
+
+
+def test_store_indexes_seed_users(users_path):
+    store = UserStore(users_path)
+    assert len(store) == 14
+    assert asyncio.run(store.get(5))["email"] == "abood@gmail.com"
+    assert asyncio.run(store.get_by_email("abood@gmail.com"))["id"] == 5
+    assert asyncio.run(store.get(999)) is None
+    assert asyncio.run(store.get_by_email("nobody@example.com")) is None
+
+
+def test_writes_go_to_journal_and_replay(users_path):
+    before = users_path.read_bytes()
+    store = UserStore(users_path)
+    asyncio.run(store.update(6, lambda u: u.update(draft={"department": {"firstName": "وسيم"}})))
+    created = asyncio.run(store.create({"email": "new@sam.ae", "password": "x", "registered": False, "applied": False}))
+
+    # The snapshot is untouched; only the changed users were appended.
+    assert users_path.read_bytes() == before
+    lines = store.journal_path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["user"]["id"] for line in lines] == [6, created["id"]]
+
+    reloaded = UserStore(users_path)
+    assert asyncio.run(reloaded.get(6))["draft"] == {"department": {"firstName": "وسيم"}}
+    assert asyncio.run(reloaded.get_by_email("new@sam.ae"))["id"] == 16
+
+
+def test_torn_journal_tail_is_ignored(users_path):
+    store = UserStore(users_path)
+    asyncio.run(store.update(1, lambda u: u.update(registered=True)))
+    with open(store.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"op": "put", "user": {"id": 1, "ema')
+
+    assert asyncio.run(UserStore(users_path).get(1))["registered"] is True
+
+
+def test_update_many_is_one_journal_record_and_all_or_nothing(users_path):
+    store = UserStore(users_path)
+
+    def approve(slug):
+        return lambda u: u["categoryStatuses"].update({slug: "qualified"})
+
+    def broken(user):
+        raise ValueError("rejected")
+
+    with pytest.raises(ValueError):
+        asyncio.run(store.update_many({6: approve("department"), 11: broken}, paths=[("categoryStatuses",)]))
+    assert asyncio.run(store.get(6))["categoryStatuses"]["department"] == "waiting-approval"
+    assert not store.journal_path.exists() or store.journal_path.read_text() == ""
+
+    updated = asyncio.run(
+        store.update_many({6: approve("department"), 11: approve("department")}, paths=[("categoryStatuses",)])
+    )
+    assert set(updated) == {6, 11}
+    lines = store.journal_path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1 and [r["id"] for r in json.loads(lines[0])["records"]] == [6, 11]
+    assert asyncio.run(store.count_registrations("qualified", "department")) == 3
+
+    reloaded = UserStore(users_path)
+    assert asyncio.run(reloaded.get(11))["categoryStatuses"] == {"department": "qualified"}
+
+
+def test_compact_folds_journal_into_snapshot(users_path):
+    store = UserStore(users_path, compact_threshold=2)
+    for user_id in (1, 2):
+        asyncio.run(store.update(user_id, lambda u: u.update(applied=True)))
+    store.close()
+
+    assert store.journal_path.read_bytes() == b""
+    users = json.loads(users_path.read_text(encoding="utf-8"))["users"]
+    assert [u["applied"] for u in users if u["id"] in (1, 2)] == [True, True]
+
+
+def test_auth_endpoints_use_store(app, user_store):
+    client = TestClient(app)
+    res = client.post("/api/v1/auth/login", json={"email": "abood@gmail.com", "password": "a"})
+    assert res.status_code == 200
+    assert res.json()["isAdmin"] is True
+
+    res = client.post("/api/v1/auth/signup", json={"email": "fresh@sam.ae", "password": "pw"})
+    assert res.status_code == 200
+    new_id = res.json()["id"]
+
+    res = client.post(f"/api/v1/auth/draft/{new_id}", json={"data": {"project": {"firstName": "A"}}})
+    assert res.status_code == 200
+    assert client.get(f"/api/v1/auth/draft/{new_id}").json()["draft"] == {"project": {"firstName": "A"}}
+    assert asyncio.run(UserStore(user_store.path).get(new_id))["draft"] == {"project": {"firstName": "A"}}
+
+    assert client.get("/api/v1/auth/me/999").status_code == 404
+    res = client.post("/api/v1/auth/login", json={"email": "abood@gmail.com", "password": "wrong"})
+    assert res.status_code == 401
@@ -0,0 +1,131 @@
+"""Tests for submission validation and its incremental autosave path."""
+
+import json
+
+from fastapi.testclient import TestClient
+
+from app.services.criteria import PATTERN_A, PATTERN_B
+from app.services.validation import (
+    ALL,
+    count_words,
+    delta_from_json_patch,
+    delta_from_merge_patch,
+    get_validator,
+)
+
+MERGE = {"content-type": "application/merge-patch+json"}
+JSON_PATCH = {"content-type": "application/json-patch+json"}
+ANSWER = "قاد الموظف مبادرة لتحسين كفاءة إدارة الأصول وخفض التكاليف (cost savings) بنسبة 20%."
+
+
+def _form(criteria, **overrides):
+    form = {
+        "fullName": "مريم حداد",
+        "email": "maryam@sam.ae",
+        "phone": "+971 50 123 4567",
+        "criteriaResponses": {c.id: {"text": ANSWER, "files": []} for c in criteria},
+    }
+    form.update(overrides)
+    return form
+
+
+def test_count_words_mixed_arabic_english():
+    assert count_words("مرحبا بالعالم، هذا اختبار") == 4
+    assert count_words("كَتَبَ الطالبُ الدرسَ") == 3  # diacritics do not split words
+    assert count_words("كلمة،كلمة - e-services don't 1,000") == 5
+    assert count_words("   ") == 0
+
+
+def test_full_validation_reports_every_rule():
+    validator = get_validator("employee-nonsupervisory-administrative")
+    assert validator.validate(_form(PATTERN_A)).valid
+
+    responses = _form(PATTERN_A)["criteriaResponses"]
+    responses["emp-perf"] = {"text": "قصير", "files": []}
+    responses["emp-init"] = {"text": "كلمة " * 401, "files": [{}] * 16}
+    del responses["emp-learn"]
+    result = validator.validate(_form(PATTERN_A, email="x@gmail.com", phone="12345", criteriaResponses=responses))
+
+    assert [i["code"] for i in result.criteria["emp-perf"]] == ["responseTooShort"]
+    assert result.criteria["emp-init"] == [
+        {"code": "wordLimitExceeded", "max": 400, "current": 401},
+        {"code": "fileLimitExceeded", "max": 15, "current": 16},
+    ]
+    assert result.criteria["emp-learn"] == [{"code": "responseRequired"}]
+    assert set(result.fields) == {"email", "phone"}
+
+
+def test_validators_are_compiled_per_pattern():
+    assert get_validator("employee-nonsupervisory-unsung") is get_validator("employee-nonsupervisory-unsung")
+    assert get_validator("employee-nonsupervisory", "unsung").criteria == PATTERN_B
+    assert get_validator("employee-supervisory-futureleader").criteria[0].id == "fl-perf"
+    assert get_validator("unknown") is None
+
+    unsung = get_validator("employee-nonsupervisory-unsung")
+    result = unsung.validate(_form(PATTERN_B))
+    assert {i["code"] for issues in result.criteria.values() for i in issues} == {"ratingRequired"}
+
+
+def test_deltas_name_the_touched_criteria():
+    assert delta_from_merge_patch({"criteriaResponses": {"emp-perf": {"text": "x"}}}).criteria == {"emp-perf"}
+    assert delta_from_merge_patch({"phone": "x"}).fields
+    assert delta_from_merge_patch({"employeeSubcategory": "unsung"}) == ALL
+    ops = [{"op": "replace", "path": "/criteriaResponses/emp-init/text", "value": "x"}]
+    assert delta_from_json_patch(ops).criteria == {"emp-init"}
+    assert delta_from_json_patch([{"op": "remove", "path": "/criteriaResponses"}]).criteria is None
+
+
+def test_revalidate_only_rechecks_touched_criteria():
+    validator = get_validator("project")
+    form = _form(validator.criteria)
+    previous = validator.validate(form)
+
+    form["criteriaResponses"]["proj-exec"]["text"] = ""
+    form["criteriaResponses"]["proj-design"]["text"] = ""  # not part of the delta
+    delta = delta_from_merge_patch({"criteriaResponses": {"proj-exec": {"text": ""}}})
+    result = validator.revalidate(form, previous, delta)
+    assert set(k for k, v in result.criteria.items() if v) == {"proj-exec"}
+    assert previous.valid
+
+
+def test_autosave_returns_incremental_validation(app, user_store):
+    client = TestClient(app)
+    url = "/api/v1/auth/draft/6/submission:project"
+    form = _form(get_validator("project").criteria)
+
+    res = client.patch(url, content=json.dumps(form), headers=MERGE)
+    assert res.json()["validation"]["valid"] is True
+
+    ops = [{"op": "replace", "path": "/criteriaResponses/proj-results/text", "value": "كلمة " * 450}]
+    validation = client.patch(url, content=json.dumps(ops), headers=JSON_PATCH).json()["validation"]
+    assert validation["criteria"] == {"proj-results": [{"code": "wordLimitExceeded", "max": 400, "current": 450}]}
+    assert validation["wordCounts"]["proj-results"] == 450
+
+    # Ordinary registration drafts are not validated.
+    assert "validation" not in client.patch("/api/v1/auth/draft/6/project", json={"a": 1}, headers=MERGE).json()
+
+
+def test_submit_application_validates_the_form(app, user_store):
+    client = TestClient(app)
+    url = "/api/v1/auth/submit-application/6"
+    body = {"categorySlug": "project", "referenceNumber": "SAM-1", "submittedAt": "2026-03-01T09:00:00.000Z"}
+    form = _form(get_validator("project").criteria)
+
+    bad = client.post(url, json={**body, "data": {**form, "email": "someone@example.com"}})
+    assert bad.status_code == 422
+    assert bad.json()["detail"]["fields"]["email"][0]["code"] == "invalidEmail"
+
+    assert client.post(url, json={**body, "data": form}).status_code == 200
+    submitted = client.get("/api/v1/auth/me/6/submissions").json()["submissions"]
+    assert submitted["project"]["data"] == form
+
+    # Legacy clients that keep the form in the browser are still accepted.
+    assert client.post(url, json={**body, "categorySlug": "green"}).status_code == 200
+
+
+def test_validate_submission_endpoint(app):
+    client = TestClient(app)
+    res = client.post("/api/v1/auth/validate-submission", json={"categorySlug": "green", "data": {}})
+    assert res.status_code == 200
+    assert res.json()["valid"] is False and len(res.json()["criteria"]) == 8
+    assert client.post("/api/v1/auth/validate-submission", json={"categorySlug": "x", "data": {}}).status_code == 404
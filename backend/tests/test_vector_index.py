@@ -0,0 +1,159 @@
+"""Tests for the vector index, embedders and reviewers' evidence search."""
+
+import asyncio
+import io
+import json
+import zipfile
+
+import httpx
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.rag.embeddings import HashingEmbedder, RemoteEmbedder
+from app.rag.retrieval import Document, EvidenceIndex, passages
+from app.rag.vector_index import Entry, VectorIndex
+from app.services.criteria import PROJECT
+
+EMBEDDER = HashingEmbedder()
+PROJECT_CRITERIA = [c.id for c in PROJECT]
+TEXTS = {
+    "a": ("project", "proj-results", "خفض التكاليف بنسبة عشرين بالمئة cost savings"),
+    "b": ("project", "proj-design", "تصميم المشروع ومراحل التنفيذ"),
+    "c": ("green", "green-waste", "إعادة تدوير النفايات وخفض التكاليف"),
+}
+
+
+def _index(root) -> VectorIndex:
+    index = VectorIndex(root, EMBEDDER.dim, EMBEDDER.name)
+    entries = [Entry(id, category, criterion) for id, (category, criterion, _) in TEXTS.items()]
+    index.add(entries, EMBEDDER.embed([text for _, _, text in TEXTS.values()]))
+    return index
+
+
+def _search(index, query, **filters):
+    return [hit.id for hit in index.search(EMBEDDER.embed([query])[0], k=3, **filters)]
+
+
+def test_hashing_embedder_is_normalized_and_stable():
+    vectors = EMBEDDER.embed(["خفض التكاليف", "خَفْض التكاليف", ""])
+    assert np.allclose(np.linalg.norm(vectors[:2], axis=1), 1.0)
+    assert np.allclose(vectors[0], vectors[1])  # diacritics are ignored
+    assert not vectors[2].any()
+
+
+def test_search_ranks_and_filters(tmp_path):
+    index = _index(tmp_path)
+    assert _search(index, "خفض التكاليف")[:2] in (["a", "c"], ["c", "a"])
+    assert _search(index, "خفض التكاليف", category="project")[0] == "a"
+    assert _search(index, "خفض التكاليف", criterion="proj-design") == ["b"]
+    assert _search(index, "x", category="unknown") == []
+
+
+def test_updates_are_incremental_and_survive_reopen(tmp_path):
+    index = _index(tmp_path)
+    index.add([Entry("a", "project", "proj-design")], EMBEDDER.embed(["مراحل التنفيذ"]))
+    assert index.delete(["c", "missing"]) == 1
+    assert index.count == 4 and index.live == 2  # the old "a" row and "c" are dead, not rewritten
+    index.close()
+
+    reopened = VectorIndex(tmp_path, EMBEDDER.dim, EMBEDDER.name)
+    assert _search(reopened, "مراحل التنفيذ", criterion="proj-design") == ["a", "b"]
+    assert "c" not in reopened and reopened.live == 2
+    reopened.compact()
+    assert reopened.count == 2 and _search(reopened, "cost savings", category="green") == []
+    reopened.close()
+
+    with pytest.raises(ValueError):
+        VectorIndex(tmp_path, 128, "hashing-v1-128")
+
+
+def test_torn_log_line_is_dropped_on_reopen(tmp_path):
+    _index(tmp_path).close()
+    with open(tmp_path / "entries.jsonl", "a", encoding="utf-8") as log:
+        log.write('{"row": 3, "id": "d", "categ')
+    index = VectorIndex(tmp_path, EMBEDDER.dim, EMBEDDER.name)
+    assert index.live == 3
+    index.add([Entry("d", "green", "")], EMBEDDER.embed(["d"]))
+    index.close()
+    assert VectorIndex(tmp_path, EMBEDDER.dim, EMBEDDER.name).live == 4
+
+
+def test_capacity_grows(tmp_path):
+    index = VectorIndex(tmp_path, 8, "test")
+    vectors = np.eye(8, dtype=np.float32)[np.arange(3000) % 8]
+    index.add([Entry(str(i), "c") for i in range(3000)], vectors)
+    assert index.capacity == 4096
+    hits = index.search(np.eye(8, dtype=np.float32)[5], k=2)
+    assert all(int(hit.id) % 8 == 5 and hit.score == pytest.approx(1.0) for hit in hits)
+
+
+def test_remote_embedder_batches_requests():
+    calls = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        calls.append(body["input"])
+        data = [{"index": i, "embedding": [float(len(text)), 0.0]} for i, text in enumerate(body["input"])]
+        return httpx.Response(200, json={"data": data})
+
+    embedder = RemoteEmbedder("key", dim=2, batch_size=2, transport=httpx.MockTransport(handler))
+    vectors = embedder.embed(["a", "bb", "ccc"])
+    assert calls == [["a", "bb"], ["ccc"]]
+    assert np.allclose(vectors, [[1, 0], [1, 0], [1, 0]])
+    embedder.close()
+
+
+def test_passages_split_long_text():
+    assert [len(p.split()) for p in passages("كلمة " * 320)] == [150, 150, 20]
+
+
+def test_index_submission_replaces_previous_passages(tmp_path):
+    index = EvidenceIndex(tmp_path, EMBEDDER)
+    form = {"criteriaResponses": {"proj-results": {"text": "خفض التكاليف"}, "proj-design": {"text": "تصميم"}}}
+    report = Document("att1", "report.docx", "proj-results", "صفحة أولى\n\nوفورات مالية", [
+        {"kind": "page", "number": 1, "start": 0, "end": 9},
+        {"kind": "page", "number": 2, "start": 11, "end": 22},
+    ])
+    assert index.index_submission(6, "project", form, [report]) == 4
+    hit = index.search("وفورات مالية", k=1, criterion="proj-results")[0]
+    assert hit.meta["fileName"] == "report.docx" and hit.meta["page"] == 2
+
+    assert index.index_submission(6, "project", {"criteriaResponses": {"proj-design": {"text": "تصميم"}}}) == 1
+    assert index.index.live == 1
+    assert index.remove_submission(6, "project") == 1
+
+
+def _docx(*pages) -> bytes:
+    w = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    body = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'.join(f"<w:p><w:r><w:t>{p}</w:t></w:r></w:p>" for p in pages)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as z:
+        z.writestr("word/document.xml", f"<w:document {w}><w:body>{body}</w:body></w:document>")
+    return buffer.getvalue()
+
+
+def test_submission_is_searchable_by_reviewers(app, user_store, upload_service, job_workers):
+    data = _docx("مقدمة المشروع", "حققنا وفورات مالية كبيرة في الصيانة")
+    session = asyncio.run(upload_service.create(6, "project", "results.docx", len(data), "proj-results"))
+
+    async def chunks():
+        yield data
+
+    asyncio.run(upload_service.append(session.id, 0, chunks()))
+
+    client = TestClient(app)
+    answers = ("تصميم المشروع ومراحل التنفيذ", "تنفيذ المشروع حسب الخطة", "نتائج المشروع وأثره")
+    form = {"criteriaResponses": {c: {"text": t, "files": []} for c, t in zip(PROJECT_CRITERIA, answers)}}
+    body = {"categorySlug": "project", "referenceNumber": "SAM-1", "submittedAt": "2026-03-01T09:00:00.000Z"}
+    assert client.post("/api/v1/auth/submit-application/6", json={**body, "data": form}).status_code == 200
+    assert job_workers.run_pending() == 1
+
+    res = client.get("/api/v1/review/evidence", params={"q": "وفورات مالية", "criterion": "proj-results"})
+    items = res.json()["items"]
+    assert items[0]["fileName"] == "results.docx" and items[0]["page"] == 2
+    assert items[0]["userId"] == 6 and items[0]["kind"] == "attachment"
+    res = client.get("/api/v1/review/evidence", params={"q": "مراحل التنفيذ", "category": "project"})
+    assert res.json()["items"][0]["criterionId"] == "proj-design"
+    assert client.get("/api/v1/review/evidence", params={"q": "x", "category": "green"}).json() == {"items": []}
+    assert client.get("/api/v1/review/evidence", params={"q": ""}).status_code == 422